@@ -1,16 +1,13 @@
 import importlib
-import os
-import yaml
 
+from utils.cloud_config import get_cloud_config
 from utils.common import is_not_empty
 
 _default_adapter = "log"
 
 def get_adapter_type(key, default = _default_adapter):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        return loaded_data['adapters'][key] if 'adapters' in loaded_data and key in loaded_data['adapters'] and is_not_empty(loaded_data['adapters'][key]) else default
+    loaded_data = get_cloud_config().data
+    return loaded_data['adapters'][key] if 'adapters' in loaded_data and key in loaded_data['adapters'] and is_not_empty(loaded_data['adapters'][key]) else default
 
 def get_adapter_by_name(key, name):
     class_path = "{}Adapter".format(name.capitalize())
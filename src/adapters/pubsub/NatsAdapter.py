@@ -14,7 +14,7 @@ class NatsAdapter(PubsubAdapter):
 
     def consume(self, group, channel, handler):
         log_msg("DEBUG", "[Pubsub][NatsAdapter][consume] channel = {}, group = {}".format(channel, group))
-        _nc.consume(channel, handler)
+        _nc.consume(channel, handler, group is not None)
 
     def decode(self, msg):
         return json.loads(msg.data.decode())
@@ -1,7 +1,7 @@
-import asyncio
 import json
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
+from utils.executor import get_consumer_executor
 from utils.logger import log_msg
 from database.redis_db import redis_client as redis
 
@@ -15,7 +15,7 @@ class RedisAdapter(PubsubAdapter):
         sub = redis.pubsub()
         sub.subscribe(channel)
         for payload in sub.listen():
-            asyncio.run(handler(payload))
+            get_consumer_executor().dispatch(handler, payload)
 
     def decode(self, msg):
         log_msg("DEBUG", "[Pubsub][RedisAdapter][decode] msg = {}".format(msg))
@@ -1,31 +1,51 @@
-import asyncio
 import json
+import time
+import asyncio
+import threading
 
 from uuid import uuid4
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
+from utils.consumer import CONSUMER_BATCH_SIZE, CONSUMER_CLAIM_IDLE_TIME, CONSUMER_CLAIM_INTERVAL, CONSUMER_STREAM_MAXLEN
+from utils.executor import get_consumer_executor
 from utils.logger import log_msg
+from utils.observability.gauge import create_gauge, set_gauge
 
 from redis.exceptions import ResponseError
 from database.redis_db import redis_client as redis
 
 _consumer_name = "consumer_{}".format(uuid4())
+_stream_maxlen = CONSUMER_STREAM_MAXLEN if CONSUMER_STREAM_MAXLEN > 0 else None
+_lag_gauge = create_gauge("redisstream_consumer_lag", "Entries of the stream not delivered to the consumer group yet", ["channel", "group"])
+_pending_gauge = create_gauge("redisstream_consumer_pending", "Entries delivered to the consumer group but not acknowledged yet", ["channel", "group"])
+_running_entries = set()
+_running_lock = threading.Lock()
 
 class RedisstreamAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
         log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][send] channel = {}, group = {}, payload = {}".format(channel, group, payload))
-        redis.xadd(channel, { 'data': json.dumps(payload) })
+        redis.xadd(channel, { 'data': json.dumps(payload) }, maxlen=_stream_maxlen, approximate=True)
 
     def consume(self, group, channel, handler):
         log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] channel = {}, group = {}".format(channel, group))
 
+        if group is None:
+            self.consume_all(channel, handler)
+            return
+
         try:
             redis.xgroup_create(channel, group, mkstream=True)
         except ResponseError as re:
             log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] group {} already exists: {}".format(group, re))
 
+        claimed_at = 0
         while True:
-            messages = redis.xreadgroup(group, _consumer_name, { channel: '>' }, count=1, block=1000)
+            if time.monotonic() - claimed_at >= CONSUMER_CLAIM_INTERVAL:
+                self.claim(group, channel, handler)
+                self.observe_lag(group, channel)
+                claimed_at = time.monotonic()
+
+            messages = redis.xreadgroup(group, _consumer_name, { channel: '>' }, count=CONSUMER_BATCH_SIZE, block=1000)
             for message in messages:
                 if not isinstance(message, list):
                     continue
@@ -33,7 +53,67 @@ class RedisstreamAdapter(PubsubAdapter):
                 log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] stream = {}, message_data = {}".format(stream, message_data))
                 for msg_id, data in message_data:
                     log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] msg_id = {}, data = {}".format(msg_id, data))
-                    asyncio.run(handler(data))
+                    get_consumer_executor().dispatch(self.acked(group, channel, msg_id, handler), data)
+
+    def acked(self, group, channel, msg_id, handler):
+        entry = (channel, group, msg_id)
+        with _running_lock:
+            _running_entries.add(entry)
+
+        async def handle_and_ack(data):
+            try:
+                await handler(data)
+            finally:
+                #? the handler reports its own errors on the invocation: only the entries of crashed consumers are claimed again
+                try:
+                    await asyncio.to_thread(redis.xack, channel, group, msg_id)
+                finally:
+                    with _running_lock:
+                        _running_entries.discard(entry)
+        return handle_and_ack
+
+    def is_running(self, group, channel, msg_id):
+        with _running_lock:
+            return (channel, group, msg_id) in _running_entries
+
+    def claim(self, group, channel, handler):
+        start_id = '0-0'
+        while True:
+            claimed = redis.xautoclaim(channel, group, _consumer_name, CONSUMER_CLAIM_IDLE_TIME, start_id, count=CONSUMER_BATCH_SIZE)
+            start_id, message_data = claimed[0], claimed[1]
+            for msg_id, data in message_data:
+                log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][claim] msg_id = {}, data = {}".format(msg_id, data))
+                if data is None:
+                    #? the entry has been trimmed meanwhile
+                    redis.xack(channel, group, msg_id)
+                    continue
+                if self.is_running(group, channel, msg_id):
+                    #? still handled by this consumer: claiming it has only reset its idle time
+                    continue
+                get_consumer_executor().dispatch(self.acked(group, channel, msg_id, handler), data)
+
+            if start_id == '0-0':
+                return
+
+    def observe_lag(self, group, channel):
+        try:
+            for info in redis.xinfo_groups(channel):
+                if info['name'] == group:
+                    labels = { 'channel': channel, 'group': group }
+                    set_gauge(_lag_gauge, info.get('lag'), labels)
+                    set_gauge(_pending_gauge, info.get('pending'), labels)
+        except ResponseError as re:
+            log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][observe_lag] cannot get the group's info: {}".format(re))
+
+    def consume_all(self, channel, handler):
+        last_id = '$'
+        while True:
+            messages = redis.xread({ channel: last_id }, block=1000)
+            for stream, message_data in messages:
+                for msg_id, data in message_data:
+                    log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume_all] msg_id = {}, data = {}".format(msg_id, data))
+                    last_id = msg_id
+                    get_consumer_executor().dispatch(handler, data)
 
     def decode(self, msg):
         log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][decode] msg = {}".format(msg))
@@ -0,0 +1,74 @@
+from jinja2 import Environment, FileSystemLoader, BaseLoader, meta, select_autoescape
+from jinja2.exceptions import TemplateSyntaxError
+
+from utils.common import get_src_path, AUTOESCAPE_EXTENSIONS
+from utils.consumer import CONSUMER_FUNCTIONS_CACHE_SIZE, CONSUMER_FUNCTIONS_CACHE_TTL
+from utils.functions import get_ext_from_language
+from utils.logger import log_msg
+from utils.lru_cache import TtlLruCache
+
+_templates_path = "{}/templates/faas/main".format(get_src_path())
+_env = Environment(loader=FileSystemLoader(_templates_path), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
+_string_env = Environment(loader=BaseLoader(), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
+_handle_call_placeholder = "__cwcloud_handle_call_placeholder__"
+_user_auth_variables = ["user_auth_key", "user_auth_value"]
+
+_definitions = TtlLruCache(CONSUMER_FUNCTIONS_CACHE_SIZE, CONSUMER_FUNCTIONS_CACHE_TTL)
+
+class FunctionDefinition():
+  def __init__(self, function_id, serverless_function):
+    self.function = serverless_function
+    self.language = serverless_function['content']['language']
+    self.ext = get_ext_from_language(self.language)
+    self.updated_at = serverless_function.get('updated_at')
+    self.templates = None
+    self.variables = None
+
+    if "env" not in serverless_function['content']:
+      serverless_function['content']['env'] = {}
+
+    #? the main template is rendered once with a placeholder for the arguments
+    #? then both parts around the placeholder are compiled for the second pass (env and user_auth)
+    self.main_content = _env.get_template("main.{}.j2".format(self.ext)).render(
+      function_id=function_id,
+      handle_definition=serverless_function['content']['code'],
+      handle_call=_handle_call_placeholder
+    )
+
+    try:
+      self.variables = meta.find_undeclared_variables(_string_env.parse(self.main_content))
+    except TemplateSyntaxError as e:
+      log_msg("DEBUG", "[consume][FunctionDefinition] cannot parse the function's templates, e.msg = {}".format(e))
+
+    if self.main_content.count(_handle_call_placeholder) == 1:
+      try:
+        prefix, suffix = self.main_content.split(_handle_call_placeholder)
+        self.templates = (_string_env.from_string(prefix), _string_env.from_string(suffix))
+      except TemplateSyntaxError as e:
+        log_msg("DEBUG", "[consume][FunctionDefinition] cannot precompile the function's templates, e.msg = {}".format(e))
+
+  def uses_user_auth(self):
+    return self.variables is None or any(variable in self.variables for variable in _user_auth_variables)
+
+  def render(self, handle_call, **kwargs):
+    kwargs['env'] = self.function['content']['env']
+    if self.templates is None:
+      template = _string_env.from_string(self.main_content.replace(_handle_call_placeholder, handle_call))
+      return template.render(**kwargs)
+
+    rendered_handle_call = _string_env.from_string(handle_call).render(**kwargs) if "{" in handle_call else handle_call
+    return "{}{}{}".format(self.templates[0].render(**kwargs), rendered_handle_call, self.templates[1].render(**kwargs))
+
+def get_cached_definition(function_id):
+  return _definitions.get(function_id)
+
+def cache_definition(function_id, serverless_function):
+  definition = FunctionDefinition(function_id, serverless_function)
+  _definitions.put(function_id, definition)
+  return definition
+
+def invalidate_definition(function_id, updated_at = None):
+  definition = _definitions.get(function_id)
+  if definition is not None and (updated_at is None or definition.updated_at != updated_at):
+    log_msg("DEBUG", "[consume][invalidate_definition] function_id = {}, updated_at = {}".format(function_id, updated_at))
+    _definitions.delete(function_id)
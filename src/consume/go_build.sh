@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+cd /functions
+go build -o "${2}" "${1}.go"
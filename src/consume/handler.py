@@ -1,17 +1,21 @@
 import re
-import requests
-
-from jinja2 import Environment, FileSystemLoader, BaseLoader, select_autoescape
+import asyncio
+import hashlib
+import httpx
 
 from adapters.AdapterConfig import get_adapter
-from utils.command import get_script_output
-from utils.common import get_env_int, get_src_path, is_not_empty, is_empty_key, is_not_empty_key, AUTOESCAPE_EXTENSIONS
+from consume.definitions import cache_definition, get_cached_definition, invalidate_definition
+from consume.pool import eval_pooled, get_runtime_handle_call, is_pooled
+from consume.results import ResultsBatcher
+from utils.command import aget_script_output
+from utils.common import get_src_path, is_not_empty, is_empty_key, is_not_empty_key
+from utils.consumer import CONSUMER_RESULTS_BATCH_SIZE, CONSUMER_RESULTS_BATCH_WAIT_TIME
 from utils.faas.vars import FAAS_API_TOKEN, FAAS_API_URL
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.observability.otel import get_otel_tracer
 from utils.security import is_forbidden
 from utils.file import quiet_remove
-from utils.functions import get_ext_from_language, is_not_supported_language
+from utils.functions import is_not_supported_language
 from utils.logger import log_msg
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
@@ -21,32 +25,70 @@ from utils.observability.enums import Method
 _api_endpoint = "{}/v1/faas".format(FAAS_API_URL)
 _functions_file_path = "/functions"
 _consume_src_path = "{}/consume".format(get_src_path())
-_templates_path = "{}/templates/faas/main".format(get_src_path())
-_env = Environment(loader=FileSystemLoader(_templates_path), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
 
 pubsub_adapter = get_adapter("pubsub")
 
 _headers = { "X-Auth-Token": FAAS_API_TOKEN } if is_not_empty(FAAS_API_TOKEN) else None
 _span_prefix = "faas-consumer"
 _counter = create_counter("consumer", "consumer counter")
+_http_client = None
+
+def get_http_client():
+  global _http_client
+  if _http_client is None:
+    _http_client = httpx.AsyncClient(headers=_headers, timeout=HTTP_REQUEST_TIMEOUT)
+  return _http_client
 
-def update_invocation(invocation_id, payload):
+async def update_invocation(invocation_id, payload):
   invocation_url = "{}/invocation/{}".format(_api_endpoint, invocation_id)
   log_msg("DEBUG", "[consume][update_invocation] update invocation with : {}, invocation_url = {}".format(payload, invocation_url))
-  r_update_payload = requests.put(invocation_url, json=payload, headers=_headers, timeout=HTTP_REQUEST_TIMEOUT)
+  r_update_payload = await get_http_client().put(invocation_url, json=payload)
   if r_update_payload.status_code != 200:
     log_msg("ERROR", "[consume][update_invocation] bad response from the API: code = {}, body = {}".format(r_update_payload.status_code, r_update_payload.content))
 
-def error_invocation(invocation_id, payload, msg):
+async def update_invocations(payloads):
+  invocations_url = "{}/invocations".format(_api_endpoint)
+  log_msg("DEBUG", "[consume][update_invocations] update {} invocations, invocations_url = {}".format(len(payloads), invocations_url))
+  r_update_payloads = await get_http_client().put(invocations_url, json={ 'invocations': payloads })
+  if r_update_payloads.status_code in [404, 405]:
+    log_msg("WARN", "[consume][update_invocations] the API doesn't support the bulk completion, falling back to one update per invocation")
+    for payload in payloads:
+      await update_invocation(payload['id'], payload)
+    return
+
+  if r_update_payloads.status_code != 200:
+    log_msg("ERROR", "[consume][update_invocations] bad response from the API: code = {}, body = {}".format(r_update_payloads.status_code, r_update_payloads.content))
+    return
+
+  for result in r_update_payloads.json()['results']:
+    if result['status'] != 'ok':
+      log_msg("ERROR", "[consume][update_invocations] the invocation {} hasn't been updated: {}".format(result['id'], result))
+
+_results_batcher = ResultsBatcher(CONSUMER_RESULTS_BATCH_SIZE, CONSUMER_RESULTS_BATCH_WAIT_TIME, update_invocations)
+
+async def save_invocation(invocation_id, payload):
+  if CONSUMER_RESULTS_BATCH_SIZE > 1:
+    await _results_batcher.add(payload)
+  else:
+    await update_invocation(invocation_id, payload)
+
+async def error_invocation(invocation_id, payload, msg):
   log_msg("ERROR", "[consumer][error_invocation] {}, payload = {}".format(msg, payload))
   payload['content']['state'] = "error"
   payload['content']['result'] = msg
-  update_invocation(invocation_id, payload)
+  await save_invocation(invocation_id, payload)
 
 def is_user_authenticated(payload):
   log_msg("DEBUG", "[is_authenticated] serverless_function = {}".format(payload['content']['user_auth']['is_authenticated']))
   return payload['content']['user_auth']['is_authenticated']
 
+def get_isolation_key(function_id, payload):
+  #? a warm interpreter is only reused by the same function called with the same credentials
+  if not is_user_authenticated(payload):
+    return function_id
+
+  return "{}:{}".format(function_id, hashlib.sha256(payload['content']['user_auth']['header_value'].encode('utf-8')).hexdigest())
+
 async def handle(msg):
   with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.ASYNCWORKER)):
     increment_counter(_counter, Method.ASYNCWORKER)
@@ -64,91 +106,104 @@ async def handle(msg):
     invocation_id = payload['id']
 
     if is_empty_key(payload, 'content') or is_empty_key(payload['content'], 'function_id'):
-      error_invocation(invocation_id, payload, "the invocation {} is not valid, missing function_id".format(invocation_id))
+      await error_invocation(invocation_id, payload, "the invocation {} is not valid, missing function_id".format(invocation_id))
       return
 
     function_id = payload['content']['function_id']
-    function_url = "{}/function/{}".format(_api_endpoint, function_id)
-    log_msg("DEBUG", "[consume][handle] getting function_url = {}".format(function_url))
-    r_serverless_function = requests.get(function_url, headers =_headers, timeout=HTTP_REQUEST_TIMEOUT)
-    if r_serverless_function.status_code != 200:
-      error_invocation(invocation_id, payload, "the function {} is not found".format(function_id))
-      return
-    
-    serverless_function = r_serverless_function.json()
-    if is_empty_key(serverless_function, 'content') or is_empty_key(serverless_function['content'], 'language'):
-      error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing language".format(function_id))
-      return
+    definition = get_cached_definition(function_id)
+    if definition is None:
+      function_url = "{}/function/{}".format(_api_endpoint, function_id)
+      log_msg("DEBUG", "[consume][handle] getting function_url = {}".format(function_url))
+      r_serverless_function = await get_http_client().get(function_url)
+      if r_serverless_function.status_code != 200:
+        await error_invocation(invocation_id, payload, "the function {} is not found".format(function_id))
+        return
 
-    language = serverless_function['content']['language']
-    if is_not_supported_language(language):
-      error_invocation(invocation_id, payload, "not supported language: {}".format(language))
-      return
+      serverless_function = r_serverless_function.json()
+      if is_empty_key(serverless_function, 'content') or is_empty_key(serverless_function['content'], 'language'):
+        await error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing language".format(function_id))
+        return
 
-    if is_empty_key(serverless_function['content'], 'code'):
-      error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing code".format(function_id))
-      return
+      language = serverless_function['content']['language']
+      if is_not_supported_language(language):
+        await error_invocation(invocation_id, payload, "not supported language: {}".format(language))
+        return
+
+      if is_empty_key(serverless_function['content'], 'code'):
+        await error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing code".format(function_id))
+        return
+
+      definition = cache_definition(function_id, serverless_function)
+
+    serverless_function = definition.function
+    language = definition.language
 
     if is_not_empty_key(payload['content'], 'args'):
       args = payload['content']['args']
       if any(is_forbidden(arg['value']) for arg in args):
-        error_invocation(invocation_id, payload, "forbidden argument(s) for the function {}".format(function_id))
+        await error_invocation(invocation_id, payload, "forbidden argument(s) for the function {}".format(function_id))
         return
 
       if is_not_empty_key(serverless_function['content'], 'regexp'):
           regexp = serverless_function['content']['regexp']
           if any(not re.match(regexp, arg['value']) for arg in args):
-              error_invocation(invocation_id, payload, "the function {}'s definition forbid some arguments, regexp = {}".format(function_id, regexp))
+              await error_invocation(invocation_id, payload, "the function {}'s definition forbid some arguments, regexp = {}".format(function_id, regexp))
               return
 
     try:
       payload['content']['state'] = "complete"
-      ext = get_ext_from_language(language)
-      function_file_path = "{}/{}.{}".format(_functions_file_path, invocation_id, ext)
-      log_msg("DEBUG", "[consume][handle] write function file : {}".format(function_file_path))
-      with open(function_file_path, 'w') as function_file:
-        template = _env.get_template("main.{}.j2".format(ext))
-
-        function_with_args_tpl = "handle({})"
-        function_without_args_tpl = "handle()"
-        args_separator = ","
-
-        if language == "bash":
-          function_with_args_tpl="handle {}"
-          function_without_args_tpl="handle"
-          args_separator=" "
-
-        handle_call = function_with_args_tpl.format(args_separator.join(["\"{}\"".format(item['value']) for item in payload['content']['args']])) if is_not_empty_key(payload['content'], 'args') else function_without_args_tpl
-
-        main_content = template.render(
-          function_id=function_id,
-          handle_definition=serverless_function['content']['code'],
-          handle_call=handle_call
+      ext = definition.ext
+
+      function_with_args_tpl = "handle({})"
+      function_without_args_tpl = "handle()"
+      args_separator = ","
+
+      if language == "bash":
+        function_with_args_tpl="handle {}"
+        function_without_args_tpl="handle"
+        args_separator=" "
+
+      args_values = [item['value'] for item in payload['content']['args']] if is_not_empty_key(payload['content'], 'args') else []
+      handle_call = function_with_args_tpl.format(args_separator.join(["\"{}\"".format(value) for value in args_values])) if len(args_values) > 0 else function_without_args_tpl
+
+      #? the go binaries are cached per function's code: the arguments are passed at run time and the code using the user's auth isn't cached
+      pooled = is_pooled(ext) and (ext != "go" or not definition.uses_user_auth())
+      if pooled and ext == "go":
+        handle_call = get_runtime_handle_call(len(args_values))
+
+      if is_user_authenticated(payload):
+        log_msg("DEBUG", "[consume][handle] user is authenticated, user_auth_key = {}, user_auth_value = {}".format(payload['content']['user_auth']['header_key'], payload['content']['user_auth']['header_value']))
+        main_content = definition.render(
+          handle_call,
+          user_auth_key=payload['content']['user_auth']['header_key'] ,
+          user_auth_value=payload['content']['user_auth']['header_value']
         )
-
-        if "env" not in serverless_function['content']:
-          serverless_function['content']['env'] = {}
-
-        env = Environment(loader=BaseLoader(), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
-        template = env.from_string(main_content)
-        if is_user_authenticated(payload):
-          log_msg("DEBUG", "[consume][handle] user is authenticated, user_auth_key = {}, user_auth_value = {}".format(payload['content']['user_auth']['header_key'], payload['content']['user_auth']['header_value']))
-          main_content = template.render(
-            user_auth_key=payload['content']['user_auth']['header_key'] ,
-            user_auth_value=payload['content']['user_auth']['header_value'],
-            env=serverless_function['content']['env']
-          )
-        else:
-          main_content = template.render(
-            env=serverless_function['content']['env']
-          )
-
-        function_file.write(main_content)
-      payload['content']['result'] = "{}".format(get_script_output("{}/{}_eval.sh {}".format(_consume_src_path, ext, invocation_id)))
-
-      quiet_remove(function_file_path)
-      update_invocation(invocation_id, payload)
+      else:
+        main_content = definition.render(handle_call)
+
+      if pooled:
+        log_msg("DEBUG", "[consume][handle] eval function with the warm {} interpreters: invocation_id = {}".format(ext, invocation_id))
+        payload['content']['result'] = "{}".format(await asyncio.to_thread(eval_pooled, ext, invocation_id, main_content, get_isolation_key(function_id, payload), args_values))
+      else:
+        function_file_path = "{}/{}.{}".format(_functions_file_path, invocation_id, ext)
+        log_msg("DEBUG", "[consume][handle] write function file : {}".format(function_file_path))
+        with open(function_file_path, 'w') as function_file:
+          function_file.write(main_content)
+        payload['content']['result'] = "{}".format(await aget_script_output("{}/{}_eval.sh {}".format(_consume_src_path, ext, invocation_id)))
+        quiet_remove(function_file_path)
+
+      await save_invocation(invocation_id, payload)
     except Exception as e:
-      error_invocation(invocation_id, payload, "e.type = {}, e.msg = {}".format(type(e), e))
+      await error_invocation(invocation_id, payload, "e.type = {}, e.msg = {}".format(type(e), e))
     finally:
       await pubsub_adapter().reply(msg, payload)
+
+async def handle_function_change(msg):
+  with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.ASYNCWORKER)):
+    payload = pubsub_adapter().decode(msg)
+    if payload is None or is_empty_key(payload, 'function') or is_empty_key(payload['function'], 'id'):
+      log_msg("DEBUG", "[consume][handle_function_change] invalid payload = {}".format(payload))
+      return
+
+    log_msg("DEBUG", "[consume][handle_function_change] receive : {}".format(payload))
+    invalidate_definition(payload['function']['id'], payload['function']['updated_at'] if is_not_empty_key(payload['function'], 'updated_at') else None)
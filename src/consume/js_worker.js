@@ -0,0 +1,129 @@
+const readline = require('readline');
+const util = require('util');
+const vm = require('vm');
+
+const { Console } = require('console');
+const { Writable } = require('stream');
+
+let chunks = [];
+
+const output = new Writable({
+    write(chunk, encoding, callback) {
+        chunks.push(chunk.toString());
+        callback();
+    }
+});
+
+const capturedConsole = new Console({ stdout: output, stderr: output });
+
+//? the replies keep the real stdout, the functions writing on it (even through require('process')) are captured
+const reply = process.stdout.write.bind(process.stdout);
+process.stdout.write = (chunk, encoding, callback) => output.write(chunk, encoding, callback);
+process.stderr.write = (chunk, encoding, callback) => output.write(chunk, encoding, callback);
+
+process.on('uncaughtException', (err) => chunks.push(util.format('%s\n', err && err.stack ? err.stack : err)));
+process.on('unhandledRejection', (err) => chunks.push(util.format('%s\n', err && err.stack ? err.stack : err)));
+
+function isThenable(value) {
+    return value !== null && (typeof value === 'object' || typeof value === 'function') && typeof value.then === 'function';
+}
+
+function createSandbox(pending) {
+    const track = (promise) => {
+        pending.add(promise);
+        return promise;
+    };
+
+    //? the timers are pending until they've run or been cleared, like the event loop of a standalone node process
+    const timers = new Map();
+    const wrapTimer = (set, clear, once) => [
+        (callback, ...args) => {
+            let done;
+            track(new Promise((resolve) => done = resolve));
+            const timer = set((...cbArgs) => {
+                try {
+                    callback(...cbArgs);
+                } finally {
+                    if (once) {
+                        timers.delete(timer);
+                        done();
+                    }
+                }
+            }, ...args);
+            timers.set(timer, done);
+            return timer;
+        },
+        (timer) => {
+            clear(timer);
+            if (timers.has(timer)) {
+                timers.get(timer)();
+                timers.delete(timer);
+            }
+        }
+    ];
+
+    const [sandboxSetTimeout, sandboxClearTimeout] = wrapTimer(setTimeout, clearTimeout, true);
+    const [sandboxSetInterval, sandboxClearInterval] = wrapTimer(setInterval, clearInterval, false);
+    const [sandboxSetImmediate, sandboxClearImmediate] = wrapTimer(setImmediate, clearImmediate, true);
+
+    return {
+        require: require,
+        console: capturedConsole,
+        process: {
+            env: { ...process.env },
+            argv: [],
+            platform: process.platform,
+            version: process.version,
+            versions: process.versions,
+            stdout: output,
+            stderr: output,
+            nextTick: (callback, ...args) => process.nextTick(callback, ...args),
+            hrtime: process.hrtime,
+            memoryUsage: process.memoryUsage,
+            cwd: () => process.cwd()
+        },
+        Buffer: Buffer,
+        URL: URL,
+        fetch: globalThis.fetch ? (...args) => track(globalThis.fetch(...args)) : undefined,
+        setTimeout: sandboxSetTimeout,
+        clearTimeout: sandboxClearTimeout,
+        setInterval: sandboxSetInterval,
+        clearInterval: sandboxClearInterval,
+        setImmediate: sandboxSetImmediate,
+        clearImmediate: sandboxClearImmediate,
+        module: { exports: {} }
+    };
+}
+
+async function evalCode(request) {
+    chunks = [];
+    const pending = new Set();
+    const sandbox = createSandbox(pending);
+
+    try {
+        vm.runInNewContext(request.code, sandbox, { filename: `/functions/${request.id}.js` });
+        if (isThenable(sandbox.r)) {
+            pending.add(Promise.resolve(sandbox.r).catch((err) => chunks.push(util.format('%s\n', err && err.stack ? err.stack : err))));
+        }
+    } catch (err) {
+        chunks.push(util.format('%s\n', err && err.stack ? err.stack : err));
+    }
+
+    //? wait for the async work started by the function (promises, fetch and timers) before replying
+    do {
+        const settling = [...pending];
+        await Promise.allSettled(settling);
+        settling.forEach((promise) => pending.delete(promise));
+        await new Promise((resolve) => setImmediate(resolve));
+    } while (pending.size > 0);
+
+    return chunks.join('');
+}
+
+const requests = readline.createInterface({ input: process.stdin, terminal: false });
+
+let queue = Promise.resolve();
+requests.on('line', (line) => {
+    const request = JSON.parse(line);
+    queue = queue.then(() => evalCode(request)).then((result) => reply(`${JSON.stringify({ output: result })}\n`));
+});
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import signal
+import sys
+import threading
+
+from collections import OrderedDict
+from subprocess import Popen, PIPE, DEVNULL # nosec B404
+
+from utils.command import get_script_output
+from utils.common import get_src_path
+from utils.consumer import CONSUMER_GO_CACHE_SIZE, CONSUMER_POOL_ENABLED, CONSUMER_POOL_MAX_RUNS, CONSUMER_POOL_SIZE, CONSUMER_POOL_TIMEOUT
+from utils.file import create_dir_if_not_exists, quiet_remove
+from utils.logger import log_msg
+
+_functions_file_path = "/functions"
+_go_cache_path = "{}/.cache".format(_functions_file_path)
+_consume_src_path = "{}/consume".format(get_src_path())
+
+#? the warm interpreters only inherit those variables (no database, nats or api secrets)
+_sandbox_env_keys = ["PATH", "HOME", "LANG", "LC_ALL", "TZ", "NODE_PATH", "GOPATH", "GOCACHE"]
+
+_workers_cmds = {
+  "py": [sys.executable, "-I", "{}/py_worker.py".format(_consume_src_path)],
+  "js": ["node", "{}/js_worker.js".format(_consume_src_path)]
+}
+
+#? those workers start a fresh context per call, the others are only reused for the same isolation key
+_fresh_context_exts = ["py"]
+
+_pools = {}
+_go_cache = None
+
+def get_sandbox_env():
+  return { k: os.environ[k] for k in _sandbox_env_keys if k in os.environ }
+
+class InterpreterWorker():
+  def __init__(self, ext):
+    self.ext = ext
+    self.runs = 0
+    self.key = None
+    self.process = Popen(_workers_cmds[ext], stdin = PIPE, stdout = PIPE, stderr = DEVNULL, cwd = _functions_file_path, env = get_sandbox_env(), universal_newlines = True, bufsize = 1, start_new_session = True) # nosec B603
+    log_msg("DEBUG", "[consume][InterpreterWorker] started ext = {}, pid = {}".format(ext, self.process.pid))
+
+  def is_alive(self):
+    return self.process.poll() is None
+
+  def is_exhausted(self):
+    return self.runs >= CONSUMER_POOL_MAX_RUNS or not self.is_alive()
+
+  def eval(self, invocation_id, main_content):
+    self.runs = self.runs + 1
+    timer = threading.Timer(CONSUMER_POOL_TIMEOUT, self.stop)
+    timer.start()
+    try:
+      self.process.stdin.write("{}\n".format(json.dumps({ 'id': invocation_id, 'code': main_content })))
+      self.process.stdin.flush()
+      response = self.process.stdout.readline()
+    finally:
+      timer.cancel()
+
+    if not response:
+      raise RuntimeError("the {} interpreter has been stopped (timeout = {}s)".format(self.ext, CONSUMER_POOL_TIMEOUT))
+
+    return json.loads(response)['output']
+
+  def stop(self):
+    if self.is_alive():
+      log_msg("DEBUG", "[consume][InterpreterWorker] stopping ext = {}, pid = {}, runs = {}".format(self.ext, self.process.pid, self.runs))
+      #? kill the whole session to also stop the forked child running the function
+      try:
+        os.killpg(self.process.pid, signal.SIGKILL)
+      except OSError:
+        self.process.kill()
+
+class InterpreterPool():
+  def __init__(self, ext, size):
+    self.ext = ext
+    self.idle = []
+    self.available = threading.Condition()
+    for _ in range(size):
+      self.idle.append(self.spawn())
+
+  def spawn(self):
+    try:
+      return InterpreterWorker(self.ext)
+    except OSError as e:
+      log_msg("ERROR", "[consume][InterpreterPool] cannot start a {} interpreter: e.type = {}, e.msg = {}".format(self.ext, type(e), e))
+      return None
+
+  def take(self, key):
+    #? prefer a worker already bound to the same key, then a fresh one, then recycle the oldest
+    for candidates in ([w for w in self.idle if w is not None and w.key == key], [w for w in self.idle if w is None or w.key is None], self.idle):
+      if len(candidates) > 0:
+        worker = candidates[0]
+        self.idle.remove(worker)
+        return worker
+
+  def acquire(self, key = None):
+    if self.ext in _fresh_context_exts:
+      key = None
+
+    with self.available:
+      self.available.wait_for(lambda: len(self.idle) > 0)
+      worker = self.take(key)
+
+    if worker is None or worker.is_exhausted() or worker.key not in (None, key):
+      if worker is not None:
+        worker.stop()
+      worker = self.spawn()
+
+    if worker is None:
+      self.put(None)
+      raise RuntimeError("no {} interpreter available".format(self.ext))
+
+    worker.key = key
+    return worker
+
+  def put(self, worker):
+    with self.available:
+      self.idle.append(worker)
+      self.available.notify()
+
+  def release(self, worker):
+    if worker.is_exhausted():
+      worker.stop()
+      worker = self.spawn()
+    self.put(worker)
+
+  def eval(self, invocation_id, main_content, key = None):
+    worker = self.acquire(key)
+    try:
+      return worker.eval(invocation_id, main_content)
+    finally:
+      self.release(worker)
+
+class GoBinaryCache():
+  def __init__(self, size):
+    self.size = size
+    self.binaries = OrderedDict()
+    self.lock = threading.Lock()
+    self.builds = {}
+    self.running = {}
+    self.evicted = set()
+    shutil.rmtree(_go_cache_path, ignore_errors = True)
+    create_dir_if_not_exists(_go_cache_path)
+
+  def build(self, invocation_id, main_content, binary_path):
+    function_file_path = "{}/{}.go".format(_functions_file_path, invocation_id)
+    with open(function_file_path, 'w') as function_file:
+      function_file.write(main_content)
+
+    output = get_script_output("{}/go_build.sh {} {}".format(_consume_src_path, invocation_id, binary_path))
+    quiet_remove(function_file_path)
+    return output
+
+  def get_build_lock(self, digest):
+    with self.lock:
+      return self.builds.setdefault(digest, threading.Lock())
+
+  def acquire(self, digest):
+    with self.lock:
+      binary_path = self.binaries.get(digest)
+      if binary_path is not None:
+        self.binaries.move_to_end(digest)
+        self.running[binary_path] = self.running.get(binary_path, 0) + 1
+      return binary_path
+
+  def release(self, binary_path):
+    with self.lock:
+      self.running[binary_path] = self.running[binary_path] - 1
+      if self.running[binary_path] > 0:
+        return
+      del self.running[binary_path]
+      if binary_path not in self.evicted:
+        return
+      self.evicted.discard(binary_path)
+    quiet_remove(binary_path)
+
+  def add(self, digest, binary_path):
+    evicted_paths = []
+    with self.lock:
+      self.binaries[digest] = binary_path
+      while len(self.binaries) > self.size:
+        evicted_digest, evicted_path = self.binaries.popitem(last = False)
+        self.builds.pop(evicted_digest, None)
+        #? the binaries still running are removed by their last call
+        if evicted_path in self.running:
+          self.evicted.add(evicted_path)
+        else:
+          evicted_paths.append(evicted_path)
+
+    for evicted_path in evicted_paths:
+      quiet_remove(evicted_path)
+
+  def eval(self, invocation_id, main_content, args = None):
+    #? main_content only depends on the function's code and number of arguments, their values are passed at run time
+    digest = hashlib.sha256(main_content.encode('utf-8')).hexdigest()
+
+    #? the concurrent calls of the same code wait for a single build
+    with self.get_build_lock(digest):
+      binary_path = self.acquire(digest)
+      if binary_path is None:
+        log_msg("DEBUG", "[consume][GoBinaryCache] compiling digest = {}".format(digest))
+        build_path = "{}/{}_{}".format(_go_cache_path, digest, invocation_id)
+        output = self.build(invocation_id, main_content, build_path)
+        if not os.path.exists(build_path):
+          with self.lock:
+            self.builds.pop(digest, None)
+          return output
+
+        self.add(digest, build_path)
+        binary_path = self.acquire(digest)
+
+    try:
+      return get_script_output(shlex.join([binary_path] + (args if args is not None else [])), env = get_sandbox_env())
+    finally:
+      self.release(binary_path)
+
+def get_runtime_handle_call(nb_args):
+  return "handle({})".format(",".join(["cwcloudArgs[{}]".format(i) for i in range(nb_args)]))
+
+def init_interpreter_pools():
+  global _go_cache
+  if not CONSUMER_POOL_ENABLED:
+    return
+
+  log_msg("INFO", "[consume][init_interpreter_pools] warming up {} interpreter(s) per language, max_runs = {}".format(CONSUMER_POOL_SIZE, CONSUMER_POOL_MAX_RUNS))
+  for ext in _workers_cmds:
+    _pools[ext] = InterpreterPool(ext, CONSUMER_POOL_SIZE)
+  _go_cache = GoBinaryCache(CONSUMER_GO_CACHE_SIZE)
+
+def is_pooled(ext):
+  return ext in _pools or (ext == "go" and _go_cache is not None)
+
+def eval_pooled(ext, invocation_id, main_content, key = None, args = None):
+  if ext == "go":
+    return _go_cache.eval(invocation_id, main_content, args)
+
+  return _pools[ext].eval(invocation_id, main_content, key)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import traceback
+
+#? pre-warm the modules imported by the main.py.j2 template
+import requests # noqa: F401
+import yaml # noqa: F401
+
+from datetime import datetime # noqa: F401
+
+def eval_code(invocation_id, code):
+  with tempfile.TemporaryFile(mode = "w+") as output:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = (os.dup(1), os.dup(2))
+    os.dup2(output.fileno(), 1)
+    os.dup2(output.fileno(), 2)
+    try:
+      with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+          exec(compile(code, "/functions/{}.py".format(invocation_id), "exec"), { '__name__': '__main__' }) # nosec B102
+        except SystemExit:
+          pass
+        except BaseException:
+          exc_type, exc, tb = sys.exc_info()
+          traceback.print_exception(exc_type, exc, tb.tb_next)
+    finally:
+      output.flush()
+      os.dup2(saved_fds[0], 1)
+      os.dup2(saved_fds[1], 2)
+      os.close(saved_fds[0])
+      os.close(saved_fds[1])
+
+    output.seek(0)
+    return output.read()
+
+def eval_isolated(invocation_id, code):
+  #? each function runs in a forked child: the warm modules are shared but sys.modules, os.environ and the globals are not
+  read_fd, write_fd = os.pipe()
+  pid = os.fork()
+  if pid == 0:
+    os.close(read_fd)
+    with os.fdopen(write_fd, "w") as result:
+      result.write(eval_code(invocation_id, code))
+    os._exit(0)
+
+  os.close(write_fd)
+  with os.fdopen(read_fd, "r") as result:
+    output = result.read()
+  os.waitpid(pid, 0)
+  return output
+
+def main():
+  requests_channel = os.fdopen(os.dup(0), "r")
+  responses_channel = os.fdopen(os.dup(1), "w")
+
+  #? the functions must not be able to read or write the protocol's channels
+  devnull = os.open(os.devnull, os.O_RDWR)
+  os.dup2(devnull, 0)
+  sys.stdin = open(os.devnull, "r")
+
+  for line in requests_channel:
+    request = json.loads(line)
+    output = eval_isolated(request['id'], request['code'])
+    responses_channel.write("{}\n".format(json.dumps({ 'output': output })))
+    responses_channel.flush()
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,44 @@
+import asyncio
+
+from utils.logger import log_msg
+
+class ResultsBatcher():
+  def __init__(self, size, wait_time, flush_handler):
+    self.size = size
+    self.wait_time = wait_time
+    self.flush_handler = flush_handler
+    self.pending = []
+    self.timer = None
+
+  async def add(self, payload):
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    self.pending.append((payload, future))
+
+    if len(self.pending) >= self.size:
+      self.flush()
+    elif self.timer is None:
+      self.timer = loop.call_later(self.wait_time / 1000, self.flush)
+
+    #? the caller only replies to the message once its result has been written back
+    await future
+
+  def flush(self):
+    if self.timer is not None:
+      self.timer.cancel()
+      self.timer = None
+
+    batch, self.pending = self.pending, []
+    if len(batch) > 0:
+      asyncio.get_running_loop().create_task(self.write(batch))
+
+  async def write(self, batch):
+    log_msg("DEBUG", "[consume][ResultsBatcher][write] flushing {} result(s)".format(len(batch)))
+    try:
+      await self.flush_handler([payload for payload, _ in batch])
+    except Exception as e:
+      log_msg("ERROR", "[consume][ResultsBatcher][write] unexpected error: e.type = {}, e.msg = {}".format(type(e), e))
+    finally:
+      for _, future in batch:
+        if not future.done():
+          future.set_result(None)
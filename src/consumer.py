@@ -1,5 +1,7 @@
-from consume.handler import handle, pubsub_adapter
-from utils.consumer import CONSUMER_CHANNEL, CONSUMER_GROUP
+from consume.handler import handle, handle_function_change, pubsub_adapter
+from consume.pool import init_interpreter_pools
+from utils.broadcast import start_broadcast_listener
+from utils.consumer import CONSUMER_CHANNEL, CONSUMER_GROUP, FUNCTIONS_CHANNEL
 from utils.observability.otel import init_otel_metrics, init_otel_tracer, init_otel_logger
 from utils.workers import wait_startup_time
 
@@ -7,6 +9,10 @@ wait_startup_time()
 init_otel_tracer()
 init_otel_metrics()
 init_otel_logger()
+init_interpreter_pools()
+
+#? no consumer group: every consumer must invalidate its own functions cache
+start_broadcast_listener(FUNCTIONS_CHANNEL, handle_function_change)
 
 while True:
   pubsub_adapter().consume(CONSUMER_GROUP, CONSUMER_CHANNEL, handle)
@@ -8,13 +8,15 @@ from fastapi.responses import JSONResponse
 from entities.Bucket import Bucket
 from entities.User import User
 
-from utils.bucket import create_bucket, delete_bucket, refresh_bucket, register_bucket, update_credentials
+from utils.bucket import delete_bucket, refresh_bucket, register_bucket, update_credentials
 from utils.common import is_empty, is_not_empty, is_numeric, is_true
 from utils.instance import check_instance_name_validity
 from utils.dynamic_name import generate_hashed_name
 from utils.provider import exist_provider, get_provider_infos
 from utils.encoder import AlchemyEncoder
 from utils.observability.cid import get_current_cid
+from utils.provisioning import enqueue_provisioning_job
+from utils.statistics import invalidate_user_statistics
 
 def admin_create_bucket(current_user, provider, region, payload, db, bt: BackgroundTasks):
     bucket_name = payload.name
@@ -80,10 +82,18 @@ def admin_create_bucket(current_user, provider, region, payload, db, bt: Backgro
         check_instance_name_validity(bucket_name)
         hash, hashed_bucket_name = generate_hashed_name(bucket_name)
         new_bucket = register_bucket(hash, provider, region, chosen_user_id, current_user.id, bucket_name, bucket_type, db)
-
-        bt.add_task(create_bucket, provider, exist_user.email, new_bucket.id, hashed_bucket_name, region, bucket_type, db)
-
-        new_bucket_json = json.loads(json.dumps(new_bucket, cls = AlchemyEncoder))
+        invalidate_user_statistics(new_bucket.user_id)
+
+        job = enqueue_provisioning_job("bucket", provider, new_bucket.id, new_bucket.user_id, {
+            'provider': provider,
+            'user_email': exist_user.email,
+            'bucket_id': new_bucket.id,
+            'hashed_bucket_name': hashed_bucket_name,
+            'region': region,
+            'bucket_type': bucket_type
+        }, db)
+
+        new_bucket_json = {**json.loads(json.dumps(new_bucket, cls = AlchemyEncoder)), 'job_id': "{}".format(job.id)}
         return JSONResponse(content = new_bucket_json, status_code = 200)
     except auto.StackAlreadyExistsError:
         return JSONResponse(content = {
@@ -158,6 +168,7 @@ def admin_remove_bucket(current_user, bucket_id, db, bt: BackgroundTasks):
     try:
         bt.add_task(delete_bucket, user_bucket.provider, user_bucket, user_email)
         Bucket.updateStatus(user_bucket.id, "deleted", db)
+        invalidate_user_statistics(user_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message': 'bucket successfully deleted', 
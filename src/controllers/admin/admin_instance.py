@@ -5,17 +5,22 @@ from pulumi import automation as auto
 from fastapi import BackgroundTasks
 from fastapi.responses import JSONResponse
 
+from entities.Instance import Instance
+
 from utils.common import is_boolean, is_empty, is_false, is_not_empty, is_not_empty_key, is_numeric, is_true
 from utils.dns_zones import get_dns_zones
 from utils.domain import is_not_subdomain_valid
 from utils.images import get_os_image
 from utils.dynamic_name import rehash_dynamic_name
-from utils.instance import check_exist_instance, check_instance_name_validity, generic_remove_instance, get_server_state, get_virtual_machine, update_instance_status, create_instance, register_instance, refresh_instance, get_virtual_machine, reregister_instance
+from utils.instance import check_exist_instance, check_instance_name_validity, generic_remove_instance, update_instance_status, register_instance, refresh_instance, reregister_instance
+from utils.inventory import get_instance_vm, get_instances_vms
 from utils.logger import log_msg
 from utils.dynamic_name import generate_hashed_name
 from utils.gitlab import get_gitlab_project, get_gitlab_project_playbooks, get_project_quietly, get_user_project_by_id, get_user_project_by_name, get_user_project_by_url, is_http_error_fetching_project, is_not_project_found_in_gitlab, refresh_project_credentials
 from utils.encoder import AlchemyEncoder
 from utils.provider import exist_provider, get_provider_infos, get_provider_available_instances_by_region_zone
+from utils.provisioning import enqueue_provisioning_job
+from utils.statistics import invalidate_user_statistics
 from utils.zone_utils import exists_zone
 from utils.observability.cid import get_current_cid
 
@@ -209,33 +214,33 @@ def admin_add_instance(current_user, payload, provider, region, zone, environmen
         log_msg("DEBUG", "[admin_instance][admin_add_instance] hash = {}, hashed_instance_name = {}".format(hash, hashed_instance_name))
 
         new_instance = register_instance(hash, provider, region, zone, userid, instance_name.lower(), instance_type, environment, gitlab_project, root_dns_zone, db)
+        invalidate_user_statistics(userid)
         ami_image = get_os_image(region, zone)
         user_project_json = json.loads(json.dumps(exist_project, cls = AlchemyEncoder))
         env_json = json.loads(json.dumps(exist_env, cls = AlchemyEncoder))
 
-        bt.add_task(create_instance,
-            provider,
-            ami_image,
-            new_instance.id,
-            email,
-            instance_name,
-            hashed_instance_name,
-            env_json,
-            region,
-            zone,
-            generate_dns,
-            gitlab_project,
-            user_project_json,
-            instance_type,
-            debug,
-            centralized,
-            root_dns_zone,
-            payload.args,
-            db
-        )
+        job = enqueue_provisioning_job("instance", provider, new_instance.id, new_instance.user_id, {
+            'provider': provider,
+            'ami_image': ami_image,
+            'instance_id': new_instance.id,
+            'user_email': email,
+            'instance_name': instance_name,
+            'hashed_instance_name': hashed_instance_name,
+            'environment': env_json,
+            'instance_region': region,
+            'instance_zone': zone,
+            'generate_dns': generate_dns,
+            'gitlab_project': gitlab_project,
+            'user_project': user_project_json,
+            'instance_type': instance_type,
+            'debug': debug,
+            'centralized': centralized,
+            'root_dns_zone': root_dns_zone,
+            'args': payload.args
+        }, db)
 
         dumpedInstance = json.loads(json.dumps(new_instance, cls = AlchemyEncoder))
-        new_instance_json = {**dumpedInstance, "environment": new_instance.environment.name, "path": new_instance.environment.path, 'status': 'ok',"gitlab_project": new_instance.project.url}
+        new_instance_json = {**dumpedInstance, "environment": new_instance.environment.name, "path": new_instance.environment.path, 'status': 'ok',"gitlab_project": new_instance.project.url, "job_id": "{}".format(job.id)}
         return JSONResponse(content = new_instance_json, status_code = 200)
     except auto.StackAlreadyExistsError as sae:
         log_msg("ERROR", "[admin_instance][admin_add_instance] unexpected StackAlreadyExistsError:{}".format(sae))
@@ -382,33 +387,33 @@ def admin_attach_instance(bt: BackgroundTasks, current_user, provider, region, z
     try:
         gitlab_project = get_gitlab_project(project_id, exist_project.gitlab_host, exist_project.access_token)
         reregister_instance(userInstance.id, provider, region, zone, instance_type, userInstance.root_dns_zone, project_id, db)
+        invalidate_user_statistics(userInstance.user_id)
         ami_image = get_os_image(region, zone)
         user_project_json = json.loads(json.dumps(exist_project, cls = AlchemyEncoder))
         env_json = json.loads(json.dumps(exist_env, cls = AlchemyEncoder))
 
-        bt.add_task(create_instance,
-            provider,
-            ami_image,
-            userInstance.id,
-            exist_user.email,
-            instance_name,
-            hashed_instance_name,
-            env_json,
-            region,
-            zone,
-            generate_dns,
-            gitlab_project,
-            user_project_json,
-            instance_type,
-            debug,
-            centralized,
-            userInstance.root_dns_zone,
-            None,
-            db
-        )
+        job = enqueue_provisioning_job("instance", provider, userInstance.id, userInstance.user_id, {
+            'provider': provider,
+            'ami_image': ami_image,
+            'instance_id': userInstance.id,
+            'user_email': exist_user.email,
+            'instance_name': instance_name,
+            'hashed_instance_name': hashed_instance_name,
+            'environment': env_json,
+            'instance_region': region,
+            'instance_zone': zone,
+            'generate_dns': generate_dns,
+            'gitlab_project': gitlab_project,
+            'user_project': user_project_json,
+            'instance_type': instance_type,
+            'debug': debug,
+            'centralized': centralized,
+            'root_dns_zone': userInstance.root_dns_zone,
+            'args': None
+        }, db)
 
         dumpedInstance = json.loads(json.dumps(userInstance, cls = AlchemyEncoder))
-        new_instance_json = {**dumpedInstance, 'environment': userInstance.environment.name, 'path': userInstance.environment.path, 'gitlab_project': userInstance.project.url}
+        new_instance_json = {**dumpedInstance, 'environment': userInstance.environment.name, 'path': userInstance.environment.path, 'gitlab_project': userInstance.project.url, 'job_id': "{}".format(job.id)}
         return JSONResponse(content = new_instance_json, status_code = 200)
     except auto.StackAlreadyExistsError:
         return JSONResponse(content = {
@@ -452,10 +457,39 @@ def admin_get_instance(current_user, instance_id, db):
         **dumpedInstance,
         "environment": userInstance.environment.name if is_not_empty(userInstance.environment) and is_not_empty(userInstance.environment.name) else "unknown",
         "path": userInstance.environment.path if is_not_empty(userInstance.environment) and is_not_empty(userInstance.environment.path) else "unknown",
-        "project": {**dumpedProject} if is_not_empty(dumpedProject) else { "name": "unknown" }
+        "project": {**dumpedProject} if is_not_empty(dumpedProject) else { "name": "unknown" },
+        "vm": get_instances_vms([userInstance], db)[0]
     }
     return JSONResponse(content = instanceJson, status_code = 200)
 
+def admin_get_instance_state(current_user, instance_id, refresh, db):
+    if not is_numeric(instance_id):
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Invalid instance id',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    userInstance = Instance.findInstanceById(instance_id, db)
+    if not userInstance:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Instance not found', 
+            'i18n_code': "instance_not_found",
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    server = get_instance_vm(userInstance, db, refresh)
+    if not server:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Instance not found', 
+            'i18n_code': "instance_not_found",
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    return JSONResponse(content = server, status_code = 200)
+
 def admin_remove_instance(current_user, instance_id, db, bt: BackgroundTasks):
     if not is_numeric(instance_id):
         return JSONResponse(content = {
@@ -489,6 +523,7 @@ def admin_remove_instance(current_user, instance_id, db, bt: BackgroundTasks):
             'cid': get_current_cid()
         }, status_code = result_remove["http_code"])
 
+    invalidate_user_statistics(user_instance.user_id)
     return JSONResponse(content = result_remove["message"], status_code = result_remove["http_code"])
 
 def admin_refresh_instance(current_user, instance_id, db):
@@ -510,7 +545,7 @@ def admin_refresh_instance(current_user, instance_id, db):
             'cid': get_current_cid()
         }, status_code = 404)
     hashed_instance_name = f'{userInstance.name}-{userInstance.hash}'
-    if not get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, hashed_instance_name):
+    if not get_instance_vm(userInstance, db, refresh = True):
         return JSONResponse(content = {
             'status': 'ko',
             'error': 'Instance not found', 
@@ -545,7 +580,7 @@ def admin_update_instance(current_user, instance_id, payload, db):
             'cid': get_current_cid()
         }, status_code = 404)
 
-    server = get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, f'{userInstance.name}-{userInstance.hash}')
+    server = get_instance_vm(userInstance, db)
 
     if not server:
         return JSONResponse(content = {
@@ -565,7 +600,7 @@ def admin_update_instance(current_user, instance_id, payload, db):
                 'i18n_code': 'active_not_exist',
                 'cid': get_current_cid()
             }, status_code = 400)
-        server_state = get_server_state(userInstance.provider, server)
+        server_state = server['state']
         if action == "poweroff":
             if server_state == "stopped":
                 return JSONResponse(content = {
@@ -691,7 +726,7 @@ def admin_update_instance(current_user, instance_id, payload, db):
 def admin_get_instances(current_user, provider, region, db):
     from entities.Instance import Instance
     userRegionInstances = Instance.getAllInstancesByRegion(provider, region, db)
-    userRegionInstancesJson = json.loads(json.dumps(userRegionInstances, cls = AlchemyEncoder))
+    userRegionInstancesJson = [{**instance, "vm": vm} for instance, vm in zip(json.loads(json.dumps(userRegionInstances, cls = AlchemyEncoder)), get_instances_vms(userRegionInstances, db))]
     return JSONResponse(content = userRegionInstancesJson, status_code = 200)
 
 def admin_get_user_instances(current_user, provider, region, user_id, db):
@@ -704,5 +739,5 @@ def admin_get_user_instances(current_user, provider, region, user_id, db):
         }, status_code = 404)
     from entities.Instance import Instance
     userRegionInstances = Instance.getAllUserInstancesByRegion(provider, region, user_id, db)
-    userRegionInstancesJson = json.loads(json.dumps(userRegionInstances, cls = AlchemyEncoder))
+    userRegionInstancesJson = [{**instance, "vm": vm} for instance, vm in zip(json.loads(json.dumps(userRegionInstances, cls = AlchemyEncoder)), get_instances_vms(userRegionInstances, db))]
     return JSONResponse(content = userRegionInstancesJson, status_code = 200)
@@ -9,6 +9,7 @@ from entities.kubernetes.KubeconfigFile import KubeConfigFile
 
 from utils.logger import log_msg
 from utils.yaml import read_uploaded_yaml_file
+from utils.kubernetes.client_cache import evict_kubeconfig_client, get_kubeconfig_client
 from utils.kubernetes.k8s_management import get_dumped_json, install_flux
 from utils.observability.cid import get_current_cid
 
@@ -54,26 +55,26 @@ def get_cluster_infos(current_user, cluster_id, db):
                 }, status_code=404
             )
 
-        kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
-        config.load_kube_config_from_dict(kc_content)
-        core_v1 = client.CoreV1Api()
-        apps_v1 = client.AppsV1Api()
-        v1Server = client.VersionApi()
-        custom_obj = client.CustomObjectsApi()
+        cluster_client = get_kubeconfig_client(kubeconfigFile)
+        core_v1 = cluster_client.core_v1()
+        v1Server = cluster_client.version()
+        custom_obj = cluster_client.custom_objects()
 
     # Get the server info
         server_version = v1Server.get_code()
-        pods = core_v1.list_pod_for_all_namespaces(watch=False)
-        nodes = core_v1.list_node()
+        pods = cluster_client.list_objects('pods')
+        nodes = cluster_client.list_objects('nodes')
         node_metrics = custom_obj.list_cluster_custom_object("metrics.k8s.io", "v1beta1", "nodes")
 
     # Get the max pods capacity of the cluster
         max_pods = 0
         nodes_result = []
-        for i in range(len(nodes.items)):
+        #? the metrics are matched by node name: the informer store isn't in the same order as the metrics list
+        node_usages = {m['metadata']['name']: m['usage'] for m in node_metrics.get('items', []) if 'metadata' in m and 'usage' in m}
+        for i in range(len(nodes)):
             try:
-                node = nodes.items[i]
-                node_metric = node_metrics['items'][i]['usage']
+                node = nodes[i]
+                node_metric = node_usages[node.metadata.name]
                 
                 max_pods += int(node.status.allocatable.get("pods", 0))
                 nodes_result.append({
@@ -96,7 +97,7 @@ def get_cluster_infos(current_user, cluster_id, db):
                 "ip": pod.status.pod_ip or "N/A",
                 "status": pod.status.phase or "Unknown"
             }
-            for pod in pods.items
+            for pod in pods
             if pod and pod.metadata and pod.status
         ]
 
@@ -110,7 +111,7 @@ def get_cluster_infos(current_user, cluster_id, db):
                 "updated_replicas": getattr(deployment.status, 'updated_replicas', 0),
                 "age": deployment.metadata.creation_timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')
             }
-            for deployment in apps_v1.list_deployment_for_all_namespaces().items
+            for deployment in cluster_client.list_objects('deployments')
             if deployment and deployment.metadata and deployment.status
         ]
         
@@ -154,6 +155,7 @@ def save_kubeconfig(current_user:UserSchema, kubeconfig:UploadFile, db:Session):
     try:
         read_clusters_and_save(file, kubeconfigFile.id, db)
     except Exception:
+        evict_kubeconfig_client(kubeconfigFile.id)
         kubeconfigFile.delete(db)
         return JSONResponse(content = {
             'status': 'ko',
@@ -172,9 +174,12 @@ def save_kubeconfig(current_user:UserSchema, kubeconfig:UploadFile, db:Session):
 def read_clusters_and_save(file, file_id, db):
     kc_content = read_uploaded_yaml_file(file)
     
-    config.load_kube_config_from_dict(kc_content)
-    v1Server = client.VersionApi()
-    server_version = v1Server.get_code()
+    #? dedicated client: the global configuration of the kubernetes module is shared by all the requests
+    api_client = config.new_client_from_config_dict(kc_content)
+    try:
+        server_version = client.VersionApi(api_client).get_code()
+    finally:
+        api_client.close()
     
     for cluster in kc_content.get('clusters',[]):
         cl = Cluster()
@@ -196,6 +201,7 @@ def delete_cluster_by_id(current_user, cluster_id, db):
         }, status_code = 404)
 
     Cluster.deleteOne(cluster.id, db)
+    evict_kubeconfig_client(cluster.kubeconfig_file_id)
     return JSONResponse(content = {
         'status': 'ok',
         'message': 'Cluster successfully deleted'
@@ -5,7 +5,7 @@ from fastapi import UploadFile
 
 from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
-from kubernetes import client, config, dynamic
+from kubernetes import client, dynamic
 from kubernetes.client.rest import ApiException
 
 from entities.kubernetes.Cluster import Cluster
@@ -19,29 +19,37 @@ from utils.gitlab import GIT_HELMCHARTS_REPO_ID, GIT_HELMCHARTS_REPO_URL, read_f
 from utils.yaml import read_uploaded_yaml_file
 from utils.kubernetes.object import generate_object
 from utils.kubernetes.object import clear_metadata
+from utils.kubernetes.client_cache import get_kubeconfig_client
 from utils.common import convert_dict_keys_to_camel_case, is_empty
 from utils.observability.cid import get_current_cid
 
-def get_cluster_configfile(current_user: UserSchema, cluster_id: int, db: Session):
+def get_cluster_client(current_user: UserSchema, cluster_id: int, db: Session):
     cluster: Cluster = Cluster.getById(cluster_id, db)
     if not cluster:
         return JSONResponse(content = {
             'status': 'ko',
             'error': 'Cluster not found', 
-            'i18n_code': '2fa_method_not_found',
+            'i18n_code': 'cluster_not_found',
             'cid': get_current_cid()
         }, status_code = 404)
 
     kubeconfigFile = KubeConfigFile.findOne(cluster.kubeconfig_file_id,db)
-    kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
-    return kc_content
+    if not kubeconfigFile:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'kubeconfig file not found',
+            'i18n_code': 'kubeconfig_not_found',
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    return get_kubeconfig_client(kubeconfigFile)
 
 def get_cluster_services(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.CoreV1Api()
-    services = v1.list_service_for_all_namespaces()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    services = cluster_client.list_objects('services')
     services_result =  [
         {
             "name": service.metadata.name, 
@@ -50,40 +58,42 @@ def get_cluster_services(current_user: UserSchema, cluster_id: int, db: Session)
             "selectors": service.spec.selector,
             "targets": [port.to_dict() for port in service.spec.ports],
             "creation_date": service.metadata.creation_timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')
-        } for service in services.items
+        } for service in services
     ]
 
     return JSONResponse(content = services_result, status_code = 200)
 
 def get_cluster_general_services(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.CoreV1Api()
-    services = v1.list_service_for_all_namespaces()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    services = cluster_client.list_objects('services')
     services_result =  [
         {
             "name": service.metadata.name, 
             "namespace": service.metadata.namespace, 
-        } for service in services.items
+        } for service in services
     ]
 
     return JSONResponse(content = services_result, status_code = 200)
 
 def get_cluster_general_namespaces(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.CoreV1Api()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    v1 = cluster_client.core_v1()
     namespaces = v1.list_namespace()
     namespaces_result =  [ namespace.metadata.name for namespace in namespaces.items ]
     return JSONResponse(content = namespaces_result, status_code = 200)
 
 def get_cluster_config_maps(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.CoreV1Api()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    v1 = cluster_client.core_v1()
     config_maps = v1.list_config_map_for_all_namespaces()
     config_maps_results =  [
         {
@@ -97,10 +107,11 @@ def get_cluster_config_maps(current_user: UserSchema, cluster_id: int, db: Sessi
     return JSONResponse(content = config_maps_results, status_code = 200)
 
 def get_cluster_ingresses(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.NetworkingV1Api()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    v1 = cluster_client.networking_v1()
     ingresses = v1.list_ingress_for_all_namespaces()
     ingress_result =  [
         {
@@ -120,10 +131,11 @@ def get_cluster_ingresses(current_user: UserSchema, cluster_id: int, db: Session
     return JSONResponse(content = ingress_result, status_code = 200)
 
 def get_cluster_secrets(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.CoreV1Api()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    v1 = cluster_client.core_v1()
     secrets = v1.list_secret_for_all_namespaces()
     secrets_result =  [
         {
@@ -136,10 +148,11 @@ def get_cluster_secrets(current_user: UserSchema, cluster_id: int, db: Session):
     return JSONResponse(content = secrets_result, status_code = 200)
 
 def get_cluster_ingress_classes(current_user: UserSchema, cluster_id: int, db: Session):
-    kc_content = get_cluster_configfile(current_user, cluster_id, db)
-    
-    config.load_kube_config_from_dict(kc_content)
-    v1 = client.NetworkingV1Api()
+    cluster_client = get_cluster_client(current_user, cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    v1 = cluster_client.networking_v1()
     ingress_classes = v1.list_ingress_class()
     ingress_classes_result =  [
         {
@@ -151,41 +164,33 @@ def get_cluster_ingress_classes(current_user: UserSchema, cluster_id: int, db: S
     ]
     return JSONResponse(content = ingress_classes_result, status_code = 200)
 
-def delete_resource(kc_content, manifest: ObjectSchema, api_group: str, api_version: str, plural: str):
-    config.load_kube_config_from_dict(kc_content)
-    dynamic_client = dynamic.DynamicClient(
-        client.api_client.ApiClient()
-    )
+def delete_resource(api_client: client.ApiClient, manifest: ObjectSchema, api_group: str, api_version: str, plural: str):
+    dynamic_client = dynamic.DynamicClient(api_client)
 
     resource = dynamic_client.resources.get(api_version=api_version ,kind=K8S_OBJECTS[manifest.kind.lower()])
     dynamic_client.delete(resource=resource,name=manifest.name, namespace=manifest.namespace, api_version=f"{api_group}/{api_version}")
 
 def delete_object(current_user: UserSchema, object: ObjectSchema, db: Session):
-    cluster: Cluster = Cluster.getById(object.cluster_id, db)
-    kubeconfigFile: KubeConfigFile = KubeConfigFile.findOne(cluster.kubeconfig_file_id,db)
-    kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
+    cluster_client = get_cluster_client(current_user, object.cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
     resource = K8S_RESOURCES[object.kind]
-    delete_resource(kc_content, object, resource['api_group'], resource['api_version'], resource['plural'])
+    delete_resource(cluster_client.api_client, object, resource['api_group'], resource['api_version'], resource['plural'])
     return JSONResponse(content = {
         'status': 'ok',
         'message': 'Successfully deleted object'
     }, status_code = 200)
 
 def update_object(current_user: UserSchema, object: ObjectSchema,yaml_file:UploadFile, db: Session):
-    cluster: Cluster = Cluster.getById(object.cluster_id, db)
-    if not cluster:
-        return JSONResponse(content = {
-            'status': 'ko',
-            'message': 'Cluster not found',
-            'cid': get_current_cid()
-        }, status_code = 404)
-    
-    kubeconfigFile: KubeConfigFile = KubeConfigFile.findOne(cluster.kubeconfig_file_id,db)
-    kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
+    cluster_client = get_cluster_client(current_user, object.cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
     file = yaml.safe_load(yaml_file.file.read())
     yaml_file.file.close()
     
-    res = apply_resource(kc_content, file, object, True)
+    res = apply_resource(cluster_client.api_client, file, object, True)
     
     return res if res else JSONResponse(content = {
         'status': 'ok',
@@ -245,9 +250,7 @@ def add_object_to_cluster(current_user:UserSchema, values_file:UploadFile, objec
     # Generate and apply resource
     output = generate_object(values_file, object)
     rc_info = ObjectSchema(kind=object.kind, cluster_id=object.cluster_id, name=file_name, namespace=file_namespace)
-    kubeconfigFile: KubeConfigFile = KubeConfigFile.findOne(cluster.kubeconfig_file_id,db)
-    kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
-    res = apply_resource(kc_content, yaml.safe_load(output), rc_info)
+    res = apply_resource(get_kubeconfig_client(kubeconfig_file).api_client, yaml.safe_load(output), rc_info)
 
     return res if res else JSONResponse(content = {
         'status': 'ok',
@@ -259,11 +262,8 @@ def get_chart_values(kind):
     f = read_file_from_gitlab(GIT_HELMCHARTS_REPO_ID, f'objects-management-values/{kind}.yaml','main', GIT_DEFAULT_TOKEN, host)
     return PlainTextResponse(content = f, status_code = 200)
 
-def apply_resource(kc_content, file, manifest: ObjectSchema, isUpdate: bool = False):
-    config.load_kube_config_from_dict(kc_content)
-    dynamic_client = dynamic.DynamicClient(
-        client.ApiClient()
-    )
+def apply_resource(api_client: client.ApiClient, file, manifest: ObjectSchema, isUpdate: bool = False):
+    dynamic_client = dynamic.DynamicClient(api_client)
 
     yaml_namespace = file['metadata']['namespace']
     
@@ -294,11 +294,11 @@ def get_object(current_user: UserSchema, object: ObjectSchema, db: Session):
             'cid': get_current_cid()
         }, status_code = 400)
 
-    cluster: Cluster = Cluster.getById(object.cluster_id, db)
-    kubeconfigFile: KubeConfigFile = KubeConfigFile.findOne(cluster.kubeconfig_file_id,db)
-    kc_content = read_uploaded_yaml_file(kubeconfigFile.content)
-    config.load_kube_config_from_dict(kc_content)
-    dynamic_client = dynamic.DynamicClient(client.ApiClient())
+    cluster_client = get_cluster_client(current_user, object.cluster_id, db)
+    if isinstance(cluster_client, JSONResponse):
+        return cluster_client
+
+    dynamic_client = dynamic.DynamicClient(cluster_client.api_client)
     try:
         resource = dynamic_client.resources.get(
             api_version=f"{K8S_RESOURCES[object.kind.lower()]['api_version']}",
@@ -10,7 +10,9 @@ from entities.Instance import Instance
 from utils.common import is_numeric, is_empty
 from utils.encoder import AlchemyEncoder
 from utils.gitlab import  create_gitlab_project, delete_gitlab_project, get_gitlab_project_playbooks, attach_default_gitlab_project_to_user, detach_user_gitlab_project
+from utils.list import group_by_key
 from utils.observability.cid import get_current_cid
+from utils.statistics import invalidate_user_statistics
 
 def admin_transfer_project (project_id, payload, db):
     try:
@@ -42,6 +44,7 @@ def admin_transfer_project (project_id, payload, db):
             }, status_code = 409)
 
         original_project_user = User.getUserById(project.id, db)
+        original_owner_id = project.userid
         Project.updateOwner(project.id, user.id, db)
         attach_default_gitlab_project_to_user(project.id, user.email)
         detach_user_gitlab_project(project.id, original_project_user)
@@ -53,6 +56,7 @@ def admin_transfer_project (project_id, payload, db):
         from entities.Access import Access
         Access.updateObjectsAccessesOwner("instance", projectInstancesIds, user.id, db)
         Access.updateObjectAccessesOwner("project", project.id, user.id, db)
+        invalidate_user_statistics(original_owner_id, user.id)
 
         return JSONResponse(content = {
             'status': 'ok',
@@ -89,6 +93,7 @@ def admin_add_project(payload, db):
         if is_empty(project_type):
             project_type = 'vm'
         project = create_gitlab_project(project_name, target_user.id, target_user.email, host, git_username, token, namespace, project_type, db)
+        invalidate_user_statistics(target_user.id)
         projectJson = json.loads(json.dumps(project, cls = AlchemyEncoder))
         return JSONResponse(content = projectJson, status_code = 201)
     except HTTPError as e:
@@ -104,8 +109,8 @@ def admin_get_projects(db):
     projectsJson = json.loads(json.dumps(projects, cls = AlchemyEncoder))
 
     user_instances = Instance.getAllInstances(db)
-    user_instancesJson = json.loads(json.dumps(user_instances, cls = AlchemyEncoder))
-    populatedInstancesProjects = [{**project, "instances": [instance for instance in user_instancesJson if instance["project_id"] == project["id"] ]} for project in projectsJson]
+    projectsInstances = group_by_key(json.loads(json.dumps(user_instances, cls = AlchemyEncoder)), "project_id")
+    populatedInstancesProjects = [{**project, "instances": projectsInstances.get(project["id"], [])} for project in projectsJson]
     return JSONResponse(content = populatedInstancesProjects, status_code = 200)
 
 def admin_get_project(project_id, db):
@@ -168,8 +173,10 @@ def admin_remove_project(project_id, db):
                 'cid': get_current_cid()
             }, status_code = 400)
 
+        owner_id = project.userid
         delete_gitlab_project(project_id, project.gitlab_host, project.access_token)
         Project.deleteOne(project_id, db)
+        invalidate_user_statistics(owner_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message' : 'project successfully deleted', 
@@ -228,8 +235,10 @@ def admin_remove_project_by_name(project_name, db):
                 'cid': get_current_cid()
             }, status_code = 400)
 
+        owner_id = project.userid
         delete_gitlab_project(project.id, project.gitlab_host, project.access_token)
         Project.deleteOne(project.id, db)
+        invalidate_user_statistics(owner_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message' : 'project successfully deleted', 
@@ -288,8 +297,10 @@ def admin_remove_project_by_url(project_url, db):
                 'cid': get_current_cid()
             }, status_code = 400)
 
+        owner_id = project.userid
         delete_gitlab_project(project.id, project.gitlab_host, project.access_token)
         Project.deleteOne(project.id, db)
+        invalidate_user_statistics(owner_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message' : 'project successfully deleted', 
@@ -8,13 +8,15 @@ from urllib.error import HTTPError
 from entities.Registry import Registry
 from entities.User import User
 
-from utils.registry import create_registry, delete_registry, refresh_registry, register_registry, update_credentials
+from utils.registry import delete_registry, refresh_registry, register_registry, update_credentials
 from utils.common import is_empty, is_not_empty, is_numeric, is_true
 from utils.instance import check_instance_name_validity
 from utils.dynamic_name import generate_hashed_name
 from utils.encoder import AlchemyEncoder
 from utils.provider import exist_provider, get_provider_infos
 from utils.observability.cid import get_current_cid
+from utils.provisioning import enqueue_provisioning_job
+from utils.statistics import invalidate_user_statistics
 
 def admin_add_registry(current_user, provider, region, payload, db, bt: BackgroundTasks):
     name = payload.name
@@ -81,18 +83,18 @@ def admin_add_registry(current_user, provider, region, payload, db, bt: Backgrou
         check_instance_name_validity(name)
         hash, hashed_registry_name = generate_hashed_name(name)
         new_registry = register_registry(hash, provider, region, userid, name, type, db)
-
-        bt.add_task(create_registry,
-            provider,
-            exist_user.email,
-            new_registry.id,
-            hashed_registry_name,
-            region,
-            type,
-            db
-        )
-
-        new_registry_json = json.loads(json.dumps(new_registry, cls = AlchemyEncoder))
+        invalidate_user_statistics(userid)
+
+        job = enqueue_provisioning_job("registry", provider, new_registry.id, userid, {
+            'provider': provider,
+            'user_email': exist_user.email,
+            'registry_id': new_registry.id,
+            'hashed_name': hashed_registry_name,
+            'region': region,
+            'type': type
+        }, db)
+
+        new_registry_json = {**json.loads(json.dumps(new_registry, cls = AlchemyEncoder)), 'job_id': "{}".format(job.id)}
         return JSONResponse(content = new_registry_json, status_code = 200)
     except auto.StackAlreadyExistsError:
         return JSONResponse(content = {
@@ -167,6 +169,7 @@ def admin_remove_registry(current_user, registry_id, db, bt: BackgroundTasks):
     try:
         bt.add_task(delete_registry, user_registry.provider, user_registry, user_email)
         Registry.updateStatus(user_registry.id, "deleted", db)
+        invalidate_user_statistics(user_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message': 'registry successfully deleted', 
@@ -368,7 +368,7 @@ def delete_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db):
         }, status_code=404)
 
     SupportTicketAttachment.deleteAttachmentById(attachment.id, db)
-    result = delete_from_attachment_bucket(attachment.name, attachment.storage_key)
+    result = delete_from_attachment_bucket(attachment.storage_key)
     if is_false(result['status']):
         return JSONResponse(content = {
             'status': 'ko',
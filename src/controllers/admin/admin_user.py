@@ -12,16 +12,17 @@ from entities.faas.Invocation import InvocationEntity
 from entities.iot.Device import Device
 from entities.User import User
 
-from utils.common import is_false, is_numeric, generate_hash_password
+from utils.common import is_false, is_numeric
 from utils.env_vars import DOMAIN
 from utils.flag import is_flag_enabled
 from utils.jwt import jwt_encode
 from utils.logger import log_msg
 from utils.mail import send_confirmation_email
-from utils.paginator import get_paginated_list
+from utils.paginator import get_paginated_page
 from utils.gitlab import create_gitlab_user
 from utils.encoder import AlchemyEncoder
 from utils.security import check_password, is_not_email_valid
+from utils.password import hash_password
 from utils.observability.cid import get_current_cid
 
 def admin_delete_user_2fa(current_user, userId, db):
@@ -200,7 +201,7 @@ def admin_add_user(current_user, payload, db):
                 'cid': get_current_cid()
             }, status_code = 409)
 
-        payload.password = generate_hash_password(password)
+        payload.password = hash_password(password)
         new_user = User(**payload.dict())
         new_user.save(db)
 
@@ -239,15 +240,18 @@ def admin_add_user(current_user, payload, db):
         }, status_code = e.code)
 
 def admin_get_users(current_user, no_per_page, page, db):
-    users = User.getAllUsers(db)
     users_per_page = no_per_page
     _page = page
     if _page and users_per_page:
         _page = int(_page)
         users_per_page = int(no_per_page)
-        pages = get_paginated_list(users, "/user", _page, users_per_page)
+        #? only the requested page is loaded, the count is done by the database
+        count = User.countUsers(db)
+        users = User.getUsersPage(max(_page - 1, 0) * users_per_page, users_per_page, db)
+        pages = get_paginated_page(users, count, "/user", _page, users_per_page)
         return JSONResponse(content = {"result": pages}, status_code = 200)
 
+    users = User.getAllUsers(db)
     return JSONResponse(content = {"result": users}, status_code = 200)
 
 def admin_get_user(current_user, userId, db):
@@ -9,6 +9,7 @@ from utils.common import is_empty, is_numeric
 from utils.encoder import AlchemyEncoder
 from utils.observability.cid import get_current_cid
 from utils.provider import exist_provider
+from utils.statistics import invalidate_user_statistics
 from entities.Bucket import Bucket
 from entities.Access import Access
 
@@ -81,6 +82,7 @@ def remove_bucket(current_user, provider, region, bucket_id, db, bt: BackgroundT
     try:
         bt.add_task(delete_bucket, user_bucket.provider, user_bucket, user_email)
         Bucket.updateStatus(user_bucket.id, "deleted", db)
+        invalidate_user_statistics(user_bucket.user_id)
         return JSONResponse(content = {
             'status': 'ok',
             'message': 'bucket successfully deleted',
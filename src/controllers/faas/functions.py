@@ -7,12 +7,16 @@ from fastapi.responses import JSONResponse
 from entities.faas.Function import FunctionEntity
 
 from utils.common import is_empty, is_false, is_not_empty, is_not_numeric, is_true
+from utils.broadcast import broadcast
+from utils.consumer import FUNCTIONS_CHANNEL
 from utils.faas.functions import is_not_supported_language, is_not_supported_callback_type, restructure_callbacks
-from utils.faas.owner import get_email_owner, get_owner_id, override_owner_id
+from utils.faas.owner import get_email_owners, get_owner_id, override_owner_id
 from utils.faas.security import has_not_exec_right, has_not_write_right
+from utils.iot.object_type import invalidate_function_metadata
 from utils.encoder import AlchemyEncoder
 from utils.file import get_b64_content
 from utils.observability.cid import get_current_cid
+from utils.paginator import get_page_cursors, paginate
 
 def add_function(payload, current_user, db):
     if is_empty(payload.content.name):
@@ -110,6 +114,15 @@ def override_function(id, payload, current_user, db):
         "updated_at": updated_at
     })
     db.commit()
+    invalidate_function_metadata(id)
+
+    broadcast(FUNCTIONS_CHANNEL, {
+        'action': 'override',
+        'function': {
+            'id': "{}".format(id),
+            'updated_at': "{}".format(updated_at)
+        }
+    })
 
     return {
         'status': 'ok',
@@ -161,12 +174,21 @@ def delete_function(id, current_user, db):
     
         function.delete(synchronize_session=False)
         db.commit()
+        invalidate_function_metadata(id)
+
+        broadcast(FUNCTIONS_CHANNEL, {
+            'action': 'delete',
+            'function': {
+                'id': "{}".format(id)
+            }
+        })
+
     return {
         'status': 'ok',
         'code': 200
     }
 
-def get_my_functions(db, current_user, start_index, max_results):
+def get_my_functions(db, current_user, start_index, max_results, cursor = None, total = False):
     if is_not_numeric(start_index) or is_not_numeric(max_results):
         return {
             'status': 'ko',
@@ -175,8 +197,18 @@ def get_my_functions(db, current_user, start_index, max_results):
             'i18n_code': 'faas_invalid_parameters'
         }
 
-    results = db.query(FunctionEntity).filter(FunctionEntity.owner_id == current_user.id).order_by(FunctionEntity.updated_at.desc()).order_by(FunctionEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    query = db.query(FunctionEntity).filter(FunctionEntity.owner_id == current_user.id)
+    try:
+        page = paginate(query, [FunctionEntity.updated_at, FunctionEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor'
+        }
 
+    results = page['results']
     for function in results:
         content = copy.deepcopy(function.content)
         function.content = restructure_callbacks(content)
@@ -186,10 +218,11 @@ def get_my_functions(db, current_user, start_index, max_results):
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
-        'results': results
+        'results': results,
+        **get_page_cursors(page, query, total)
     }
 
-def get_all_functions(db, current_user, start_index, max_results):
+def get_all_functions(db, current_user, start_index, max_results, cursor = None, total = False):
     if is_false(current_user.is_admin):
         return {
             'status': 'ko',
@@ -206,17 +239,29 @@ def get_all_functions(db, current_user, start_index, max_results):
             'i18n_code': 'faas_invalid_parameters'
         }
 
-    results = db.query(FunctionEntity).order_by(FunctionEntity.updated_at.desc()).order_by(FunctionEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    query = db.query(FunctionEntity)
+    try:
+        page = paginate(query, [FunctionEntity.updated_at, FunctionEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor'
+        }
 
+    results = page['results']
     for function in results:
         content = copy.deepcopy(function.content)
         function.content = restructure_callbacks(content)
 
+    owners = get_email_owners(results, db)
     return {
         'status': 'ok',
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
+        **get_page_cursors(page, query, total),
         'results': list(map(lambda f: {
             "id": f.id,
             "is_public": f.is_public,
@@ -225,7 +270,7 @@ def get_all_functions(db, current_user, start_index, max_results):
             "updated_at": f.updated_at,
             "owner": {
                 "id": f.owner_id,
-                "username": get_email_owner(f, db)
+                "username": owners.get(f.owner_id)
             }
         }, results))
     }
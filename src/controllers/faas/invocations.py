@@ -10,20 +10,23 @@ from entities.faas.Function import FunctionEntity
 from entities.faas.Invocation import InvocationEntity
 from entities.faas.InvocationExecutionTrace import InvocationExecutionTraceEntity
 
-from utils.common import del_key_if_exists, get_env_int, is_empty, is_false, is_not_empty, is_not_empty_key, is_not_numeric, is_not_uuid, is_true
+from utils.common import del_key_if_exists, get_env_int, is_empty, is_false, is_not_empty, is_not_empty_key, is_not_numeric, is_not_uuid, is_true, is_uuid
 from utils.consumer import CONSUMER_CHANNEL, CONSUMER_GROUP
 from utils.encoder import AlchemyEncoder
+from utils.faas.completions import notify_completion, register_completion_waiter, start_completions_listener, unregister_completion_waiter
 from utils.faas.invocations import _in_progress, is_unknown_state
 from utils.faas.functions import is_not_owner
-from utils.faas.invoker import get_email_invoker, get_invoker_id, override_invoker_id
+from utils.faas.invoker import get_email_invokers, get_invoker_id, override_invoker_id
 from utils.faas.iot import send_payload_in_realtime
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import log_msg
 from utils.observability.cid import get_current_cid
+from utils.paginator import get_page_cursors, paginate
 
 _pubsub_adapter = get_adapter("pubsub")
 _max_retry_invoke_sync = get_env_int('MAX_RETRY_INVOKE_SYNC', 100)
 _invoke_sync_wait_time = get_env_int('INVOKE_SYNC_WAIT_TIME', 1)
+_invoke_sync_check_time = get_env_int('INVOKE_SYNC_CHECK_TIME', 10)
 
 def invoke(payload, current_user, user_auth, db):
     if is_empty(payload.content.state):
@@ -117,30 +120,49 @@ def invoke(payload, current_user, user_auth, db):
 def is_state_exists(search_result_invocation):
     return is_not_empty_key(search_result_invocation, 'entity') and is_not_empty(search_result_invocation['entity'].content) and is_not_empty_key(search_result_invocation['entity'].content, 'state')
 
-def invoke_sync(payload, current_user, user_auth, db):
-    result = invoke(payload, current_user, user_auth, db)
-    if is_false(result['status']):
-        return result
-
-    id = result['id']
-    for retry in range(0, _max_retry_invoke_sync):
+def find_invocation_state(id, current_user, db):
+    try:
         search_result_invocation = get_invocation(id, current_user, db)
+    finally:
+        #? the loaded entity stays readable once detached and the pooled connection is released while waiting
+        db.close()
 
-        state = search_result_invocation['entity'].content['state'] if is_state_exists(search_result_invocation) else "undefined"
-        log_msg("DEBUG", "[invoke_sync] found invocation: id = {}, retry = {}, status = {}, state = {}".format(id, retry, search_result_invocation['status'], state))
-
-        if is_false(search_result_invocation['status']) or state != _in_progress:
-            return search_result_invocation
+    state = search_result_invocation['entity'].content['state'] if is_state_exists(search_result_invocation) else "undefined"
+    return search_result_invocation, state
 
-        time.sleep(_invoke_sync_wait_time)
+async def invoke_sync(payload, current_user, user_auth, db):
+    result = await asyncio.to_thread(invoke, payload, current_user, user_auth, db)
+    if is_false(result['status']):
+        return result
 
-    return search_result_invocation
+    id = result['id']
+    start_completions_listener()
+    waiter = register_completion_waiter(id)
+    try:
+        #? the completion notification wakes up the caller, the periodic check only covers the lost notifications
+        deadline = time.monotonic() + _max_retry_invoke_sync * _invoke_sync_wait_time
+        retry = 0
+        while True:
+            search_result_invocation, state = await asyncio.to_thread(find_invocation_state, id, current_user, db)
+            log_msg("DEBUG", "[invoke_sync] found invocation: id = {}, retry = {}, status = {}, state = {}".format(id, retry, search_result_invocation['status'], state))
+
+            remaining_time = deadline - time.monotonic()
+            if is_false(search_result_invocation['status']) or state != _in_progress or remaining_time <= 0:
+                return search_result_invocation
+
+            await waiter.wait(min(_invoke_sync_check_time, remaining_time))
+            retry += 1
+    finally:
+        unregister_completion_waiter(waiter)
 
 async def async_send_payload_in_realtime(callback, safe_payload):
     await send_payload_in_realtime(callback, safe_payload)
 
+def has_callbacks(function):
+    return is_not_empty(function.content) and (is_not_empty_key(function.content, 'callback_url') or is_not_empty_key(function.content, 'callbacks'))
+
 def send_result_to_callbacks(payload, invocation, function):
-    if payload.content.state != _in_progress:
+    if payload.content.state != _in_progress and has_callbacks(function):
         old_invocation_json = json.loads(json.dumps(invocation, cls = AlchemyEncoder))
         safe_payload = old_invocation_json.copy()
         del_key_if_exists(safe_payload['content'], 'env')
@@ -167,6 +189,47 @@ def send_result_to_callbacks(payload, invocation, function):
                             asyncio.run(async_send_payload_in_realtime(callback, safe_payload))
 
 def complete(id, payload, current_user, db):
+    db_invocation = db.query(InvocationEntity).filter(InvocationEntity.id == id)
+    db_trace_invocation = db.query(InvocationExecutionTraceEntity).filter(InvocationExecutionTraceEntity.invocation_id == id)
+    old_invocation = db_invocation.first()
+    function = db.query(FunctionEntity).filter(FunctionEntity.id == payload.content.function_id).first() if is_uuid(payload.content.function_id) else None
+
+    error = get_completion_error(id, payload, old_invocation, function, current_user)
+    if error is not None:
+        return error
+
+    result = override_invoker_id(payload, old_invocation, current_user, db)
+    if is_false(result['status']):
+        return result
+
+    updated_at = datetime.now()
+    db_invocation.update({
+        "invoker_id": result['invoker_id'],
+        "content": payload.content.dict(),
+        "updated_at": updated_at
+    })
+    db.commit()
+
+    db_trace_invocation.update({
+        "invoker_id": result['invoker_id'],
+        "content": payload.content.dict(),
+        "updated_at": updated_at
+    })
+    db.commit()
+
+    if payload.content.state != _in_progress:
+        notify_completion(id, payload.content.state)
+
+    send_result_to_callbacks(payload, old_invocation, function)
+
+    return {
+        'status': 'ok',
+        'code': 200,
+        'id': id,
+        'updated_at': updated_at
+    }
+
+def get_completion_error(id, payload, invocation, function, current_user):
     if is_empty(payload.content.state):
         return {
             'status': 'ko',
@@ -185,10 +248,7 @@ def complete(id, payload, current_user, db):
             'cid': get_current_cid()
         }
 
-    db_invocation = db.query(InvocationEntity).filter(InvocationEntity.id == id)
-    db_trace_invocation = db.query(InvocationExecutionTraceEntity).filter(InvocationExecutionTraceEntity.invocation_id == id)
-    old_invocation = db_invocation.first()
-    if not old_invocation:
+    if not invocation:
         return {
             'status': 'ko',
             'code': 404,
@@ -196,7 +256,7 @@ def complete(id, payload, current_user, db):
             'i18n_code': 'faas_not_found_invocation',
             'cid': get_current_cid()
         }
-    
+
     if is_not_uuid(payload.content.function_id):
         return {
             'status': 'ko',
@@ -206,14 +266,11 @@ def complete(id, payload, current_user, db):
             'cid': get_current_cid()
         }
 
-    db_function = db.query(FunctionEntity).filter(FunctionEntity.id == payload.content.function_id)
-    function = db_function.first()
-
     if not function:
         return {
             'status': 'ko',
             'code': 400,
-            'message': "Function '{}' not found".format(id),
+            'message': "Function '{}' not found".format(payload.content.function_id),
             'i18n_code': 'faas_not_found_function',
             'cid': get_current_cid()
         }
@@ -226,7 +283,7 @@ def complete(id, payload, current_user, db):
             'i18n_code': 'faas_wrong_args_number',
             'cid': get_current_cid()
         }
-    
+
     if any(a.key not in function.content['args'] for a in payload.content.args):
         return {
             'status': 'ko',
@@ -245,32 +302,75 @@ def complete(id, payload, current_user, db):
             'cid': get_current_cid()
         }
 
-    result = override_invoker_id(payload, old_invocation, current_user, db)
-    if is_false(result['status']):
-        return result
+    return None
+
+def complete_all(payload, current_user, db):
+    invocations_ids = [i.id for i in payload.invocations if is_uuid("{}".format(i.id))]
+    functions_ids = [i.content.function_id for i in payload.invocations if is_uuid(i.content.function_id)]
+    invocations = { "{}".format(i.id): i for i in db.query(InvocationEntity).filter(InvocationEntity.id.in_(invocations_ids)).all() } if is_not_empty(invocations_ids) else {}
+    functions = { "{}".format(f.id): f for f in db.query(FunctionEntity).filter(FunctionEntity.id.in_(functions_ids)).all() } if is_not_empty(functions_ids) else {}
 
+    results = []
+    completed = []
+    invocations_mappings = []
     updated_at = datetime.now()
-    db_invocation.update({
-        "invoker_id": result['invoker_id'],
-        "content": payload.content.dict(),
-        "updated_at": updated_at
-    })
-    db.commit()
+    for completed_invocation in payload.invocations:
+        invocation = invocations.get("{}".format(completed_invocation.id))
+        function = functions.get(completed_invocation.content.function_id)
+        error = get_completion_error(completed_invocation.id, completed_invocation, invocation, function, current_user)
+        if error is None:
+            error = override_invoker_id(completed_invocation, invocation, current_user, db)
+            if is_true(error['status']):
+                invoker_id = error['invoker_id']
+                error = None
+
+        if error is not None:
+            results.append({ 'id': completed_invocation.id, **error })
+            continue
+
+        invocations_mappings.append({
+            'id': invocation.id,
+            'invoker_id': invoker_id,
+            'content': completed_invocation.content.dict(),
+            'updated_at': updated_at
+        })
+        completed.append((completed_invocation, invocation, function))
+        results.append({
+            'id': completed_invocation.id,
+            'status': 'ok',
+            'code': 200,
+            'updated_at': updated_at
+        })
+
+    if is_not_empty(invocations_mappings):
+        traces = db.query(InvocationExecutionTraceEntity.id, InvocationExecutionTraceEntity.invocation_id).filter(InvocationExecutionTraceEntity.invocation_id.in_([m['id'] for m in invocations_mappings])).all()
+        mappings_by_invocation = { "{}".format(m['id']): m for m in invocations_mappings }
+        traces_mappings = [{ **mappings_by_invocation["{}".format(t.invocation_id)], 'id': t.id } for t in traces]
+
+        completed = [(c, i, f) for c, i, f in completed if c.content.state != _in_progress and has_callbacks(f)]
+        callbacks_invocations_ids = [i.id for _, i, _ in completed]
+        callbacks_functions_ids = [f.id for _, _, f in completed]
+
+        db.bulk_update_mappings(InvocationEntity, invocations_mappings)
+        db.bulk_update_mappings(InvocationExecutionTraceEntity, traces_mappings)
+        db.commit()
 
-    db_trace_invocation.update({
-        "invoker_id": result['invoker_id'],
-        "content": payload.content.dict(),
-        "updated_at": updated_at
-    })
-    db.commit()
+        for mapping in invocations_mappings:
+            if mapping['content']['state'] != _in_progress:
+                notify_completion(mapping['id'], mapping['content']['state'])
 
-    send_result_to_callbacks(payload, old_invocation, function)
+        #? reload the expired entities with one query per table before invoking the callbacks
+        if is_not_empty(completed):
+            db.query(InvocationEntity).filter(InvocationEntity.id.in_(callbacks_invocations_ids)).all()
+            db.query(FunctionEntity).filter(FunctionEntity.id.in_(callbacks_functions_ids)).all()
+
+    for completed_invocation, invocation, function in completed:
+        send_result_to_callbacks(completed_invocation, invocation, function)
 
     return {
         'status': 'ok',
         'code': 200,
-        'id': id,
-        'updated_at': updated_at
+        'results': results
     }
 
 def get_invocation(id, current_user, db):
@@ -318,7 +418,7 @@ def clear_my_invocations(current_user, db):
         'code': 200
     }
 
-def get_my_invocations(db, current_user, start_index, max_results):
+def get_my_invocations(db, current_user, start_index, max_results, cursor = None, total = False):
     if is_not_numeric(start_index) or is_not_numeric(max_results):
         return {
             'status': 'ko',
@@ -328,17 +428,28 @@ def get_my_invocations(db, current_user, start_index, max_results):
             'cid': get_current_cid()
         }
 
-    results = db.query(InvocationEntity).filter(InvocationEntity.invoker_id == current_user.id).order_by(InvocationEntity.updated_at.desc()).order_by(InvocationEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    query = db.query(InvocationEntity).filter(InvocationEntity.invoker_id == current_user.id)
+    try:
+        page = paginate(query, [InvocationEntity.updated_at, InvocationEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor',
+            'cid': get_current_cid()
+        }
 
     return {
         'status': 'ok',
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
-        'results': results
+        'results': page['results'],
+        **get_page_cursors(page, query, total)
     }
 
-def get_all_invocations(db, current_user, start_index, max_results):
+def get_all_invocations(db, current_user, start_index, max_results, cursor = None, total = False):
     if is_false(current_user.is_admin):
         return {
             'status': 'ko',
@@ -357,13 +468,27 @@ def get_all_invocations(db, current_user, start_index, max_results):
             'cid': get_current_cid()
         }
 
-    results = db.query(InvocationEntity).order_by(InvocationEntity.updated_at.desc()).order_by(InvocationEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    query = db.query(InvocationEntity)
+    try:
+        page = paginate(query, [InvocationEntity.updated_at, InvocationEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor',
+            'cid': get_current_cid()
+        }
+
+    results = page['results']
+    invokers = get_email_invokers(results, db)
 
     return {
         'status': 'ok',
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
+        **get_page_cursors(page, query, total),
         'results': list(map(lambda i: {
             "id": i.id,
             "content": i.content,
@@ -371,7 +496,7 @@ def get_all_invocations(db, current_user, start_index, max_results):
             "updated_at": i.updated_at,
             "invoker": {
                 "id": i.invoker_id,
-                "username": get_email_invoker(i, db)
+                "username": invokers.get(i.invoker_id)
             }
         }, results))
     }
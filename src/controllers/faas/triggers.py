@@ -8,9 +8,11 @@ from utils.common import is_empty, is_false, is_not_empty, is_not_numeric, is_tr
 from utils.consumer import TRIGGERS_CHANNEL, TRIGGERS_GROUP
 from utils.date import is_iso_date_valid
 from utils.faas.functions import is_not_owner
-from utils.faas.owner import get_email_owner, get_owner_id, override_owner_id
+from utils.faas.owner import get_email_owners, get_owner_id, override_owner_id
 from utils.faas.triggers import is_not_supported_kind
+from utils.iot.object_type import invalidate_triggers_metadata
 from utils.observability.cid import get_current_cid
+from utils.paginator import get_page_cursors, paginate
 
 _pubsub_adapter = get_adapter("pubsub")
 
@@ -91,6 +93,11 @@ def add_trigger(payload, current_user, db):
         'action': 'add',
         'trigger': {
             'id': "{}".format(new_trigger.id),
+            'kind': new_trigger.kind,
+            'content': new_trigger.content,
+            'owner': {
+                'id': new_trigger.owner_id
+            },
             'created_at': "{}".format(new_trigger.created_at),
             'updated_at': "{}".format(new_trigger.updated_at)
         }
@@ -172,11 +179,17 @@ def override_trigger(id, current_user, payload, db):
         "updated_at": updated_at
     })
     db.commit()
+    invalidate_triggers_metadata([id])
 
     _pubsub_adapter().publish(TRIGGERS_GROUP, TRIGGERS_CHANNEL, {
         'action': 'override',
         'trigger': {
             'id': "{}".format(id),
+            'kind': payload.kind,
+            'content': payload.content.dict(),
+            'owner': {
+                'id': result['owner_id']
+            },
             'updated_at': "{}".format(updated_at)
         }
     })
@@ -218,6 +231,7 @@ def delete_trigger(id, current_user, db):
     if trigger.first():
         trigger.delete(synchronize_session=False)
         db.commit()
+        invalidate_triggers_metadata([id])
 
     _pubsub_adapter().publish(TRIGGERS_GROUP, TRIGGERS_CHANNEL, {
         'action': 'delete',
@@ -231,7 +245,7 @@ def delete_trigger(id, current_user, db):
         'code': 200
     }
 
-def get_my_triggers(db, current_user, kind, start_index, max_results):
+def get_my_triggers(db, current_user, kind, start_index, max_results, cursor = None, total = False):
     if is_not_numeric(start_index) or is_not_numeric(max_results):
         return {
             'status': 'ko',
@@ -246,17 +260,27 @@ def get_my_triggers(db, current_user, kind, start_index, max_results):
     else:
         query = db.query(TriggerEntity).filter(TriggerEntity.owner_id == current_user.id)
 
-    results = query.order_by(TriggerEntity.updated_at.desc()).order_by(TriggerEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    try:
+        page = paginate(query, [TriggerEntity.updated_at, TriggerEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor',
+            'cid': get_current_cid()
+        }
 
     return {
         'status': 'ok',
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
-        'results': results
+        'results': page['results'],
+        **get_page_cursors(page, query, total)
     }
 
-def get_all_triggers(db, current_user, kind, start_index, max_results):
+def get_all_triggers(db, current_user, kind, start_index, max_results, cursor = None, total = False):
     if is_false(current_user.is_admin):
         return {
             'status': 'ko',
@@ -280,13 +304,25 @@ def get_all_triggers(db, current_user, kind, start_index, max_results):
     else:
         query = db.query(TriggerEntity)
 
-    results = query.order_by(TriggerEntity.updated_at.desc()).order_by(TriggerEntity.created_at.desc()).offset(int(start_index)).limit(int(max_results)).all()
+    try:
+        page = paginate(query, [TriggerEntity.updated_at, TriggerEntity.id], int(max_results), cursor, int(start_index))
+    except ValueError as e:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': "{}".format(e),
+            'i18n_code': 'faas_invalid_cursor',
+            'cid': get_current_cid()
+        }
 
+    results = page['results']
+    owners = get_email_owners(results, db)
     return {
         'status': 'ok',
         'code': 200,
         'start_index': start_index,
         'max_results': max_results,
+        **get_page_cursors(page, query, total),
         'results': list(map(lambda t: {
             "id": t.id,
             "kind": t.kind,
@@ -295,17 +331,20 @@ def get_all_triggers(db, current_user, kind, start_index, max_results):
             "updated_at": t.updated_at,
             "owner": {
                 "id": t.owner_id,
-                "username": get_email_owner(t, db)
+                "username": owners.get(t.owner_id)
             }
         }, results))
     }
 
 def clear_my_triggers(current_user, db):
+    trigger_ids = [trigger_id for (trigger_id,) in db.query(TriggerEntity.id).filter(TriggerEntity.owner_id == current_user.id).all()]
     db.query(TriggerEntity).filter(TriggerEntity.owner_id == current_user.id).delete()
     db.commit()
+    invalidate_triggers_metadata(trigger_ids)
 
     _pubsub_adapter().publish(TRIGGERS_GROUP, TRIGGERS_CHANNEL, {
-        'action': 'clear'
+        'action': 'clear',
+        'triggers': [{'id': "{}".format(trigger_id)} for trigger_id in trigger_ids]
     })
 
     return {
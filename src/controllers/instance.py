@@ -5,6 +5,9 @@ from pulumi import automation as auto
 from fastapi import BackgroundTasks
 from fastapi.responses import JSONResponse
 
+from entities.Access import Access
+from entities.Instance import Instance
+
 from utils.common import is_boolean, is_empty, is_false, is_not_empty, is_numeric, is_true
 from utils.flag import is_flag_disabled
 from utils.dns_zones import get_dns_zones
@@ -15,9 +18,13 @@ from utils.encoder import AlchemyEncoder
 from utils.images import get_os_image
 from utils.logger import log_msg
 from utils.dynamic_name import rehash_dynamic_name
-from utils.instance import check_exist_instance, generic_remove_instance, get_server_state, get_virtual_machine, reregister_instance, register_instance, create_instance, update_instance_status, check_instance_name_validity
+from utils.instance import check_exist_instance, generic_remove_instance, reregister_instance, register_instance, update_instance_status, check_instance_name_validity
+from utils.inventory import get_instance_vm, get_instances_vms
+from utils.serializer import SerializedResponse, serialize
 from utils.provider import exist_provider, get_provider_infos, get_provider_available_instances_by_region_zone
 from utils.zone_utils import exists_zone
+from utils.provisioning import enqueue_provisioning_job
+from utils.statistics import invalidate_user_statistics
 from utils.observability.cid import get_current_cid
 
 def get_instance(current_user, provider, region, instance_id, db):
@@ -58,11 +65,53 @@ def get_instance(current_user, provider, region, instance_id, db):
         **dumpedInstance,
         "environment": userInstance.environment.name,
         "path": userInstance.environment.path,
-        "project": {**dumpedProject}
+        "project": {**dumpedProject},
+        "vm": get_instances_vms([userInstance], db)[0]
     }
 
     return JSONResponse(content = instanceJson, status_code = 200)
 
+def get_instance_state(current_user, provider, region, instance_id, refresh, db):
+    if not exist_provider(provider):
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'provider does not exist',
+            'i18n_code': 'provider_not_exist',
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    if not is_numeric(instance_id):
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Invalid instance id',
+            'i18n_code': "invalid_instance_id",
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    userInstance = Instance.findUserInstance(current_user.id, provider, region, instance_id, db)
+    if not userInstance:
+        access = Access.getUserAccessToObject(current_user.id, "instance", instance_id, db)
+        if not access:
+            return JSONResponse(content = {
+                'status': 'ko',
+                'error': 'Instance not found',
+                'i18n_code': "instance_not_found",
+                'cid': get_current_cid()
+            }, status_code = 404)
+
+        userInstance = Instance.findInstance(provider, region, access.object_id, db)
+
+    server = get_instance_vm(userInstance, db, refresh)
+    if not server:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Instance not found',
+            'i18n_code': 'instance_not_found',
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    return JSONResponse(content = server, status_code = 200)
+
 def remove_instance(current_user, provider, region, instance_id, db, bt: BackgroundTasks):
     if not exist_provider(provider):
         return JSONResponse(content = {
@@ -106,6 +155,7 @@ def remove_instance(current_user, provider, region, instance_id, db, bt: Backgro
             'cid': get_current_cid()
         }, status_code = result_remove["http_code"])
 
+    invalidate_user_statistics(user_instance.user_id)
     return JSONResponse(content = result_remove["message"], status_code = result_remove["http_code"])
 
 def update_instance(current_user, payload, provider, region, instance_id, db):
@@ -138,7 +188,7 @@ def update_instance(current_user, payload, provider, region, instance_id, db):
             'cid': get_current_cid()
         }, status_code = 404)
 
-    server = get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, rehash_dynamic_name(userInstance.name, userInstance.hash))
+    server = get_instance_vm(userInstance, db)
     if not server:
         return JSONResponse(content = {
             'status': 'ko',
@@ -158,7 +208,7 @@ def update_instance(current_user, payload, provider, region, instance_id, db):
                 'cid': get_current_cid()
             }, status_code = 400)
 
-        server_state = get_server_state(userInstance.provider, server)
+        server_state = server['state']
 
         if action == "poweroff":
             if server_state == "stopped":
@@ -442,37 +492,38 @@ def attach_instance(bt: BackgroundTasks, current_user, provider, region, zone, p
     try:
         gitlab_project = get_gitlab_project(project_id, exist_project.gitlab_host, exist_project.access_token)
         reregister_instance(userInstance.id, provider, region, zone, instance_type, userInstance.root_dns_zone, exist_project.id, db)
+        invalidate_user_statistics(userInstance.user_id)
         ami_image = get_os_image(region, zone)
         user_project_json = json.loads(json.dumps(exist_project, cls = AlchemyEncoder))
         env_json = json.loads(json.dumps(exist_env, cls = AlchemyEncoder))
 
-        bt.add_task(create_instance,
-            provider,
-            ami_image,
-            userInstance.id,
-            current_user.email,
-            instance_name,
-            hashed_instance_name,
-            env_json,
-            region,
-            zone,
-            generate_dns,
-            gitlab_project,
-            user_project_json,
-            instance_type,
-            debug,
-            centralized,
-            userInstance.root_dns_zone,
-            None,
-            db
-        )
+        job = enqueue_provisioning_job("instance", provider, userInstance.id, userInstance.user_id, {
+            'provider': provider,
+            'ami_image': ami_image,
+            'instance_id': userInstance.id,
+            'user_email': current_user.email,
+            'instance_name': instance_name,
+            'hashed_instance_name': hashed_instance_name,
+            'environment': env_json,
+            'instance_region': region,
+            'instance_zone': zone,
+            'generate_dns': generate_dns,
+            'gitlab_project': gitlab_project,
+            'user_project': user_project_json,
+            'instance_type': instance_type,
+            'debug': debug,
+            'centralized': centralized,
+            'root_dns_zone': userInstance.root_dns_zone,
+            'args': None
+        }, db)
 
         dumpedInstance = json.loads(json.dumps(userInstance, cls = AlchemyEncoder))
         new_instance_json = {
             **dumpedInstance,
             "environment": userInstance.environment.name,
             "path": userInstance.environment.path,
-            "gitlab_project": userInstance.project.url
+            "gitlab_project": userInstance.project.url,
+            "job_id": "{}".format(job.id)
         }
         return JSONResponse(content = new_instance_json, status_code = 200)
     except auto.StackAlreadyExistsError:
@@ -660,33 +711,33 @@ def provision_instance(current_user, payload, provider, region, zone, environmen
                 }, status_code = 404)
 
         new_instance = register_instance(hash, provider, region, zone, current_user.id, instance_name.lower(), instance_type, environment, gitlab_project, root_dns_zone, db)
+        invalidate_user_statistics(current_user.id)
         ami_image = get_os_image(region, zone)
         user_project_json = json.loads(json.dumps(exist_project, cls = AlchemyEncoder))
         env_json = json.loads(json.dumps(exist_env, cls = AlchemyEncoder))
 
-        bt.add_task(create_instance,
-            provider,
-            ami_image,
-            new_instance.id,
-            email,
-            instance_name,
-            hashed_instance_name,
-            env_json,
-            region,
-            zone,
-            generate_dns,
-            gitlab_project,
-            user_project_json,
-            instance_type,
-            debug,
-            centralized,
-            root_dns_zone,
-            payload.args,
-            db
-        )
+        job = enqueue_provisioning_job("instance", provider, new_instance.id, new_instance.user_id, {
+            'provider': provider,
+            'ami_image': ami_image,
+            'instance_id': new_instance.id,
+            'user_email': email,
+            'instance_name': instance_name,
+            'hashed_instance_name': hashed_instance_name,
+            'environment': env_json,
+            'instance_region': region,
+            'instance_zone': zone,
+            'generate_dns': generate_dns,
+            'gitlab_project': gitlab_project,
+            'user_project': user_project_json,
+            'instance_type': instance_type,
+            'debug': debug,
+            'centralized': centralized,
+            'root_dns_zone': root_dns_zone,
+            'args': payload.args
+        }, db)
 
         dumpedInstance = json.loads(json.dumps(new_instance, cls = AlchemyEncoder))
-        new_instance_json = {**dumpedInstance, "environment": new_instance.environment.name, "path": new_instance.environment.path, "gitlab_project": new_instance.project.url}
+        new_instance_json = {**dumpedInstance, "environment": new_instance.environment.name, "path": new_instance.environment.path, "gitlab_project": new_instance.project.url, "job_id": "{}".format(job.id)}
         return JSONResponse(content = new_instance_json, status_code = 200)
     except auto.StackAlreadyExistsError as sae:
         log_msg("ERROR", "[instance][provision_instance] unexpected StackAlreadyExistsError:{}".format(sae))
@@ -729,7 +780,6 @@ def get_instances(current_user, provider, region, db):
     other_instances = Instance.findInstancesByRegion(other_instances_ids, provider, region, db)
     userRegionInstances.extend(other_instances)
     instances = []
-    for instance in userRegionInstances:
-        dumpedInstance = json.loads(json.dumps(instance, cls = AlchemyEncoder))
-        instances.append({**dumpedInstance, "environment": instance.environment.name, "path": instance.environment.path})
-    return JSONResponse(content = instances, status_code = 200)
+    for instance, vm in zip(userRegionInstances, get_instances_vms(userRegionInstances, db)):
+        instances.append({**serialize(instance), "environment": instance.environment.name, "path": instance.environment.path, "vm": vm})
+    return SerializedResponse(content = instances, status_code = 200)
@@ -1,9 +1,12 @@
 from datetime import datetime
 import json
+import uuid
+import asyncio
 from controllers.faas.invocations import invoke_sync
+from database.postgres_db import SessionLocal
 from entities.faas.Function import FunctionEntity
 from entities.faas.Trigger import TriggerEntity
-from entities.iot.Data import Data, NumericData, StringData
+from entities.iot.Data import Data
 from entities.iot.ObjectType import ObjectType
 from fastapi.responses import JSONResponse
 from entities.iot.Device import Device
@@ -11,11 +14,16 @@ from schedule.crontabs import handle_trigger
 from schemas.faas.Invocation import Invocation
 from schemas.faas.InvocationArg import InvocationArgument
 from schemas.faas.InvocationContent import InvocationContent
-from utils.common import is_numeric, is_not_empty_key
+from utils.common import get_env_int, is_numeric, is_not_empty_key, is_uuid
 from utils.encoder import AlchemyEncoder
+from utils.iot.object_type import check_decoding_function_args, get_object_types_metadata
+from utils.iot.timeseries import IOT_MAX_POINTS, ROLLUP_RESOLUTIONS, get_numeric_series, get_rollup_rows, parse_range
 from utils.observability.cid import get_current_cid
 
-def add_data(current_user, user_auth, payload, db):
+IOT_BATCH_MAX_SIZE = get_env_int('IOT_BATCH_MAX_SIZE', 1000)
+IOT_DECODING_CONCURRENCY = get_env_int('IOT_DECODING_CONCURRENCY', 10)
+
+def get_decoding_invocation(current_user, payload, db):
     existing_device = Device.getUserDeviceById(current_user.email, payload.device_id, db)
     if current_user.is_admin:
         existing_device = Device.getDeviceById(payload.device_id, db)
@@ -57,31 +65,15 @@ def add_data(current_user, user_auth, payload, db):
             }, status_code = 404)
         
         dumped_existing_function = json.loads(json.dumps(existing_function, cls = AlchemyEncoder))
-        args = dumped_existing_function['content']['args']
-        if args:
-            if len(args) == 1:
-                if args[0] != 'data':
-                    return JSONResponse(content = {
-                        'status': 'ko',
-                        'message': "Decoding function key should be named 'data'",
-                        'i18n_code': 'decoding_function_key_should_be_named_data',
-                        'cid': get_current_cid()
-                    }, status_code = 404)
-            else:
-                return JSONResponse(content = {
-                    'status': 'ko',
-                    'message': 'Decoding function has more than one argument',
-                    'i18n_code': 'decoding_function_has_more_than_one_argument',
-                    'cid': get_current_cid()
-                }, status_code = 404)
-        else:
+        args_error = check_decoding_function_args(dumped_existing_function)
+        if args_error:
             return JSONResponse(content = {
                 'status': 'ko',
-                'message': "Decoding function 'data' argument not found",
-                'i18n_code': 'decoding_function_data_argument_not_found',
+                'message': args_error['message'],
+                'i18n_code': args_error['i18n_code'],
                 'cid': get_current_cid()
-            }, status_code = 404)
-        
+            }, status_code = args_error['code'])
+
         invocation_payload = Invocation(
             invoker_id = current_user.id,
             content = InvocationContent(
@@ -103,46 +95,260 @@ def add_data(current_user, user_auth, payload, db):
                 dumped_trigger = json.loads(json.dumps(trigger, cls = AlchemyEncoder))
                 handle_trigger(dumped_trigger)
 
-        sync_invocation_result = invoke_sync(invocation_payload, current_user, user_auth, db)
-        if sync_invocation_result['status'] == 'ko':
-            return JSONResponse(content = {
-                'status': 'ko',
-                'message': sync_invocation_result['message'],
-                'i18n_code': sync_invocation_result['i18n_code'],
-                'cid': get_current_cid()
-            }, status_code = sync_invocation_result['code'])
-        dumped_result = json.loads(json.dumps(sync_invocation_result, cls = AlchemyEncoder))
-        result = dumped_result['entity']['content']['result']
-        data = Data()
-        data.device_id = payload.device_id
-        data.normalized_content = dumped_result
-        data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        db.add(data)
-        db.commit()
+        return invocation_payload
+
+def save_decoded_data(payload, sync_invocation_result, db):
+    dumped_result = json.loads(json.dumps(sync_invocation_result, cls = AlchemyEncoder))
+    save_decoded_batch([(payload, dumped_result, dumped_result['entity']['content']['result'])], db)
+
+    return JSONResponse(content = {
+        'status': 'ok',
+        'message': 'Data added successfully',
+        'cid': get_current_cid()
+    }, status_code = 201)
+
+async def add_data(current_user, user_auth, payload, db):
+    invocation_payload = await asyncio.to_thread(get_decoding_invocation, current_user, payload, db)
+    if not isinstance(invocation_payload, Invocation):
+        return invocation_payload
+
+    sync_invocation_result = await invoke_sync(invocation_payload, current_user, user_auth, db)
+    if sync_invocation_result['status'] == 'ko':
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': sync_invocation_result['message'],
+            'i18n_code': sync_invocation_result['i18n_code'],
+            'cid': get_current_cid()
+        }, status_code = sync_invocation_result['code'])
+
+    return await asyncio.to_thread(save_decoded_data, payload, sync_invocation_result, db)
+
+def get_reading_error(index, reading, error):
+    return {
+        'index': index,
+        'device_id': reading.device_id,
+        'status': 'ko',
+        'code': error['code'],
+        'message': error['message'],
+        'i18n_code': error['i18n_code']
+    }
+
+def get_device_key(device_id):
+    return str(uuid.UUID(str(device_id))) if is_uuid(str(device_id)) else None
+
+def get_batch_groups(current_user, payload, db):
+    #? one query for all the devices and one per metadata table for the object types which are not cached yet
+    readings = payload.data
+    device_ids = list({key for key in (get_device_key(reading.device_id) for reading in readings) if key})
+    if current_user.is_admin:
+        devices = Device.getDevicesByIds(device_ids, db)
+    else:
+        devices = Device.getUserDevicesByIds(current_user.email, device_ids, db)
+
+    devices = {get_device_key(device.id): device for device in devices}
+    object_types = get_object_types_metadata([device.typeobject_id for device in devices.values() if device.active and device.typeobject_id], db)
+
+    errors = []
+    groups = {}
+    for index, reading in enumerate(readings):
+        device = devices.get(get_device_key(reading.device_id))
+        if not device:
+            errors.append(get_reading_error(index, reading, {'code': 404, 'message': 'Device not found', 'i18n_code': 'device_not_found'}))
+            continue
+
+        if not device.active:
+            errors.append(get_reading_error(index, reading, {'code': 403, 'message': 'Device not active', 'i18n_code': 'device_not_active'}))
+            continue
+
+        object_type_id = str(device.typeobject_id)
+        object_type = object_types.get(object_type_id)
+        if not object_type:
+            errors.append(get_reading_error(index, reading, {'code': 404, 'message': 'TypeObject not found', 'i18n_code': 'typeobject_not_found'}))
+            continue
+
+        if object_type['error']:
+            errors.append(get_reading_error(index, reading, object_type['error']))
+            continue
+
+        groups.setdefault(object_type_id, {'object_type': object_type, 'indexes': []})['indexes'].append(index)
+
+    return groups, errors
+
+def get_decoding_payload(current_user, function_id, value):
+    return Invocation(
+        invoker_id = current_user.id,
+        content = InvocationContent(
+            function_id = function_id,
+            args = [
+                InvocationArgument(
+                    key = "data",
+                    value = value
+                )
+            ]
+        )
+    )
+
+def get_normalized_content(dumped_result, result):
+    entity = dumped_result['entity']
+    return {**dumped_result, 'entity': {**entity, 'content': {**entity['content'], 'result': result}}}
+
+def get_invocation_error(sync_invocation_result):
+    return {
+        'code': sync_invocation_result['code'],
+        'message': sync_invocation_result['message'],
+        'i18n_code': sync_invocation_result['i18n_code']
+    }
+
+def get_batch_results(result):
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return None
+    return result if isinstance(result, list) else None
+
+async def decode_batch(current_user, user_auth, object_type, readings, db):
+    #? the decoding function receives the json list of the contents and has to return the list of the results in the same order
+    sync_invocation_result = await invoke_sync(get_decoding_payload(current_user, object_type['decoding_function'], json.dumps([reading.content for reading in readings])), current_user, user_auth, db)
+    if sync_invocation_result['status'] == 'ko':
+        return [get_invocation_error(sync_invocation_result)] * len(readings)
+
+    dumped_result = json.loads(json.dumps(sync_invocation_result, cls = AlchemyEncoder))
+    results = get_batch_results(dumped_result['entity']['content']['result'])
+    if results is None or len(results) != len(readings):
+        return [{'code': 500, 'message': 'Decoding function should return one result per reading', 'i18n_code': 'decoding_function_invalid_batch_result'}] * len(readings)
+
+    return [(get_normalized_content(dumped_result, result), result) for result in results]
 
+async def decode_reading(current_user, user_auth, object_type, reading, semaphore):
+    #? each concurrent decoding gets its own session, the request's one can't be shared between threads
+    async with semaphore:
+        db = SessionLocal()
+        try:
+            sync_invocation_result = await invoke_sync(get_decoding_payload(current_user, object_type['decoding_function'], reading.content), current_user, user_auth, db)
+        finally:
+            db.close()
+
+    if sync_invocation_result['status'] == 'ko':
+        return get_invocation_error(sync_invocation_result)
+
+    dumped_result = json.loads(json.dumps(sync_invocation_result, cls = AlchemyEncoder))
+    return (dumped_result, dumped_result['entity']['content']['result'])
+
+async def decode_readings(current_user, user_auth, object_type, readings, db):
+    if object_type['batch_decoding']:
+        return await decode_batch(current_user, user_auth, object_type, readings, db)
+
+    semaphore = asyncio.Semaphore(IOT_DECODING_CONCURRENCY)
+    return await asyncio.gather(*[decode_reading(current_user, user_auth, object_type, reading, semaphore) for reading in readings])
+
+def handle_triggers(triggers):
+    for trigger in triggers:
+        handle_trigger(trigger)
+
+def save_decoded_batch(decoded_readings, db):
+    created_at = datetime.now().replace(microsecond = 0)
+    data_rows = []
+    numeric_rows = []
+    string_rows = []
+    for reading, normalized_content, result in decoded_readings:
+        data_id = uuid.uuid4()
+        device_id = get_device_key(reading.device_id)
+        data_rows.append({'id': data_id, 'device_id': device_id, 'normalized_content': normalized_content, 'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S')})
+        row = {'id': uuid.uuid4(), 'data_id': str(data_id), 'device_id': device_id, 'key': "data"}
         if is_numeric(result):
-            numeric_data = NumericData()
-            numeric_data.data_id = data.id
-            numeric_data.device_id = payload.device_id
-            numeric_data.key = "data"
-            numeric_data.value = result
-            numeric_data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            db.add(numeric_data)
-            db.commit()
+            numeric_rows.append({**row, 'value': float(result), 'created_at': created_at})
         else:
-            string_data = StringData()
-            string_data.data_id = data.id
-            string_data.device_id = payload.device_id
-            string_data.key = "data"
-            string_data.value = result
-            string_data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            string_rows.append({**row, 'value': result if isinstance(result, str) else json.dumps(result), 'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S')})
+
+    Data.insertBatch(data_rows, numeric_rows, string_rows, get_rollup_rows(numeric_rows), db)
+    return [str(row['id']) for row in data_rows]
+
+async def add_data_batch(current_user, user_auth, payload, db):
+    if len(payload.data) == 0 or len(payload.data) > IOT_BATCH_MAX_SIZE:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': 'The batch should contain between 1 and {} readings'.format(IOT_BATCH_MAX_SIZE),
+            'i18n_code': 'iot_batch_invalid_size',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    groups, results = await asyncio.to_thread(get_batch_groups, current_user, payload, db)
 
-            db.add(string_data)
-            db.commit()
+    decoded_indexes = []
+    decoded_readings = []
+    triggers = [trigger for group in groups.values() for trigger in group['object_type']['triggers']]
+    if triggers:
+        await asyncio.to_thread(handle_triggers, triggers)
+
+    for group in groups.values():
+        object_type = group['object_type']
+        readings = [payload.data[index] for index in group['indexes']]
+        decoded = await decode_readings(current_user, user_auth, object_type, readings, db)
+        for index, reading, decoded_reading in zip(group['indexes'], readings, decoded):
+            if isinstance(decoded_reading, dict):
+                results.append(get_reading_error(index, reading, decoded_reading))
+            else:
+                decoded_indexes.append(index)
+                decoded_readings.append((reading, *decoded_reading))
 
+    if decoded_readings:
+        data_ids = await asyncio.to_thread(save_decoded_batch, decoded_readings, db)
+        for index, data_id in zip(decoded_indexes, data_ids):
+            results.append({'index': index, 'device_id': payload.data[index].device_id, 'status': 'ok', 'data_id': data_id})
+
+    results.sort(key = lambda result: result['index'])
+    nb_errors = sum(1 for result in results if result['status'] == 'ko')
+    return JSONResponse(content = {
+        'status': 'ok' if nb_errors == 0 else 'ko',
+        'message': 'Data added successfully' if nb_errors == 0 else '{} of {} readings were not added'.format(nb_errors, len(results)),
+        'results': results,
+        'cid': get_current_cid()
+    }, status_code = 201 if nb_errors == 0 else 207)
+
+def get_numeric_data_series(current_user, device_id, key, start, end, max_points, resolution, db):
+    if not is_uuid(device_id):
         return JSONResponse(content = {
-            'status': 'ok',
-            'message': 'Data added successfully',
+            'status': 'ko',
+            'message': 'Device id is not valid',
+            'i18n_code': 'invalid_device_id',
             'cid': get_current_cid()
-        }, status_code = 201)
+        }, status_code = 400)
+
+    if current_user.is_admin:
+        existing_device = Device.getDeviceById(device_id, db)
+    else:
+        existing_device = Device.getUserDeviceById(current_user.email, device_id, db)
+    if not existing_device:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': 'Device not found',
+            'i18n_code': 'device_not_found',
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    if resolution and resolution != 'raw' and resolution not in ROLLUP_RESOLUTIONS:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': 'The resolution should be one of: raw, {}'.format(", ".join(ROLLUP_RESOLUTIONS)),
+            'i18n_code': 'invalid_resolution',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    start, end = parse_range(start, end)
+    if start >= end or max_points < 1:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': 'The range or the number of points is not valid',
+            'i18n_code': 'invalid_series_range',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    resolution, points = get_numeric_series(str(existing_device.id), key, start, end, min(max_points, IOT_MAX_POINTS), resolution, db)
+    return JSONResponse(content = {
+        'status': 'ok',
+        'resolution': resolution,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'points': points
+    }, status_code = 200)
@@ -5,12 +5,13 @@ from entities.iot.Device import Device
 from entities.User import User
 from schemas.User import UserRegisterSchema
 
-from utils.common import generate_hash_password, get_admin_status, is_empty, is_false, is_not_empty, is_true
+from utils.common import get_admin_status, is_empty, is_false, is_not_empty, is_true
 from utils.env_vars import DOMAIN
 from utils.gitlab import create_gitlab_user
 from utils.logger import log_msg
 from utils.mail import send_device_confirmation_email, send_user_and_device_confirmation_email, send_user_confirmation_email_without_activation_link
 from utils.observability.cid import get_current_cid
+from utils.password import hash_password
 from utils.security import generate_token, is_not_email_valid, random_password
 from utils.jwt import jwt_decode
 
@@ -40,7 +41,7 @@ def add_device(current_user, payload, db):
                 password = password
             )
 
-            register_payload.password = generate_hash_password(password)
+            register_payload.password = hash_password(password)
             new_user = User(**register_payload.dict())
             new_user.save(db)
             create_gitlab_user(email)
@@ -9,7 +9,7 @@ from entities.iot.ObjectType import ObjectType
 from utils.common import is_true
 from utils.encoder import AlchemyEncoder
 from utils.file import get_b64_content
-from utils.iot.object_type import object_type_user_content_check
+from utils.iot.object_type import object_type_user_content_check, invalidate_object_type_metadata
 from utils.observability.cid import get_current_cid
 
 def get_object_types(current_user, db):
@@ -69,6 +69,7 @@ def update_object_type(current_user, object_type_id, payload, db):
 
     current_date = datetime.now().date().strftime('%Y-%m-%d')
     ObjectType.updateObjectType(object_type_id, payload, current_date, db)
+    invalidate_object_type_metadata(object_type_id)
 
     return JSONResponse(content = {
         'status': 'ok',
@@ -87,6 +88,7 @@ def delete_object_type(current_user, object_type_id, db):
         }, status_code = 404)
     
     ObjectType.deleteObjectType(object_type_id, db)
+    invalidate_object_type_metadata(object_type_id)
 
     return JSONResponse(content = {
         'status': 'ok',
@@ -20,6 +20,7 @@ from utils.kubernetes.k8s_management import (delete_custom_resource,
 from utils.list import unmarshall_list_array
 from utils.logger import log_msg
 from utils.observability.cid import get_current_cid
+from utils.serializer import SerializedResponse, serialize
 
 GROUP = "helm.toolkit.fluxcd.io"
 VERSION = "v2beta2"
@@ -32,16 +33,14 @@ def get_deployments(current_user: UserSchema, db):
     else:
         deployments = Deployment.getAllByUser(current_user.id, db)
 
-    deploymentJson = json.loads(json.dumps(deployments, cls = AlchemyEncoder))
-    
     deploymentJson = [
         {
-            **deployment,
-            "namespace": f'{deployment["name"]}-{deployment["hash"]}'
-        } for deployment in deploymentJson
+            **serialize(deployment),
+            "namespace": f'{deployment.name}-{deployment.hash}'
+        } for deployment in deployments
     ]
     
-    return JSONResponse(content = deploymentJson, status_code = 200)
+    return SerializedResponse(content = deploymentJson, status_code = 200)
 
 def create_new_deployment(current_user:UserSchema, deployment:DeploymentSchema, db):
     env: Environment = Environment.getById(deployment.env_id, db)
@@ -15,7 +15,10 @@ from utils.common import is_empty, is_numeric, is_true
 from utils.encoder import AlchemyEncoder
 from utils.flag import is_flag_disabled
 from utils.gitlab import create_gitlab_project, delete_gitlab_project, get_gitlab_project_playbooks, attach_default_gitlab_project_to_user, detach_user_gitlab_project
+from utils.list import group_by_key
 from utils.observability.cid import get_current_cid
+from utils.serializer import SerializedResponse, serialize
+from utils.statistics import invalidate_user_statistics
 
 def check_permissions(current_user, project, db):
     user = User.getUserById(current_user.id, db)
@@ -83,6 +86,7 @@ def transfer_project(current_user, payload, projectId, db):
 
         Access.updateObjectsAccessesOwner("instance", projectInstancesIds, user.id, db)
         Access.updateObjectAccessesOwner("project", project.id, user.id, db)
+        invalidate_user_statistics(current_user.id, user.id)
 
         return JSONResponse(content = {
             'status': 'ok',
@@ -130,6 +134,7 @@ def add_project(current_user, payload, db):
             project_type,
             db
         )
+        invalidate_user_statistics(current_user.id)
         projectJson = json.loads(json.dumps(project, cls = AlchemyEncoder))
         return JSONResponse(content = projectJson, status_code = 201)
     except HTTPError as e:
@@ -147,27 +152,27 @@ def get_projects(current_user, type, db):
     other_project_ids = [access.object_id for access in other_projects_access]
     other_projects = Project.findProjects(other_project_ids, db)
     projects.extend(other_projects)
-    projectsJson = json.loads(json.dumps(projects, cls = AlchemyEncoder))
+    projectsJson = serialize(projects)
     user_instances = Instance.getActiveUserInstances(current_user.id, db)
-    user_instancesJson = json.loads(json.dumps(user_instances, cls = AlchemyEncoder))
+    projectsInstances = group_by_key(serialize(user_instances), "project_id")
+    deployments = Deployment.getFirstByProjects([project["id"] for project in projectsJson], db)
+    environments = {env.id: env for env in Environment.getByIds(list({deployment.env_id for deployment in deployments.values()}), db)}
 
     for project in projectsJson:
-        deployment = Deployment.getFirstByProject(project["id"], db)
-        project["environment"] = None
-        if is_true(deployment):
-            environemnt = Environment.getById(deployment.env_id, db)
-            project["environment"] = {
-                "id": environemnt.id,
-                "name": environemnt.name,
-            }
+        deployment = deployments.get(project["id"])
+        environment = environments.get(deployment.env_id) if is_true(deployment) else None
+        project["environment"] = {
+            "id": environment.id,
+            "name": environment.name,
+        } if is_true(environment) else None
     populatedProjects = [
         {
             **project,
-            "instances": [instance for instance in user_instancesJson if instance["project_id"] == project["id"] ]
+            "instances": projectsInstances.get(project["id"], [])
         } for project in projectsJson
     ]
     
-    return JSONResponse(content = populatedProjects, status_code = 200)
+    return SerializedResponse(content = populatedProjects, status_code = 200)
 
 def get_project(current_user, projectId, db):
     try:
@@ -245,6 +250,7 @@ def delete_project(current_user, projectId, db):
         check_permissions(current_user, project, db)
         delete_gitlab_project(projectId, project.gitlab_host, project.access_token)
         Project.deleteOne(projectId, db)
+        invalidate_user_statistics(current_user.id)
 
         return JSONResponse(content = {
             'status' : 'ok',
@@ -309,6 +315,7 @@ def delete_project_by_name(current_user, project_name, db):
         check_permissions(current_user, project, db)
         delete_gitlab_project(project.id, project.gitlab_host, project.access_token)
         Project.deleteOne(project.id, db)
+        invalidate_user_statistics(current_user.id)
 
         return JSONResponse(content = {
              'status' : 'ok',
@@ -373,6 +380,7 @@ def delete_project_by_url(current_user, project_url, db):
         check_permissions(current_user, project, db)
         delete_gitlab_project(project.id, project.gitlab_host, project.access_token)
         Project.deleteOne(project.id, db)
+        invalidate_user_statistics(current_user.id)
 
         return JSONResponse(content = {
             'status' : 'ok',
@@ -0,0 +1,26 @@
+from fastapi.responses import JSONResponse
+
+from entities.ProvisioningJob import ProvisioningJob
+from utils.common import is_uuid
+from utils.provisioning import get_job_json
+from utils.observability.cid import get_current_cid
+
+def get_provisioning_job(current_user, job_id, db):
+    if not is_uuid(job_id):
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Invalid provisioning job id',
+            'i18n_code': 'invalid_provisioning_job_id',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    job = ProvisioningJob.findUserJob(job_id, current_user.id, db)
+    if not job:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'Provisioning job not found',
+            'i18n_code': 'provisioning_job_not_found',
+            'cid': get_current_cid()
+        }, status_code = 404)
+
+    return JSONResponse(content = get_job_json(job), status_code = 200)
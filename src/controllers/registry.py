@@ -11,6 +11,7 @@ from utils.provider import exist_provider
 from utils.registry import delete_registry, update_credentials
 from utils.common import is_empty, is_numeric
 from utils.observability.cid import get_current_cid
+from utils.statistics import invalidate_user_statistics
 
 def get_registry(current_user, provider, region, registryId, db):
     if not exist_provider(provider):
@@ -82,6 +83,7 @@ def remove_registry(current_user, provider, region, registryId, db, bt: Backgrou
     try:
         bt.add_task(delete_registry, user_registry.provider, user_registry, user_email)
         Registry.updateStatus(user_registry.id, "deleted", db)
+        invalidate_user_statistics(user_registry.user_id)
 
         return JSONResponse(content = {
             'status': 'ok',
@@ -1,21 +1,25 @@
 from datetime import datetime
+import re
 import json
-import os
+import asyncio
 from datetime import datetime
 from urllib.error import HTTPError
+from urllib.parse import quote
 from uuid import uuid4
 from entities.SupportTicketAttachment import SupportTicketAttachment
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from entities.SupportTicket import SupportTicket
 from entities.SupportTicketLog import SupportTicketLog
 from entities.User import User
-from utils.bucket import delete_from_attachment_bucket, download_from_attachment_bucket, upload_to_attachment_bucket
+from utils.bucket import AsyncStreamReader, delete_from_attachment_bucket, get_from_attachment_bucket, put_to_attachment_bucket, stream_object
 from utils.logger import log_msg
-from utils.common import get_env_int, is_false, is_not_numeric
+from utils.common import get_env_int, is_empty, is_false, is_not_numeric
 from utils.encoder import AlchemyEncoder
 from utils.gitlab import add_gitlab_issue, add_gitlab_issue_comment
 from utils.observability.cid import get_current_cid
 
+_byte_range_regexp = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
 def get_support_tickets(current_user, db):
     supportTickets = SupportTicket.getUserSupportTickets(current_user.id, db)
     supportTicketsJson = json.loads(json.dumps(supportTickets, cls = AlchemyEncoder))
@@ -328,26 +332,41 @@ def update_support_ticket(current_user, ticket_id, payload, db):
             'cid': get_current_cid()
         }, status_code = 500)
 
-def attach_file_to_ticket_by_id(current_user, ticket_id, files, db):
+def get_user_ticket(current_user, ticket_id, db):
     if is_not_numeric(ticket_id):
-        return JSONResponse(content = {
+        return None, JSONResponse(content = {
             'status': 'ko',
             'error': 'Invalid ticket id', 
             'i18n_code': 'invalid_ticket_id',
             'cid': get_current_cid()
         }, status_code = 400)
- 
+
     if current_user.is_admin:
         ticket: SupportTicket = SupportTicket.getSupportTicket(ticket_id, db)
     else:
         ticket: SupportTicket = SupportTicket.getUserSupportTicket(current_user.id, ticket_id, db)
     if not ticket:
-        return JSONResponse(content = {
+        return None, JSONResponse(content = {
             'status': 'ko',
             'error': 'ticket not found',
             'cid': get_current_cid()
         }, status_code = 404)
 
+    return ticket, None
+
+def get_bucket_error_response(result):
+    return JSONResponse(content = {
+        'status': 'ko',
+        'error': result['error'],
+        'i18n_code': result['i18n_code'],
+        'cid': result['cid']
+    }, status_code = result['http_code'])
+
+def attach_file_to_ticket_by_id(current_user, ticket_id, files, db):
+    _, error = get_user_ticket(current_user, ticket_id, db)
+    if error:
+        return error
+
     if not files:
         return JSONResponse(content = {
             'status': 'ko',
@@ -357,25 +376,15 @@ def attach_file_to_ticket_by_id(current_user, ticket_id, files, db):
         }, status_code = 400)
 
     for file in files:
-        os.makedirs('uploaded_files', exist_ok = True)
-        target_name = uuid4().__str__()
-        path_file = os.path.join('uploaded_files', target_name)
-
-        with open(path_file, "wb") as file_object:
-            file_object.write(file.file.read())
-
-        result = upload_to_attachment_bucket(path_file, target_name)
+        #? the spooled upload is sent by parts to the bucket without being read entirely
+        target_name = "{}".format(uuid4())
+        result = put_to_attachment_bucket(file.file, target_name, file.content_type)
         if is_false(result['status']):
-            return JSONResponse(content = {
-                'status': 'ko',
-                'error': result['error'],
-                'i18n_code': result['i18n_code'],
-                'cid': result['cid']
-            }, status_code = result['http_code'])
+            return get_bucket_error_response(result)
 
         SupportTicketAttachment(
             mime_type = file.content_type,
-            storage_key = path_file,
+            storage_key = target_name,
             name = file.filename,
             support_ticket_id = ticket_id,
             user_id = current_user.id
@@ -386,27 +395,59 @@ def attach_file_to_ticket_by_id(current_user, ticket_id, files, db):
         'message': 'file successfully attached',
         'i18n_code': 'file_attached_successfully'
     }, status_code = 200)
-    
-def download_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db):
-    if is_not_numeric(ticket_id):
+
+async def stream_file_to_ticket_by_id(current_user, ticket_id, filename, request, db):
+    _, error = await asyncio.to_thread(get_user_ticket, current_user, ticket_id, db)
+    if error:
+        return error
+
+    if is_empty(filename):
         return JSONResponse(content = {
             'status': 'ko',
-            'error': 'Invalid ticket id', 
-            'i18n_code': 'invalid_ticket_id',
+            'error': 'No files attached', 
+            'i18n_code': 'no_files_attached',
             'cid': get_current_cid()
         }, status_code = 400)
-    
-    if current_user.is_admin:
-        ticket: SupportTicket = SupportTicket.getSupportTicket(ticket_id, db)
-    else:
-        ticket: SupportTicket = SupportTicket.getUserSupportTicket(current_user.id, ticket_id, db)
-    
-    if not ticket:
+
+    #? the request body is piped into the bucket by parts from a worker thread
+    target_name = "{}".format(uuid4())
+    content_type = request.headers.get('content-type')
+    reader = AsyncStreamReader(request.stream(), asyncio.get_running_loop())
+    result = await asyncio.to_thread(put_to_attachment_bucket, reader, target_name, content_type)
+    if is_false(result['status']):
+        return get_bucket_error_response(result)
+
+    if reader.size == 0:
+        await asyncio.to_thread(delete_from_attachment_bucket, target_name)
         return JSONResponse(content = {
             'status': 'ko',
-            'error': 'ticket not found',
+            'error': 'No files attached', 
+            'i18n_code': 'no_files_attached',
             'cid': get_current_cid()
-        }, status_code = 404)
+        }, status_code = 400)
+
+    await asyncio.to_thread(SupportTicketAttachment(
+        mime_type = content_type,
+        storage_key = target_name,
+        name = filename,
+        support_ticket_id = ticket_id,
+        user_id = current_user.id
+    ).save, db)
+
+    return JSONResponse(content = {
+        'status': 'ok',
+        'message': 'file successfully attached',
+        'i18n_code': 'file_attached_successfully'
+    }, status_code = 200)
+
+def get_byte_range(range_header):
+    #? only a single range is forwarded, the others are answered with the whole content as the rfc allows
+    return range_header.strip() if range_header and _byte_range_regexp.match(range_header.strip()) else None
+
+def download_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db, range_header = None):
+    _, error = get_user_ticket(current_user, ticket_id, db)
+    if error:
+        return error
 
     attachment: SupportTicketAttachment = SupportTicketAttachment.getAttachmentByTicketId(ticket_id, attachment_id, db)
 
@@ -417,20 +458,21 @@ def download_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db):
             'i18n_code': 'attachment_not_found',
             'cid': get_current_cid()
         }, status_code = 404)
-    
-    target_name = attachment.name
-    path_file = attachment.storage_key
 
-    result = download_from_attachment_bucket(path_file, target_name)
+    result = get_from_attachment_bucket(attachment.storage_key, get_byte_range(range_header))
     if is_false(result['status']):
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': result['error'],
-            'i18n_code': result['i18n_code'],
-            'cid': result['cid']
-        }, status_code = result['http_code'])
+        return get_bucket_error_response(result)
+
+    response = result['response']
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Content-Disposition': "attachment; filename*=utf-8''{}".format(quote(attachment.name))
+    }
+    for header in ['Content-Length', 'Content-Range']:
+        if header in response.headers:
+            headers[header] = response.headers[header]
 
-    return FileResponse(target_name, filename = target_name)
+    return StreamingResponse(stream_object(response), status_code = response.status, headers = headers, media_type = attachment.mime_type or "application/octet-stream")
 
 def delete_file_from_ticket_by_id(current_user: User, ticket_id, attachment_id, db):
     if is_not_numeric(ticket_id):
@@ -461,12 +503,7 @@ def delete_file_from_ticket_by_id(current_user: User, ticket_id, attachment_id,
     SupportTicketAttachment.deleteAttachmentById(attachment.id, db)
     result = delete_from_attachment_bucket(attachment.storage_key)
     if is_false(result['status']):
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': result['error'],
-            'i18n_code': result['i18n_code'],
-            'cid': result['cid']
-        }, status_code = result['http_code'])
+        return get_bucket_error_response(result)
 
     return JSONResponse(content={
         'status': 'ok',
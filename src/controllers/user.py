@@ -1,4 +1,3 @@
-import json
 
 from datetime import datetime, timedelta
 from urllib.error import HTTPError
@@ -7,19 +6,25 @@ from jose.exceptions import ExpiredSignatureError, JOSEError, JWTError
 from entities.iot.Device import Device
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only
 
 from entities.User import User
 
-from utils.common import generate_hash_password, is_boolean, is_empty, is_false, is_not_empty, is_true, verify_password
-from utils.encoder import AlchemyEncoder
+from utils.common import is_boolean, is_empty, is_false, is_not_empty, is_true
 from utils.env_vars import DOMAIN
 from utils.jwt import jwt_decode, jwt_encode
 from utils.logger import log_msg
 from utils.mail import send_confirmation_email, send_forget_password_email
 from utils.gitlab import create_gitlab_user
 from utils.security import check_password, is_not_email_valid
+from utils.paginator import paginate
+from utils.serializer import SerializedResponse, get_serializer, serialize
+from utils.statistics import get_user_cloud_counts
+from utils.password import hash_password, verify_password
 from utils.observability.cid import get_current_cid
 
+_resources_kinds = ["projects", "instances", "buckets", "registries"]
+
 def get_current_user_data(current_user, db):
     user = User.getUserById(current_user.id, db)
     if is_empty(user):
@@ -87,7 +92,7 @@ def create_user_account(payload, db):
                 'cid': get_current_cid()
             }, status_code = 409)
 
-        payload.password = generate_hash_password(password)
+        payload.password = hash_password(password)
 
         new_user = User(**payload.dict())
         new_user.save(db)
@@ -123,35 +128,67 @@ def create_user_account(payload, db):
         }, status_code = e.code)
 
 def get_user_cloud_statistics(current_user, db):
-    from entities.Instance import Instance
-    from entities.Project import Project
-    from entities.Bucket import Bucket
-    from entities.Registry import Registry
-    instances = len(Instance.getActiveUserInstances(current_user.id, db))
-    projects = len(Project.getUserProjects(current_user.id, db))
-    buckets = len(Bucket.getAllUserBuckets(current_user.id, db))
-    registries = len(Registry.getAllUserRegistries(current_user.id, db))
+    return JSONResponse(content = get_user_cloud_counts(current_user.id, db), status_code = 200)
 
-    return JSONResponse(content = {"projects": projects, "instances": instances, "buckets": buckets, "registries": registries}, status_code = 200)
-
-def get_user_cloud_resources(current_user, db):
+def get_user_resources_query(kind, user_id, db):
     from entities.Instance import Instance
-    instances = Instance.getActiveUserInstances(current_user.id, db)
-    instancesJson = json.loads(json.dumps(instances, cls = AlchemyEncoder))
-
     from entities.Project import Project
-    projects = Project.getUserProjects(current_user.id, db)
-    projectsJson = json.loads(json.dumps(projects, cls = AlchemyEncoder))
-
     from entities.Bucket import Bucket
-    buckets = Bucket.getAllUserBuckets(current_user.id, db)
-    bucketsJson = json.loads(json.dumps(buckets, cls = AlchemyEncoder))
-
     from entities.Registry import Registry
-    registries = Registry.getAllUserRegistries(current_user.id, db)
-    registriesJson = json.loads(json.dumps(registries, cls = AlchemyEncoder))
+    if kind == "projects":
+        return Project, db.query(Project).filter(Project.userid == user_id)
+    if kind == "instances":
+        return Instance, db.query(Instance).filter(Instance.user_id == user_id, Instance.status != "deleted")
+    if kind == "buckets":
+        return Bucket, db.query(Bucket).filter(Bucket.user_id == user_id, Bucket.status != "deleted")
+    return Registry, db.query(Registry).filter(Registry.user_id == user_id, Registry.status != "deleted")
+
+def get_projected_query(model, query, fields):
+    #? only the requested columns are loaded, the unknown ones are ignored since the kinds don't share all their columns
+    if fields is None:
+        return query, None
+
+    columns = [field for field in fields if field in get_serializer(model).columns]
+    return query.options(load_only(*[getattr(model, column) for column in columns])), columns
+
+def get_user_cloud_resources(current_user, db, kind = None, fields = None, start_index = 0, max_results = 10, cursor = None):
+    fields = [field.strip() for field in fields.split(",") if is_not_empty(field.strip())] if is_not_empty(fields) else None
+    if is_empty(kind):
+        content = {}
+        for resources_kind in _resources_kinds:
+            model, query = get_user_resources_query(resources_kind, current_user.id, db)
+            query, columns = get_projected_query(model, query, fields)
+            content[resources_kind] = serialize(query.all(), columns)
+        return SerializedResponse(content = content, status_code = 200)
+
+    if kind not in _resources_kinds:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'invalid resource kind, expected one of {}'.format(", ".join(_resources_kinds)),
+            'i18n_code': 'invalid_resource_kind',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    model, query = get_user_resources_query(kind, current_user.id, db)
+    query, columns = get_projected_query(model, query, fields)
+    try:
+        page = paginate(query, [model.id], max_results, cursor, start_index)
+    except ValueError as e:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': "{}".format(e),
+            'i18n_code': 'invalid_cursor',
+            'cid': get_current_cid()
+        }, status_code = 400)
 
-    return JSONResponse(content = {"projects": projectsJson, "instances": instancesJson, "buckets": bucketsJson, "registries": registriesJson}, status_code = 200)
+    return SerializedResponse(content = {
+        'kind': kind,
+        'start_index': start_index,
+        'max_results': max_results,
+        'results': serialize(page['results'], columns),
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor']
+    }, status_code = 200)
 
 def update_user_password(current_user, payload, db):
     new_password = payload.new_password
@@ -0,0 +1,56 @@
+import zlib
+
+from sqlalchemy import text
+
+from database.postgres_db import dbEngine
+from utils.logger import log_msg
+
+class AdvisoryLock():
+    #? postgres session advisory lock: it's released by postgres as soon as the holder's connection is lost
+    def __init__(self, name):
+        self.name = name
+        self.key = zlib.crc32(name.encode())
+        self.connection = None
+
+    def try_acquire(self):
+        if self.connection is not None:
+            return self.is_held()
+
+        connection = dbEngine.connect().execution_options(isolation_level = "AUTOCOMMIT")
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {'key': self.key}).scalar()
+        except Exception:
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
+
+        log_msg("INFO", "[AdvisoryLock][try_acquire] lock acquired: name = {}".format(self.name))
+        self.connection = connection
+        return True
+
+    def is_held(self):
+        if self.connection is None:
+            return False
+
+        try:
+            self.connection.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            log_msg("WARN", "[AdvisoryLock][is_held] lock lost: name = {}, e.type = {}, e.msg = {}".format(self.name, type(e), e))
+            self.release()
+            return False
+
+    def release(self):
+        if self.connection is None:
+            return
+
+        try:
+            self.connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': self.key})
+        except Exception as e:
+            log_msg("DEBUG", "[AdvisoryLock][release] unable to unlock: name = {}, e.type = {}, e.msg = {}".format(self.name, type(e), e))
+        finally:
+            self.connection.close()
+            self.connection = None
@@ -2,27 +2,34 @@ import nats
 import json
 import asyncio
 
+from nats.js.api import DeliverPolicy
+
+from database.nats_connection import get_nats_connection
 from utils.consumer import CONSUMER_SLEEP_TIME
 from utils.eventloop import get_event_loop
+from utils.executor import get_consumer_executor
 from utils.logger import log_msg
-from utils.nats import close_nats, get_creds_file_if_exists, get_nats_url
+from utils.nats import close_nats, declare_stream, get_creds_file_if_exists, get_nats_url, get_stream_max_age, get_stream_subjects
 
 class JetstreamClient():
     async def stream(self, group, channel):
         _nc = await nats.connect(get_nats_url(), user_credentials = get_creds_file_if_exists())
         _js = _nc.jetstream()
-        await _js.add_stream(name = channel, subjects = [group])
+        await declare_stream(_js, channel, get_stream_subjects(group, channel), get_stream_max_age(group))
         return _nc, _js
 
     async def apublish(self, group, channel, payload):
-        _nc, _js = await self.stream(group, channel)
-        await _js.publish(channel, json.dumps(payload).encode('UTF-8'))
-        await close_nats(_nc)
+        await get_nats_connection().ajetstream_publish(channel, get_stream_subjects(group, channel), channel, json.dumps(payload).encode('UTF-8'), get_stream_max_age(group))
 
     async def aconsume(self, group, channel, handler):
         _nc, _js = await self.stream(group, channel)
+
         try:
-            await _js.subscribe(channel, group, durable = group, cb = handler)
+            if group is None:
+                #? the fan-out listeners only need the notifications sent from now on, not the stream's history
+                await _js.subscribe(channel, cb = get_consumer_executor().wrap(handler), deliver_policy = DeliverPolicy.NEW)
+            else:
+                await _js.subscribe(channel, group, durable = group, cb = get_consumer_executor().wrap(handler))
             await asyncio.sleep(CONSUMER_SLEEP_TIME)
         finally:
             await close_nats(_nc)
@@ -30,7 +37,7 @@ class JetstreamClient():
             exit(1)
 
     def publish(self, group, channel, payload):
-        asyncio.run(self.apublish(group, channel, payload))
+        get_nats_connection().jetstream_publish(channel, get_stream_subjects(group, channel), channel, json.dumps(payload).encode('UTF-8'), get_stream_max_age(group))
 
     def consume(self, group, channel, handler):
         loop = get_event_loop()
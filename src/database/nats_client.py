@@ -2,8 +2,10 @@ import nats
 import json
 import asyncio
 
+from database.nats_connection import get_nats_connection
 from utils.consumer import CONSUMER_GROUP, CONSUMER_SLEEP_TIME
 from utils.eventloop import get_event_loop
+from utils.executor import get_consumer_executor
 
 from utils.logger import log_msg
 from utils.nats import close_nats, get_creds_file_if_exists, get_nats_url
@@ -14,14 +16,12 @@ class NatsClient():
         return _nc
 
     async def apublish(self, channel, payload):
-        _nc = await self.connect()
-        await _nc.publish(channel, json.dumps(payload).encode('UTF-8'))
-        await close_nats(_nc)
+        await get_nats_connection().apublish(channel, json.dumps(payload).encode('UTF-8'))
 
-    async def aconsume(self, channel, handler):
+    async def aconsume(self, channel, handler, is_queued = True):
         _nc = await self.connect()
         try:
-            await _nc.subscribe(channel, CONSUMER_GROUP, cb = handler)
+            await _nc.subscribe(channel, CONSUMER_GROUP if is_queued else "", cb = get_consumer_executor().wrap(handler))
             await asyncio.sleep(CONSUMER_SLEEP_TIME)
         finally:
             await close_nats(_nc)
@@ -29,9 +29,9 @@ class NatsClient():
             exit(1)
 
     def publish(self, channel, payload):
-        asyncio.run(self.apublish(channel, payload))
+        get_nats_connection().publish(channel, json.dumps(payload).encode('UTF-8'))
 
-    def consume(self, channel, handler):
+    def consume(self, channel, handler, is_queued = True):
         loop = get_event_loop()
-        loop.run_until_complete(self.aconsume(channel, handler))
+        loop.run_until_complete(self.aconsume(channel, handler, is_queued))
         loop.run_forever()
@@ -0,0 +1,101 @@
+import atexit
+import asyncio
+import threading
+
+from nats.aio.client import Client as NATS
+
+from utils.common import get_env_int
+from utils.http import HTTP_REQUEST_TIMEOUT
+from utils.logger import log_msg
+from utils.nats import close_nats, declare_stream, get_creds_file_if_exists, get_nats_url
+
+_connect_timeout = get_env_int("NATS_CONNECT_TIMEOUT", 5)
+_connection = None
+_connection_lock = threading.Lock()
+
+class NatsConnection():
+    def __init__(self):
+        self.loop = None
+        self.nc = None
+        self.js = None
+        self.streams = set()
+        self.lock = threading.Lock()
+        self.connect_lock = None
+
+    def get_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target = self.loop.run_forever, name = "nats-connection", daemon = True).start()
+                atexit.register(self.close)
+        return self.loop
+
+    async def aconnect(self):
+        if self.connect_lock is None:
+            self.connect_lock = asyncio.Lock()
+
+        async with self.connect_lock:
+            if self.nc is None or self.nc.is_closed:
+                log_msg("DEBUG", "[NatsConnection][aconnect] opening the shared connection")
+                #? reconnects forever once connected but gives up the first connection after a timeout
+                nc = NATS()
+                try:
+                    await asyncio.wait_for(nc.connect(get_nats_url(), user_credentials = get_creds_file_if_exists(), max_reconnect_attempts = -1), _connect_timeout)
+                except asyncio.TimeoutError:
+                    await nc.close()
+                    raise
+                self.nc = nc
+                self.js = None
+        return self.nc
+
+    async def ajetstream(self, stream, subjects, max_age = None):
+        nc = await self.aconnect()
+        if self.js is None:
+            self.js = nc.jetstream()
+
+        if stream not in self.streams:
+            await declare_stream(self.js, stream, subjects, max_age)
+            self.streams.add(stream)
+        return self.js
+
+    async def do_publish(self, subject, data):
+        nc = await self.aconnect()
+        await nc.publish(subject, data)
+
+    async def do_jetstream_publish(self, stream, subjects, subject, data, max_age = None):
+        js = await self.ajetstream(stream, subjects, max_age)
+        await js.publish(subject, data)
+
+    def run(self, coro):
+        #? called from the API's worker threads: waits for the shared loop to hand over the message
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop()).result(HTTP_REQUEST_TIMEOUT)
+
+    async def arun(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.get_loop()))
+
+    def publish(self, subject, data):
+        self.run(self.do_publish(subject, data))
+
+    async def apublish(self, subject, data):
+        await self.arun(self.do_publish(subject, data))
+
+    def jetstream_publish(self, stream, subjects, subject, data, max_age = None):
+        self.run(self.do_jetstream_publish(stream, subjects, subject, data, max_age))
+
+    async def ajetstream_publish(self, stream, subjects, subject, data, max_age = None):
+        await self.arun(self.do_jetstream_publish(stream, subjects, subject, data, max_age))
+
+    def close(self):
+        #? flushes the pending messages on shutdown
+        if self.nc is not None and not self.nc.is_closed:
+            try:
+                self.run(close_nats(self.nc))
+            except Exception as e:
+                log_msg("WARN", "[NatsConnection][close] unable to drain the connection: e.type = {}, e.msg = {}".format(type(e), e))
+
+def get_nats_connection():
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            _connection = NatsConnection()
+    return _connection
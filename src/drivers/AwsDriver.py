@@ -107,6 +107,30 @@ class AwsDriver(ProviderDriver):
         else:
             return None
 
+    def list_virtual_machines(self, region, zones, instance_names):
+        my_config = Config(
+        region_name = region,
+        signature_version = 'v4',
+        retries = {
+            'max_attempts': 10,
+            'mode': 'standard'
+        })
+        client = boto3.client('ec2', config = my_config, aws_access_key_id = get_driver_access_key_id(), aws_secret_access_key = get_driver_secret_access_key())
+        names = set(instance_names)
+        servers = {}
+        for page in client.get_paginator('describe_instances').paginate(Filters = [ {'Name': 'tag-key', 'Values': ['Name']} ]):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    name = next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == "Name"), None)
+                    #? a terminated instance can keep the name of the one which replaced it
+                    if name not in names or (name in servers and instance['State']['Name'] == "terminated"):
+                        continue
+                    servers[name] = {
+                        "id": instance['InstanceId'],
+                        "state": instance['State']['Name']
+                    }
+        return servers
+
     def update_virtual_machine_status(self, region, zone, server_id, action):
         my_config = Config(
         region_name = region,
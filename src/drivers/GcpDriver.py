@@ -202,6 +202,24 @@ class GcpDriver(ProviderDriver):
         else:
             return None
 
+    def list_virtual_machines(self, region, zones, instance_names):
+        credentials = service_account.Credentials.from_service_account_info(
+            _google_app_credentials,
+            scopes = ['https://www.googleapis.com/auth/cloud-platform'])
+
+        client = compute_v1.InstancesClient(credentials = credentials)
+        servers = {}
+        for zone in zones:
+            #? the gcp names are suffixed, they're matched on the hashed names like in get_gcp_instance_name
+            for instance in client.list(project = _gcp_project_id, zone = f'{region}-{zone}'):
+                name = next((n for n in instance_names if instance.name.startswith(n)), None)
+                if name is not None:
+                    servers[name] = {
+                        "id": instance.id,
+                        "state": instance.status
+                    }
+        return servers
+
     def update_virtual_machine_status(self, region, zone, server_id, action):
         availibility_zone = f'{region}-{zone}'
 
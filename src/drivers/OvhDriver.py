@@ -117,11 +117,20 @@ class OvhDriver(ProviderDriver):
 
     def get_server_state(self, server):
         switcher = {
+            "BUILD": "starting",
+            "REBUILD": "starting",
             "SHUTOFF": "stopped",
+            "SUSPENDED": "stopped",
+            "PAUSED": "stopped",
+            "SHELVED": "stopped",
+            "SHELVED_OFFLOADED": "stopped",
+            "REBOOT": "rebooting",
             "HARD_REBOOT": "rebooting",
+            "DELETED": "deleted",
+            "SOFT_DELETED": "deleted",
             "ACTIVE": "running"
         }
-        return switcher.get(server['status'])
+        return switcher.get(server['status'], "starting")
 
     def get_virtual_machine(self, region, zone, instance_name):
         con = get_openstack_connection(region)
@@ -131,6 +140,11 @@ class OvhDriver(ProviderDriver):
         server_res = con.compute.get_server(server)
         return server_res
 
+    def list_virtual_machines(self, region, zones, instance_names):
+        names = set(instance_names)
+        con = get_openstack_connection(region)
+        return {server['name']: server for server in con.compute.servers() if server['name'] in names}
+
     def update_virtual_machine_status(self, region, zone, server_id, action):
         con = get_openstack_connection(region)
         if action == "poweroff":
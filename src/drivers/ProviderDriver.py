@@ -33,6 +33,10 @@ class ProviderDriver(ABC):
     def get_virtual_machine(self, region, zone, instance_name):
         pass
 
+    def list_virtual_machines(self, region, zones, instance_names):
+        #? bulk listing used by the inventory sync, None when the provider can only be queried vm by vm
+        return None
+
     @abstractmethod
     def update_virtual_machine_status(self, region, zone, server_id, action):
         pass
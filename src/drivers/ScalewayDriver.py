@@ -21,6 +21,7 @@ SCW_API_URL = "https://api.scaleway.com"
 SCW_ACCESS_KEY = os.getenv('SCW_ACCESS_KEY')
 SCW_SECRET_KEY = os.getenv('SCW_SECRET_KEY')
 SCW_PROJECT_ID = os.getenv('SCW_PROJECT_ID')
+SCW_SERVERS_PAGE_SIZE = 100
 
 class ScalewayDriver(ProviderDriver):
     def create_dns_records(self, record_name, environment, ip_address, root_dns_zone):
@@ -248,6 +249,22 @@ class ScalewayDriver(ProviderDriver):
             return servers[0]
         return None
 
+    def list_virtual_machines(self, region, zones, instance_names):
+        names = set(instance_names)
+        servers = {}
+        for zone in zones:
+            region_zone = "{}-{}".format(region, zone)
+            page = 1
+            while True:
+                res = requests.get(f'{SCW_API_URL}/instance/v1/zones/{region_zone}/servers?per_page={SCW_SERVERS_PAGE_SIZE}&page={page}', headers={"X-Auth-Token": SCW_SECRET_KEY}, timeout=HTTP_REQUEST_TIMEOUT)
+                res.raise_for_status()
+                page_servers = res.json()['servers']
+                servers.update({server['name']: server for server in page_servers if server['name'] in names})
+                if len(page_servers) < SCW_SERVERS_PAGE_SIZE:
+                    break
+                page += 1
+        return servers
+
     def update_virtual_machine_status(self, region, zone, server_id, action):
         regionZone = "{}-{}".format(region, zone)
         actionData = {'action':action}
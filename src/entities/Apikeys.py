@@ -2,6 +2,8 @@ from database.postgres_db import Base
 from sqlalchemy import Column, ForeignKey, String, Integer
 from datetime import datetime
 
+from utils.auth_cache import invalidate_principals
+
 class ApiKeys(Base):
     __tablename__ = "api_keys"
     id = Column(Integer, primary_key = True)
@@ -49,8 +51,10 @@ class ApiKeys(Base):
     def deleteUserAllApiKeys(user_id, db):
         db.query(ApiKeys).filter(ApiKeys.user_id == user_id).delete()
         db.commit()
+        invalidate_principals(user_id)
 
     @staticmethod
     def deleteUserApiKey(user_id, key_id, db):
         db.query(ApiKeys).filter(ApiKeys.user_id == user_id, ApiKeys.id == key_id).delete()
         db.commit()
+        invalidate_principals(user_id)
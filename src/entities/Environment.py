@@ -38,6 +38,14 @@ class Environment(Base):
         env = db.query(Environment).filter(Environment.id == envId).first()
         return env
 
+    @staticmethod
+    def getByIds(envIds, db):
+        if not envIds:
+            return []
+
+        envs = db.query(Environment).filter(Environment.id.in_(envIds)).all()
+        return envs
+
     @staticmethod
     def getAvailableEnvironmentById(envId, db):
         env = db.query(Environment).filter(Environment.id == envId, Environment.is_private == False).first() # noqa
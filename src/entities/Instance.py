@@ -1,5 +1,5 @@
 from sqlalchemy import Column, ForeignKey, String, Integer, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
 from datetime import datetime
 
 from database.postgres_db import Base
@@ -39,7 +39,7 @@ class Instance(Base):
 
     @staticmethod
     def findInstancesByRegion(instancesIds, provider, region, db):
-        instances = db.query(Instance).filter(Instance.id.in_(instancesIds), Instance.provider == provider, Instance.region == region, Instance.status != "deleted").all()
+        instances = db.query(Instance).options(selectinload(Instance.environment)).filter(Instance.id.in_(instancesIds), Instance.provider == provider, Instance.region == region, Instance.status != "deleted").all()
         return instances
 
     @staticmethod
@@ -99,7 +99,7 @@ class Instance(Base):
 
     @staticmethod
     def getActiveUserInstancesPerRegion(userId, provider, region, db):
-        instances = db.query(Instance).filter(Instance.user_id == userId, Instance.provider == provider, Instance.region == region, Instance.status  != "deleted").all()
+        instances = db.query(Instance).options(selectinload(Instance.environment)).filter(Instance.user_id == userId, Instance.provider == provider, Instance.region == region, Instance.status  != "deleted").all()
         return instances
 
     @staticmethod
@@ -107,6 +107,10 @@ class Instance(Base):
         instances = db.query(Instance).filter(Instance.status != "deleted").all()
         return instances
 
+    @staticmethod
+    def getAllActiveInstancesLocations(db):
+        return db.query(Instance.provider, Instance.region, Instance.zone, Instance.name, Instance.hash).filter(Instance.status != "deleted").all()
+
     @staticmethod
     def getAllActiveInstancesByProject(projectId, db):
         instances = db.query(Instance).filter(Instance.project_id == projectId, Instance.status != "deleted").all()
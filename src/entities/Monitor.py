@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, bindparam, update
 from sqlalchemy.dialects.postgresql import JSONB
 from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
 from database.postgres_db import Base
@@ -19,6 +19,7 @@ class Monitor(Base):
     expected_http_code = Column(String, default='20*')
     expected_contain = Column(String)
     timeout = Column(Integer, default=30)
+    interval = Column(Integer)
     username = Column(String)
     password = Column(String)
     headers = Column(JSONB, default=dict)
@@ -96,6 +97,7 @@ class Monitor(Base):
             'expected_http_code': payload.expected_http_code,
             'expected_contain': payload.expected_contain,
             'timeout': payload.timeout,
+            'interval': payload.interval,
             'username': payload.username,
             'password': payload.password,
             'headers': Monitor._serialize_headers(payload.headers),
@@ -134,7 +136,11 @@ class Monitor(Base):
         db.commit()
  
     @staticmethod
-    def updateMonitorStatus(monitor_id, status, response_time, db):
-        db.query(Monitor).filter(Monitor.id == monitor_id).update({'status': status, 'response_time': response_time})
+    def updateMonitorsStatus(statuses, db):
+        #? single executemany, the monitors deleted in the meantime are just ignored
+        db.execute(
+            update(Monitor).where(Monitor.id == bindparam('monitor_id')).values(status = bindparam('monitor_status'), response_time = bindparam('monitor_response_time')),
+            [{'monitor_id': s['id'], 'monitor_status': s['status'], 'monitor_response_time': s['response_time']} for s in statuses]
+        )
         db.commit()
 
@@ -0,0 +1,75 @@
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
+
+from database.postgres_db import Base
+from database.types import CachedGUID
+
+class ProvisioningJob(Base):
+    __tablename__ = 'provisioning_job'
+    id = Column(CachedGUID, primary_key=True, default=uuid4, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
+    kind = Column(String(50), nullable=False)
+    provider = Column(String(100), nullable=False)
+    resource_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("user.id"))
+    args = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    step = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def save(self, db):
+        db.add(self)
+        db.commit()
+
+    @staticmethod
+    def findById(id, db):
+        return db.query(ProvisioningJob).filter(ProvisioningJob.id == id).first()
+
+    @staticmethod
+    def findUserJob(id, user_id, db):
+        return db.query(ProvisioningJob).filter(ProvisioningJob.id == id, ProvisioningJob.user_id == user_id).first()
+
+    @staticmethod
+    def claimJob(id, now, db):
+        #? conditional update: only one worker gets the job even when its message is delivered twice
+        claimed = db.query(ProvisioningJob).filter(ProvisioningJob.id == id, ProvisioningJob.status == "pending", ProvisioningJob.next_attempt_at <= now).update({"status": "running", "attempts": ProvisioningJob.attempts + 1, "updated_at": now}, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    @staticmethod
+    def getDueJobs(now, limit, db):
+        return db.query(ProvisioningJob.id, ProvisioningJob.provider).filter(ProvisioningJob.status == "pending", ProvisioningJob.next_attempt_at <= now).order_by(ProvisioningJob.next_attempt_at).limit(limit).all()
+
+    @staticmethod
+    def heartbeat(id, attempts, now, db):
+        #? the attempt number is the worker's lease: a released and claimed again job isn't kept alive by its former worker
+        alive = db.query(ProvisioningJob).filter(ProvisioningJob.id == id, ProvisioningJob.status == "running", ProvisioningJob.attempts == attempts).update({"updated_at": now}, synchronize_session=False)
+        db.commit()
+        return alive == 1
+
+    @staticmethod
+    def releaseStaleJobs(before, max_attempts, now, db):
+        #? the jobs of a crashed worker would be running forever otherwise
+        released = db.query(ProvisioningJob).filter(ProvisioningJob.status == "running", ProvisioningJob.updated_at < before, ProvisioningJob.attempts < max_attempts).update({"status": "pending", "next_attempt_at": now, "updated_at": now}, synchronize_session=False)
+        db.commit()
+        return released
+
+    @staticmethod
+    def expireStaleJobs(before, max_attempts, now, db):
+        expired = db.query(ProvisioningJob).filter(ProvisioningJob.status == "running", ProvisioningJob.updated_at < before, ProvisioningJob.attempts >= max_attempts).all()
+        if len(expired) > 0:
+            db.query(ProvisioningJob).filter(ProvisioningJob.id.in_([job.id for job in expired])).update({"status": "failed", "error": "timeout", "updated_at": now}, synchronize_session=False)
+            db.commit()
+        return expired
+
+    @staticmethod
+    def updateJob(id, values, db):
+        db.query(ProvisioningJob).filter(ProvisioningJob.id == id).update({**values, "updated_at": datetime.now()}, synchronize_session=False)
+        db.commit()
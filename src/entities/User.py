@@ -12,7 +12,8 @@ from entities.Apikeys import ApiKeys
 from entities.SupportTicketLog import SupportTicketLog
 from entities.SupportTicket import SupportTicket
 
-from utils.common import generate_hash_password
+from utils.auth_cache import invalidate_principals
+from utils.password import hash_password
 
 class User(Base):
     __tablename__ = "user"
@@ -64,25 +65,37 @@ class User(Base):
         user = db.query(User).filter(User.id == userId).first()
         return user
 
+    @staticmethod
+    def getEmailsByIds(userIds, db):
+        if not userIds:
+            return {}
+
+        emails = db.query(User.id, User.email).filter(User.id.in_(userIds)).all()
+        return {userId: email for userId, email in emails}
+
     @staticmethod
     def deleteUserById(userId, db):
         db.query(User).filter(User.id == userId).delete()
         db.commit()
+        invalidate_principals(userId)
 
     @staticmethod
     def updateConfirmation(userId, confirmedStatus, db):
         db.query(User).filter(User.id == userId).update({"confirmed": confirmedStatus})
         db.commit()
+        invalidate_principals(userId)
 
     @staticmethod
     def updateUserRole(userId, RoleStatus, db):
         db.query(User).filter(User.id == userId).update({"is_admin": RoleStatus})
         db.commit()
+        invalidate_principals(userId)
 
     @staticmethod
     def updateUser(id, payload, db):
         db.query(User).filter(User.id == id).update({"email": payload.email, "company_name": payload.company_name, "registration_number": payload.registration_number, "address": payload.address, "contact_info": payload.contact_info})
         db.commit()
+        invalidate_principals(id)
 
     @staticmethod
     def adminUpdateUser(id, payload, db):
@@ -108,21 +121,30 @@ class User(Base):
             }
         })
         db.commit()
+        invalidate_principals(id)
 
     @staticmethod
     def updateUserEmail(id, email, db):
         db.query(User).filter(User.id == id).update({"email": email})
         db.commit()
+        invalidate_principals(id)
 
     @staticmethod
     def updateUserPassword(id, password, db):
-        db.query(User).filter(User.id == id).update({"password": generate_hash_password(password)})
+        db.query(User).filter(User.id == id).update({"password": hash_password(password)})
+        db.commit()
+        invalidate_principals(id)
+
+    @staticmethod
+    def updateUserPasswordHash(id, password_hash, db):
+        db.query(User).filter(User.id == id).update({"password": password_hash})
         db.commit()
 
     @staticmethod
     def updateUserPasswordAndConfirm(id, password, db):
-        db.query(User).filter(User.id == id).update({"password": generate_hash_password(password), "confirmed": True})
+        db.query(User).filter(User.id == id).update({"password": hash_password(password), "confirmed": True})
         db.commit()
+        invalidate_principals(id)
 
     @staticmethod
     def getAllUsers(db):
@@ -133,6 +155,19 @@ class User(Base):
             users.append(user.__dict__)
         return users
 
+    @staticmethod
+    def countUsers(db):
+        return db.query(User).count()
+
+    @staticmethod
+    def getUsersPage(offset, limit, db):
+        users = []
+        for user in db.query(User).order_by(User.id).offset(offset).limit(limit).all():
+            del user.__dict__["_sa_instance_state"]
+            del user.__dict__["password"]
+            users.append(user.__dict__)
+        return users
+
     @staticmethod
     def getFirstAdminUser(db):
         user = db.query(User).filter(User.is_admin).first()
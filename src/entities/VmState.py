@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from database.postgres_db import Base
+
+class VmState(Base):
+    __tablename__ = 'vm_state'
+    provider = Column(String(100), primary_key=True)
+    hashed_name = Column(String(254), primary_key=True)
+    region = Column(String(100))
+    zone = Column(String(100))
+    server_id = Column(String(254), nullable=False)
+    raw_state = Column(String(50))
+    state = Column(String(50), nullable=False)
+    synced_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    @staticmethod
+    def findState(provider, hashed_name, db):
+        return db.query(VmState).filter(VmState.provider == provider, VmState.hashed_name == hashed_name).first()
+
+    @staticmethod
+    def findStates(provider, hashed_names, db):
+        if len(hashed_names) == 0:
+            return []
+        return db.query(VmState).filter(VmState.provider == provider, VmState.hashed_name.in_(hashed_names)).all()
+
+    @staticmethod
+    def saveStates(provider, region, states, synced_at, db):
+        #? states: {hashed_name: (zone, server_id, raw_state, state)}, the existing rows are loaded in one query
+        existing = {vm_state.hashed_name: vm_state for vm_state in VmState.findStates(provider, list(states), db)}
+        for hashed_name, (zone, server_id, raw_state, state) in states.items():
+            vm_state = existing.get(hashed_name)
+            if vm_state is None:
+                vm_state = VmState(provider = provider, hashed_name = hashed_name)
+                db.add(vm_state)
+            vm_state.region = region
+            vm_state.zone = zone
+            vm_state.server_id = server_id
+            vm_state.raw_state = raw_state
+            vm_state.state = state
+            vm_state.synced_at = synced_at
+        db.commit()
+
+    @staticmethod
+    def deleteStates(provider, hashed_names, db):
+        if len(hashed_names) == 0:
+            return
+        db.query(VmState).filter(VmState.provider == provider, VmState.hashed_name.in_(hashed_names)).delete(synchronize_session=False)
+        db.commit()
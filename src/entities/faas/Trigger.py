@@ -26,6 +26,12 @@ class TriggerEntity(Base):
     @staticmethod
     def findById(trigger_id, db):
         return db.query(TriggerEntity).filter(TriggerEntity.id == trigger_id).first()
+
+    @staticmethod
+    def findByIds(trigger_ids, db):
+        if not trigger_ids:
+            return []
+        return db.query(TriggerEntity).filter(TriggerEntity.id.in_(trigger_ids)).all()
     
     @staticmethod
     def findUserTriggerById(user_id, trigger_id, db):
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, ForeignKey, String, Float
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Float, case, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.dialects.postgresql import JSONB
 from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
 from database.postgres_db import Base
@@ -15,6 +16,18 @@ class Data(Base):
     def getAllData(db):
         return db.query(Data).all()
 
+    @staticmethod
+    def insertBatch(data_rows, numeric_rows, string_rows, rollup_rows, db):
+        #? multi-rows inserts in a single transaction, the ids are generated by the caller to link the rows
+        if data_rows:
+            db.execute(insert(Data.__table__), data_rows)
+        if numeric_rows:
+            db.execute(insert(NumericData.__table__), numeric_rows)
+            NumericDataRollup.upsertRollups(rollup_rows, db)
+        if string_rows:
+            db.execute(insert(StringData.__table__), string_rows)
+        db.commit()
+
 class NumericData(Base):
     __tablename__ = 'numeric_data'
     id = Column(CachedGUID, primary_key=True, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
@@ -22,12 +35,56 @@ class NumericData(Base):
     device_id = Column(String, ForeignKey("device.id"))
     key = Column(String, nullable=False)
     value = Column(Float, nullable=False)
-    created_at = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
 
     @staticmethod
     def getAllNumericData(db):
         return db.query(NumericData).all()
 
+    @staticmethod
+    def getSeries(device_id, key, start, end, limit, db):
+        return db.query(NumericData.created_at, NumericData.value).filter(NumericData.device_id == device_id, NumericData.key == key, NumericData.created_at >= start, NumericData.created_at < end).order_by(NumericData.created_at).limit(limit).all()
+
+class NumericDataRollup(Base):
+    __tablename__ = 'numeric_data_rollup'
+    device_id = Column(String, ForeignKey("device.id"), primary_key=True)
+    key = Column(String, primary_key=True)
+    resolution = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_value = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+
+    @staticmethod
+    def upsertRollups(rollup_rows, db):
+        #? the rows are merged with the existing buckets, they're sorted to always lock the buckets in the same order
+        if not rollup_rows:
+            return
+
+        dialect = postgresql if db.get_bind().dialect.name == 'postgresql' else sqlite
+        table = NumericDataRollup.__table__
+        statement = dialect.insert(table)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements = [table.c.device_id, table.c.key, table.c.resolution, table.c.bucket],
+            set_ = {
+                'min_value': case((excluded.min_value < table.c.min_value, excluded.min_value), else_ = table.c.min_value),
+                'max_value': case((excluded.max_value > table.c.max_value, excluded.max_value), else_ = table.c.max_value),
+                'sum_value': table.c.sum_value + excluded.sum_value,
+                'count': table.c.count + excluded.count
+            }
+        )
+        db.execute(statement, sorted(rollup_rows, key = lambda row: (row['device_id'], row['key'], row['resolution'], row['bucket'])))
+
+    @staticmethod
+    def countPoints(device_id, key, resolution, start, end, db):
+        return db.query(func.coalesce(func.sum(NumericDataRollup.count), 0)).filter(NumericDataRollup.device_id == device_id, NumericDataRollup.key == key, NumericDataRollup.resolution == resolution, NumericDataRollup.bucket >= start, NumericDataRollup.bucket < end).scalar()
+
+    @staticmethod
+    def getSeries(device_id, key, resolution, start, end, limit, db):
+        return db.query(NumericDataRollup).filter(NumericDataRollup.device_id == device_id, NumericDataRollup.key == key, NumericDataRollup.resolution == resolution, NumericDataRollup.bucket >= start, NumericDataRollup.bucket < end).order_by(NumericDataRollup.bucket).limit(limit).all()
+
 class StringData(Base):
     __tablename__ = 'string_data'
     id = Column(CachedGUID, primary_key=True, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
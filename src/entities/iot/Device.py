@@ -25,6 +25,18 @@ class Device(Base):
     @staticmethod
     def getUserDeviceById(username, device_id, db):
         return db.query(Device).filter(Device.username == username, Device.id == device_id).first()
+
+    @staticmethod
+    def getDevicesByIds(device_ids, db):
+        if not device_ids:
+            return []
+        return db.query(Device).filter(Device.id.in_(device_ids)).all()
+
+    @staticmethod
+    def getUserDevicesByIds(username, device_ids, db):
+        if not device_ids:
+            return []
+        return db.query(Device).filter(Device.username == username, Device.id.in_(device_ids)).all()
     
     @staticmethod
     def getUserLatestInactiveDevice(username, db):
@@ -26,6 +26,12 @@ class ObjectType(Base):
     def findById(object_type_id, db):
         object_type = db.query(ObjectType).filter(ObjectType.id == object_type_id).first()
         return object_type
+
+    @staticmethod
+    def findByIds(object_type_ids, db):
+        if not object_type_ids:
+            return []
+        return db.query(ObjectType).filter(ObjectType.id.in_(object_type_ids)).all()
     
     @staticmethod
     def findUserObjectTypeById(user_id, object_type_id, db):
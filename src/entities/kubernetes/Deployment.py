@@ -52,6 +52,17 @@ class Deployment(Base):
         app = db.query(Deployment).filter(Deployment.project_id == project_id).first()
         return app
 
+    @staticmethod
+    def getFirstByProjects(project_ids, db) -> dict[int, "Deployment"]:
+        firsts = {}
+        if not project_ids:
+            return firsts
+
+        apps = db.query(Deployment).filter(Deployment.project_id.in_(project_ids)).order_by(Deployment.id).all()
+        for app in apps:
+            firsts.setdefault(app.project_id, app)
+        return firsts
+
     @staticmethod
     def deleteOne(id, db):
         db.query(Deployment).filter(Deployment.id == id).delete()
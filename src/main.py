@@ -11,9 +11,12 @@ from exceptions.CwHTTPException import CwHTTPException
 from database.postgres_db import dbEngine
 from database.postgres_db import Base
 
+from utils.bucket import buckets
 from utils.common import get_env_bool
 from utils.logger import log_msg
+from utils.iot.timeseries import timeseries
 from utils.observability.monitor import monitors
+from utils.observability.tracker import tracker
 from utils.observability.cid import get_current_cid
 from utils.observability.metrics import metrics
 from utils.observability.otel import init_otel_metrics, init_otel_tracer, init_otel_logger
@@ -51,6 +54,9 @@ init_otel_metrics()
 init_otel_logger()
 metrics()
 monitors()
+tracker()
+timeseries()
+buckets()
 
 instrumentator.instrument(app, metric_namespace='cwcloudapi', metric_subsystem='cwcloudapi')
 instrumentator.expose(app, endpoint='/v1/metrics')
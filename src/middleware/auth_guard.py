@@ -1,6 +1,9 @@
+import copy
+
 from jose import JWTError
 
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from fastapi import Depends, status, APIRouter
 
 from middleware.auth_headers import user_token_header, auth_token_header
@@ -13,6 +16,7 @@ from exceptions.CwHTTPException import CwHTTPException
 from database.postgres_db import get_db
 from adapters.AdapterConfig import get_adapter
 
+from utils.auth_cache import cache_principal, get_cached_principal, get_principal_key
 from utils.common import is_empty, is_not_empty, is_false
 from utils.jwt import jwt_decode
 from utils.logger import log_msg
@@ -32,6 +36,26 @@ async def get_mem_user_token(user_token):
     log_msg("DEBUG", "[auth_guard][get_mem_user_token] decoded_user = {}".format(decoded_user))
     return CACHE_ADAPTER().get(email), TokenData(email = email)
 
+def get_cached_user(principal_key, db):
+    principal = get_cached_principal(principal_key)
+    if principal is None:
+        return None
+
+    #? attaches a copy of the cached user to the request's session without querying the database
+    user = User(**copy.deepcopy(principal['attributes']))
+    make_transient_to_detached(user)
+    return db.merge(user, load = False)
+
+def get_cached_token_user(user_token, db):
+    #? the JWT is still decoded in order to check its expiration
+    jwt_decode(user_token)
+    return get_cached_user(get_principal_key("token", user_token), db)
+
+def cache_user(principal_key, user):
+    if is_not_empty(user):
+        cache_principal(principal_key, user.id, { c.key: copy.deepcopy(getattr(user, c.key)) for c in inspect(User).column_attrs })
+    return user
+
 async def get_user_authentication(user_token: str = Depends(user_token_header), auth_token: str = Depends(auth_token_header)):
     if is_not_empty(user_token):
         user_auth = UserAuthentication(is_authenticated = True, header_key = "X-User-Token", header_value = user_token)
@@ -49,25 +73,30 @@ async def get_current_not_mandatory_user(user_token: str = Depends(user_token_he
             return current_user
         if is_not_empty(user_token):
             try:
-                decoded_mem_token, token_data = await get_mem_user_token(user_token)
-                if not decoded_mem_token:
-                    log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] mem_user_token is not defined")
-                    return None
-                if decoded_mem_token != user_token:
-                    log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] decoded_mem_token != user_token")
-                    return None
-                user = User.getUserByEmail(token_data.email, db)
+                user = get_cached_token_user(user_token, db)
+                if is_empty(user):
+                    decoded_mem_token, token_data = await get_mem_user_token(user_token)
+                    if not decoded_mem_token:
+                        log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] mem_user_token is not defined")
+                        return None
+                    if decoded_mem_token != user_token:
+                        log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] decoded_mem_token != user_token")
+                        return None
+                    user = cache_user(get_principal_key("token", user_token), User.getUserByEmail(token_data.email, db))
             except JWTError as e:
                 log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] e.type = {}, e.msg = {}".format(type(e), e))
                 return None
         elif is_not_empty(auth_token):
             secret_key = auth_token
-            user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
-            if is_empty(user_api_key):
-                log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] user_api_key is not set")
-                return None
+            principal_key = get_principal_key("apikey", secret_key)
+            user = get_cached_user(principal_key, db)
+            if is_empty(user):
+                user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
+                if is_empty(user_api_key):
+                    log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] user_api_key is not set")
+                    return None
 
-            user = User.getUserById(user_api_key.user_id, db)
+                user = cache_user(principal_key, User.getUserById(user_api_key.user_id, db))
         else:
             log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] auth_token is not set")
             return None
@@ -86,21 +115,26 @@ async def get_current_user(user_token: str = Depends(user_token_header), auth_to
 
         if is_not_empty(user_token):
             try:
-                decoded_mem_token, token_data = await get_mem_user_token(user_token)
-                if not decoded_mem_token:
-                    raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
-                if decoded_mem_token != user_token:
-                    raise CwHTTPException(message = {"error": "authentification failed 2", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
-
-                user = User.getUserByEmail(token_data.email, db)
+                user = get_cached_token_user(user_token, db)
+                if is_empty(user):
+                    decoded_mem_token, token_data = await get_mem_user_token(user_token)
+                    if not decoded_mem_token:
+                        raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
+                    if decoded_mem_token != user_token:
+                        raise CwHTTPException(message = {"error": "authentification failed 2", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
+
+                    user = cache_user(get_principal_key("token", user_token), User.getUserByEmail(token_data.email, db))
             except JWTError:
                 raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
         elif is_not_empty(auth_token):
             secret_key = auth_token
-            user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
-            if is_empty(user_api_key):
-                raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
-            user = User.getUserById(user_api_key.user_id, db)
+            principal_key = get_principal_key("apikey", secret_key)
+            user = get_cached_user(principal_key, db)
+            if is_empty(user):
+                user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
+                if is_empty(user_api_key):
+                    raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
+                user = cache_user(principal_key, User.getUserById(user_api_key.user_id, db))
         else:
             raise CwHTTPException(message = {"error": "authentification failed", "i18n_code": "auth_failed"}, status_code = status.HTTP_401_UNAUTHORIZED)
 
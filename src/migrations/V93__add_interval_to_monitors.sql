@@ -0,0 +1,2 @@
+ALTER TABLE monitor
+ADD COLUMN interval INTEGER;
@@ -0,0 +1,8 @@
+CREATE INDEX faas_invocations_by_updated_at ON faas_invocation (updated_at DESC, id DESC);
+CREATE INDEX faas_invocations_by_invoker_updated_at ON faas_invocation (invoker_id, updated_at DESC, id DESC);
+
+CREATE INDEX faas_functions_by_updated_at ON faas_function (updated_at DESC, id DESC);
+CREATE INDEX faas_functions_by_owner_updated_at ON faas_function (owner_id, updated_at DESC, id DESC);
+
+CREATE INDEX faas_triggers_by_updated_at ON faas_trigger (updated_at DESC, id DESC);
+CREATE INDEX faas_triggers_by_owner_updated_at ON faas_trigger (owner_id, updated_at DESC, id DESC);
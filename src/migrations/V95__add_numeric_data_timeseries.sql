@@ -0,0 +1,62 @@
+CREATE OR REPLACE FUNCTION create_numeric_data_partitions(from_date date, months_ahead integer) RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', from_date)::date;
+    last_month date := (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+    partition_name text;
+BEGIN
+    WHILE month_start <= last_month LOOP
+        partition_name := 'numeric_data_' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            BEGIN
+                EXECUTE format('CREATE TABLE %I PARTITION OF numeric_data FOR VALUES FROM (%L) TO (%L)', partition_name, month_start, (month_start + interval '1 month')::date);
+            EXCEPTION WHEN others THEN
+                RAISE WARNING 'cannot create the partition %: %', partition_name, SQLERRM;
+            END;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE numeric_data RENAME TO numeric_data_unpartitioned;
+ALTER TABLE numeric_data_unpartitioned RENAME CONSTRAINT numeric_data_pkey TO numeric_data_unpartitioned_pkey;
+
+CREATE TABLE numeric_data (
+    id uuid NOT NULL DEFAULT uuid_generate_v4(),
+    data_id uuid NOT NULL,
+    device_id uuid NOT NULL,
+    created_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    key varchar(254) NOT NULL,
+    value float NOT NULL,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (data_id) REFERENCES public.data(id) ON DELETE CASCADE,
+    FOREIGN KEY (device_id) REFERENCES public.device(id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX numeric_data_by_device_key_created_at ON numeric_data (device_id, key, created_at);
+
+SELECT create_numeric_data_partitions(COALESCE((SELECT min(created_at)::date FROM numeric_data_unpartitioned), CURRENT_DATE), 2);
+CREATE TABLE numeric_data_default PARTITION OF numeric_data DEFAULT;
+
+INSERT INTO numeric_data (id, data_id, device_id, created_at, key, value)
+SELECT id, data_id, device_id, created_at, key, value FROM numeric_data_unpartitioned;
+
+DROP TABLE numeric_data_unpartitioned;
+
+CREATE TABLE IF NOT EXISTS numeric_data_rollup (
+    device_id uuid NOT NULL,
+    key varchar(254) NOT NULL,
+    resolution varchar(10) NOT NULL,
+    bucket timestamp NOT NULL,
+    min_value float NOT NULL,
+    max_value float NOT NULL,
+    sum_value float NOT NULL,
+    count integer NOT NULL,
+    PRIMARY KEY (device_id, key, resolution, bucket),
+    FOREIGN KEY (device_id) REFERENCES public.device(id) ON DELETE CASCADE
+);
+
+INSERT INTO numeric_data_rollup (device_id, key, resolution, bucket, min_value, max_value, sum_value, count)
+SELECT device_id, key, resolution, date_trunc(resolution, created_at), min(value), max(value), sum(value), count(*)
+FROM numeric_data, (VALUES ('minute'), ('hour'), ('day')) AS resolutions(resolution)
+GROUP BY device_id, key, resolution, date_trunc(resolution, created_at);
@@ -0,0 +1,19 @@
+CREATE TABLE IF NOT EXISTS public.provisioning_job (
+    id uuid NOT NULL DEFAULT uuid_generate_v4(),
+    kind varchar(50) NOT NULL,
+    provider varchar(100) NOT NULL,
+    resource_id integer NOT NULL,
+    user_id integer,
+    args jsonb NOT NULL,
+    status varchar(20) NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    error text,
+    next_attempt_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id),
+    FOREIGN KEY (user_id) REFERENCES public.user(id) ON DELETE SET NULL
+);
+
+CREATE INDEX provisioning_jobs_by_status_next_attempt_at ON provisioning_job (status, next_attempt_at);
+CREATE INDEX provisioning_jobs_by_kind_resource ON provisioning_job (kind, resource_id);
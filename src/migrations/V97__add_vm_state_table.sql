@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS public.vm_state (
+    provider varchar(100) NOT NULL,
+    hashed_name varchar(254) NOT NULL,
+    region varchar(100),
+    zone varchar(100),
+    server_id varchar(254) NOT NULL,
+    raw_state varchar(50),
+    state varchar(50) NOT NULL,
+    synced_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (provider, hashed_name)
+);
+
+CREATE INDEX vm_states_by_synced_at ON vm_state (synced_at);
@@ -0,0 +1,2 @@
+ALTER TABLE provisioning_job
+ADD COLUMN step integer NOT NULL DEFAULT 0;
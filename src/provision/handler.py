@@ -0,0 +1,26 @@
+from adapters.AdapterConfig import get_adapter
+from provision.jobs import submit_job
+
+from utils.common import is_empty_key
+from utils.logger import log_msg
+from utils.observability.otel import get_otel_tracer
+from utils.observability.traces import span_format
+from utils.observability.counter import create_counter, increment_counter
+from utils.observability.enums import Method
+
+pubsub_adapter = get_adapter("pubsub")
+
+_span_prefix = "provisioner"
+_counter = create_counter("provisioner", "provisioner counter")
+
+async def handle(msg):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.ASYNCWORKER)):
+        increment_counter(_counter, Method.ASYNCWORKER)
+        payload = pubsub_adapter().decode(msg)
+        if payload is None or is_empty_key(payload, 'job_id'):
+            log_msg("DEBUG", "[provisioner][handle] payload is none or without job_id: {}".format(payload))
+            return
+
+        #? the message is acknowledged right away: the job's state is kept in the database, not in the stream
+        log_msg("INFO", "[provisioner][handle] new provisioning job: {}".format(payload))
+        submit_job(payload['job_id'], payload.get('provider', "default"))
@@ -0,0 +1,30 @@
+import threading
+import time
+
+from database.advisory_lock import AdvisoryLock
+from database.postgres_db import SessionLocal
+from utils.inventory import INVENTORY_SYNC_INTERVAL, sync_inventory
+from utils.logger import log_msg
+
+def run_inventory_sync():
+    db = SessionLocal()
+    try:
+        return sync_inventory(db)
+    finally:
+        db.close()
+
+def start_inventory_sync():
+    #? a single provisioner among the replicas pages through the providers
+    lock = AdvisoryLock("inventory-sync")
+
+    def sync():
+        while True:
+            try:
+                if lock.try_acquire():
+                    run_inventory_sync()
+            except Exception as e:
+                log_msg("ERROR", "[provision][start_inventory_sync] unexpected error: e.type = {}, e.msg = {}".format(type(e), e))
+                lock.release()
+            time.sleep(INVENTORY_SYNC_INTERVAL)
+
+    threading.Thread(target = sync, name = "inventory-sync", daemon = True).start()
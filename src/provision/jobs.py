@@ -0,0 +1,150 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from database.postgres_db import SessionLocal
+from entities.Bucket import Bucket
+from entities.Instance import Instance
+from entities.ProvisioningJob import ProvisioningJob
+from entities.Registry import Registry
+from utils.bucket import create_bucket
+from utils.instance import prepare_instance, provision_instance
+from utils.logger import log_msg
+from utils.registry import create_registry
+from utils.provisioning import PROVISIONING_HEARTBEAT_INTERVAL, PROVISIONING_JOB_TIMEOUT, PROVISIONING_MAX_ATTEMPTS, PROVISIONING_POLL_INTERVAL, PROVISIONING_PROVIDER_CONCURRENCY, get_retry_delay
+from utils.statistics import invalidate_user_statistics
+
+#? the completed steps are persisted: a retry resumes from the failed step instead of replaying the side effects
+_job_steps = {
+    'instance': [prepare_instance, provision_instance],
+    'bucket': [create_bucket],
+    'registry': [create_registry]
+}
+
+_job_resources = {
+    'instance': Instance,
+    'bucket': Bucket,
+    'registry': Registry
+}
+
+#? one pool per provider: a slow or failing provider doesn't hold the slots of the others
+_executors = {}
+_queued = set()
+_lock = threading.Lock()
+
+def get_provider_executor(provider):
+    with _lock:
+        if provider not in _executors:
+            _executors[provider] = ThreadPoolExecutor(max_workers = PROVISIONING_PROVIDER_CONCURRENCY, thread_name_prefix = "provision-{}".format(provider))
+        return _executors[provider]
+
+def submit_job(job_id, provider):
+    job_id = "{}".format(job_id)
+    with _lock:
+        #? the same job can be notified and polled, it's only queued once by worker
+        if job_id in _queued:
+            return False
+        _queued.add(job_id)
+
+    get_provider_executor(provider).submit(run_job, job_id)
+    return True
+
+def fail_resource(job, db):
+    try:
+        _job_resources[job.kind].updateStatus(job.resource_id, "failed", db)
+        invalidate_user_statistics(job.user_id)
+    except Exception as e:
+        log_msg("ERROR", "[provision][fail_resource] unable to mark the {} {} as failed: e.type = {}, e.msg = {}".format(job.kind, job.resource_id, type(e), e))
+
+def fail_job(job, e, db):
+    if job.attempts < PROVISIONING_MAX_ATTEMPTS:
+        delay = get_retry_delay(job.attempts)
+        log_msg("WARN", "[provision][fail_job] job {} failed, retrying in {}s: attempts = {}, e.type = {}, e.msg = {}".format(job.id, delay, job.attempts, type(e), e))
+        ProvisioningJob.updateJob(job.id, {'status': "pending", 'error': "{}".format(e), 'next_attempt_at': datetime.now() + timedelta(seconds = delay)}, db)
+        return
+
+    log_msg("ERROR", "[provision][fail_job] job {} failed after {} attempts: e.type = {}, e.msg = {}".format(job.id, job.attempts, type(e), e))
+    ProvisioningJob.updateJob(job.id, {'status': "failed", 'error': "{}".format(e)}, db)
+    fail_resource(job, db)
+
+def start_heartbeat(job_id, attempts):
+    stopped = threading.Event()
+
+    def beat():
+        #? the heartbeat keeps the running job from being released by poll_jobs, on its own session
+        while not stopped.wait(PROVISIONING_HEARTBEAT_INTERVAL):
+            db = SessionLocal()
+            try:
+                if not ProvisioningJob.heartbeat(job_id, attempts, datetime.now(), db):
+                    return
+            except Exception as e:
+                log_msg("WARN", "[provision][start_heartbeat] unexpected error: job_id = {}, e.type = {}, e.msg = {}".format(job_id, type(e), e))
+            finally:
+                db.close()
+
+    threading.Thread(target = beat, name = "provisioning-heartbeat-{}".format(job_id), daemon = True).start()
+    return stopped
+
+def run_job(job_id):
+    #? the workers open their own sessions: nothing is shared with the request which created the job
+    db = SessionLocal()
+    try:
+        with _lock:
+            _queued.discard(job_id)
+
+        if not ProvisioningJob.claimJob(job_id, datetime.now(), db):
+            log_msg("DEBUG", "[provision][run_job] job {} already taken or not due".format(job_id))
+            return
+
+        job = ProvisioningJob.findById(job_id, db)
+        log_msg("INFO", "[provision][run_job] running job {}: kind = {}, provider = {}, resource_id = {}, attempt = {}".format(job.id, job.kind, job.provider, job.resource_id, job.attempts))
+        heartbeat = start_heartbeat(job.id, job.attempts)
+        try:
+            steps = _job_steps[job.kind]
+            for step in range(job.step, len(steps)):
+                steps[step](**job.args, db = db)
+                ProvisioningJob.updateJob(job.id, {'step': step + 1}, db)
+        except Exception as e:
+            db.rollback()
+            fail_job(job, e, db)
+            return
+        finally:
+            heartbeat.set()
+
+        ProvisioningJob.updateJob(job.id, {'status': "succeeded", 'error': None}, db)
+        invalidate_user_statistics(job.user_id)
+    except Exception as e:
+        log_msg("ERROR", "[provision][run_job] unexpected error: job_id = {}, e.type = {}, e.msg = {}".format(job_id, type(e), e))
+    finally:
+        db.close()
+
+def poll_jobs():
+    #? safety net for the lost notifications, the retries and the jobs of the crashed workers
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        released = ProvisioningJob.releaseStaleJobs(now - timedelta(seconds = PROVISIONING_JOB_TIMEOUT), PROVISIONING_MAX_ATTEMPTS, now, db)
+        if released > 0:
+            log_msg("WARN", "[provision][poll_jobs] {} stale jobs released".format(released))
+
+        for job in ProvisioningJob.expireStaleJobs(now - timedelta(seconds = PROVISIONING_JOB_TIMEOUT), PROVISIONING_MAX_ATTEMPTS, now, db):
+            log_msg("ERROR", "[provision][poll_jobs] job {} timed out after {} attempts".format(job.id, job.attempts))
+            fail_resource(job, db)
+
+        for job_id, provider in ProvisioningJob.getDueJobs(now, PROVISIONING_PROVIDER_CONCURRENCY * 10, db):
+            submit_job(job_id, provider)
+    finally:
+        db.close()
+
+def start_polling():
+    def poll():
+        while True:
+            try:
+                poll_jobs()
+            except Exception as e:
+                log_msg("ERROR", "[provision][start_polling] unexpected error: e.type = {}, e.msg = {}".format(type(e), e))
+            time.sleep(PROVISIONING_POLL_INTERVAL)
+
+    threading.Thread(target = poll, name = "provisioning-poller", daemon = True).start()
@@ -0,0 +1,16 @@
+from provision.handler import handle, pubsub_adapter
+from provision.inventory import start_inventory_sync
+from provision.jobs import start_polling
+from utils.consumer import PROVISIONING_CHANNEL, PROVISIONING_GROUP
+from utils.observability.otel import init_otel_metrics, init_otel_tracer, init_otel_logger
+from utils.workers import wait_startup_time
+
+wait_startup_time()
+init_otel_tracer()
+init_otel_metrics()
+init_otel_logger()
+start_polling()
+start_inventory_sync()
+
+while True:
+  pubsub_adapter().consume(PROVISIONING_GROUP, PROVISIONING_CHANNEL, handle)
@@ -23,6 +23,7 @@ def import_resources(app):
     from routes.pricing import api_pricing
     from routes.project import api_project
     from routes.provider import api_provider
+    from routes.provisioning import api_provisioning
     from routes.registry import api_registry
     from routes.support import api_support
     from routes.faas import api_invocation, api_functions, api_languages, api_templates, api_trigger_kinds, api_trigger
@@ -35,6 +36,7 @@ def import_resources(app):
     from routes.admin.instance import api_admin_instance
     from routes.admin.mfa import api_admin_mfa
     from routes.admin.project import api_admin_project
+    from routes.admin.provisioning import api_admin_provisioning
     from routes.admin.registry import api_admin_registry
     from routes.admin.support import api_admin_support
     from routes.admin.kubernetes import api_admin_object, api_admin_cluster
@@ -73,6 +75,7 @@ def import_resources(app):
     app.include_router(api_control.router, tags = ['Instance'], prefix = f'/{version}/control')
     app.include_router(api_bucket.router, tags = ['Bucket'], prefix = f'/{version}/bucket')
     app.include_router(api_registry.router, tags = ['Registry'], prefix = f'/{version}/registry')
+    app.include_router(api_provisioning.router, tags = ['Provisioning'], prefix = f'/{version}/provisioning')
     app.include_router(api_email.router, tags = ['Email'], prefix = f'/{version}/email')
     app.include_router(api_languages.router, tags = ['FaaS'], prefix = f'/{version}/faas')
     app.include_router(api_functions.router, tags = ['FaaS'], prefix = f'/{version}/faas')
@@ -98,6 +101,7 @@ def import_resources(app):
     app.include_router(api_admin_instance.router, tags = ['Admin Instance'], prefix = f'/{version}/admin/instance')
     app.include_router(api_admin_bucket.router, tags = ['Admin Bucket'], prefix = f'/{version}/admin/bucket')
     app.include_router(api_admin_registry.router, tags = ['Admin Registry'], prefix = f'/{version}/admin/registry')
+    app.include_router(api_admin_provisioning.router, tags = ['Admin Provisioning'], prefix = f'/{version}/admin/provisioning')
     app.include_router(api_admin_functions.router, tags = ['Admin FaaS'], prefix = f'/{version}/admin/faas')
     app.include_router(api_admin_invocation.router, tags = ['Admin FaaS'], prefix = f'/{version}/admin/faas')
     app.include_router(api_admin_trigger.router, tags = ['Admin FaaS'], prefix = f'/{version}/admin/faas')
@@ -21,10 +21,10 @@ _span_prefix = "adm-faas-function"
 _counter = create_counter("adm_faas_function_api", "Admin function API counter")
 
 @router.get("/functions")
-def find_all_functions(response: Response, current_user: Annotated[UserSchema, Depends(admin_required)], start_index: int = 0, max_results: int = 10, db: Session = Depends(get_db)):
+def find_all_functions(response: Response, current_user: Annotated[UserSchema, Depends(admin_required)], start_index: int = 0, max_results: int = 10, cursor: str = None, total: bool = False, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.ALL)):
         increment_counter(_counter, Method.GET, Action.ALL)
-        results = get_all_functions(db, current_user, start_index, max_results)
+        results = get_all_functions(db, current_user, start_index, max_results, cursor, total)
         response.status_code = results['code']
         return results
 
@@ -6,7 +6,7 @@ from schemas.User import UserSchema
 from database.postgres_db import get_db
 from schemas.Instance import InstanceProvisionSchema, InstanceAttachSchema, InstanceUpdateSchema
 from middleware.auth_guard import admin_required
-from controllers.admin.admin_instance import admin_add_instance, admin_get_instance, admin_get_instances, admin_get_user_instances, admin_remove_instance, admin_update_instance, admin_refresh_instance, admin_attach_instance
+from controllers.admin.admin_instance import admin_add_instance, admin_get_instance, admin_get_instance_state, admin_get_instances, admin_get_user_instances, admin_remove_instance, admin_update_instance, admin_refresh_instance, admin_attach_instance
 
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
@@ -42,6 +42,12 @@ def get_instance_by_id(current_user: Annotated[UserSchema, Depends(admin_require
         increment_counter(_counter, Method.GET)
         return admin_get_instance(current_user, instance_id, db)
 
+@router.get("/{instance_id}/state")
+def get_instance_state_by_id(current_user: Annotated[UserSchema, Depends(admin_required)], instance_id: str, refresh: bool = False, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
+        increment_counter(_counter, Method.GET)
+        return admin_get_instance_state(current_user, instance_id, refresh, db)
+
 @router.delete("/{instance_id}")
 def delete_instance_by_id(bt: BackgroundTasks, current_user: Annotated[UserSchema, Depends(admin_required)], instance_id: str, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.DELETE)):
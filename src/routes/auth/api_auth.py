@@ -1,7 +1,8 @@
+import asyncio
 import json
 
 from datetime import datetime
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, Request
 from fastapi.responses import JSONResponse
 
 from sqlalchemy.orm import Session
@@ -9,10 +10,12 @@ from sqlalchemy.orm import Session
 from adapters.AdapterConfig import get_adapter
 from schemas.User import UserLoginSchema
 from database.postgres_db import get_db
+from utils.auth_cache import invalidate_principals
 from utils.jwt import jwt_encode
 
 from utils.logger import log_msg
-from utils.common import get_env_int, verify_password
+from utils.client_ips import get_trusted_client_ip
+from utils.common import get_env_int, is_false
 from utils.flag import is_flag_enabled
 from utils.encoder import AlchemyEncoder
 from utils.observability.cid import get_current_cid
@@ -20,6 +23,7 @@ from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
 from utils.observability.enums import Method
+from utils.password import verify_login_password
 
 router = APIRouter()
 CACHE_ADAPTER = get_adapter('cache')
@@ -27,8 +31,37 @@ CACHE_ADAPTER = get_adapter('cache')
 _span_prefix = "login"
 _counter = create_counter("auth_api", "Auth API counter")
 
+def get_login_success_response(user, new_hash, db):
+    from entities.User import User
+    from entities.Mfa import Mfa
+    if new_hash:
+        User.updateUserPasswordHash(user.id, new_hash, db)
+
+    mfaMethods = Mfa.getUserMfaMethods(user.id, db)
+    token = jwt_encode({
+        "id": user.id,
+        "email": user.email,
+        "confirmed": user.confirmed,
+        "is_admin": user.is_admin,
+        "emailapi": is_flag_enabled(user.enabled_features, 'emailapi'),
+        "cwaiapi": is_flag_enabled(user.enabled_features, 'cwaiapi'),
+        "verified": "true" if len(mfaMethods) == 0 else "false",
+        "time": datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
+    })
+    CACHE_ADAPTER().delete(user.email)
+    CACHE_ADAPTER().put(user.email, token, get_env_int("TOKEN_EXPIRATION_TIME"))
+    invalidate_principals(user.id)
+    mfaMethodsJson = json.loads(json.dumps(mfaMethods, cls = AlchemyEncoder))
+    log_msg("INFO", "User {} successfully authenticated".format(user.email))
+    return JSONResponse(content = {
+        'status': 'ok',
+        'token': token,
+        'confirmed': user.confirmed,
+        'methods': mfaMethodsJson
+    }, status_code = 200)
+
 @router.post("/login")
-def login_user(payload: UserLoginSchema, db: Session = Depends(get_db)):
+async def login_user(payload: UserLoginSchema, request: Request, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
         increment_counter(_counter, Method.POST)
         from entities.User import User
@@ -43,7 +76,7 @@ def login_user(payload: UserLoginSchema, db: Session = Depends(get_db)):
                 'cid': get_current_cid()
             }, status_code = 403)
 
-        user = User.getUserByEmail(email, db)
+        user = await asyncio.to_thread(User.getUserByEmail, email, db)
         if not user:
             log_msg("WARN", "User {} try to authenticate but it not exists".format(email))
             return JSONResponse(content = {
@@ -53,31 +86,19 @@ def login_user(payload: UserLoginSchema, db: Session = Depends(get_db)):
                 'cid': get_current_cid()
             }, status_code = 403)
 
-        from entities.Mfa import Mfa
-        mfaMethods = Mfa.getUserMfaMethods(user.id, db)
-        if verify_password(password, user.password):
-            token = jwt_encode({
-                "id": user.id,
-                "email": user.email,
-                "confirmed": user.confirmed,
-                "is_admin": user.is_admin,
-                "emailapi": is_flag_enabled(user.enabled_features, 'emailapi'),
-                "cwaiapi": is_flag_enabled(user.enabled_features, 'cwaiapi'),
-                "verified": "true" if len(mfaMethods) == 0 else "false",
-                "time": datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
-            })
-            CACHE_ADAPTER().delete(user.email)
-            CACHE_ADAPTER().put(user.email, token, get_env_int("TOKEN_EXPIRATION_TIME"))
-            from entities.Mfa import Mfa
-            mfaMethods = Mfa.getUserMfaMethods(user.id, db)
-            mfaMethodsJson = json.loads(json.dumps(mfaMethods, cls = AlchemyEncoder))
-            log_msg("INFO", "User {} successfully authenticated".format(user.email))
+        #? the bcrypt verification runs in the hashing processes, the event loop keeps serving the other requests
+        result = await verify_login_password(password, user.password, ["ip:{}".format(get_trusted_client_ip(request)), "email:{}".format(user.email)])
+        if is_false(result['status']):
+            log_msg("WARN", "User {} authentication rejected: {}".format(user.email, result['i18n_code']))
             return JSONResponse(content = {
-                'status': 'ok',
-                'token': token,
-                'confirmed': user.confirmed,
-                'methods': mfaMethodsJson
-            }, status_code = 200)
+                'status': 'ko',
+                'error': result['error'],
+                'i18n_code': result['i18n_code'],
+                'cid': get_current_cid()
+            }, status_code = result['http_code'])
+
+        if result['verified']:
+            return await asyncio.to_thread(get_login_success_response, user, result['new_hash'], db)
 
         log_msg("WARN", "User {} fails to authenticate".format(user.email))
         return JSONResponse(content = {
@@ -9,9 +9,10 @@ from schemas.Control import ControlDeleteInstanceSchema, ControlUpdateInstanceSc
 from utils.client_ips import get_client_ips
 from utils.common import is_not_empty
 from utils.gitlab import delete_runner, get_project_runners
-from utils.dynamic_name import rehash_dynamic_name
-from utils.instance import delete_instance, update_instance_status, get_virtual_machine
+from utils.instance import delete_instance, update_instance_status
+from utils.inventory import get_instance_vm
 from utils.logger import log_msg
+from utils.statistics import invalidate_user_statistics
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
@@ -48,7 +49,7 @@ def handle_instance_error_creation(request: Request, bt: BackgroundTasks, instan
                 'cid': get_current_cid()
             }, status_code = 403)
 
-        server = get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, rehash_dynamic_name(userInstance.name, userInstance.hash))
+        server = get_instance_vm(userInstance, db)
 
         if not server:
             return JSONResponse(content = {
@@ -73,6 +74,7 @@ def handle_instance_error_creation(request: Request, bt: BackgroundTasks, instan
             if len(filtered_runners) > 0:
                 delete_runner(filtered_runners[0]["id"], userInstance.project.gitlab_host, userInstance.project.access_token)
             Instance.updateStatus(userInstance.id, "deleted", db)
+            invalidate_user_statistics(userInstance.user_id)
 
             return JSONResponse(content = {
                 'status': 'ok',
@@ -111,7 +113,7 @@ def update_instance(request: Request, instance_id: str, payload: ControlUpdateIn
                 'cid': get_current_cid()
             }, status_code = 403)
 
-        server = get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, rehash_dynamic_name(userInstance.name, userInstance.hash))
+        server = get_instance_vm(userInstance, db)
 
         if not server:
             return JSONResponse(content = {
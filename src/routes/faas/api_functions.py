@@ -34,10 +34,10 @@ def import_function(current_user: Annotated[UserSchema, Depends(faasapi_required
         return import_new_function(current_user, function_file, db)
 
 @router.get("/functions")
-def find_my_functions(response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], start_index: int = 0, max_results: int = 10, db: Session = Depends(get_db)):
+def find_my_functions(response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], start_index: int = 0, max_results: int = 10, cursor: str = None, total: bool = False, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.ALL)):
         increment_counter(_counter, Method.GET, Action.ALL)
-        results = get_my_functions(db, current_user, start_index, max_results)
+        results = get_my_functions(db, current_user, start_index, max_results, cursor, total)
         response.status_code = results['code']
         return results
 
@@ -6,9 +6,9 @@ from database.postgres_db import get_db
 from middleware.auth_guard import get_current_not_mandatory_user, get_current_user, get_user_authentication
 from middleware.faasapi_guard import faasapi_required
 from schemas.User import UserSchema
-from schemas.faas.Invocation import Invocation, CompletedInvocation
+from schemas.faas.Invocation import Invocation, CompletedInvocation, CompletedInvocations
 from schemas.UserAuthentication import UserAuthentication
-from controllers.faas.invocations import clear_my_invocations, invoke, invoke_sync, complete, get_invocation, get_my_invocations, delete_invocation
+from controllers.faas.invocations import clear_my_invocations, invoke, invoke_sync, complete, complete_all, get_invocation, get_my_invocations, delete_invocation
 
 from utils.common import is_not_empty_key, is_true
 from utils.observability.otel import get_otel_tracer
@@ -30,10 +30,10 @@ def create_invocation(payload: Invocation, response: Response, current_user: Ann
         return result
 
 @router.post("/invocation/sync")
-def create_sync_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: Session = Depends(get_db)):
+async def create_sync_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST, Action.SYNC)):
         increment_counter(_counter, Method.POST, Action.SYNC)
-        result = invoke_sync(payload, current_user, user_auth, db)
+        result = await invoke_sync(payload, current_user, user_auth, db)
         response.status_code = result['code']
         return result
 
@@ -45,6 +45,14 @@ def update_invocation(id: str, payload: CompletedInvocation, response: Response,
         response.status_code = result['code']
         return result
 
+@router.put("/invocations")
+def update_invocations(payload: CompletedInvocations, response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.PUT, Action.ALL)):
+        increment_counter(_counter, Method.PUT, Action.ALL)
+        result = complete_all(payload, current_user, db)
+        response.status_code = result['code']
+        return result
+
 @router.get("/invocation/{id}")
 def find_invocation_by_id(id: str, response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
@@ -54,10 +62,10 @@ def find_invocation_by_id(id: str, response: Response, current_user: Annotated[U
         return result['entity'] if is_true(result['status']) and is_not_empty_key(result, 'entity') else result
 
 @router.get("/invocations")
-def find_my_invocations(response: Response, current_user: Annotated[UserSchema, Depends(get_current_user)], start_index: int = 0, max_results: int = 10, db: Session = Depends(get_db)):
+def find_my_invocations(response: Response, current_user: Annotated[UserSchema, Depends(get_current_user)], start_index: int = 0, max_results: int = 10, cursor: str = None, total: bool = False, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.ALL)):
         increment_counter(_counter, Method.GET, Action.ALL)
-        results = get_my_invocations(db, current_user, start_index, max_results)
+        results = get_my_invocations(db, current_user, start_index, max_results, cursor, total)
         response.status_code = results['code']
         return results
 
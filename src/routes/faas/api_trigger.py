@@ -47,10 +47,10 @@ def find_trigger_by_id(id: str, response: Response, current_user: Annotated[User
         return result['entity']
 
 @router.get("/triggers")
-def find_my_triggers(response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], kind: str = None, start_index: int = 0, max_results: int = 10, db: Session = Depends(get_db)):
+def find_my_triggers(response: Response, current_user: Annotated[UserSchema, Depends(faasapi_required)], kind: str = None, start_index: int = 0, max_results: int = 10, cursor: str = None, total: bool = False, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.ALL)):
         increment_counter(_counter, Method.GET, Action.ALL)
-        results = get_my_triggers(db, current_user, kind, start_index, max_results)
+        results = get_my_triggers(db, current_user, kind, start_index, max_results, cursor, total)
         response.status_code = results['code']
         return results
 
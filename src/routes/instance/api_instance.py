@@ -7,7 +7,7 @@ from database.postgres_db import get_db
 from schemas.Instance import InstanceUpdateSchema, InstanceAttachSchema, InstanceProvisionSchema
 from middleware.auth_guard import get_current_active_user
 from middleware.daasapi_guard import daasapi_required
-from controllers.instance import attach_instance, get_instance, get_instances, provision_instance, update_instance, remove_instance
+from controllers.instance import attach_instance, get_instance, get_instance_state, get_instances, provision_instance, update_instance, remove_instance
 
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
@@ -31,6 +31,12 @@ def get_instance_by_id(current_user: Annotated[UserSchema, Depends(get_current_a
         increment_counter(_counter, Method.GET)
         return get_instance(current_user, provider, region, instance_id, db)
 
+@router.get("/{provider}/{region}/{instance_id}/state")
+def get_instance_state_by_id(current_user: Annotated[UserSchema, Depends(get_current_active_user)], daas: Annotated[UserSchema, Depends(daasapi_required)], provider: str, region: str, instance_id: str, refresh: bool = False, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
+        increment_counter(_counter, Method.GET)
+        return get_instance_state(current_user, provider, region, instance_id, refresh, db)
+
 @router.delete("/{provider}/{region}/{instance_id}")
 def delete_instance(bt: BackgroundTasks, current_user: Annotated[UserSchema, Depends(get_current_active_user)], daas: Annotated[UserSchema, Depends(daasapi_required)], provider: str, region: str, instance_id: str , db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.DELETE)):
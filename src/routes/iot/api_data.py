@@ -1,10 +1,11 @@
-from controllers.iot.data import add_data
+from controllers.iot.data import add_data, add_data_batch, get_numeric_data_series
 from fastapi import APIRouter, Depends
-from middleware.auth_guard import get_current_not_mandatory_user, get_user_authentication
+from middleware.auth_guard import get_current_active_user, get_current_not_mandatory_user, get_user_authentication
 from schemas.UserAuthentication import UserAuthentication
-from schemas.iot.Data import DataSchema
+from schemas.iot.Data import DataSchema, DataBatchSchema
 from sqlalchemy.orm import Session
 from typing import Annotated
+from datetime import datetime
 from database.postgres_db import get_db
 from schemas.User import UserSchema
 from utils.observability.otel import get_otel_tracer
@@ -18,7 +19,19 @@ _span_prefix = "iot-data"
 _counter = create_counter("iot_data_api", "IoT data API counter")
 
 @router.post("/data")
-def create_data(current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], payload: DataSchema, db: Session = Depends(get_db)):
+async def create_data(current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], payload: DataSchema, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
         increment_counter(_counter, Method.POST)
-        return add_data(current_user, user_auth, payload, db)
+        return await add_data(current_user, user_auth, payload, db)
+
+@router.post("/data/batch")
+async def create_data_batch(current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], payload: DataBatchSchema, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
+        increment_counter(_counter, Method.POST)
+        return await add_data_batch(current_user, user_auth, payload, db)
+
+@router.get("/data/numeric/{device_id}")
+def get_numeric_data(current_user: Annotated[UserSchema, Depends(get_current_active_user)], device_id: str, key: str = "data", start: datetime = None, end: datetime = None, max_points: int = 500, resolution: str = None, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
+        increment_counter(_counter, Method.GET)
+        return get_numeric_data_series(current_user, device_id, key, start, end, max_points, resolution, db)
@@ -19,6 +19,7 @@ from adapters.AdapterConfig import get_adapter
 from middleware.pre_auth_guard import pre_token_required
 from middleware.auth_guard import get_current_active_user
 
+from utils.auth_cache import invalidate_principals
 from utils.encoder import AlchemyEncoder
 from utils.flag import is_flag_enabled
 from utils.jwt import jwt_encode
@@ -157,6 +158,7 @@ def verify_u2f(current_user: Annotated[UserSchema, Depends(pre_token_required)],
             })
             CACHE_ADAPTER().delete(current_user.email)
             CACHE_ADAPTER().put(current_user.email, token, get_env_int("TOKEN_EXPIRATION_TIME"))
+            invalidate_principals(current_user.id)
             return JSONResponse(content = {
                 'status': 'ok',
                 'token': token
@@ -264,6 +266,7 @@ def post(current_user: Annotated[UserSchema, Depends(pre_token_required)], paylo
         })
         CACHE_ADAPTER().delete(current_user.email)
         CACHE_ADAPTER().put(current_user.email, token, get_env_int("TOKEN_EXPIRATION_TIME"))
+        invalidate_principals(current_user.id)
         return JSONResponse(content = {
             'status': 'ok',
             'token': token
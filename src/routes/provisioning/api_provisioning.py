@@ -0,0 +1,24 @@
+from typing import Annotated
+from sqlalchemy.orm import Session
+from fastapi import Depends, APIRouter
+
+from schemas.User import UserSchema
+from database.postgres_db import get_db
+from middleware.auth_guard import get_current_active_user
+from controllers.provisioning import get_provisioning_job
+
+from utils.observability.otel import get_otel_tracer
+from utils.observability.traces import span_format
+from utils.observability.counter import create_counter, increment_counter
+from utils.observability.enums import Method
+
+router = APIRouter()
+
+_span_prefix = "provisioning"
+_counter = create_counter("provisioning_api", "Provisioning API counter")
+
+@router.get("/job/{job_id}")
+def get_job(current_user: Annotated[UserSchema, Depends(get_current_active_user)], job_id: str, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
+        increment_counter(_counter, Method.GET)
+        return get_provisioning_job(current_user, job_id, db)
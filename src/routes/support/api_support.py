@@ -1,12 +1,12 @@
 from typing import Annotated, List
 from sqlalchemy.orm import Session
-from fastapi import Depends, APIRouter, File, UploadFile
+from fastapi import Depends, APIRouter, File, Header, Request, UploadFile
 
 from schemas.User import UserSchema
 from database.postgres_db import get_db
 from schemas.Support import SupportTicketSchema, SupportTicketReplySchema
 from middleware.auth_guard import get_current_active_user
-from controllers.support import attach_file_to_ticket_by_id, delete_file_from_ticket_by_id, delete_reply_support_ticket, download_file_from_ticket_by_id, get_support_tickets, add_support_ticket, get_support_ticket, reply_support_ticket, auto_close_tickets, update_reply_support_ticket, update_support_ticket
+from controllers.support import attach_file_to_ticket_by_id, stream_file_to_ticket_by_id, delete_file_from_ticket_by_id, delete_reply_support_ticket, download_file_from_ticket_by_id, get_support_tickets, add_support_ticket, get_support_ticket, reply_support_ticket, auto_close_tickets, update_reply_support_ticket, update_support_ticket
 
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
@@ -72,11 +72,17 @@ def attach_file_to_ticket(current_user: Annotated[UserSchema, Depends(get_curren
         increment_counter(_counter, Method.POST)
         return attach_file_to_ticket_by_id(current_user, ticket_id, files, db)
 
+@router.post("/attach-file/{ticket_id}/stream")
+async def stream_file_to_ticket(current_user: Annotated[UserSchema, Depends(get_current_active_user)], ticket_id: str, filename: str, request: Request, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
+        increment_counter(_counter, Method.POST)
+        return await stream_file_to_ticket_by_id(current_user, ticket_id, filename, request, db)
+
 @router.get("/attach-file/{ticket_id}")
-def download_files_from_ticket(current_user: Annotated[UserSchema, Depends(get_current_active_user)], ticket_id: str, attachment_id: str, db: Session = Depends(get_db)):
+def download_files_from_ticket(current_user: Annotated[UserSchema, Depends(get_current_active_user)], ticket_id: str, attachment_id: str, range_header: Annotated[str, Header(alias = "Range")] = None, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        return download_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db)
+        return download_file_from_ticket_by_id(current_user, ticket_id, attachment_id, db, range_header)
     
 @router.delete("/attach-file/{ticket_id}")
 def delete_files_from_ticket(current_user: Annotated[UserSchema, Depends(get_current_active_user)], ticket_id: str, attachment_id: str, db: Session = Depends(get_db)):
@@ -1,15 +1,15 @@
 from datetime import datetime
 from enum import Enum
-from fastapi import APIRouter, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi.responses import Response
 
-from utils.common import is_empty
+from utils.client_ips import get_client_ip
 from utils.logger import quiet_log_msg
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
 from utils.observability.enums import Method
-from utils.observability.tracker import TRACKER_IMAGE_PATH, get_infos_from_ip, init_tracker_img, parse_user_agent
+from utils.observability.tracker import TRACKER_REMOTE_LOOKUP, get_infos_from_ip, get_local_infos_from_ip, get_tracker_img, parse_user_agent
 
 router = APIRouter()
 
@@ -20,18 +20,16 @@ class TrackerFormat(str, Enum):
     img = "img"
     json = "json"
 
+async def log_with_remote_infos(payload):
+    payload['infos'] = await get_infos_from_ip(payload['host'])
+    quiet_log_msg("INFO", payload)
+
 @router.get("/{format}/{website}")
-def track(request: Request, format: TrackerFormat, website: str):
+async def track(request: Request, background_tasks: BackgroundTasks, format: TrackerFormat, website: str):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        init_tracker_img()
-
-        host = request.headers.get("X-Real-IP")
-        if is_empty(host):
-           host = request.headers.get("X-Forwarded-For")
 
-        if is_empty(host):
-           host = request.client.host
+        host = get_client_ip(request)
 
         user_agent = request.headers.get("User-Agent")
         referrer = request.headers.get("Referer", "None")
@@ -50,12 +48,19 @@ def track(request: Request, format: TrackerFormat, website: str):
             "browser": parsed_ua['browser'],
             "os": parsed_ua['os'],
             "details": parsed_ua['details'],
-            "infos": get_infos_from_ip(host)
+            "infos": get_local_infos_from_ip(host)
         }
 
-        quiet_log_msg("INFO", payload)
+        #? the pixel doesn't wait for the remote apis: the hit is logged once they answered
+        if payload['infos'] is not None:
+            quiet_log_msg("INFO", payload)
+        elif format is TrackerFormat.img and TRACKER_REMOTE_LOOKUP:
+            background_tasks.add_task(log_with_remote_infos, dict(payload))
+        else:
+            payload['infos'] = await get_infos_from_ip(host)
+            quiet_log_msg("INFO", payload)
 
-        return FileResponse(TRACKER_IMAGE_PATH, media_type="image/png", headers = {
+        return Response(content = get_tracker_img(), media_type="image/png", headers = {
             "x-cwcloud-client-host": host,
             "x-cwcloud-user-agent": user_agent,
             "x-cwcloud-website": website,
@@ -44,10 +44,10 @@ def get_user_statistics(current_user: Annotated[UserSchema, Depends(get_current_
         return get_user_cloud_statistics(current_user, db)
 
 @router.get("/resources")
-def get_user_resources(current_user: Annotated[UserSchema, Depends(get_current_active_user)], db: Session = Depends(get_db)):
+def get_user_resources(current_user: Annotated[UserSchema, Depends(get_current_active_user)], kind: str = None, fields: str = None, start_index: int = 0, max_results: int = 10, cursor: str = None, db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.RESOURCE)):
         increment_counter(_counter, Method.GET, Action.RESOURCE)
-        return get_user_cloud_resources(current_user, db)
+        return get_user_cloud_resources(current_user, db, kind, fields, start_index, max_results, cursor)
 
 @router.patch("/password")
 def update_password(current_user: Annotated[UserSchema, Depends(get_current_active_user)], payload: UserUpdatePasswordSchema, db: Session = Depends(get_db)):
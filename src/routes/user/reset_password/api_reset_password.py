@@ -8,8 +8,10 @@ from schemas.User import UserLoginSchema, UserSchema
 from database.postgres_db import get_db
 from middleware.auth_guard import admin_required
 
-from utils.common import generate_hash_password, is_empty, is_false
+from utils.auth_cache import invalidate_principals
+from utils.common import is_empty, is_false
 from utils.security import check_password
+from utils.password import hash_password
 from utils.bytes_generator import generate_random_bytes
 from utils.mail import send_email
 from utils.observability.cid import get_current_cid
@@ -53,8 +55,9 @@ def reset_password(current_user: Annotated[UserSchema, Depends(admin_required)],
                     'cid': get_current_cid()
                 }, status_code = 400)
 
-        target_user.password = generate_hash_password(user_new_password)
+        target_user.password = hash_password(user_new_password)
         db.commit()
+        invalidate_principals(target_user.id)
         subject = "Reset Password"
         message = "Your password changed:<ul>" + \
             "<li> your new password is: " + user_new_password + \
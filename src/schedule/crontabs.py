@@ -1,25 +1,39 @@
+import json
+import threading
+import time
 import requests
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from dateutil.parser import parse
 
-from utils.common import is_empty_key, is_not_empty
-from utils.bytes_generator import generate_random_bytes
+from utils.common import is_empty, is_empty_key, is_not_empty, is_not_empty_key
+from utils.consumer import TRIGGERS_RESYNC_TIME
 from utils.cron import parse_crontab
 from utils.date import is_after_current_time
 from utils.faas.vars import FAAS_API_MAX_RESULTS, FAAS_API_TOKEN, FAAS_API_URL
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import log_msg
 
-global _scheduler
 _scheduler = BackgroundScheduler()
 _scheduler.start()
 
 _api_endpoint = "{}/v1/faas".format(FAAS_API_URL)
 _api_admin_endpoint = "{}/v1/admin/faas".format(FAAS_API_URL)
 _headers = { "X-Auth-Token": FAAS_API_TOKEN } if is_not_empty(FAAS_API_TOKEN) else None
+_resync_job_id = "triggers-resync"
+
+#? the jobs are keyed by the trigger id: the fingerprints tell which triggers changed
+#? and the events times protect the changes received during a full resync from its stale snapshot
+_lock = threading.RLock()
+_fingerprints = {}
+_events_at = {}
+
+def get_trigger_owner_id(trigger):
+    return trigger['owner']['id'] if is_not_empty_key(trigger, 'owner') else trigger.get('owner_id')
 
 def invoke_function(trigger):
     invocation_endpoint = "{}/invocation".format(_api_endpoint)
@@ -28,83 +42,152 @@ def invoke_function(trigger):
         invocation_endpoint,
         json={
             'content': {
-                'invoker_id': trigger['owner']['id'],
+                'invoker_id': get_trigger_owner_id(trigger),
                 'function_id': trigger['content']['function_id'],
                 'args': trigger['content']['args']
             }
-        }, 
+        },
         headers=_headers,
         timeout=HTTP_REQUEST_TIMEOUT
     )
 
-def handle_trigger(trigger):
+def get_fingerprint(trigger):
+    return json.dumps([trigger['kind'], trigger['content'], get_trigger_owner_id(trigger)], sort_keys = True, default = str)
+
+def get_job_trigger(trigger):
     if is_empty_key(trigger, 'content') or any(is_empty_key(trigger['content'], k) for k in ['name', 'function_id']):
-        log_msg("WARN", "[scheduler][init_triggered_functions] missing some mandatory fields, ignoring trigger = {}".format(trigger))
+        log_msg("WARN", "[scheduler][get_job_trigger] missing some mandatory fields, ignoring trigger = {}".format(trigger))
+        return None
 
     if not 'args' in trigger['content']:
-        log_msg("WARN", "[scheduler][init_triggered_functions] missing args mandatory fields, ignoring trigger = {}".format(trigger))
+        log_msg("WARN", "[scheduler][get_job_trigger] missing args mandatory fields, ignoring trigger = {}".format(trigger))
+        return None
 
     if trigger['kind'] == "cron":
         if is_empty_key(trigger['content'], 'cron_expr'):
-            log_msg("WARN", "[scheduler][reinit_crontabs] missing cron_expr field, ignoring trigger = {}".format(trigger))
+            log_msg("WARN", "[scheduler][get_job_trigger] missing cron_expr field, ignoring trigger = {}".format(trigger))
+            return None
 
         apscheduler_args = parse_crontab(trigger['content']['cron_expr'])
-        log_msg("DEBUG", "[scheduler][reinit_crontabs] add this cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
-        _scheduler.add_job(lambda: invoke_function(trigger), CronTrigger(**apscheduler_args), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)))
+        log_msg("DEBUG", "[scheduler][get_job_trigger] cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
+        return CronTrigger(**apscheduler_args)
     elif trigger['kind'] == "schedule":
         if is_empty_key(trigger['content'], 'execution_time'):
-            log_msg("WARN", "[scheduler][invoke_scheduled_functions] missing execution_time field, ignoring trigger = {}".format(trigger))
+            log_msg("WARN", "[scheduler][get_job_trigger] missing execution_time field, ignoring trigger = {}".format(trigger))
+            return None
 
-        execution_time = parse(trigger['content']['execution_time'])
         if is_after_current_time(trigger['content']['execution_time']):
-            log_msg("DEBUG", "[scheduler][invoke_scheduled_functions] Scheduling function for trigger: {}".format(trigger))
-            _scheduler.add_job(lambda: invoke_function(trigger), DateTrigger(run_date=execution_time), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)), replace_existing=True)
+            log_msg("DEBUG", "[scheduler][get_job_trigger] scheduling function for trigger: {}".format(trigger))
+            return DateTrigger(run_date=parse(trigger['content']['execution_time']))
+
+    return None
+
+def remove_job(trigger_id):
+    try:
+        _scheduler.remove_job(trigger_id)
+    except JobLookupError:
+        pass
+
+def upsert_trigger(trigger):
+    trigger_id = "{}".format(trigger['id'])
+    fingerprint = get_fingerprint(trigger)
+    with _lock:
+        #? an unchanged trigger keeps its job and so its next run time
+        if _fingerprints.get(trigger_id) == fingerprint:
+            return
 
-def init_triggered_functions():
-    global _scheduler
-    _scheduler.shutdown(wait = False)
-    _scheduler = BackgroundScheduler()
-    _scheduler.start()
+        _fingerprints[trigger_id] = fingerprint
+        job_trigger = get_job_trigger(trigger)
+        if job_trigger is None:
+            remove_job(trigger_id)
+            return
+
+        _scheduler.add_job(invoke_function, job_trigger, args = [trigger], id = trigger_id, name = trigger['content']['name'], replace_existing = True)
+
+def remove_trigger(trigger_id):
+    trigger_id = "{}".format(trigger_id)
+    with _lock:
+        _fingerprints.pop(trigger_id, None)
+        remove_job(trigger_id)
 
-    start_index = 0
+def handle_trigger(trigger):
+    upsert_trigger(trigger)
+
+def apply_trigger_event(payload):
+    #? the add and override events carry the whole trigger, the former events without it fall back to a full resync
+    action = payload.get('action')
+    trigger = payload.get('trigger') or {}
+    if action in ['add', 'override'] and is_not_empty_key(trigger, 'kind'):
+        upserted, removed = [trigger], []
+    elif action == 'delete' and is_not_empty_key(trigger, 'id'):
+        upserted, removed = [], [trigger['id']]
+    elif action == 'clear' and 'triggers' in payload:
+        upserted, removed = [], [t['id'] for t in payload['triggers']]
+    else:
+        log_msg("INFO", "[scheduler][apply_trigger_event] unknown event, resync everything: {}".format(payload))
+        init_triggered_functions()
+        return
+
+    with _lock:
+        now = time.monotonic()
+        for trigger_id in [t['id'] for t in upserted] + removed:
+            _events_at["{}".format(trigger_id)] = now
+        for t in upserted:
+            upsert_trigger(t)
+        for trigger_id in removed:
+            remove_trigger(trigger_id)
+
+def fetch_triggers():
+    triggers = []
+    cursor = None
+    trigger_endpoint = "{}/triggers".format(_api_admin_endpoint)
     while True:
-        trigger_endpoint = "{}/triggers".format(_api_admin_endpoint)
-        log_msg("DEBUG", "[scheduler][init_triggered_functions] trigger_endpoint = {}".format(trigger_endpoint))
-        r_triggers = requests.get("{}?start_index={}&max_results={}".format(trigger_endpoint, start_index, FAAS_API_MAX_RESULTS), headers=_headers, timeout=HTTP_REQUEST_TIMEOUT)
+        params = {'max_results': FAAS_API_MAX_RESULTS}
+        if is_not_empty(cursor):
+            params['cursor'] = cursor
+
+        log_msg("DEBUG", "[scheduler][fetch_triggers] trigger_endpoint = {}, cursor = {}".format(trigger_endpoint, cursor))
+        r_triggers = requests.get(trigger_endpoint, params=params, headers=_headers, timeout=HTTP_REQUEST_TIMEOUT)
         if r_triggers.status_code != 200:
-            log_msg("ERROR", "[scheduler][init_triggered_functions] triggers api respond an error, r.code = {}, r.body = {}".format(r_triggers.status_code, r_triggers))    
-            return
+            log_msg("ERROR", "[scheduler][fetch_triggers] triggers api respond an error, r.code = {}, r.body = {}".format(r_triggers.status_code, r_triggers))
+            return None
+
+        page = r_triggers.json()
+        if not is_empty_key(page, 'results'):
+            triggers.extend(page['results'])
+
+        cursor = page.get('next_cursor')
+        if is_empty(cursor) or is_empty_key(page, 'results'):
+            return triggers
+
+def is_changed_since(trigger_id, started_at):
+    return _events_at.get(trigger_id, 0) > started_at
+
+def reconcile_triggers(triggers, started_at):
+    #? the triggers changed by an event since the beginning of the resync are left as they are
+    with _lock:
+        trigger_ids = set()
+        for trigger in triggers:
+            trigger_id = "{}".format(trigger['id'])
+            trigger_ids.add(trigger_id)
+            if not is_changed_since(trigger_id, started_at):
+                upsert_trigger(trigger)
+
+        for trigger_id in [trigger_id for trigger_id in _fingerprints if trigger_id not in trigger_ids and not is_changed_since(trigger_id, started_at)]:
+            remove_trigger(trigger_id)
+
+        for trigger_id in [trigger_id for trigger_id, event_at in _events_at.items() if event_at <= started_at]:
+            del _events_at[trigger_id]
+
+def init_triggered_functions():
+    started_at = time.monotonic()
+    triggers = fetch_triggers()
+    if triggers is None:
+        return
+
+    reconcile_triggers(triggers, started_at)
+    log_msg("INFO", "[scheduler][init_triggered_functions] {} triggers synchronized".format(len(triggers)))
 
-        triggers = r_triggers.json()
-        if is_empty_key(triggers, 'results'):
-            log_msg("DEBUG", "[scheduler][init_triggered_functions] no more triggers found...")    
-            break
-
-        for trigger in triggers['results']:
-            if is_empty_key(trigger, 'content') or any(is_empty_key(trigger['content'], k) for k in ['name', 'function_id']):
-                log_msg("WARN", "[scheduler][init_triggered_functions] missing some mandatory fields, ignoring trigger = {}".format(trigger))
-                continue
-
-            if not 'args' in trigger['content']:
-                log_msg("WARN", "[scheduler][init_triggered_functions] missing args mandatory fields, ignoring trigger = {}".format(trigger))
-                continue
-
-            if trigger['kind'] == "cron":
-                if is_empty_key(trigger['content'], 'cron_expr'):
-                    log_msg("WARN", "[scheduler][reinit_crontabs] missing cron_expr field, ignoring trigger = {}".format(trigger))
-                    continue
-
-                apscheduler_args = parse_crontab(trigger['content']['cron_expr'])
-                log_msg("DEBUG", "[scheduler][reinit_crontabs] add this cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
-                _scheduler.add_job(lambda: invoke_function(trigger), CronTrigger(**apscheduler_args), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)))
-            elif trigger['kind'] == "schedule":
-                if is_empty_key(trigger['content'], 'execution_time'):
-                    log_msg("WARN", "[scheduler][invoke_scheduled_functions] missing execution_time field, ignoring trigger = {}".format(trigger))
-                    continue
-
-                execution_time = parse(trigger['content']['execution_time'])
-                if is_after_current_time(trigger['content']['execution_time']):
-                    log_msg("DEBUG", "[scheduler][invoke_scheduled_functions] Scheduling function for trigger: {}".format(trigger))
-                    _scheduler.add_job(lambda: invoke_function(trigger), DateTrigger(run_date=execution_time), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)), replace_existing=True)
-
-            start_index = start_index + 1
+def schedule_resync():
+    #? safety net for the lost events
+    _scheduler.add_job(init_triggered_functions, IntervalTrigger(seconds = TRIGGERS_RESYNC_TIME), id = _resync_job_id, replace_existing = True)
@@ -1,5 +1,5 @@
 from adapters.AdapterConfig import get_adapter
-from schedule.crontabs import init_triggered_functions
+from schedule.crontabs import apply_trigger_event
 
 from utils.logger import log_msg
 from utils.observability.otel import get_otel_tracer
@@ -20,6 +20,5 @@ async def handle(msg):
             log_msg("DEBUG", "[scheduler][handle] payload is none")
             return
 
-        log_msg("INFO", "[scheduler][handle] there's a change on the crons: {}, reset everything from database".format(payload))
-        
-        init_triggered_functions()
+        log_msg("INFO", "[scheduler][handle] there's a change on the crons: {}".format(payload))
+        apply_trigger_event(payload)
@@ -45,6 +45,7 @@ class BaseMonitorSchema(BaseModel):
     body: Optional[str] = Field(None, description="Request body for POST/PUT requests")
     expected_contain: Optional[str] = Field(None, description="Expected content in the HTTP response body")
     timeout: int = Field(default=30, gt=0, le=300)
+    interval: Optional[int] = Field(default=None, ge=10, le=86400, description="Interval between two checks in seconds (MONITOR_WAIT_TIME by default)")
     username: Optional[str] = None
     password: Optional[str] = None
     headers: List[Header] = Field(default_factory=list, description="Optional headers for the HTTP request")
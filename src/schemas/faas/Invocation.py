@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 from schemas.faas.InvocationContent import InvocationContent
 
@@ -12,3 +12,6 @@ class CompletedInvocation(Invocation):
     invoker_username: Optional[str]
     created_at: Optional[str]
     updated_at: Optional[str]
+
+class CompletedInvocations(BaseModel):
+    invocations: List[CompletedInvocation]
@@ -1,4 +1,9 @@
 from pydantic import BaseModel, Field
+from typing import List
+
 class DataSchema(BaseModel):
     device_id: str
     content: str
+
+class DataBatchSchema(BaseModel):
+    data: List[DataSchema]
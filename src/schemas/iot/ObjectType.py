@@ -6,6 +6,7 @@ class ObjectTypeContent(BaseModel):
     name: str
     decoding_function: str
     triggers: list[str]
+    batch_decoding: Optional[bool] = False
 
 class ObjectTypeSchema(BaseModel):
     content: ObjectTypeContent
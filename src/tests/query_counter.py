@@ -0,0 +1,53 @@
+import importlib
+import os
+
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, configure_mappers
+from sqlalchemy.pool import StaticPool
+
+from database.postgres_db import Base
+
+_src_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+_entities_path = os.path.join(_src_path, 'entities')
+
+@compiles(JSONB, "sqlite")
+def compile_jsonb_for_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+def get_test_session():
+    #? in memory database with all the entities tables, the postgres server defaults are left aside
+    for root, _, files in os.walk(_entities_path):
+        for file in [f for f in files if f.endswith(".py")]:
+            importlib.import_module(os.path.relpath(os.path.join(root, file[:-3]), _src_path).replace(os.sep, "."))
+
+    configure_mappers()
+    #? a single connection shared with the threads of asyncio.to_thread
+    engine = create_engine("sqlite://", connect_args = {'check_same_thread': False}, poolclass = StaticPool)
+    metadata = MetaData()
+    for table in Base.metadata.tables.values():
+        for column in table.to_metadata(metadata).columns:
+            column.server_default = None
+
+    metadata.create_all(engine)
+    return Session(engine)
+
+class QueryCounter():
+    def __init__(self, db):
+        self.engine = db.get_bind()
+        self.statements = []
+
+    def count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self.count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, "before_cursor_execute", self.count)
+
+class QueryCountMixin():
+    def assertMaxQueries(self, counter, max_count):
+        self.assertLessEqual(len(counter.statements), max_count, "{} queries:\n{}".format(len(counter.statements), "\n".join(counter.statements)))
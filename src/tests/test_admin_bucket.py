@@ -26,7 +26,7 @@ class TestAdminBucket(TestCase):
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(result.body.decode(), "[]")
 
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
     @patch('entities.Bucket.Bucket.findById')
     def test_admin_get_bucket(self, findById, generate_hash_password):
         # Given
@@ -98,7 +98,7 @@ class TestAdminBucket(TestCase):
     @patch('entities.Bucket.Bucket.findById')
     @patch('controllers.admin.admin_bucket.delete_bucket', side_effect = None)
     @patch('entities.Bucket.Bucket.updateStatus', side_effect = None)
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
     def test_admin_delete_bucket(self, generate_hash_password, updateStatus, delete_bucket_mock, findById):
         # Given
         from controllers.admin.admin_bucket import admin_remove_bucket
@@ -130,11 +130,11 @@ class TestAdminBucket(TestCase):
         self.assertEqual(result.body.decode(), '{"status":"ok","message":"bucket successfully deleted","i18n_code":"bucket_deleted"}')
    
     @patch('entities.User.User.getUserByEmail')
-    @patch('utils.common.generate_hash_password', side_effect=lambda p: p)
+    @patch('utils.password.hash_password', side_effect=lambda p: p)
     @patch('utils.dynamic_name.generate_hashed_name', side_effect=lambda p: ("aabbcc", p, "test-aabbcc"))
     @patch('controllers.admin.admin_bucket.register_bucket')
-    @patch('controllers.admin.admin_bucket.create_bucket', side_effect=None)
-    def test_admin_add_bucket(self, create_bucket, register_bucket, generate_hash_password, generate_hashed_name, getUserByEmail):
+    @patch('controllers.admin.admin_bucket.enqueue_provisioning_job', return_value=Mock(id="aabbcc"))
+    def test_admin_add_bucket(self, enqueue_provisioning_job, register_bucket, generate_hash_password, generate_hashed_name, getUserByEmail):
         # Given
         from controllers.admin.admin_bucket import admin_create_bucket
         from entities.Bucket import Bucket
@@ -189,7 +189,8 @@ class TestAdminBucket(TestCase):
             "secret_key": None,
             "status": None,
             "type": "private",
-            "user_id": None
+            "user_id": None,
+            "job_id": "aabbcc"
         }
         self.assertEqual(actual_json, expected_json)
 
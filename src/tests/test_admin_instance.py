@@ -32,8 +32,9 @@ class TestAdminInstance(TestCase):
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(result.body.decode(), "[]")
 
+    @patch('entities.VmState.VmState.findStates', return_value = [])
     @patch('entities.Instance.Instance.findInstanceById')
-    def test_admin_get_instance(self, findInstanceById):
+    def test_admin_get_instance(self, findInstanceById, findStates):
         # Given
         from controllers.admin.admin_instance import admin_get_instance
         from entities.Instance import Instance
@@ -88,7 +89,7 @@ class TestAdminInstance(TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(response_status_code, 200)
         self.assertIsInstance(result, JSONResponse)
-        self.assertEqual(result.body.decode(), f'{{"created_at":null,"environment_id":null,"hash":"aabbcc","id":1,"ip_address":null,"is_protected":false,"modification_date":null,"name":"test-instance","project_id":null,"provider":"scaleway","region":"fr-par","root_dns_zone":"comwork.cloud","status":"deleted","type":"DEV1-S","user":null,"user_id":1,"zone":"1","environment":"code","path":"code","project":{{"access_token":null,"created_at":null,"git_username":null,"gitlab_host":null,"gitlab_project_id":"1","gitlab_token":"{self.test_token}","gitlab_url":"https://gitlab.comwork.io","gitlab_username":"amirghedira","id":1,"name":"test_project","namespace_id":null,"type":"vm","url":"https://gitlab.comwork.io/dynamic/test_project","user":null,"user_id":1,"userid":null}}}}')
+        self.assertEqual(result.body.decode(), f'{{"created_at":null,"environment_id":null,"hash":"aabbcc","id":1,"ip_address":null,"is_protected":false,"modification_date":null,"name":"test-instance","project_id":null,"provider":"scaleway","region":"fr-par","root_dns_zone":"comwork.cloud","status":"deleted","type":"DEV1-S","user":null,"user_id":1,"zone":"1","environment":"code","path":"code","project":{{"access_token":null,"created_at":null,"git_username":null,"gitlab_host":null,"gitlab_project_id":"1","gitlab_token":"{self.test_token}","gitlab_url":"https://gitlab.comwork.io","gitlab_username":"amirghedira","id":1,"name":"test_project","namespace_id":null,"type":"vm","url":"https://gitlab.comwork.io/dynamic/test_project","user":null,"user_id":1,"userid":null}},"vm":null}}')
 
     @patch('utils.dynamic_name.generate_hashed_name', side_effect = lambda p: ("aabbcc", p, "test-aabbcc"))
     @patch('entities.User.User.getUserByEmail')
@@ -97,11 +98,11 @@ class TestAdminInstance(TestCase):
     @patch('controllers.admin.admin_instance.get_user_project_by_id')
     @patch('controllers.admin.admin_instance.refresh_project_credentials')
     @patch('controllers.admin.admin_instance.register_instance')
-    @patch('controllers.admin.admin_instance.create_instance', side_effect = lambda provider, ami_image, instance_id, user_email, instance_name, hashed_instance_name, environment, instance_region, instance_zone, generate_dns, gitlab_project, user_project, instance_type, debug, centralized, root_dns_zone, db : "")
+    @patch('controllers.admin.admin_instance.enqueue_provisioning_job', return_value = Mock(id = "aabbcc"))
     @patch('controllers.admin.admin_instance.get_gitlab_project_playbooks', side_effect = lambda x, y, z: [])
     @patch('controllers.admin.admin_instance.check_exist_instance', side_effect = lambda userid, instance_name, db: False)
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
-    def test_admin_create_instance(self, generate_hash_password, check_exist_instance, get_gitlab_project_playbooks, create_instance, register_instance, get_user_project_by_id, refresh_project_credentials, get_gitlab_project, getByPath, getUserByEmail, generate_hashed_name):
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
+    def test_admin_create_instance(self, generate_hash_password, check_exist_instance, get_gitlab_project_playbooks, enqueue_provisioning_job, register_instance, get_user_project_by_id, refresh_project_credentials, get_gitlab_project, getByPath, getUserByEmail, generate_hashed_name):
         # Given
         from controllers.admin.admin_instance import admin_add_instance
         from entities.Environment import Environment
@@ -188,4 +189,4 @@ class TestAdminInstance(TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(response_status_code, 200)
         self.assertIsInstance(result, JSONResponse)
-        self.assertEqual(result.body.decode(), '{"created_at":null,"environment_id":null,"hash":"aabbcc","id":1,"ip_address":null,"is_protected":false,"modification_date":null,"name":"test-aabbcc","project_id":null,"provider":"scaleway","region":"fr-par","root_dns_zone":"comwork.cloud","status":"ok","type":"DEV1-S","user":null,"user_id":1,"zone":"1","environment":"code","path":"code","gitlab_project":"https://gitlab.comwork.io/dynamic/test_project"}')
+        self.assertEqual(result.body.decode(), '{"created_at":null,"environment_id":null,"hash":"aabbcc","id":1,"ip_address":null,"is_protected":false,"modification_date":null,"name":"test-aabbcc","project_id":null,"provider":"scaleway","region":"fr-par","root_dns_zone":"comwork.cloud","status":"ok","type":"DEV1-S","user":null,"user_id":1,"zone":"1","environment":"code","path":"code","gitlab_project":"https://gitlab.comwork.io/dynamic/test_project","job_id":"aabbcc"}')
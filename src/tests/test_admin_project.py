@@ -64,7 +64,7 @@ class TestAdminProject(TestCase):
     @patch('entities.Project.Project.save')
     @patch('middleware.auth_guard.is_mock_test', side_effect = lambda: True)
     @patch('middleware.auth_guard.get_current_active_user', side_effect = lambda: test_current_user)
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
     @patch('utils.gitlab.create_gitlab_project')
     def test_add_admin_projects(self, create_gitlab_project_mock, generate_hash_password, get_current_active_user, is_mock_test, project_save_mock, mock_get_user_by_mail):
         # Given
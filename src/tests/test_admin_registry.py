@@ -28,7 +28,7 @@ class TestAdminRegistry(TestCase):
         self.assertEqual(getAllRegistriesByRegion.call_args[0][0], "scaleway")
         self.assertEqual(getAllRegistriesByRegion.call_args[0][1], "fr-par")
 
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
     @patch('entities.Registry.Registry.findById')
     def test_admin_get_registry(self, findById, generate_hash_password):
         # Given
@@ -98,7 +98,7 @@ class TestAdminRegistry(TestCase):
     @patch('entities.Registry.Registry.findById')
     @patch('controllers.admin.admin_registry.delete_registry', side_effect = None)
     @patch('entities.Registry.Registry.updateStatus', side_effect = None)
-    @patch('utils.common.generate_hash_password', side_effect = lambda p: p)
+    @patch('utils.password.hash_password', side_effect = lambda p: p)
     def test_admin_delete_registry(self, generate_hash_password, updateStatus, delete_registry_mock, findById):
         # Given
         from controllers.admin.admin_registry import admin_remove_registry
@@ -128,12 +128,12 @@ class TestAdminRegistry(TestCase):
         self.assertEqual(result.body.decode(),'{"status":"ok","message":"registry successfully deleted","i18n_code":"registry_deleted"}')
 
     @patch('entities.User.User.getUserByEmail')
-    @patch('utils.common.generate_hash_password', side_effect=lambda p: p)
+    @patch('utils.password.hash_password', side_effect=lambda p: p)
     @patch('utils.dynamic_name.generate_hashed_name', side_effect=lambda p: ("aabbcc", p, "test-aabbcc"))
     @patch('controllers.admin.admin_registry.register_registry')
-    @patch('controllers.admin.admin_registry.create_registry', side_effect=None)
+    @patch('controllers.admin.admin_registry.enqueue_provisioning_job', return_value=Mock(id="aabbcc"))
     def test_admin_add_registry(
-        self, create_registry, register_registry, generate_hash_password, generate_hashed_name, getUserByEmail
+        self, enqueue_provisioning_job, register_registry, generate_hash_password, generate_hashed_name, getUserByEmail
     ):
         # Given
         from controllers.admin.admin_registry import admin_add_registry
@@ -176,7 +176,7 @@ class TestAdminRegistry(TestCase):
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(
             result.body.decode(),
-            '{"access_key":null,"created_at":null,"endpoint":null,"hash":"aabbcc","id":1,"name":null,"provider":"scaleway","region":"fr-par","secret_key":null,"status":null,"type":"private","user_id":null}'
+            '{"access_key":null,"created_at":null,"endpoint":null,"hash":"aabbcc","id":1,"name":null,"provider":"scaleway","region":"fr-par","secret_key":null,"status":null,"type":"private","user_id":null,"job_id":"aabbcc"}'
         )
         # Additional checks for robustness
         self.assertEqual(registry.provider, "scaleway")
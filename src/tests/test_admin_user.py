@@ -19,9 +19,9 @@ class TestAdminUser(TestCase):
     def __init__(self, *args, **kwargs):
         super(TestAdminUser, self).__init__(*args, **kwargs)
     
-    @patch('entities.User.User.getAllUsers', side_effect = lambda x: [])
-    @patch('utils.paginator.get_paginated_list', side_effect = lambda w,x,y,z: [])
-    def test_admin_get_users(self, getAllUsers, get_paginated_list):    
+    @patch('entities.User.User.countUsers', side_effect = lambda x: 0)
+    @patch('entities.User.User.getUsersPage', side_effect = lambda x,y,z: [])
+    def test_admin_get_users(self, getUsersPage, countUsers):    
         # Given
         from controllers.admin.admin_user import admin_get_users
         from entities.User import User
@@ -34,8 +34,8 @@ class TestAdminUser(TestCase):
             confirmed=True, 
             is_admin=True
         )
-        get_paginated_list.return_value = [test_user]
-        getAllUsers.return_value = test_user
+        getUsersPage.return_value = [test_user]
+        countUsers.return_value = 0
 
         # When
         result = admin_get_users(test_current_user, no_per_page, page, mock_db)
@@ -46,6 +46,7 @@ class TestAdminUser(TestCase):
         self.assertEqual(response_status_code, 200)
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(result.body.decode(), '{"result":{"page":1,"no_per_page":10,"count":0,"previous":"","next":"","data":[]}}')
+        getUsersPage.assert_called_once_with(0, 10, mock_db)
     
     @patch('entities.User.User.getUserById', side_effect = lambda x,y:[]) 
     def test_admin_get_user(self, getUserById):
@@ -0,0 +1,37 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils.auth_cache import cache_principal, get_cached_principal, get_principal_key, invalidate_principals
+
+class TestAuthCache(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestAuthCache, self).__init__(*args, **kwargs)
+
+    def test_principal_key_is_hashed(self):
+        # Given
+        credential = "my-secret-key"
+
+        # When
+        key = get_principal_key("apikey", credential)
+
+        # Then
+        self.assertTrue(key.startswith("apikey:"))
+        self.assertNotIn(credential, key)
+        self.assertNotEqual(key, get_principal_key("token", credential))
+
+    @patch('utils.auth_cache.broadcast')
+    @patch('utils.auth_cache.start_broadcast_listener')
+    def test_invalidate_principals(self, start_broadcast_listener, broadcast):
+        # Given
+        cache_principal("token:1", 1, {'id': 1})
+        cache_principal("apikey:1", 1, {'id': 1})
+        cache_principal("token:2", 2, {'id': 2})
+
+        # When
+        invalidate_principals(1)
+
+        # Then
+        self.assertIsNone(get_cached_principal("token:1"))
+        self.assertIsNone(get_cached_principal("apikey:1"))
+        self.assertEqual(get_cached_principal("token:2")['attributes'], {'id': 2})
+        broadcast.assert_called_once_with("auth", {'user_id': 1})
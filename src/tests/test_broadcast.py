@@ -0,0 +1,38 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.broadcast import _listeners, listen_broadcast, start_broadcast_listener
+
+class TestBroadcast(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestBroadcast, self).__init__(*args, **kwargs)
+
+    @patch('utils.broadcast.time.sleep')
+    @patch('utils.broadcast._pubsub_adapter')
+    def test_listener_subscribes_again_after_exit(self, pubsub_adapter, sleep):
+        # Given
+        consume = pubsub_adapter.return_value.consume
+        consume.side_effect = [SystemExit(1), Exception("connection lost"), KeyboardInterrupt()]
+
+        # When
+        with self.assertRaises(KeyboardInterrupt):
+            listen_broadcast("channel", Mock())
+
+        # Then
+        self.assertEqual(consume.call_count, 3)
+
+    @patch('utils.broadcast.threading.Thread')
+    def test_dead_listener_is_restarted(self, thread):
+        # Given
+        _listeners["dead-channel"] = Mock(is_alive = Mock(return_value = False))
+        _listeners["alive-channel"] = Mock(is_alive = Mock(return_value = True))
+
+        # When
+        start_broadcast_listener("dead-channel", Mock())
+        start_broadcast_listener("alive-channel", Mock())
+
+        # Then
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+        self.assertIs(_listeners.pop("dead-channel"), thread.return_value)
+        _listeners.pop("alive-channel")
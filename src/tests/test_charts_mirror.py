@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from git import Actor, Repo
+
+from utils.gitlab import push_files_to_repository
+from utils.kubernetes.charts_mirror import ChartsMirror
+from utils.kubernetes.deployment_env import get_charts_files
+
+_author = Actor("test", "test@example.com")
+
+def write_file(root, path, content):
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok = True)
+    with open(full_path, "w") as file:
+        file.write(content)
+
+class TestChartsMirror(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestChartsMirror, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.tmp_dir, "source")
+        self.source = Repo.init(self.source_path, initial_branch = "main")
+        write_file(self.source_path, "charts/nginx/Chart.yaml", "name: nginx")
+        write_file(self.source_path, "charts/nginx/templates/deployment.yaml", "kind: Deployment")
+        write_file(self.source_path, "charts/redis/external-chart.yaml", "name: redis\nversion: 1.0.0\nrepository: https://charts.example.com")
+        write_file(self.source_path, "charts/postgres/Chart.yaml", "name: postgres")
+        self.commit("init")
+        self.mirror = ChartsMirror(self.source_path, os.path.join(self.tmp_dir, "mirror"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def commit(self, message):
+        self.source.git.add(A = True)
+        return self.source.index.commit(message, author = _author, committer = _author)
+
+    def test_get_charts_files_of_the_selected_charts(self):
+        # Given
+        charts = ["nginx", "redis"]
+        external_charts = []
+
+        # When
+        files = get_charts_files(self.mirror.refresh(), charts, external_charts)
+
+        # Then
+        self.assertEqual(sorted(file["path"] for file in files), ["/charts/nginx/Chart.yaml", "/charts/nginx/templates/deployment.yaml"])
+        self.assertEqual(charts, ["nginx"])
+        self.assertEqual([chart.name for chart in external_charts], ["redis"])
+
+    @patch('utils.kubernetes.charts_mirror.CHARTS_MIRROR_REFRESH_TIME', 0)
+    def test_refresh_fetches_the_new_commits(self):
+        # Given
+        self.mirror.refresh()
+        write_file(self.source_path, "charts/nginx/Chart.yaml", "name: nginx\nversion: 2")
+        expected = self.commit("update")
+
+        # When
+        commit = self.mirror.refresh()
+
+        # Then
+        self.assertEqual(commit.hexsha, expected.hexsha)
+        self.assertTrue(Repo(self.mirror.path).bare)
+
+    @patch('utils.kubernetes.charts_mirror.CHARTS_MIRROR_REFRESH_TIME', 3600)
+    def test_refresh_is_throttled(self):
+        # Given
+        first = self.mirror.refresh()
+        write_file(self.source_path, "charts/nginx/Chart.yaml", "name: nginx\nversion: 2")
+        self.commit("update")
+
+        # When
+        commit = self.mirror.refresh()
+
+        # Then
+        self.assertEqual(commit.hexsha, first.hexsha)
+
+    def test_push_files_with_one_tree_listing(self):
+        # Given
+        project = Mock()
+        project.repository_tree.return_value = [{'path': "Chart.yaml", 'type': "blob"}, {'path': "charts", 'type': "tree"}]
+        gitlab_connection = Mock()
+        gitlab_connection.projects.get.return_value = project
+        files = [{'path': "/Chart.yaml", 'content': "a"}, {'path': "/charts/nginx/Chart.yaml", 'content': "b"}]
+
+        # When
+        push_files_to_repository(files, gitlab_connection, 1, "main", "Added Manifest")
+
+        # Then
+        project.files.get.assert_not_called()
+        project.commits.create.assert_called_once_with({
+            'branch': "main",
+            'commit_message': "Added Manifest",
+            'actions': [
+                {'action': "update", 'file_path': "/Chart.yaml", 'content': "a"},
+                {'action': "create", 'file_path': "/charts/nginx/Chart.yaml", 'content': "b"}
+            ]
+        })
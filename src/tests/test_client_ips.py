@@ -0,0 +1,59 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.client_ips import get_client_ip, get_trusted_client_ip
+
+class TestClientIps(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestClientIps, self).__init__(*args, **kwargs)
+
+    def test_get_client_ip_prefers_the_real_ip(self):
+        # Given
+        request = Mock(headers = {"X-Real-IP": "198.51.100.4", "X-Forwarded-For": "203.0.113.7, 10.0.0.1"})
+
+        # When
+        result = get_client_ip(request)
+
+        # Then
+        self.assertEqual(result, "198.51.100.4")
+
+    def test_get_client_ip_from_the_forwarded_for(self):
+        # Given
+        request = Mock(headers = {"X-Forwarded-For": "203.0.113.7, 10.0.0.1"})
+
+        # When
+        result = get_client_ip(request)
+
+        # Then
+        self.assertEqual(result, "203.0.113.7")
+
+    def test_get_client_ip_without_proxy(self):
+        # Given
+        request = Mock(headers = {}, client = Mock(host = "192.0.2.1"))
+
+        # When
+        result = get_client_ip(request)
+
+        # Then
+        self.assertEqual(result, "192.0.2.1")
+
+    def test_get_trusted_client_ip_ignores_the_headers_of_clients(self):
+        # Given
+        request = Mock(headers = {"X-Real-IP": "198.51.100.4", "X-Forwarded-For": "203.0.113.7"}, client = Mock(host = "192.0.2.1"))
+
+        # When
+        result = get_trusted_client_ip(request)
+
+        # Then
+        self.assertEqual(result, "192.0.2.1")
+
+    @patch('utils.client_ips._trusted_proxies', ["10.0.0.1", "10.0.0.2"])
+    def test_get_trusted_client_ip_behind_trusted_proxies(self):
+        # Given
+        request = Mock(headers = {"X-Forwarded-For": "203.0.113.7, 198.51.100.4, 10.0.0.2"}, client = Mock(host = "10.0.0.1"))
+
+        # When
+        result = get_trusted_client_ip(request)
+
+        # Then
+        self.assertEqual(result, "198.51.100.4")
@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils import cloud_config
+from utils.cloud_config import get_cloud_config
+
+_config_v1 = """
+providers:
+  - name: scaleway
+    instance_configs:
+      - region: fr-par
+        zones:
+          - name: 1
+            instance_types:
+              - type: DEV1-S
+                price_variable: PRICE_DEV1_S
+"""
+
+_config_v2 = """
+providers:
+  - name: scaleway
+  - name: ovh
+"""
+
+class TestCloudConfig(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCloudConfig, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        fd, self.config_path = tempfile.mkstemp(suffix = ".yml")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.config_path)
+
+    def write_config(self, content, mtime):
+        with open(self.config_path, "w") as stream:
+            stream.write(content)
+        os.utime(self.config_path, (mtime, mtime))
+
+    def test_indexes(self):
+        # Given
+        self.write_config(_config_v1, 1000)
+
+        # When
+        with patch.object(cloud_config, '_config_path', self.config_path), patch.object(cloud_config, '_config', None):
+            config = get_cloud_config()
+
+        # Then
+        self.assertEqual(config.get_provider("scaleway")['name'], "scaleway")
+        self.assertIsNone(config.get_provider("aws"))
+        self.assertEqual(config.get_region("scaleway", "fr-par")['region'], "fr-par")
+        self.assertEqual(config.get_zone("scaleway", "fr-par", "1")['instance_types'][0]['type'], "DEV1-S")
+        self.assertIsNone(config.get_zone("scaleway", "fr-par", "2"))
+
+    def test_parse_once_and_reload_on_change(self):
+        # Given
+        self.write_config(_config_v1, 1000)
+
+        with patch.object(cloud_config, '_config_path', self.config_path), patch.object(cloud_config, '_config', None):
+            # When
+            first = get_cloud_config()
+            second = get_cloud_config()
+            self.write_config(_config_v2, 2000)
+            reloaded = get_cloud_config()
+
+        # Then
+        self.assertIs(first, second)
+        self.assertIsNot(first, reloaded)
+        self.assertEqual(sorted(reloaded.providers.keys()), ["ovh", "scaleway"])
+
+    def test_keep_previous_config_on_invalid_file(self):
+        # Given
+        self.write_config(_config_v1, 1000)
+
+        with patch.object(cloud_config, '_config_path', self.config_path), patch.object(cloud_config, '_config', None):
+            first = get_cloud_config()
+            self.write_config("providers: [", 2000)
+
+            # When
+            config = get_cloud_config()
+
+        # Then
+        self.assertIs(first, config)
+        self.assertIsNotNone(config.get_provider("scaleway"))
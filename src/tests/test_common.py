@@ -5,11 +5,12 @@ from unittest import TestCase
 from unittest.mock import Mock
 from unittest.mock import patch
 
-from utils.common import generate_hash_password, verify_password, is_boolean, is_not_empty, is_true, is_empty_key, del_key_if_exists, is_numeric, is_disabled, safe_compare_entry, safe_get_entry, is_response_ok, unbase64, is_uuid, to_camel_case, convert_dict_keys_to_camel_case, get_admin_status, get_env_int, sanitize_metric_name, sanitize_header_name, is_http_status_code
+from utils.common import is_boolean, is_not_empty, is_true, is_empty_key, del_key_if_exists, is_numeric, is_disabled, safe_compare_entry, safe_get_entry, is_response_ok, unbase64, is_uuid, to_camel_case, convert_dict_keys_to_camel_case, get_admin_status, get_env_int, sanitize_metric_name, sanitize_header_name, is_http_status_code
+from utils.password import hash_password, verify_password
 
 class TestCommonUtils(TestCase):
     def test_verify_password(self):
-        hashed = generate_hash_password("test123")
+        hashed = hash_password("test123")
         self.assertTrue(verify_password("test123", hashed))
         self.assertFalse(verify_password("wrong", hashed))
 
@@ -0,0 +1,44 @@
+import asyncio
+import threading
+
+from unittest import TestCase
+
+from utils.faas.completions import register_completion_waiter, resolve_completion_waiters, unregister_completion_waiter, _waiters
+
+class TestCompletions(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCompletions, self).__init__(*args, **kwargs)
+
+    def test_wake_up_on_completion(self):
+        # Given
+        async def wait_completion():
+            waiter = register_completion_waiter("invocation-id")
+            try:
+                threading.Timer(0.05, lambda: resolve_completion_waiters("invocation-id")).start()
+                return await waiter.wait(5)
+            finally:
+                unregister_completion_waiter(waiter)
+
+        # When
+        result = asyncio.run(wait_completion())
+
+        # Then
+        self.assertTrue(result)
+        self.assertNotIn("invocation-id", _waiters)
+
+    def test_wait_timeout(self):
+        # Given
+        async def wait_completion():
+            waiter = register_completion_waiter("invocation-id")
+            try:
+                resolve_completion_waiters("another-invocation-id")
+                return await waiter.wait(0.05)
+            finally:
+                unregister_completion_waiter(waiter)
+
+        # When
+        result = asyncio.run(wait_completion())
+
+        # Then
+        self.assertFalse(result)
+        self.assertNotIn("invocation-id", _waiters)
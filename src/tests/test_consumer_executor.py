@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from unittest import TestCase
+
+from utils.executor import ConsumerExecutor
+
+class TestConsumerExecutor(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestConsumerExecutor, self).__init__(*args, **kwargs)
+
+    def test_dispatch_bounded_concurrency(self):
+        # Given
+        executor = ConsumerExecutor(2)
+        lock = threading.Lock()
+        done = threading.Event()
+        counters = { 'in_flight': 0, 'max_in_flight': 0, 'handled': 0 }
+
+        async def handler(msg):
+            with lock:
+                counters['in_flight'] = counters['in_flight'] + 1
+                counters['max_in_flight'] = max(counters['max_in_flight'], counters['in_flight'])
+            await asyncio.sleep(0.01)
+            with lock:
+                counters['in_flight'] = counters['in_flight'] - 1
+                counters['handled'] = counters['handled'] + 1
+                if counters['handled'] == 6:
+                    done.set()
+
+        # When
+        for msg in range(6):
+            executor.dispatch(handler, msg)
+
+        # Then
+        self.assertTrue(done.wait(5))
+        self.assertEqual(counters['max_in_flight'], 2)
+
+    def test_adispatch_failing_handler(self):
+        # Given
+        executor = ConsumerExecutor(1)
+        handled = []
+
+        async def handler(msg):
+            if msg == "ko":
+                raise ValueError("boom")
+            handled.append(msg)
+
+        async def consume():
+            callback = executor.wrap(handler)
+            for msg in ["ko", "ok"]:
+                await callback(msg)
+            await asyncio.gather(*executor.tasks)
+
+        # When
+        asyncio.run(consume())
+
+        # Then
+        self.assertEqual(handled, ["ok"])
@@ -1,3 +1,5 @@
+import asyncio
+
 from unittest import TestCase
 from unittest.mock import Mock, patch
 
@@ -43,7 +45,7 @@ class TestData(TestCase):
         mock_user_auth.is_admin = True
 
         # When
-        result = add_data(test_current_user, mock_user_auth, payload, mock_db)
+        result = asyncio.run(add_data(test_current_user, mock_user_auth, payload, mock_db))
 
         # Then
         self.assertEqual(result['status'], 'ok')
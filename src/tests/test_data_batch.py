@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, patch
+from uuid import uuid4
+
+from entities.User import User
+from entities.faas.Function import FunctionEntity
+from entities.iot.Data import Data, NumericData, StringData
+from entities.iot.Device import Device
+from entities.iot.ObjectType import ObjectType
+from schemas.iot.Data import DataBatchSchema
+from tests.query_counter import QueryCountMixin, QueryCounter, get_test_session
+from utils.iot.object_type import _object_types_metadata, get_object_types_metadata, invalidate_function_metadata, invalidate_triggers_metadata
+
+def get_invocation_result(result):
+    return {'status': 'ok', 'entity': {'id': str(uuid4()), 'content': {'result': result}}}
+
+class TestDataBatch(TestCase, QueryCountMixin):
+    def __init__(self, *args, **kwargs):
+        super(TestDataBatch, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        _object_types_metadata.clear()
+        self.db = get_test_session()
+        self.current_user = Mock(id = 1, email = "user1@email.com", is_admin = False)
+        self.function_id = uuid4()
+        self.object_type_id = uuid4()
+        self.batch_object_type_id = uuid4()
+        self.devices = [uuid4() for _ in range(3)]
+        self.inactive_device = uuid4()
+        self.db.add(User(id = 1, email = "user1@email.com", enabled_features = {}))
+        self.db.add(FunctionEntity(id = self.function_id, is_public = False, owner_id = 1, content = {'args': ['data']}))
+        self.db.add(ObjectType(id = self.object_type_id, user_id = 1, content = {'decoding_function': str(self.function_id), 'triggers': []}, created_at = "2024-01-01", updated_at = "2024-01-01"))
+        self.db.add(ObjectType(id = self.batch_object_type_id, user_id = 1, content = {'decoding_function': str(self.function_id), 'triggers': [], 'batch_decoding': True}, created_at = "2024-01-01", updated_at = "2024-01-01"))
+        self.db.add_all([Device(id = device_id, typeobject_id = self.batch_object_type_id, username = "user1@email.com", active = True) for device_id in self.devices])
+        self.db.add(Device(id = self.inactive_device, typeobject_id = self.object_type_id, username = "user1@email.com", active = False))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_data_batch(self, readings, invoke_sync):
+        from controllers.iot.data import add_data_batch
+
+        payload = DataBatchSchema(data = [{'device_id': str(device_id), 'content': content} for device_id, content in readings])
+        with patch('controllers.iot.data.invoke_sync', invoke_sync), patch('controllers.iot.data.handle_trigger'):
+            response = asyncio.run(add_data_batch(self.current_user, Mock(), payload, self.db))
+        return response.status_code, json.loads(response.body.decode())
+
+    def test_batch_decoding_invokes_the_function_once(self):
+        # Given
+        readings = [(self.devices[i % 3], "{}".format(i)) for i in range(30)]
+        invoke_sync = AsyncMock(return_value = get_invocation_result(json.dumps([i if i % 2 == 0 else "value{}".format(i) for i in range(30)])))
+
+        # When
+        with QueryCounter(self.db) as counter:
+            status_code, result = self.add_data_batch(readings, invoke_sync)
+
+        # Then
+        self.assertEqual(status_code, 201)
+        self.assertEqual(len(result['results']), 30)
+        invoke_sync.assert_awaited_once()
+        self.assertEqual(json.loads(invoke_sync.await_args.args[0].content.args[0].value), ["{}".format(i) for i in range(30)])
+        self.assertEqual(self.db.query(Data).count(), 30)
+        self.assertEqual(self.db.query(NumericData).count(), 15)
+        self.assertEqual(self.db.query(StringData).count(), 15)
+        self.assertMaxQueries(counter, 7)
+
+    def test_invalid_readings_are_reported_without_blocking_the_others(self):
+        # Given
+        readings = [(self.devices[0], "1"), (uuid4(), "2"), ("not-a-uuid", "3"), (self.inactive_device, "4")]
+        invoke_sync = AsyncMock(return_value = get_invocation_result(json.dumps([1])))
+
+        # When
+        status_code, result = self.add_data_batch(readings, invoke_sync)
+
+        # Then
+        self.assertEqual(status_code, 207)
+        self.assertEqual([r['status'] for r in result['results']], ["ok", "ko", "ko", "ko"])
+        self.assertEqual([r.get('i18n_code') for r in result['results']], [None, "device_not_found", "device_not_found", "device_not_active"])
+        self.assertEqual(self.db.query(Data).count(), 1)
+
+    def test_unbatched_object_type_is_decoded_per_reading(self):
+        # Given
+        self.db.query(Device).filter(Device.id == self.inactive_device).update({'active': True})
+        self.db.commit()
+        readings = [(self.inactive_device, "a"), (self.inactive_device, "b")]
+        invoke_sync = AsyncMock(side_effect = [get_invocation_result("12"), {'status': 'ko', 'code': 500, 'message': 'Timeout', 'i18n_code': 'invocation_timeout'}])
+
+        # When
+        status_code, result = self.add_data_batch(readings, invoke_sync)
+
+        # Then
+        self.assertEqual(status_code, 207)
+        self.assertEqual(invoke_sync.await_count, 2)
+        self.assertEqual([r['status'] for r in result['results']], ["ok", "ko"])
+        self.assertEqual(self.db.query(NumericData).one().value, 12)
+
+    def test_batch_result_with_the_wrong_size_is_rejected(self):
+        # Given
+        readings = [(self.devices[0], "1"), (self.devices[1], "2")]
+        invoke_sync = AsyncMock(return_value = get_invocation_result(json.dumps([1])))
+
+        # When
+        status_code, result = self.add_data_batch(readings, invoke_sync)
+
+        # Then
+        self.assertEqual(status_code, 207)
+        self.assertEqual({r['i18n_code'] for r in result['results']}, {"decoding_function_invalid_batch_result"})
+        self.assertEqual(self.db.query(Data).count(), 0)
+
+    @patch('controllers.iot.data.IOT_DECODING_CONCURRENCY', 2)
+    def test_unbatched_readings_are_decoded_concurrently(self):
+        # Given
+        self.db.query(Device).filter(Device.id == self.inactive_device).update({'active': True})
+        self.db.commit()
+        readings = [(self.inactive_device, "{}".format(i)) for i in range(6)]
+        running = {'current': 0, 'max': 0}
+
+        async def invoke_sync(payload, current_user, user_auth, db):
+            running['current'] += 1
+            running['max'] = max(running['max'], running['current'])
+            await asyncio.sleep(0.01)
+            running['current'] -= 1
+            return get_invocation_result(payload.content.args[0].value)
+
+        # When
+        status_code, result = self.add_data_batch(readings, invoke_sync)
+
+        # Then
+        self.assertEqual(status_code, 201)
+        self.assertEqual(running['max'], 2)
+        self.assertEqual(sorted(row.value for row in self.db.query(NumericData).all()), [float(i) for i in range(6)])
+
+    @patch('controllers.iot.data.IOT_BATCH_MAX_SIZE', 2)
+    def test_batch_size_is_limited(self):
+        # Given
+        readings = [(self.devices[0], "1")] * 3
+
+        # When
+        status_code, result = self.add_data_batch(readings, AsyncMock())
+
+        # Then
+        self.assertEqual(status_code, 400)
+        self.assertEqual(result['i18n_code'], "iot_batch_invalid_size")
+
+    def test_metadata_is_invalidated_with_its_function_or_triggers(self):
+        # Given
+        trigger_id = str(uuid4())
+        get_object_types_metadata([self.object_type_id, self.batch_object_type_id], self.db)
+        _object_types_metadata.put("other", {'decoding_function': None, 'triggers': [{'id': trigger_id}]})
+
+        # When
+        invalidate_triggers_metadata([trigger_id])
+        after_trigger = _object_types_metadata.size()
+        invalidate_function_metadata(self.function_id)
+
+        # Then
+        self.assertEqual(after_trigger, 2)
+        self.assertEqual(_object_types_metadata.size(), 0)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from utils.observability.geoip import GeoIpDatabase
+
+class TestGeoIp(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestGeoIp, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile("w", suffix = ".csv", delete = False) as db_file:
+            db_file.write("ip_start,ip_end,continent,country,stateprov,city,latitude,longitude\n")
+            db_file.write("8.8.8.0,8.8.8.255,NA,US,California,\"Mountain View\",37.4,-122.1\n")
+            #? not sorted on purpose
+            db_file.write("1.0.0.0,1.0.0.255,OC,AU,Queensland,\"South Brisbane\",-27.4,153.0\n")
+            db_file.write("2001:db8::,2001:db8::ffff,EU,FR,Bretagne,Rennes,48.1,-1.6")
+        self.path = db_file.name
+        self.db = GeoIpDatabase(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        os.remove(self.path)
+
+    def test_lookup_in_ranges(self):
+        # Given
+        ips = ["1.0.0.0", "1.0.0.255", "8.8.8.8", "2001:db8::42"]
+
+        # When
+        cities = [self.db.lookup(ip)['city'] for ip in ips]
+
+        # Then
+        self.assertEqual(cities, ["South Brisbane", "South Brisbane", "Mountain View", "Rennes"])
+        self.assertEqual(self.db.size(), 3)
+
+    def test_lookup_outside_ranges(self):
+        # Given
+        ips = ["0.255.255.255", "1.0.1.0", "9.9.9.9", "2001:db9::1", "not-an-ip"]
+
+        # When
+        results = [self.db.lookup(ip) for ip in ips]
+
+        # Then
+        self.assertEqual(results, [None] * 5)
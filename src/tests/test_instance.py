@@ -34,8 +34,9 @@ class TestInstance(TestCase):
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(result.body.decode(), "[]")
 
+    @patch('entities.VmState.VmState.findStates', return_value = [])
     @patch('entities.Instance.Instance.findUserInstance')
-    def test_get_instance(self, findUserInstance):
+    def test_get_instance(self, findUserInstance, findStates):
         # Given
         from controllers.instance import get_instance
         from entities.Instance import Instance
@@ -93,7 +94,7 @@ class TestInstance(TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(response_status_code, 200)
         self.assertIsInstance(result, JSONResponse)
-        self.assertEqual(result.body.decode(), f'{{"created_at":null,"environment_id":1,"hash":"aabbcc","id":1,"ip_address":"127.0.0.1","is_protected":false,"modification_date":null,"name":"test-instance","project_id":1,"provider":"scaleway","region":"fr-par","root_dns_zone":null,"status":"active","type":"DEV1-S","user":null,"user_id":1,"zone":"comwork.cloud","environment":"test_environment","path":"environemnt_path","project":{{"access_token":null,"created_at":null,"git_username":null,"gitlab_host":null,"gitlab_project_id":"1","gitlab_token":"{self.test_token}","gitlab_url":"https://gitlab.comwork.io","gitlab_username":"amirghedira","id":1,"name":"test_project","namespace_id":null,"type":"vm","url":"https://gitlab.comwork.io/dynamic/test_project","user":null,"user_id":1,"userid":null}}}}')
+        self.assertEqual(result.body.decode(), f'{{"created_at":null,"environment_id":1,"hash":"aabbcc","id":1,"ip_address":"127.0.0.1","is_protected":false,"modification_date":null,"name":"test-instance","project_id":1,"provider":"scaleway","region":"fr-par","root_dns_zone":null,"status":"active","type":"DEV1-S","user":null,"user_id":1,"zone":"comwork.cloud","environment":"test_environment","path":"environemnt_path","project":{{"access_token":null,"created_at":null,"git_username":null,"gitlab_host":null,"gitlab_project_id":"1","gitlab_token":"{self.test_token}","gitlab_url":"https://gitlab.comwork.io","gitlab_username":"amirghedira","id":1,"name":"test_project","namespace_id":null,"type":"vm","url":"https://gitlab.comwork.io/dynamic/test_project","user":null,"user_id":1,"userid":null}},"vm":null}}')
     
     @patch('utils.dynamic_name.generate_hashed_name', side_effect = lambda p: ("aabbcc", p, "test-aabbcc"))
     @patch('entities.User.User.getUserById')
@@ -102,10 +103,10 @@ class TestInstance(TestCase):
     @patch('controllers.instance.get_user_project_by_id')
     @patch('controllers.instance.refresh_project_credentials')
     @patch('controllers.instance.register_instance')
-    @patch('controllers.instance.create_instance', side_effect = lambda provider, ami_image, instance_id, user_email, instance_name, hashed_instance_name, environment, instance_region, instance_zone, generate_dns, gitlab_project, user_project, instance_type, debug, centralized, root_dns_zone, db : "")
+    @patch('controllers.instance.enqueue_provisioning_job', return_value = Mock(id = "aabbcc"))
     @patch('utils.gitlab.get_gitlab_project_tree', side_effect = lambda x, y, z: [])
     @patch('controllers.instance.check_exist_instance', side_effect = lambda userid, instance_name, db: False)
-    def test_create_instance(self, check_exist_instance, get_gitlab_project_tree, create_instance, register_instance, get_user_project_by_id, refresh_project_credentials, get_gitlab_project, getByPath, getUserById, generate_hashed_name):
+    def test_create_instance(self, check_exist_instance, get_gitlab_project_tree, enqueue_provisioning_job, register_instance, get_user_project_by_id, refresh_project_credentials, get_gitlab_project, getByPath, getUserById, generate_hashed_name):
         # Given
         from controllers.instance import provision_instance
         from entities.Environment import Environment
@@ -214,7 +215,8 @@ class TestInstance(TestCase):
             "zone": "1",
             "environment": "code",
             "path": "code",
-            "gitlab_project": "https://gitlab.comwork.io/dynamic/test_project"
+            "gitlab_project": "https://gitlab.comwork.io/dynamic/test_project",
+            "job_id": "aabbcc"
         }
         self.assertEqual(actual_json, expected_json)
 
@@ -0,0 +1,163 @@
+import hashlib
+import threading
+import time
+
+from unittest import TestCase
+from unittest.mock import Mock, call, patch
+
+class TestInterpreterPool(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestInterpreterPool, self).__init__(*args, **kwargs)
+
+    @patch('consume.pool.InterpreterWorker')
+    def test_eval_reuse_worker(self, InterpreterWorker):
+        # Given
+        from consume.pool import InterpreterPool
+        worker = Mock(key = None)
+        worker.is_exhausted.return_value = False
+        worker.eval.return_value = "result"
+        InterpreterWorker.return_value = worker
+        pool = InterpreterPool("py", 1)
+
+        # When
+        results = [pool.eval("id1", "code"), pool.eval("id2", "code")]
+
+        # Then
+        self.assertEqual(results, ["result", "result"])
+        self.assertEqual(InterpreterWorker.call_count, 1)
+        worker.stop.assert_not_called()
+
+    @patch('consume.pool.InterpreterWorker')
+    def test_eval_recycle_exhausted_worker(self, InterpreterWorker):
+        # Given
+        from consume.pool import InterpreterPool
+        exhausted_worker = Mock(key = None)
+        exhausted_worker.is_exhausted.side_effect = [False, True]
+        exhausted_worker.eval.return_value = "result"
+        fresh_worker = Mock(key = None)
+        fresh_worker.is_exhausted.return_value = False
+        InterpreterWorker.side_effect = [exhausted_worker, fresh_worker]
+        pool = InterpreterPool("py", 1)
+
+        # When
+        result = pool.eval("id", "code")
+
+        # Then
+        self.assertEqual(result, "result")
+        exhausted_worker.stop.assert_called_once()
+        self.assertEqual(pool.acquire(), fresh_worker)
+
+    @patch('consume.pool.InterpreterWorker', side_effect=OSError("interpreter not found"))
+    def test_eval_without_interpreter(self, InterpreterWorker):
+        # Given
+        from consume.pool import InterpreterPool
+        pool = InterpreterPool("js", 1)
+
+        # When
+        with self.assertRaises(RuntimeError):
+            pool.eval("id", "code")
+
+        # Then
+        self.assertEqual(len(pool.idle), 1)
+
+    @patch('consume.pool.InterpreterWorker')
+    def test_eval_recycle_worker_of_another_key(self, InterpreterWorker):
+        # Given
+        from consume.pool import InterpreterPool
+        first_worker, second_worker = Mock(key = None), Mock(key = None)
+        for worker in [first_worker, second_worker]:
+            worker.is_exhausted.return_value = False
+        InterpreterWorker.side_effect = [first_worker, second_worker]
+        pool = InterpreterPool("js", 1)
+
+        # When
+        pool.eval("id1", "code", "function-1")
+        pool.eval("id2", "code", "function-1")
+        pool.eval("id3", "code", "function-2")
+
+        # Then
+        self.assertEqual(first_worker.eval.call_count, 2)
+        first_worker.stop.assert_called_once()
+        second_worker.eval.assert_called_once_with("id3", "code")
+        self.assertEqual(second_worker.key, "function-2")
+
+    @patch('consume.pool.InterpreterWorker')
+    def test_eval_reuse_fresh_context_worker_across_keys(self, InterpreterWorker):
+        # Given
+        from consume.pool import InterpreterPool
+        worker = Mock(key = None)
+        worker.is_exhausted.return_value = False
+        InterpreterWorker.return_value = worker
+        pool = InterpreterPool("py", 1)
+
+        # When
+        pool.eval("id1", "code", "function-1")
+        pool.eval("id2", "code", "function-2")
+
+        # Then
+        self.assertEqual(InterpreterWorker.call_count, 1)
+        worker.stop.assert_not_called()
+
+    @patch('consume.pool.get_script_output', return_value = "result")
+    @patch('consume.pool.os.path.exists', return_value = True)
+    @patch('consume.pool.create_dir_if_not_exists')
+    @patch('consume.pool.shutil.rmtree')
+    def test_go_concurrent_calls_build_once(self, rmtree, create_dir_if_not_exists, exists, get_script_output):
+        # Given
+        from consume.pool import GoBinaryCache
+        cache = GoBinaryCache(2)
+        cache.build = Mock(side_effect = lambda *args: time.sleep(0.1))
+        threads = [threading.Thread(target = cache.eval, args = ("id{}".format(i), "code")) for i in range(3)]
+
+        # When
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Then
+        cache.build.assert_called_once()
+        self.assertEqual(get_script_output.call_count, 3)
+
+    @patch('consume.pool.get_sandbox_env', return_value = {'PATH': "/usr/bin"})
+    @patch('consume.pool.get_script_output', return_value = "result")
+    @patch('consume.pool.os.path.exists', return_value = True)
+    @patch('consume.pool.create_dir_if_not_exists')
+    @patch('consume.pool.shutil.rmtree')
+    def test_go_args_are_passed_at_run_time(self, rmtree, create_dir_if_not_exists, exists, get_script_output, get_sandbox_env):
+        # Given
+        from consume.pool import GoBinaryCache
+        cache = GoBinaryCache(2)
+        cache.build = Mock()
+
+        # When
+        cache.eval("id1", "code", ["a b", "c"])
+        cache.eval("id2", "code", ["d"])
+
+        # Then
+        cache.build.assert_called_once()
+        binary_path = cache.build.call_args.args[2]
+        get_script_output.assert_any_call("{} 'a b' c".format(binary_path), env = {'PATH': "/usr/bin"})
+        get_script_output.assert_any_call("{} d".format(binary_path), env = {'PATH': "/usr/bin"})
+
+    @patch('consume.pool.quiet_remove')
+    @patch('consume.pool.get_script_output', return_value = "result")
+    @patch('consume.pool.os.path.exists', return_value = True)
+    @patch('consume.pool.create_dir_if_not_exists')
+    @patch('consume.pool.shutil.rmtree')
+    def test_go_evicted_binary_is_removed_after_its_last_run(self, rmtree, create_dir_if_not_exists, exists, get_script_output, quiet_remove):
+        # Given
+        from consume.pool import GoBinaryCache
+        cache = GoBinaryCache(1)
+        cache.build = Mock()
+        cache.eval("id1", "code1")
+        binary_path = cache.acquire(hashlib.sha256("code1".encode('utf-8')).hexdigest())
+
+        # When
+        cache.eval("id2", "code2")
+        removed_while_running = call(binary_path) in quiet_remove.call_args_list
+        cache.release(binary_path)
+
+        # Then
+        self.assertFalse(removed_while_running)
+        quiet_remove.assert_any_call(binary_path)
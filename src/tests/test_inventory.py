@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+from entities.Instance import Instance
+from entities.VmState import VmState
+from tests.query_counter import QueryCountMixin, QueryCounter, get_test_session
+from utils.dynamic_name import rehash_dynamic_name
+from utils.instance import update_instance_status
+from utils.inventory import INVENTORY_MAX_AGE, get_instance_vm, get_instances_vms, sync_inventory
+
+def get_state(provider, server):
+    return {"RUNNING": "running", "STOPPED": "stopped", "BOOTING": "starting"}.get(server['state'], "starting")
+
+class TestInventory(TestCase, QueryCountMixin):
+    def __init__(self, *args, **kwargs):
+        super(TestInventory, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.db = get_test_session()
+        self.db.add_all([
+            Instance(id = 1, name = "vm1", hash = "aaa", provider = "scaleway", region = "fr-par", zone = "1", status = "active"),
+            Instance(id = 2, name = "vm2", hash = "bbb", provider = "scaleway", region = "fr-par", zone = "2", status = "active"),
+            Instance(id = 3, name = "vm3", hash = "ccc", provider = "aws", region = "eu-west-1", zone = "a", status = "active"),
+            Instance(id = 4, name = "vm4", hash = "ddd", provider = "scaleway", region = "fr-par", zone = "1", status = "deleted")
+        ])
+        self.db.commit()
+
+        self.patches = [
+            patch('utils.inventory.get_server_state', side_effect = get_state),
+            patch('utils.inventory.get_virtual_machine'),
+            patch('utils.inventory.list_virtual_machines')
+        ]
+        _, self.get_virtual_machine, self.list_virtual_machines = [p.start() for p in self.patches]
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.db.close()
+
+    def get_instance(self, id):
+        return Instance.findInstanceById(id, self.db)
+
+    def save_state(self, instance_id, state, synced_at):
+        instance = self.get_instance(instance_id)
+        hashed_name = rehash_dynamic_name(instance.name, instance.hash)
+        VmState.saveStates(instance.provider, instance.region, {hashed_name: (instance.zone, "server-{}".format(instance_id), state.upper(), state)}, synced_at, self.db)
+
+    def test_sync_lists_each_region_once(self):
+        # Given
+        vm1, vm2 = rehash_dynamic_name("vm1", "aaa"), rehash_dynamic_name("vm2", "bbb")
+        self.list_virtual_machines.side_effect = lambda provider, region, zones, names: {vm1: {"id": "server-1", "state": "RUNNING"}} if provider == "scaleway" else None
+
+        # When
+        synced = sync_inventory(self.db)
+
+        # Then
+        self.assertEqual(synced, 1)
+        self.assertEqual(self.list_virtual_machines.call_count, 2)
+        self.list_virtual_machines.assert_any_call("scaleway", "fr-par", ["1", "2"], [vm1, vm2])
+        self.assertEqual(VmState.findState("scaleway", vm1, self.db).state, "running")
+        self.assertIsNone(VmState.findState("scaleway", vm2, self.db))
+
+    def test_sync_removes_the_vanished_vms(self):
+        # Given
+        self.save_state(2, "running", datetime.now())
+        self.list_virtual_machines.side_effect = lambda provider, region, zones, names: {} if provider == "scaleway" else None
+
+        # When
+        sync_inventory(self.db)
+
+        # Then
+        self.assertIsNone(VmState.findState("scaleway", rehash_dynamic_name("vm2", "bbb"), self.db))
+
+    def test_fresh_state_is_read_from_the_index(self):
+        # Given
+        self.save_state(1, "stopped", datetime.now())
+
+        # When
+        vm = get_instance_vm(self.get_instance(1), self.db)
+
+        # Then
+        self.get_virtual_machine.assert_not_called()
+        self.assertEqual((vm['id'], vm['state'], vm['raw_state']), ("server-1", "stopped", "STOPPED"))
+
+    def test_refresh_reads_the_provider(self):
+        # Given
+        self.save_state(1, "stopped", datetime.now())
+        self.get_virtual_machine.return_value = {"id": "server-1", "state": "RUNNING"}
+
+        # When
+        vm = get_instance_vm(self.get_instance(1), self.db, refresh = True)
+
+        # Then
+        self.get_virtual_machine.assert_called_once()
+        self.assertEqual(vm['state'], "running")
+        self.assertEqual(VmState.findState("scaleway", rehash_dynamic_name("vm1", "aaa"), self.db).state, "running")
+
+    def test_outdated_or_transitional_state_reads_the_provider(self):
+        # Given
+        self.save_state(1, "running", datetime.now() - timedelta(seconds = INVENTORY_MAX_AGE + 1))
+        self.save_state(2, "starting", datetime.now())
+        self.get_virtual_machine.return_value = {"id": "server", "state": "RUNNING"}
+
+        # When
+        get_instance_vm(self.get_instance(1), self.db)
+        get_instance_vm(self.get_instance(2), self.db)
+
+        # Then
+        self.assertEqual(self.get_virtual_machine.call_count, 2)
+
+    def test_unknown_vm_is_removed_from_the_index(self):
+        # Given
+        self.save_state(1, "running", datetime.now())
+        self.get_virtual_machine.return_value = None
+
+        # When
+        vm = get_instance_vm(self.get_instance(1), self.db, refresh = True)
+
+        # Then
+        self.assertIsNone(vm)
+        self.assertIsNone(VmState.findState("scaleway", rehash_dynamic_name("vm1", "aaa"), self.db))
+
+    @patch('utils.instance.update_virtual_machine_status')
+    def test_action_evicts_the_indexed_state(self, update_virtual_machine_status):
+        # Given
+        self.save_state(1, "running", datetime.now())
+
+        # When
+        update_instance_status(self.get_instance(1), "server-1", "poweroff", self.db)
+
+        # Then
+        update_virtual_machine_status.assert_called_once()
+        self.assertIsNone(VmState.findState("scaleway", rehash_dynamic_name("vm1", "aaa"), self.db))
+
+    def test_listing_reads_the_index_in_one_query(self):
+        # Given
+        self.save_state(1, "running", datetime.now())
+        self.save_state(2, "stopped", datetime.now())
+        instances = [self.get_instance(1), self.get_instance(2)]
+
+        # When
+        with QueryCounter(self.db) as counter:
+            vms = get_instances_vms(instances, self.db)
+
+        # Then
+        self.assertMaxQueries(counter, 1)
+        self.assertEqual([vm['state'] for vm in vms], ["running", "stopped"])
+        self.get_virtual_machine.assert_not_called()
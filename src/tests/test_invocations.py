@@ -176,3 +176,18 @@ class TestInvocations(TestCase):
                 }
             }
         ])
+
+    @patch('controllers.faas.invocations.get_current_cid', return_value = "cid")
+    def test_complete_invalid_function_id(self, get_current_cid):
+        # Given
+        from controllers.faas.invocations import complete
+        payload = Mock()
+        payload.content.state = "complete"
+        payload.content.function_id = "not-a-uuid"
+        db = Mock()
+
+        # When
+        result = complete("invocation-id", payload, test_current_user, db)
+
+        # Then
+        self.assertEqual((result['code'], result['i18n_code'], result['cid']), (400, 'faas_invalid_function_id', "cid"))
@@ -0,0 +1,134 @@
+import time
+
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.kubernetes import client_cache
+from utils.kubernetes.client_cache import ResourceInformer, evict_kubeconfig_client, get_kubeconfig_client
+
+def get_kubeconfig(server):
+    return """
+apiVersion: v1
+kind: Config
+current-context: test
+clusters:
+- name: test
+  cluster:
+    server: {}
+contexts:
+- name: test
+  context:
+    cluster: test
+    user: test
+users:
+- name: test
+  user:
+    token: test-token
+""".format(server).encode()
+
+def get_item(namespace, name):
+    return SimpleNamespace(metadata = SimpleNamespace(namespace = namespace, name = name))
+
+class TestK8sClientCache(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestK8sClientCache, self).__init__(*args, **kwargs)
+
+    def tearDown(self):
+        for kubeconfig_file_id in list(client_cache._clients.keys()):
+            evict_kubeconfig_client(kubeconfig_file_id)
+
+    def test_client_is_cached_by_kubeconfig(self):
+        # Given
+        kubeconfig_file = Mock(id = 1, content = get_kubeconfig("https://cluster1:6443"))
+
+        # When
+        first = get_kubeconfig_client(kubeconfig_file)
+        second = get_kubeconfig_client(kubeconfig_file)
+
+        # Then
+        self.assertIs(first, second)
+        self.assertEqual(first.api_client.configuration.host, "https://cluster1:6443")
+
+    def test_clients_dont_share_their_configuration(self):
+        # Given
+        first_file = Mock(id = 1, content = get_kubeconfig("https://cluster1:6443"))
+        second_file = Mock(id = 2, content = get_kubeconfig("https://cluster2:6443"))
+
+        # When
+        first = get_kubeconfig_client(first_file)
+        second = get_kubeconfig_client(second_file)
+
+        # Then
+        self.assertEqual(first.core_v1().api_client.configuration.host, "https://cluster1:6443")
+        self.assertEqual(second.core_v1().api_client.configuration.host, "https://cluster2:6443")
+
+    def test_new_content_replaces_the_client(self):
+        # Given
+        first = get_kubeconfig_client(Mock(id = 1, content = get_kubeconfig("https://cluster1:6443")))
+
+        # When
+        second = get_kubeconfig_client(Mock(id = 1, content = get_kubeconfig("https://cluster3:6443")))
+
+        # Then
+        self.assertIsNot(first, second)
+        self.assertEqual(second.api_client.configuration.host, "https://cluster3:6443")
+        self.assertEqual(len(client_cache._clients), 1)
+
+    @patch('utils.kubernetes.client_cache.K8S_CLIENT_CACHE_SIZE', 2)
+    def test_least_recently_used_client_is_evicted(self):
+        # Given
+        for kubeconfig_file_id in [1, 2, 3]:
+            get_kubeconfig_client(Mock(id = kubeconfig_file_id, content = get_kubeconfig("https://cluster{}:6443".format(kubeconfig_file_id))))
+
+        # When
+        keys = list(client_cache._clients.keys())
+
+        # Then
+        self.assertEqual(keys, [2, 3])
+
+    def test_informer_applies_the_events(self):
+        # Given
+        list_fn = Mock(return_value = SimpleNamespace(items = [get_item("default", "pod1"), get_item("default", "pod2")], metadata = SimpleNamespace(resource_version = "10")))
+        informer = ResourceInformer("pods", list_fn)
+
+        # When
+        resource_version = informer.relist()
+        informer.apply({'type': "ADDED", 'object': get_item("default", "pod3")})
+        informer.apply({'type': "DELETED", 'object': get_item("default", "pod1")})
+        informer.apply({'type': "BOOKMARK", 'object': {}})
+
+        # Then
+        self.assertEqual(resource_version, "10")
+        self.assertTrue(informer.synced.is_set())
+        self.assertEqual(sorted(item.metadata.name for item in informer.items()), ["pod2", "pod3"])
+
+    @patch('utils.kubernetes.client_cache.K8S_INFORMER_ENABLED', False)
+    def test_list_objects_without_informer(self):
+        # Given
+        cluster_client = get_kubeconfig_client(Mock(id = 1, content = get_kubeconfig("https://cluster1:6443")))
+        list_fn = Mock(return_value = SimpleNamespace(items = [get_item("default", "svc1")]))
+
+        # When
+        with patch.dict(client_cache._informer_resources, {'services': lambda api_client: list_fn}):
+            result = cluster_client.list_objects('services')
+
+        # Then
+        self.assertEqual([item.metadata.name for item in result], ["svc1"])
+        self.assertEqual(cluster_client.informers, {})
+
+    @patch('utils.kubernetes.client_cache.K8S_CLIENT_CLOSE_DELAY', 0.05)
+    def test_evicted_client_is_closed_after_a_delay(self):
+        # Given
+        cluster_client = get_kubeconfig_client(Mock(id = 1, content = get_kubeconfig("https://cluster1:6443")))
+        cluster_client.api_client = Mock()
+
+        # When
+        evict_kubeconfig_client(1)
+        closed_at_once = cluster_client.api_client.close.called
+
+        # Then
+        self.assertFalse(closed_at_once)
+        self.assertNotIn(1, client_cache._clients)
+        time.sleep(0.2)
+        cluster_client.api_client.close.assert_called_once()
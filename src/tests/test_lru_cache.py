@@ -0,0 +1,70 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils.lru_cache import TtlLruCache
+
+class TestTtlLruCache(TestCase):
+    def test_get_missing_key(self):
+        # Given
+        cache = TtlLruCache(2, 60)
+
+        # When
+        result = cache.get("missing")
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_evict_least_recently_used(self):
+        # Given
+        cache = TtlLruCache(2, 60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+
+        # When
+        cache.put("c", 3)
+
+        # Then
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    @patch('utils.lru_cache.time.monotonic', side_effect=[0, 30, 61])
+    def test_expired_entry(self, monotonic):
+        # Given
+        cache = TtlLruCache(2, 60)
+        cache.put("a", 1)
+
+        # When
+        results = [cache.get("a"), cache.get("a")]
+
+        # Then
+        self.assertEqual(results, [1, None])
+        self.assertEqual(cache.size(), 0)
+
+    def test_delete(self):
+        # Given
+        cache = TtlLruCache(2, 60)
+        cache.put("a", 1)
+
+        # When
+        cache.delete("a")
+        cache.delete("unknown")
+
+        # Then
+        self.assertIsNone(cache.get("a"))
+
+    def test_delete_if(self):
+        # Given
+        cache = TtlLruCache(3, 60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.put("c", 3)
+
+        # When
+        cache.delete_if(lambda value: value % 2 == 1)
+
+        # Then
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        self.assertIsNone(cache.get("c"))
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils.observability.monitor import MonitorEngine
+
+def get_entry(monitor_id, interval = 60):
+    return {
+        'id': monitor_id,
+        'interval': interval,
+        'monitor': {'name': "monitor-{}".format(monitor_id), 'type': "http", 'url': "http://localhost", 'user_id': 1}
+    }
+
+class TestMonitorEngine(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestMonitorEngine, self).__init__(*args, **kwargs)
+
+    def test_refresh_spreads_first_checks(self):
+        # Given
+        engine = MonitorEngine()
+        now = time.monotonic()
+
+        # When
+        engine.refresh([get_entry(i) for i in range(100)])
+
+        # Then
+        self.assertEqual(len(engine.monitors), 100)
+        self.assertTrue(all(now <= next_run <= now + 61 for next_run in engine.next_runs.values()))
+        self.assertGreater(len(set(engine.next_runs.values())), 1)
+
+    def test_refresh_removes_deleted_monitors(self):
+        # Given
+        engine = MonitorEngine()
+        engine.refresh([get_entry(1), get_entry(2)])
+
+        # When
+        engine.refresh([get_entry(2)])
+        due = engine.pop_due_monitors(time.monotonic() + 120)
+
+        # Then
+        self.assertEqual(list(engine.monitors.keys()), [2])
+        self.assertEqual([entry['id'] for entry in due], [2])
+
+    def test_pop_due_monitors_reschedules_with_interval(self):
+        # Given
+        engine = MonitorEngine()
+        engine.refresh([get_entry(1, 60)])
+        now = engine.next_runs[1]
+
+        # When
+        due = engine.pop_due_monitors(now)
+
+        # Then
+        self.assertEqual(len(due), 1)
+        self.assertTrue(now + 54 <= engine.next_runs[1] <= now + 66)
+        self.assertEqual(engine.pop_due_monitors(now + 1), [])
+
+    def test_pop_due_monitors_skips_running_check(self):
+        # Given
+        engine = MonitorEngine()
+        engine.refresh([get_entry(1)])
+        engine.running[1] = None
+
+        # When
+        due = engine.pop_due_monitors(time.monotonic() + 120)
+
+        # Then
+        self.assertEqual(due, [])
+        self.assertIn(1, engine.next_runs)
+
+    @patch('utils.observability.monitor.save_monitors_status')
+    @patch('utils.observability.monitor.process_callbacks')
+    @patch('utils.observability.monitor.check_monitor')
+    def test_check_statuses_are_saved_in_batch(self, check_monitor, process_callbacks, save_monitors_status):
+        # Given
+        engine = MonitorEngine()
+        check_monitor.side_effect = [(12, {'status': "ok"}), (0, {'status': "ko"})]
+
+        async def check_all():
+            engine.clients = {'default': None}
+            await asyncio.gather(engine.check(get_entry(1)), engine.check(get_entry(2)))
+            await engine.flush()
+
+        # When
+        asyncio.run(check_all())
+
+        # Then
+        save_monitors_status.assert_called_once_with([
+            {'id': 1, 'status': "success", 'response_time': "12 ms"},
+            {'id': 2, 'status': "failure", 'response_time': "0 ms"}
+        ])
+        self.assertEqual(engine.statuses, {})
+        self.assertEqual(process_callbacks.call_count, 2)
@@ -0,0 +1,111 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from database.nats_connection import NatsConnection
+
+def mock_nc(js = None):
+    nc = MagicMock()
+    nc.jetstream.return_value = js
+    nc.is_closed = False
+    nc.publish = AsyncMock()
+    nc.drain = AsyncMock()
+    nc.close = AsyncMock()
+    nc.connect = AsyncMock()
+    return nc
+
+class TestNatsConnection(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestNatsConnection, self).__init__(*args, **kwargs)
+
+    @patch('database.nats_connection.NATS')
+    def test_publish_reuse_connection(self, nats_client):
+        # Given
+        nats_client.side_effect = lambda: mock_nc()
+        connection = NatsConnection()
+
+        # When
+        connection.publish("faas", b"1")
+        connection.publish("faas", b"2")
+        asyncio.run(connection.apublish("faas", b"3"))
+
+        # Then
+        connection.nc.connect.assert_called_once()
+        self.assertEqual(connection.nc.publish.call_count, 3)
+
+    @patch('database.nats_connection.NATS')
+    def test_jetstream_publish_declare_stream_once(self, nats_client):
+        # Given
+        js = MagicMock()
+        js.add_stream = AsyncMock()
+        js.publish = AsyncMock()
+        nats_client.side_effect = lambda: mock_nc(js)
+        connection = NatsConnection()
+
+        # When
+        connection.jetstream_publish("faas", ["faas"], "faas", b"1")
+        connection.jetstream_publish("faas", ["faas"], "faas", b"2")
+
+        # Then
+        connection.nc.connect.assert_called_once()
+        js.add_stream.assert_called_once_with(name = "faas", subjects = ["faas"])
+        self.assertEqual(js.publish.call_count, 2)
+
+    @patch('database.nats_connection.NATS')
+    def test_broadcast_stream_is_bounded(self, nats_client):
+        from nats.js.errors import BadRequestError
+        from utils.nats import get_stream_max_age, get_stream_subjects
+
+        # Given
+        js = MagicMock()
+        js.add_stream = AsyncMock(side_effect = BadRequestError())
+        js.update_stream = AsyncMock()
+        js.publish = AsyncMock()
+        nats_client.side_effect = lambda: mock_nc(js)
+        connection = NatsConnection()
+
+        # When
+        connection.jetstream_publish("auth", get_stream_subjects(None, "auth"), "auth", b"1", get_stream_max_age(None))
+
+        # Then
+        js.update_stream.assert_called_once_with(name = "auth", subjects = ["auth"], max_age = get_stream_max_age(None))
+        self.assertIsNotNone(get_stream_max_age(None))
+        js.publish.assert_called_once()
+
+    @patch('database.nats_connection.NATS')
+    def test_reconnect_when_closed(self, nats_client):
+        # Given
+        nats_client.side_effect = lambda: mock_nc()
+        connection = NatsConnection()
+        connection.publish("faas", b"1")
+        closed = connection.nc
+
+        # When
+        closed.is_closed = True
+        connection.publish("faas", b"2")
+
+        # Then
+        self.assertIsNot(connection.nc, closed)
+        connection.nc.connect.assert_called_once()
+        connection.nc.publish.assert_called_once()
+
+    @patch('database.nats_connection._connect_timeout', 0.05)
+    @patch('database.nats_connection.NATS')
+    def test_first_connection_timeout(self, nats_client):
+        # Given
+        async def connect(*args, **kwargs):
+            await asyncio.sleep(5)
+
+        nc = mock_nc()
+        nc.connect = AsyncMock(side_effect = connect)
+        nats_client.return_value = nc
+        connection = NatsConnection()
+
+        # When
+        with self.assertRaises(asyncio.TimeoutError):
+            connection.publish("faas", b"1")
+
+        # Then
+        nc.close.assert_called()
+        self.assertIsNone(connection.nc)
@@ -0,0 +1,128 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.notifier import Webhook, WebhookNotifier
+
+def build_payload(messages):
+    return {'attachments': [{'title': m['level'], 'text': m['text'], 'count': m['count']} for m in messages]}
+
+class TestNotifier(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestNotifier, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.post = Mock(return_value = Mock(status_code = 200, headers = {}))
+        self.notifier = WebhookNotifier(self.post)
+        #? the messages are processed by the tests, not by the background thread
+        self.notifier.thread = Mock()
+        self.webhook = Webhook("slack", "https://hooks.example.com/1", build_payload)
+
+    @patch('utils.notifier.NOTIF_BATCH_WINDOW', 5)
+    def test_duplicates_are_coalesced_in_one_post(self):
+        # Given
+        for i in range(3):
+            self.notifier.notify(self.webhook, ("ERROR", "db down"), "ERROR", "[ERROR][t{}] db down".format(i))
+        self.notifier.notify(self.webhook, ("WARN", "slow"), "WARN", "[WARN][t3] slow")
+
+        # When
+        self.notifier.drain(0)
+        self.notifier.flush(1)
+        self.notifier.flush(5)
+
+        # Then
+        self.post.assert_called_once()
+        self.assertEqual(self.post.call_args.kwargs['json'], {'attachments': [
+            {'title': "ERROR", 'text': "[ERROR][t0] db down", 'count': 3},
+            {'title': "WARN", 'text': "[WARN][t3] slow", 'count': 1}
+        ]})
+
+    @patch('utils.notifier.NOTIF_BATCH_SIZE', 2)
+    @patch('utils.notifier.NOTIF_RATE_LIMIT', 60)
+    def test_full_batches_are_rate_limited(self):
+        # Given
+        for i in range(5):
+            self.notifier.notify(self.webhook, ("ERROR", i), "ERROR", "error {}".format(i))
+        self.notifier.drain(0)
+
+        # When
+        self.notifier.flush(0)
+        first_posts = self.post.call_count
+        self.notifier.flush(1)
+
+        # Then
+        self.assertEqual(first_posts, 1)
+        self.assertEqual(self.post.call_count, 2)
+        self.assertEqual(len(self.webhook.pending), 1)
+
+    def test_throttled_batch_is_kept(self):
+        # Given
+        self.post.return_value = Mock(status_code = 429, headers = {'Retry-After': "30"})
+        self.notifier.notify(self.webhook, ("ERROR", "a"), "ERROR", "a")
+        self.notifier.drain(0)
+
+        # When
+        self.notifier.flush(10)
+
+        # Then
+        self.assertEqual(list(self.webhook.pending.keys()), [("ERROR", "a")])
+        self.assertEqual(self.webhook.next_post_at, 40)
+
+    @patch('utils.notifier.NOTIF_RATE_LIMIT', 30)
+    @patch('utils.notifier.NOTIF_BATCH_WINDOW', 5)
+    def test_unparsable_retry_after_keeps_the_batch(self):
+        # Given
+        self.post.return_value = Mock(status_code = 429, headers = {'Retry-After': "Wed, 21 Oct 2026 07:28:00 GMT"})
+        self.notifier.notify(self.webhook, ("ERROR", "a"), "ERROR", "a")
+        self.notifier.drain(0)
+
+        # When
+        self.notifier.flush(10)
+
+        # Then
+        self.assertEqual(list(self.webhook.pending.keys()), [("ERROR", "a")])
+        self.assertEqual(self.webhook.next_post_at, 12)
+
+    @patch('utils.notifier.NOTIF_BATCH_WINDOW', 5)
+    def test_server_error_is_retried(self):
+        # Given
+        self.post.side_effect = [Mock(status_code = 503, headers = {}), Mock(status_code = 200, headers = {})]
+        self.notifier.notify(self.webhook, ("ERROR", "a"), "ERROR", "a")
+        self.notifier.drain(0)
+
+        # When
+        self.notifier.flush(10)
+        kept = list(self.webhook.pending.keys())
+        self.notifier.flush(20)
+
+        # Then
+        self.assertEqual(kept, [("ERROR", "a")])
+        self.assertEqual(self.post.call_count, 2)
+        self.assertEqual(len(self.webhook.pending), 0)
+
+    @patch('utils.notifier.NOTIF_BATCH_WINDOW', 5)
+    def test_rejected_batch_is_dropped(self):
+        # Given
+        self.post.return_value = Mock(status_code = 400, headers = {})
+        self.notifier.notify(self.webhook, ("ERROR", "a"), "ERROR", "a")
+        self.notifier.drain(0)
+
+        # When
+        self.notifier.flush(10)
+
+        # Then
+        self.post.assert_called_once()
+        self.assertEqual(len(self.webhook.pending), 0)
+
+    @patch('utils.notifier.NOTIF_QUEUE_SIZE', 2)
+    def test_messages_are_dropped_when_the_queue_is_full(self):
+        # Given
+        notifier = WebhookNotifier(self.post)
+        notifier.thread = Mock()
+
+        # When
+        for i in range(5):
+            notifier.notify(self.webhook, ("ERROR", i), "ERROR", "error {}".format(i))
+
+        # Then
+        self.assertEqual(notifier.queue.qsize(), 2)
+        self.post.assert_not_called()
@@ -0,0 +1,120 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from uuid import uuid4
+
+from entities.User import User
+from entities.faas.Invocation import InvocationEntity
+from tests.query_counter import get_test_session
+from utils.paginator import get_paginated_list, paginate
+
+class TestPaginator(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestPaginator, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.db = get_test_session()
+        self.db.add(User(id = 1, email = "user1@email.com", enabled_features = {}))
+        for day in range(1, 26):
+            self.db.add(InvocationEntity(id = uuid4(), content = {}, invoker_id = 1, created_at = "2024-01-01", updated_at = "2024-01-{:02d}".format(day)))
+        #? same updated_at, the id is the tie-breaker
+        for _ in range(3):
+            self.db.add(InvocationEntity(id = uuid4(), content = {}, invoker_id = 1, created_at = "2024-01-01", updated_at = "2024-01-10"))
+        self.db.commit()
+        self.columns = [InvocationEntity.updated_at, InvocationEntity.id]
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_paginate_follows_the_cursors(self):
+        # Given
+        query = self.db.query(InvocationEntity)
+        expected = [i.id for i in query.order_by(InvocationEntity.updated_at.desc(), InvocationEntity.id.desc()).all()]
+
+        # When
+        ids = []
+        pages = []
+        cursor = None
+        while True:
+            page = paginate(query, self.columns, 10, cursor)
+            pages.append(page)
+            ids += [i.id for i in page['results']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        # Then
+        self.assertEqual(ids, expected)
+        self.assertEqual([len(page['results']) for page in pages], [10, 10, 8])
+        self.assertIsNone(pages[0]['previous_cursor'])
+        self.assertIsNotNone(pages[-1]['previous_cursor'])
+
+    def test_paginate_goes_back_with_the_previous_cursor(self):
+        # Given
+        query = self.db.query(InvocationEntity)
+        first = paginate(query, self.columns, 10)
+        second = paginate(query, self.columns, 10, first['next_cursor'])
+
+        # When
+        back = paginate(query, self.columns, 10, second['previous_cursor'])
+
+        # Then
+        self.assertEqual([i.id for i in back['results']], [i.id for i in first['results']])
+        self.assertIsNone(back['previous_cursor'])
+        self.assertEqual(back['next_cursor'], first['next_cursor'])
+
+    def test_paginate_keeps_the_offset(self):
+        # Given
+        query = self.db.query(InvocationEntity)
+        first = paginate(query, self.columns, 10)
+
+        # When
+        result = paginate(query, self.columns, 5, offset = 5)
+
+        # Then
+        self.assertEqual([i.id for i in result['results']], [i.id for i in first['results']][5:])
+        self.assertIsNotNone(result['previous_cursor'])
+
+    def test_paginate_invalid_cursor(self):
+        # Given
+        query = self.db.query(InvocationEntity)
+
+        # When / Then
+        with self.assertRaises(ValueError):
+            paginate(query, self.columns, 10, "not-a-cursor")
+
+    def test_get_all_invocations_invalid_cursor(self):
+        # Given
+        from controllers.faas.invocations import get_all_invocations
+        current_user = Mock(id = 1, is_admin = True)
+
+        # When
+        result = get_all_invocations(self.db, current_user, "0", "10", "not-a-cursor")
+
+        # Then
+        self.assertEqual(result['code'], 400)
+        self.assertEqual(result['i18n_code'], "faas_invalid_cursor")
+
+    def test_get_all_invocations_total(self):
+        # Given
+        from controllers.faas.invocations import get_all_invocations
+        current_user = Mock(id = 1, is_admin = True)
+
+        # When
+        result = get_all_invocations(self.db, current_user, "0", "10", None, True)
+
+        # Then
+        self.assertEqual(result['total'], 28)
+        self.assertEqual(len(result['results']), 10)
+        self.assertIsNotNone(result['next_cursor'])
+
+    def test_get_paginated_list(self):
+        # Given
+        data = list(range(25))
+
+        # When
+        result = get_paginated_list(data, "/user", 2, 10)
+
+        # Then
+        self.assertEqual(result['data'], list(range(10, 20)))
+        self.assertEqual(result['count'], 25)
+        self.assertEqual(result['previous'], "/user?page=1&no_per_page=10")
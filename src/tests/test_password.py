@@ -0,0 +1,123 @@
+import asyncio
+import bcrypt
+import json
+import sys
+
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock, patch
+
+from schemas.User import UserLoginSchema
+from utils.password import BCRYPT_ROUNDS, HashingAdmission, hash_password, pwd_context, verify_login_password, verify_password
+
+#? database.redis_db connects to the redis host of the environment when imported
+sys.modules.setdefault('database.redis_db', MagicMock())
+
+def get_low_cost_hash(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(4)).decode()
+
+class TestPassword(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestPassword, self).__init__(*args, **kwargs)
+
+    def test_admission_is_bounded_per_source(self):
+        # Given
+        admission = HashingAdmission(3, 2)
+        admission.acquire(["ip:1", "email:a"])
+        admission.acquire(["ip:1", "email:b"])
+
+        # When
+        same_ip = admission.acquire(["ip:1", "email:c"])
+        other_ip = admission.acquire(["ip:2", "email:a"])
+
+        # Then
+        self.assertFalse(same_ip)
+        self.assertTrue(other_ip)
+
+    def test_admission_is_bounded_overall(self):
+        # Given
+        admission = HashingAdmission(2, 2)
+        admission.acquire(["ip:1"])
+        admission.acquire(["ip:2"])
+
+        # When
+        rejected = admission.acquire(["ip:3"])
+        admission.release(["ip:1"])
+        accepted = admission.acquire(["ip:3"])
+
+        # Then
+        self.assertFalse(rejected)
+        self.assertTrue(accepted)
+        self.assertEqual(admission.pending_by_source, {'ip:2': 1, 'ip:3': 1})
+
+    def test_hashes_are_computed_in_the_pool(self):
+        # Given
+        hashed = hash_password("password")
+
+        # When
+        verified = verify_password("password", hashed)
+        wrong = verify_password("wrong", hashed)
+
+        # Then
+        self.assertTrue(verified)
+        self.assertFalse(wrong)
+        self.assertIn("$2b${:02d}$".format(BCRYPT_ROUNDS), hashed)
+
+    def test_low_cost_hash_is_upgraded_on_login(self):
+        # Given
+        hashed = get_low_cost_hash("password")
+
+        # When
+        result = asyncio.run(verify_login_password("password", hashed, ["ip:1", "email:a"]))
+
+        # Then
+        self.assertTrue(result['verified'])
+        self.assertTrue(pwd_context.verify("password", result['new_hash']))
+        self.assertFalse(pwd_context.needs_update(result['new_hash']))
+
+    def test_unknown_hash_is_not_verified(self):
+        # Given
+        hashed = "not-a-hash"
+
+        # When
+        result = asyncio.run(verify_login_password("password", hashed, ["ip:1"]))
+
+        # Then
+        self.assertEqual((result['verified'], result['new_hash']), (False, None))
+
+    @patch('utils.password._admission', HashingAdmission(1, 1))
+    def test_login_is_rejected_when_the_source_is_busy(self):
+        from routes.auth.api_auth import login_user
+        from utils.password import _admission
+
+        # Given
+        _admission.acquire(["ip:10.0.0.1"])
+        user = Mock(id = 1, email = "user1@email.com", password = get_low_cost_hash("password"))
+        request = Mock(headers = {"X-Forwarded-For": "10.0.0.3"}, client = Mock(host = "10.0.0.1"))
+
+        # When
+        with patch('entities.User.User.getUserByEmail', return_value = user):
+            response = asyncio.run(login_user(UserLoginSchema(email = "user1@email.com", password = "password"), request, Mock()))
+
+        # Then
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(json.loads(response.body.decode())['i18n_code'], "auth_too_many_attempts")
+
+    @patch('routes.auth.api_auth.CACHE_ADAPTER')
+    @patch('routes.auth.api_auth.invalidate_principals')
+    @patch('entities.Mfa.Mfa.getUserMfaMethods', return_value = [])
+    @patch('entities.User.User.updateUserPasswordHash')
+    def test_login_upgrades_the_stored_hash(self, updateUserPasswordHash, getUserMfaMethods, invalidate_principals, cache_adapter):
+        from routes.auth.api_auth import login_user
+
+        # Given
+        user = Mock(id = 1, email = "user1@email.com", password = get_low_cost_hash("password"), confirmed = True, is_admin = False, enabled_features = {})
+        request = Mock(headers = {}, client = Mock(host = "10.0.0.1"))
+
+        # When
+        with patch('entities.User.User.getUserByEmail', return_value = user):
+            response = asyncio.run(login_user(UserLoginSchema(email = "user1@email.com", password = "password"), request, Mock()))
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        updateUserPasswordHash.assert_called_once()
+        self.assertTrue(pwd_context.verify("password", updateUserPasswordHash.call_args.args[1]))
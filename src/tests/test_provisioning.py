@@ -0,0 +1,232 @@
+import asyncio
+import json
+
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import ANY, Mock, patch
+
+from sqlalchemy.orm import Session
+
+from entities.ProvisioningJob import ProvisioningJob
+from entities.User import User
+from tests.query_counter import get_test_session
+from utils.provisioning import PROVISIONING_MAX_ATTEMPTS, PROVISIONING_RETRY_DELAY, enqueue_provisioning_job, get_retry_delay
+
+class TestProvisioning(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestProvisioning, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.db = get_test_session()
+        self.db.add_all([User(id = 1, email = "user1@email.com", enabled_features = {}), User(id = 2, email = "user2@email.com", enabled_features = {})])
+        self.db.commit()
+
+        self.handler = Mock()
+        self.resource = Mock()
+        self.patches = [
+            patch('utils.provisioning._pubsub_adapter'),
+            patch('provision.jobs.SessionLocal', side_effect = lambda: Session(self.db.get_bind())),
+            patch('provision.jobs._job_steps', {'bucket': [self.handler]}),
+            patch('provision.jobs._job_resources', {'bucket': self.resource}),
+            patch('provision.jobs.invalidate_user_statistics')
+        ]
+        self.pubsub_adapter, _, _, _, self.invalidate_user_statistics = [p.start() for p in self.patches]
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.db.close()
+
+    def enqueue_bucket_job(self):
+        return enqueue_provisioning_job("bucket", "scaleway", 1, 1, {'provider': "scaleway", 'bucket_id': 1}, self.db)
+
+    def get_job(self, job_id):
+        self.db.expire_all()
+        return ProvisioningJob.findById(job_id, self.db)
+
+    def test_job_is_persisted_and_notified(self):
+        # Given
+        publish = self.pubsub_adapter.return_value.publish
+
+        # When
+        job = self.enqueue_bucket_job()
+
+        # Then
+        self.assertEqual(self.get_job(job.id).status, "pending")
+        publish.assert_called_once()
+        self.assertEqual(publish.call_args.args[2], {'job_id': "{}".format(job.id), 'provider': "scaleway"})
+
+    def test_job_is_kept_when_the_notification_fails(self):
+        # Given
+        self.pubsub_adapter.return_value.publish.side_effect = Exception("unavailable")
+
+        # When
+        job = self.enqueue_bucket_job()
+
+        # Then
+        self.assertEqual(self.get_job(job.id).status, "pending")
+
+    def test_job_is_claimed_only_once(self):
+        # Given
+        job = self.enqueue_bucket_job()
+
+        # When
+        first = ProvisioningJob.claimJob(job.id, datetime.now(), self.db)
+        second = ProvisioningJob.claimJob(job.id, datetime.now(), self.db)
+
+        # Then
+        self.assertEqual((first, second), (True, False))
+        self.assertEqual(self.get_job(job.id).attempts, 1)
+
+    def test_job_is_run_with_its_args(self):
+        from provision.jobs import run_job
+
+        # Given
+        job = self.enqueue_bucket_job()
+
+        # When
+        run_job("{}".format(job.id))
+
+        # Then
+        self.handler.assert_called_once()
+        self.assertEqual(self.handler.call_args.kwargs['bucket_id'], 1)
+        self.assertEqual(self.get_job(job.id).status, "succeeded")
+        self.invalidate_user_statistics.assert_called_once_with(1)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        from provision.jobs import run_job
+
+        # Given
+        job = self.enqueue_bucket_job()
+        self.handler.side_effect = Exception("quota exceeded")
+
+        # When
+        run_job("{}".format(job.id))
+        run_job("{}".format(job.id))
+
+        # Then
+        retried = self.get_job(job.id)
+        self.assertEqual((retried.status, retried.attempts, retried.error), ("pending", 1, "quota exceeded"))
+        self.assertGreater(retried.next_attempt_at, datetime.now() + timedelta(seconds = PROVISIONING_RETRY_DELAY - 5))
+        self.assertEqual(self.handler.call_count, 1)
+
+    def test_job_fails_after_the_max_attempts(self):
+        from provision.jobs import run_job
+
+        # Given
+        job = self.enqueue_bucket_job()
+        ProvisioningJob.updateJob(job.id, {'attempts': PROVISIONING_MAX_ATTEMPTS - 1}, self.db)
+        self.handler.side_effect = Exception("quota exceeded")
+
+        # When
+        run_job("{}".format(job.id))
+
+        # Then
+        self.assertEqual(self.get_job(job.id).status, "failed")
+        self.resource.updateStatus.assert_called_once_with(1, "failed", ANY)
+
+    def test_stale_jobs_are_released(self):
+        # Given
+        now = datetime.now()
+        retried = self.enqueue_bucket_job()
+        expired = self.enqueue_bucket_job()
+        ProvisioningJob.updateJob(retried.id, {'status': "running", 'attempts': 1}, self.db)
+        ProvisioningJob.updateJob(expired.id, {'status': "running", 'attempts': PROVISIONING_MAX_ATTEMPTS}, self.db)
+
+        # When
+        released = ProvisioningJob.releaseStaleJobs(now + timedelta(seconds = 1), PROVISIONING_MAX_ATTEMPTS, now, self.db)
+        expired_jobs = ProvisioningJob.expireStaleJobs(now + timedelta(seconds = 1), PROVISIONING_MAX_ATTEMPTS, now, self.db)
+
+        # Then
+        self.assertEqual(released, 1)
+        self.assertEqual([job.id for job in expired_jobs], [expired.id])
+        self.assertEqual(self.get_job(retried.id).status, "pending")
+        self.assertEqual((self.get_job(expired.id).status, self.get_job(expired.id).error), ("failed", "timeout"))
+
+    def test_heartbeat_keeps_the_running_job(self):
+        # Given
+        job = self.enqueue_bucket_job()
+        ProvisioningJob.claimJob(job.id, datetime.now(), self.db)
+        later = datetime.now() + timedelta(seconds = 10)
+
+        # When
+        alive = ProvisioningJob.heartbeat(job.id, 1, later, self.db)
+        released = ProvisioningJob.releaseStaleJobs(later - timedelta(seconds = 1), PROVISIONING_MAX_ATTEMPTS, later, self.db)
+        lost = ProvisioningJob.heartbeat(job.id, 2, later, self.db)
+
+        # Then
+        self.assertEqual((alive, released, lost), (True, 0, False))
+        self.assertEqual(self.get_job(job.id).status, "running")
+
+    def test_retry_resumes_from_the_failed_step(self):
+        from provision.jobs import run_job
+
+        # Given
+        job = self.enqueue_bucket_job()
+        prepare, provision = Mock(), Mock(side_effect = [Exception("quota exceeded"), None])
+
+        # When
+        with patch('provision.jobs._job_steps', {'bucket': [prepare, provision]}):
+            run_job("{}".format(job.id))
+            ProvisioningJob.updateJob(job.id, {'next_attempt_at': datetime.now()}, self.db)
+            run_job("{}".format(job.id))
+
+        # Then
+        prepare.assert_called_once()
+        self.assertEqual(provision.call_count, 2)
+        self.assertEqual((self.get_job(job.id).status, self.get_job(job.id).step), ("succeeded", 2))
+
+    def test_retry_delay_is_exponential(self):
+        # Given
+        attempts = [1, 2, 3]
+
+        # When
+        delays = [get_retry_delay(a) for a in attempts]
+
+        # Then
+        self.assertEqual(delays, [PROVISIONING_RETRY_DELAY, PROVISIONING_RETRY_DELAY * 2, PROVISIONING_RETRY_DELAY * 4])
+
+    @patch('provision.jobs.get_provider_executor')
+    def test_job_is_queued_once_by_worker(self, get_provider_executor):
+        from provision.jobs import _queued, submit_job
+
+        # Given
+        _queued.clear()
+
+        # When
+        first = submit_job("job-1", "scaleway")
+        second = submit_job("job-1", "scaleway")
+
+        # Then
+        self.assertEqual((first, second), (True, False))
+        get_provider_executor.return_value.submit.assert_called_once()
+        _queued.clear()
+
+    @patch('provision.handler.submit_job')
+    @patch('provision.handler.pubsub_adapter')
+    def test_notification_submits_the_job(self, pubsub_adapter, submit_job):
+        from provision.handler import handle
+
+        # Given
+        pubsub_adapter.return_value.decode.return_value = {'job_id': "job-1", 'provider': "ovh"}
+
+        # When
+        asyncio.run(handle(Mock()))
+
+        # Then
+        submit_job.assert_called_once_with("job-1", "ovh")
+
+    def test_job_of_another_user_is_not_found(self):
+        from controllers.provisioning import get_provisioning_job
+
+        # Given
+        job = self.enqueue_bucket_job()
+
+        # When
+        owner = get_provisioning_job(Mock(id = 1), "{}".format(job.id), self.db)
+        other = get_provisioning_job(Mock(id = 2), "{}".format(job.id), self.db)
+
+        # Then
+        self.assertEqual(owner.status_code, 200)
+        self.assertEqual(json.loads(owner.body.decode())['status'], "pending")
+        self.assertEqual(other.status_code, 404)
@@ -0,0 +1,75 @@
+import json
+
+from unittest import TestCase
+from unittest.mock import Mock
+from uuid import uuid4
+
+from entities.Environment import Environment
+from entities.Instance import Instance
+from entities.Project import Project
+from entities.User import User
+from entities.faas.Invocation import InvocationEntity
+from entities.kubernetes.Deployment import Deployment
+from tests.query_counter import QueryCountMixin, QueryCounter, get_test_session
+
+class TestQueryCount(TestCase, QueryCountMixin):
+    def __init__(self, *args, **kwargs):
+        super(TestQueryCount, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.db = get_test_session()
+        self.current_user = Mock(id = 1, is_admin = True)
+        self.db.add_all([User(id = id, email = "user{}@email.com".format(id), enabled_features = {}) for id in [1, 2, 3]])
+        self.db.add_all([Environment(id = id, name = "env{}".format(id), path = "env{}".format(id), type = "k8s") for id in [1, 2]])
+        for id in range(1, 21):
+            self.db.add(Project(id = id, name = "project{}".format(id), userid = 1, type = "k8s"))
+            self.db.add(Deployment(id = id, name = "deployment{}".format(id), project_id = id, env_id = 1 + id % 2, user_id = 1))
+            self.db.add(Instance(id = id, name = "instance{}".format(id), project_id = id, environment_id = 1, user_id = 1, status = "active"))
+            self.db.add(InvocationEntity(id = uuid4(), content = {}, invoker_id = 1 + id % 3, created_at = "2024-01-01", updated_at = "2024-01-{:02d}".format(id)))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_get_projects_query_count(self):
+        # Given
+        from controllers.project import get_projects
+
+        # When
+        with QueryCounter(self.db) as counter:
+            result = get_projects(self.current_user, "all", self.db)
+
+        # Then
+        self.assertMaxQueries(counter, 6)
+        projects = json.loads(result.body)
+        self.assertEqual(len(projects), 20)
+        self.assertEqual(projects[0]["environment"], {"id": 2, "name": "env2"})
+        self.assertEqual([instance["name"] for instance in projects[0]["instances"]], ["instance1"])
+
+    def test_get_all_invocations_query_count(self):
+        # Given
+        from controllers.faas.invocations import get_all_invocations
+
+        # When
+        with QueryCounter(self.db) as counter:
+            result = get_all_invocations(self.db, self.current_user, "0", "10")
+
+        # Then
+        self.assertMaxQueries(counter, 2)
+        self.assertEqual(len(result['results']), 10)
+        self.assertEqual(result['results'][0]['invoker'], {"id": 3, "username": "user3@email.com"})
+
+    def test_get_instances_query_count(self):
+        # Given
+        from controllers.instance import get_instances
+        self.db.query(Instance).update({'provider': "scaleway", 'region': "fr-par"})
+        self.db.commit()
+        self.db.expunge_all()
+
+        # When
+        with QueryCounter(self.db) as counter:
+            result = get_instances(self.current_user, "scaleway", "fr-par", self.db)
+
+        # Then
+        self.assertMaxQueries(counter, 5)
+        self.assertEqual(len(json.loads(result.body)), 20)
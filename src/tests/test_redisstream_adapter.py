@@ -0,0 +1,66 @@
+import asyncio
+import sys
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+#? database.redis_db connects to the redis host of the environment when imported
+sys.modules.setdefault('database.redis_db', MagicMock())
+
+class TestRedisstreamAdapter(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestRedisstreamAdapter, self).__init__(*args, **kwargs)
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_ack_after_handle(self, redis):
+        # Given
+        from adapters.pubsub.RedisstreamAdapter import RedisstreamAdapter
+        handler = AsyncMock(side_effect = ValueError("handler failure"))
+        acked_handler = RedisstreamAdapter().acked("faas", "faas", "1-0", handler)
+
+        # When
+        with self.assertRaises(ValueError):
+            asyncio.run(acked_handler({'data': '{}'}))
+
+        # Then
+        handler.assert_called_once_with({'data': '{}'})
+        redis.xack.assert_called_once_with("faas", "faas", "1-0")
+
+    @patch('adapters.pubsub.RedisstreamAdapter.get_consumer_executor')
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_claim_stale_entries(self, redis, get_consumer_executor):
+        # Given
+        from adapters.pubsub.RedisstreamAdapter import RedisstreamAdapter
+        executor = MagicMock()
+        get_consumer_executor.return_value = executor
+        redis.xautoclaim.side_effect = [
+            ['2-0', [('1-0', {'data': '{}'}), ('1-1', None)], []],
+            ['0-0', [('2-0', {'data': '{}'})], []]
+        ]
+
+        # When
+        RedisstreamAdapter().claim("faas", "faas", AsyncMock())
+
+        # Then
+        self.assertEqual(redis.xautoclaim.call_count, 2)
+        self.assertEqual(executor.dispatch.call_count, 2)
+        redis.xack.assert_called_once_with("faas", "faas", "1-1")
+
+    @patch('adapters.pubsub.RedisstreamAdapter.get_consumer_executor')
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_claim_skips_running_entries(self, redis, get_consumer_executor):
+        # Given
+        from adapters.pubsub.RedisstreamAdapter import RedisstreamAdapter
+        executor = MagicMock()
+        get_consumer_executor.return_value = executor
+        adapter = RedisstreamAdapter()
+        acked_handler = adapter.acked("faas", "faas", "3-0", AsyncMock())
+        redis.xautoclaim.return_value = ['0-0', [('3-0', {'data': '{}'})], []]
+
+        # When
+        adapter.claim("faas", "faas", AsyncMock())
+        asyncio.run(acked_handler({'data': '{}'}))
+
+        # Then
+        executor.dispatch.assert_not_called()
+        self.assertFalse(adapter.is_running("faas", "faas", "3-0"))
@@ -0,0 +1,58 @@
+import asyncio
+
+from unittest import TestCase
+
+from consume.results import ResultsBatcher
+
+class TestResultsBatcher(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestResultsBatcher, self).__init__(*args, **kwargs)
+
+    def test_flush_when_batch_is_full(self):
+        # Given
+        batches = []
+
+        async def flush_handler(payloads):
+            batches.append(payloads)
+
+        batcher = ResultsBatcher(2, 60000, flush_handler)
+
+        # When
+        async def add_all():
+            await asyncio.gather(*[batcher.add({'id': i}) for i in range(4)])
+
+        asyncio.run(add_all())
+
+        # Then
+        self.assertEqual(batches, [[{'id': 0}, {'id': 1}], [{'id': 2}, {'id': 3}]])
+
+    def test_flush_after_wait_time(self):
+        # Given
+        batches = []
+
+        async def flush_handler(payloads):
+            batches.append(payloads)
+
+        batcher = ResultsBatcher(10, 10, flush_handler)
+
+        # When
+        async def add_all():
+            await asyncio.gather(*[batcher.add({'id': i}) for i in range(3)])
+
+        asyncio.run(add_all())
+
+        # Then
+        self.assertEqual(batches, [[{'id': 0}, {'id': 1}, {'id': 2}]])
+
+    def test_flush_handler_failure(self):
+        # Given
+        async def flush_handler(payloads):
+            raise ValueError("api unavailable")
+
+        batcher = ResultsBatcher(1, 10, flush_handler)
+
+        # When
+        asyncio.run(batcher.add({'id': 1}))
+
+        # Then
+        self.assertEqual(batcher.pending, [])
@@ -0,0 +1,119 @@
+import time
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from schedule import crontabs
+from schedule.crontabs import apply_trigger_event, fetch_triggers, reconcile_triggers
+
+def get_trigger(id, cron_expr = "*/5 * * * *"):
+    return {
+        'id': id,
+        'kind': "cron",
+        'content': {'name': "trigger{}".format(id), 'function_id': "function{}".format(id), 'args': [], 'cron_expr': cron_expr},
+        'owner': {'id': 1}
+    }
+
+class TestScheduler(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestScheduler, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.start(paused = True)
+        self.patches = [
+            patch('schedule.crontabs._scheduler', self.scheduler),
+            patch.dict(crontabs._fingerprints, clear = True),
+            patch.dict(crontabs._events_at, clear = True)
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.scheduler.shutdown(wait = False)
+
+    def get_job_ids(self):
+        return sorted(job.id for job in self.scheduler.get_jobs())
+
+    def test_jobs_are_keyed_by_trigger_id(self):
+        # Given
+        apply_trigger_event({'action': 'add', 'trigger': get_trigger("1")})
+        apply_trigger_event({'action': 'add', 'trigger': get_trigger("2")})
+
+        # When
+        with patch.object(self.scheduler, 'add_job', wraps = self.scheduler.add_job) as add_job:
+            apply_trigger_event({'action': 'add', 'trigger': get_trigger("1")})
+
+        # Then
+        self.assertEqual(self.get_job_ids(), ["1", "2"])
+        add_job.assert_not_called()
+        self.assertEqual(self.scheduler.get_job("2").args[0]['content']['function_id'], "function2")
+
+    def test_override_and_delete_events(self):
+        # Given
+        apply_trigger_event({'action': 'add', 'trigger': get_trigger("1")})
+        apply_trigger_event({'action': 'add', 'trigger': get_trigger("2")})
+
+        # When
+        apply_trigger_event({'action': 'override', 'trigger': get_trigger("1", "0 0 * * *")})
+        apply_trigger_event({'action': 'delete', 'trigger': {'id': "2"}})
+
+        # Then
+        self.assertEqual(self.get_job_ids(), ["1"])
+        self.assertEqual(self.scheduler.get_job("1").args[0]['content']['cron_expr'], "0 0 * * *")
+
+    def test_clear_event_removes_the_listed_triggers(self):
+        # Given
+        for id in ["1", "2", "3"]:
+            apply_trigger_event({'action': 'add', 'trigger': get_trigger(id)})
+
+        # When
+        apply_trigger_event({'action': 'clear', 'triggers': [{'id': "1"}, {'id': "3"}]})
+
+        # Then
+        self.assertEqual(self.get_job_ids(), ["2"])
+
+    @patch('schedule.crontabs.init_triggered_functions')
+    def test_event_without_the_trigger_falls_back_to_resync(self, init_triggered_functions):
+        # Given
+        payload = {'action': 'override', 'trigger': {'id': "1", 'updated_at': "2024-01-01"}}
+
+        # When
+        apply_trigger_event(payload)
+
+        # Then
+        init_triggered_functions.assert_called_once()
+
+    def test_resync_keeps_the_changes_received_meanwhile(self):
+        # Given
+        for id in ["1", "2", "3"]:
+            apply_trigger_event({'action': 'add', 'trigger': get_trigger(id)})
+        started_at = time.monotonic()
+        apply_trigger_event({'action': 'add', 'trigger': get_trigger("4")})
+        apply_trigger_event({'action': 'delete', 'trigger': {'id': "1"}})
+
+        # When
+        reconcile_triggers([get_trigger("1"), get_trigger("2")], started_at)
+
+        # Then
+        self.assertEqual(self.get_job_ids(), ["2", "4"])
+        self.assertEqual(sorted(crontabs._events_at.keys()), ["1", "4"])
+
+    @patch('schedule.crontabs.requests.get')
+    def test_fetch_triggers_follows_the_cursors(self, get):
+        # Given
+        get.side_effect = [
+            Mock(status_code = 200, json = Mock(return_value = {'results': [get_trigger("1")], 'next_cursor': "abc"})),
+            Mock(status_code = 200, json = Mock(return_value = {'results': [get_trigger("2")], 'next_cursor': None}))
+        ]
+
+        # When
+        triggers = fetch_triggers()
+
+        # Then
+        self.assertEqual([trigger['id'] for trigger in triggers], ["1", "2"])
+        self.assertEqual(get.call_args_list[1].kwargs['params']['cursor'], "abc")
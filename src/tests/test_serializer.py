@@ -0,0 +1,81 @@
+import json
+
+from unittest import TestCase
+
+from entities.Instance import Instance
+from entities.Project import Project
+from entities.User import User
+from utils.encoder import AlchemyEncoder
+from utils.serializer import SerializedResponse, get_serializer, serialize
+
+class TestSerializer(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestSerializer, self).__init__(*args, **kwargs)
+
+    def get_project(self):
+        project = Project(id = 1, name = "project", userid = 2)
+        project.instances = [Instance(id = 3, name = "instance", project_id = 1)]
+        return project
+
+    def test_serialize_columns_only(self):
+        # Given
+        project = self.get_project()
+
+        # When
+        result = serialize(project)
+
+        # Then
+        self.assertEqual(result['id'], 1)
+        self.assertEqual(result['name'], "project")
+        self.assertNotIn('instances', result)
+        self.assertNotIn('user', result)
+
+    def test_serialize_projection_and_relationships(self):
+        # Given
+        project = self.get_project()
+
+        # When
+        result = serialize([project], fields = ['id', 'name'], relationships = {'instances': ['id', 'name']})
+
+        # Then
+        self.assertEqual(result, [{'id': 1, 'name': "project", 'instances': [{'id': 3, 'name': "instance"}]}])
+
+    def test_serialize_unknown_relationship(self):
+        # Given
+        project = self.get_project()
+
+        # When / Then
+        with self.assertRaises(AttributeError):
+            serialize(project, relationships = {'unknown': None})
+
+    def test_serializer_is_computed_once(self):
+        # Given / When
+        first = get_serializer(Project)
+        second = get_serializer(Project)
+
+        # Then
+        self.assertIs(first, second)
+        self.assertIn('instances', first.relationships)
+        self.assertIn('user', first.relationships)
+        self.assertIn('projects', get_serializer(User).relationships)
+
+    def test_encoder_keeps_empty_relationships(self):
+        # Given
+        project = self.get_project()
+
+        # When
+        result = json.loads(json.dumps([project], cls = AlchemyEncoder))
+
+        # Then
+        self.assertEqual(result, [{**serialize(project), 'user': None}])
+
+    def test_serialized_response(self):
+        # Given
+        content = serialize(self.get_project(), fields = ['id', 'name'])
+
+        # When
+        response = SerializedResponse(content = content, status_code = 200)
+
+        # Then
+        self.assertEqual(json.loads(response.body), {'id': 1, 'name': "project"})
+        self.assertEqual(response.headers['content-type'], "application/json")
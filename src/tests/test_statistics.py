@@ -0,0 +1,92 @@
+import json
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from entities.Bucket import Bucket
+from entities.Instance import Instance
+from entities.Project import Project
+from entities.Registry import Registry
+from entities.User import User
+from tests.query_counter import QueryCountMixin, QueryCounter, get_test_session
+from utils.statistics import _statistics, get_user_cloud_counts, invalidate_user_statistics
+
+class TestStatistics(TestCase, QueryCountMixin):
+    def __init__(self, *args, **kwargs):
+        super(TestStatistics, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        _statistics.clear()
+        self.patches = [patch('utils.statistics.broadcast'), patch('utils.statistics.start_broadcast_listener')]
+        for p in self.patches:
+            p.start()
+
+        self.db = get_test_session()
+        self.current_user = Mock(id = 1)
+        self.db.add_all([User(id = 1, email = "user1@email.com", enabled_features = {}), User(id = 2, email = "user2@email.com", enabled_features = {})])
+        self.db.add_all([Project(id = i, name = "project{}".format(i), userid = 1) for i in range(1, 4)])
+        self.db.add(Project(id = 4, name = "project4", userid = 2))
+        self.db.add_all([Instance(id = i, name = "instance{}".format(i), user_id = 1, status = "deleted" if i == 1 else "active") for i in range(1, 6)])
+        self.db.add(Bucket(id = 1, name = "bucket1", user_id = 1, status = "active"))
+        self.db.add(Registry(id = 1, name = "registry1", user_id = 1, status = "deleted"))
+        self.db.commit()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.db.close()
+
+    def test_counts_are_computed_with_a_single_query(self):
+        # Given
+        user_id = self.current_user.id
+
+        # When
+        with QueryCounter(self.db) as counter:
+            counts = get_user_cloud_counts(user_id, self.db)
+
+        # Then
+        self.assertEqual(counts, {"projects": 3, "instances": 4, "buckets": 1, "registries": 0})
+        self.assertMaxQueries(counter, 1)
+
+    def test_counts_are_cached_until_invalidated(self):
+        # Given
+        get_user_cloud_counts(1, self.db)
+        self.db.add(Bucket(id = 2, name = "bucket2", user_id = 1, status = "active"))
+        self.db.commit()
+
+        # When
+        with QueryCounter(self.db) as counter:
+            cached = get_user_cloud_counts(1, self.db)
+        invalidate_user_statistics(1)
+        refreshed = get_user_cloud_counts(1, self.db)
+
+        # Then
+        self.assertMaxQueries(counter, 0)
+        self.assertEqual((cached['buckets'], refreshed['buckets']), (1, 2))
+
+    def test_resources_are_projected_and_paginated(self):
+        from controllers.user import get_user_cloud_resources
+
+        # Given
+        first = json.loads(get_user_cloud_resources(self.current_user, self.db, "instances", "name,unknown", 0, 3).body.decode())
+
+        # When
+        second = json.loads(get_user_cloud_resources(self.current_user, self.db, "instances", "name", 0, 3, first['next_cursor']).body.decode())
+
+        # Then
+        self.assertEqual(first['results'], [{'name': "instance5"}, {'name': "instance4"}, {'name': "instance3"}])
+        self.assertEqual(second['results'], [{'name': "instance2"}])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_unknown_resources_kind_is_rejected(self):
+        from controllers.user import get_user_cloud_resources
+
+        # Given
+        kind = "volumes"
+
+        # When
+        response = get_user_cloud_resources(self.current_user, self.db, kind)
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.body.decode())['i18n_code'], "invalid_resource_kind")
@@ -1,7 +1,10 @@
+import asyncio
+import io
+
 from unittest import TestCase
 from unittest.mock import patch, Mock
 from datetime import datetime
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from entities.SupportTicket import SupportTicket
@@ -15,8 +18,10 @@ from controllers.support import (
     update_reply_support_ticket,
     delete_reply_support_ticket,
     auto_close_tickets,
+    attach_file_to_ticket_by_id,
     download_file_from_ticket_by_id,
     delete_file_from_ticket_by_id,
+    stream_file_to_ticket_by_id,
 )
 from schemas.Support import SupportTicketSchema, SupportTicketReplySchema
 
@@ -313,13 +318,14 @@ class TestSupportTicket(TestCase):
 
     @patch("controllers.support.SupportTicket.getUserSupportTicket")
     @patch("controllers.support.SupportTicketAttachment.getAttachmentByTicketId")
-    @patch("controllers.support.download_from_attachment_bucket")
+    @patch("controllers.support.get_from_attachment_bucket")
     def test_download_file_success(
         self, mock_download, mock_get_attachment, mock_get_ticket
     ):
         # Given
         mock_get_ticket.return_value = self.sample_ticket
         mock_get_attachment.return_value = self.sample_attachment
+        mock_download.return_value = {'status': 'ok', 'response': Mock(status = 200, headers = {'Content-Length': "4"}, stream = Mock(return_value = iter([b"te", b"st"])))}
 
         # When
         result = download_file_from_ticket_by_id(
@@ -327,7 +333,84 @@ class TestSupportTicket(TestCase):
         )
         
         # Then
-        self.assertIsInstance(result, FileResponse)
+        self.assertIsInstance(result, StreamingResponse)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.headers['content-length'], "4")
+        self.assertEqual(result.headers['content-disposition'], "attachment; filename*=utf-8''test.txt")
+        mock_download.assert_called_once_with("storage/key/test.txt", None)
+
+    @patch("controllers.support.SupportTicket.getUserSupportTicket")
+    @patch("controllers.support.SupportTicketAttachment.getAttachmentByTicketId")
+    @patch("controllers.support.get_from_attachment_bucket")
+    def test_download_file_with_range(
+        self, mock_download, mock_get_attachment, mock_get_ticket
+    ):
+        # Given
+        mock_get_ticket.return_value = self.sample_ticket
+        mock_get_attachment.return_value = self.sample_attachment
+        mock_download.return_value = {'status': 'ok', 'response': Mock(status = 206, headers = {'Content-Length': "2", 'Content-Range': "bytes 2-3/4"}, stream = Mock(return_value = iter([b"st"])))}
+
+        # When
+        result = download_file_from_ticket_by_id(
+            self.mock_user, "123", "1", self.mock_db, "bytes=2-3"
+        )
+
+        # Then
+        self.assertEqual(result.status_code, 206)
+        self.assertEqual(result.headers['content-range'], "bytes 2-3/4")
+        mock_download.assert_called_once_with("storage/key/test.txt", "bytes=2-3")
+
+    @patch("controllers.support.SupportTicket.getUserSupportTicket")
+    @patch("controllers.support.SupportTicketAttachment.save", autospec = True)
+    @patch("controllers.support.put_to_attachment_bucket")
+    def test_attach_file_is_sent_without_local_copy(
+        self, mock_put, mock_save, mock_get_ticket
+    ):
+        # Given
+        mock_get_ticket.return_value = self.sample_ticket
+        mock_put.return_value = {'status': 'ok'}
+        file = Mock(file = io.BytesIO(b"content"), content_type = "text/plain", filename = "test.txt")
+
+        # When
+        result = attach_file_to_ticket_by_id(self.mock_user, "123", [file], self.mock_db)
+
+        # Then
+        self.assertEqual(result.status_code, 200)
+        data, target_name, content_type = mock_put.call_args.args
+        self.assertIs(data, file.file)
+        self.assertEqual(content_type, "text/plain")
+        self.assertEqual(mock_save.call_args.args[0].storage_key, target_name)
+
+    @patch("controllers.support.SupportTicket.getUserSupportTicket")
+    @patch("controllers.support.SupportTicketAttachment.save", autospec = True)
+    @patch("controllers.support.put_to_attachment_bucket")
+    def test_stream_file_pipes_the_request_body(
+        self, mock_put, mock_save, mock_get_ticket
+    ):
+        # Given
+        mock_get_ticket.return_value = self.sample_ticket
+        parts = []
+        def put(data, target_name, content_type):
+            while True:
+                part = data.read(4)
+                if not part:
+                    return {'status': 'ok'}
+                parts.append(part)
+        mock_put.side_effect = put
+
+        async def body():
+            for chunk in [b"abc", b"defgh", b"ij"]:
+                yield chunk
+        request = Mock(headers = {'content-type': "application/pdf"}, stream = body)
+
+        # When
+        result = asyncio.run(stream_file_to_ticket_by_id(self.mock_user, "123", "doc.pdf", request, self.mock_db))
+
+        # Then
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(parts, [b"abcd", b"efgh", b"ij"])
+        self.assertEqual(mock_save.call_args.args[0].name, "doc.pdf")
+        self.assertEqual(mock_save.call_args.args[0].mime_type, "application/pdf")
 
     @patch("controllers.support.SupportTicketAttachment.getAttachmentByTicketId")
     @patch("controllers.support.delete_from_attachment_bucket")
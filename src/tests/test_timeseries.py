@@ -0,0 +1,105 @@
+import json
+
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import Mock
+from uuid import uuid4
+
+from entities.User import User
+from entities.iot.Data import Data, NumericDataRollup
+from entities.iot.Device import Device
+from tests.query_counter import QueryCountMixin, QueryCounter, get_test_session
+from utils.iot.timeseries import get_rollup_rows
+
+_start = datetime(2024, 1, 1)
+
+class TestTimeseries(TestCase, QueryCountMixin):
+    def __init__(self, *args, **kwargs):
+        super(TestTimeseries, self).__init__(*args, **kwargs)
+
+    def setUp(self):
+        self.db = get_test_session()
+        self.current_user = Mock(id = 1, email = "user1@email.com", is_admin = False)
+        self.device_id = str(uuid4())
+        self.db.add(User(id = 1, email = "user1@email.com", enabled_features = {}))
+        self.db.add(Device(id = self.device_id, username = "user1@email.com", active = True))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def insert_readings(self, readings):
+        numeric_rows = []
+        data_rows = []
+        for created_at, value in readings:
+            data_id = uuid4()
+            data_rows.append({'id': data_id, 'device_id': self.device_id, 'normalized_content': {}, 'created_at': created_at.isoformat()})
+            numeric_rows.append({'id': uuid4(), 'data_id': str(data_id), 'device_id': self.device_id, 'key': "data", 'value': value, 'created_at': created_at})
+        Data.insertBatch(data_rows, numeric_rows, [], get_rollup_rows(numeric_rows), self.db)
+
+    def get_series(self, start, end, max_points, resolution = None):
+        from controllers.iot.data import get_numeric_data_series
+
+        response = get_numeric_data_series(self.current_user, self.device_id, "data", start, end, max_points, resolution, self.db)
+        return response.status_code, json.loads(response.body.decode())
+
+    def test_rollups_are_merged_incrementally(self):
+        # Given
+        self.insert_readings([(_start + timedelta(seconds = 10), 4.0), (_start + timedelta(seconds = 20), 2.0)])
+
+        # When
+        self.insert_readings([(_start + timedelta(seconds = 30), 9.0), (_start + timedelta(minutes = 5), 1.0)])
+
+        # Then
+        minutes = self.db.query(NumericDataRollup).filter(NumericDataRollup.resolution == "minute").order_by(NumericDataRollup.bucket).all()
+        day = self.db.query(NumericDataRollup).filter(NumericDataRollup.resolution == "day").one()
+        self.assertEqual([(m.min_value, m.max_value, m.sum_value, m.count) for m in minutes], [(2.0, 9.0, 15.0, 3), (1.0, 1.0, 1.0, 1)])
+        self.assertEqual((day.bucket, day.min_value, day.max_value, day.sum_value, day.count), (_start, 1.0, 9.0, 16.0, 4))
+
+    def test_raw_rows_are_returned_when_they_fit(self):
+        # Given
+        self.insert_readings([(_start + timedelta(seconds = i * 15), float(i)) for i in range(10)])
+
+        # When
+        status_code, result = self.get_series(_start, _start + timedelta(hours = 1), 100)
+
+        # Then
+        self.assertEqual(status_code, 200)
+        self.assertEqual(result['resolution'], "raw")
+        self.assertEqual([point['avg'] for point in result['points']], [float(i) for i in range(10)])
+
+    def test_coarsest_rollup_is_used_for_long_ranges(self):
+        # Given
+        self.insert_readings([(_start + timedelta(minutes = i * 30), float(i)) for i in range(96)])
+
+        # When
+        with QueryCounter(self.db) as counter:
+            status_code, result = self.get_series(_start, _start + timedelta(days = 30), 100)
+
+        # Then
+        self.assertEqual(status_code, 200)
+        self.assertEqual(result['resolution'], "day")
+        self.assertEqual([(point['count'], point['min'], point['max']) for point in result['points']], [(48, 0.0, 47.0), (48, 48.0, 95.0)])
+        self.assertMaxQueries(counter, 2)
+
+    def test_hour_rollup_is_used_when_the_minutes_dont_fit(self):
+        # Given
+        self.insert_readings([(_start + timedelta(minutes = i), 1.0) for i in range(180)])
+
+        # When
+        status_code, result = self.get_series(_start, _start + timedelta(days = 1), 100)
+
+        # Then
+        self.assertEqual(result['resolution'], "hour")
+        self.assertEqual([point['count'] for point in result['points']], [60, 60, 60])
+
+    def test_unknown_device_is_rejected(self):
+        # Given
+        device_id = str(uuid4())
+
+        # When
+        from controllers.iot.data import get_numeric_data_series
+        response = get_numeric_data_series(self.current_user, device_id, "data", None, None, 100, None, self.db)
+
+        # Then
+        self.assertEqual(response.status_code, 404)
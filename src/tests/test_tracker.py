@@ -1,4 +1,11 @@
+import os
+import asyncio
+import tempfile
+
 from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+
+from utils.observability import tracker
 from utils.observability.tracker import parse_user_agent
 
 class TestTracker(TestCase):
@@ -82,3 +89,62 @@ class TestTracker(TestCase):
         self.assertEqual(result['os'], "unknown")
         self.assertEqual(result['device'], "unknown")
         self.assertEqual(result['browser'], "unknown")
+
+    def test_parse_user_agent_is_cached(self):
+        ## Given
+        user_agent = "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+        first = parse_user_agent(user_agent)
+        first['details']['type'] = "altered"
+
+        #When
+        with patch('utils.observability.tracker.compute_user_agent') as compute_user_agent:
+            result = parse_user_agent(user_agent)
+
+        ## Then
+        compute_user_agent.assert_not_called()
+        self.assertEqual(result['os'], "ios")
+        self.assertEqual(result['details']['type'], "iphone")
+
+    def test_get_infos_from_local_database(self):
+        ## Given
+        with tempfile.NamedTemporaryFile("w", suffix = ".csv", delete = False) as db_file:
+            db_file.write("1.0.0.0,1.0.0.255,OC,AU,Queensland,\"South Brisbane\",-27.4767,153.017\n")
+            db_file.write("2a01:e00::,2a01:e3f:ffff:ffff:ffff:ffff:ffff:ffff,EU,FR,Île-de-France,Paris,48.8534,2.3488\n")
+        tracker.load_geoip_db(db_file.name)
+
+        #When
+        with patch('utils.observability.tracker.get_remote_infos_from_ip') as get_remote_infos_from_ip:
+            result = asyncio.run(tracker.get_infos_from_ip("1.0.0.42"))
+            result_v6 = asyncio.run(tracker.get_infos_from_ip("2a01:e0a::1"))
+
+        ## Then
+        get_remote_infos_from_ip.assert_not_called()
+        self.assertEqual(result['city'], "South Brisbane")
+        self.assertEqual(result['country_iso'], "AU")
+        self.assertEqual(result['loc'], "-27.4767,153.017")
+        self.assertEqual(result_v6['region'], "Île-de-France")
+        tracker._geoip_db.close()
+        tracker._geoip_db = None
+        os.remove(db_file.name)
+
+    @patch('utils.observability.tracker.TRACKER_REMOTE_LOOKUP', True)
+    def test_get_infos_from_ip_remote_fallback(self):
+        ## Given
+        remote_infos = {"status": "ok", "ip": "10.1.2.3", "city": "Paris"}
+
+        async def get_infos():
+            tracker._remote_client = None
+            with patch('utils.observability.tracker.get_remote_infos_from_ip', new_callable = AsyncMock, return_value = remote_infos) as get_remote_infos_from_ip:
+                first = await tracker.get_infos_from_ip("10.1.2.3")
+                second = await tracker.get_infos_from_ip("10.1.2.3")
+            await tracker._remote_client.aclose()
+            tracker._remote_client = None
+            return first, second, get_remote_infos_from_ip.await_count
+
+        #When
+        first, second, await_count = asyncio.run(get_infos())
+
+        ## Then
+        self.assertEqual(first, remote_infos)
+        self.assertEqual(second, remote_infos)
+        self.assertEqual(await_count, 1)
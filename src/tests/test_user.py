@@ -100,24 +100,11 @@ class TestUser(TestCase):
         result_body_str = json.dumps(result_body)
         self.assertEqual(result_body_str, '{"status": "ok", "message": "user successfully created", "i18n_code": "user_created"}')
      
-    @patch('entities.Instance.Instance.getActiveUserInstances', side_effect = lambda x,y:[])
-    @patch('entities.Access.Access.getUserAccessesByType' , side_effect = lambda x,y,z:[])
-    @patch('entities.Project.Project.getUserProjects' , side_effect = lambda x,y:[])
-    @patch('entities.Bucket.Bucket.getAllUserBuckets', side_effect = lambda x,y:[])
-    @patch('entities.Registry.Registry.getAllUserRegistries')
-    def test_get_user_cloud_statistics(self, getActiveUserInstances, getUserAccessesByType, getUserProjects, getAllUserBuckets, getAllUserRegistries):
+    @patch('controllers.user.get_user_cloud_counts')
+    def test_get_user_cloud_statistics(self, get_user_cloud_counts):
         # Given
         from controllers.user import get_user_cloud_statistics
-        from entities.Instance import Instance
-        from entities.Project import Project
-        from entities.Bucket import Bucket
-        from entities.Registry import Registry
-        from entities.Access import Access
-        getActiveUserInstances.return_value = [Instance(), Instance()]
-        getUserAccessesByType.return_value = [Access(), Access()]
-        getUserProjects.return_value = [Project(), Project()]
-        getAllUserBuckets.return_value = [Bucket()]
-        getAllUserRegistries.return_value = [Registry()]
+        get_user_cloud_counts.return_value = {"projects": 0, "instances": 0, "buckets": 0, "registries": 2}
 
         # When
         result = get_user_cloud_statistics(test_current_user, mock_db)
@@ -128,34 +115,16 @@ class TestUser(TestCase):
         self.assertEqual(response_status_code, 200)  
         self.assertIsInstance(result, JSONResponse)
         self.assertEqual(result.body.decode(), '{"projects":0,"instances":0,"buckets":0,"registries":2}')
+        get_user_cloud_counts.assert_called_once_with(test_current_user.id, mock_db)
 
-    @patch('entities.Instance.Instance.getActiveUserInstances', side_effect = lambda x,y:[])
-    @patch('entities.Project.Project.getUserProjects', side_effect = lambda x,y:[])
-    @patch('entities.Bucket.Bucket.getAllUserBuckets', side_effect = lambda x,y:[])
-    @patch('entities.Registry.Registry.getAllUserRegistries', side_effect = lambda x,y:[])
-    def test_get_user_cloud_resources(self, getAllUserRegistries, getAllUserBuckets, getActiveUserInstances, getUserProjects):
+    def test_get_user_cloud_resources(self):
         # Given
         from controllers.user import get_user_cloud_resources
-        from entities.Instance import Instance
-        from entities.Project import Project
-        from entities.Bucket import Bucket
-        from entities.Registry import Registry
-        instances = Instance()
-        projects = Project()
-        buckets = Bucket()
-        registries = Registry()
-        registries = Registry()
-        instances.id = 1
-        projects.id = 1
-        buckets.id = 1
-        registries.id = 1
-        getActiveUserInstances.return_value = instances
-        getUserProjects.return_value = projects
-        getAllUserBuckets.return_value = buckets
-        getAllUserRegistries.return_value = registries
+        from tests.query_counter import get_test_session
+        db = get_test_session()
 
         # When
-        result = get_user_cloud_resources(test_current_user, mock_db)
+        result = get_user_cloud_resources(test_current_user, db)
         response_status_code = result.__dict__['status_code']
     
         # Then
@@ -0,0 +1,35 @@
+import hashlib
+
+from utils.broadcast import broadcast, decode_broadcast, start_broadcast_listener
+from utils.common import get_env_int, is_empty_key
+from utils.consumer import AUTH_CHANNEL
+from utils.logger import log_msg
+from utils.lru_cache import TtlLruCache
+
+_principals = TtlLruCache(get_env_int('AUTH_CACHE_SIZE', 10000), get_env_int('AUTH_CACHE_TTL', 60))
+
+def get_principal_key(kind, credential):
+    return "{}:{}".format(kind, hashlib.sha256(credential.encode()).hexdigest())
+
+def get_cached_principal(key):
+    start_broadcast_listener(AUTH_CHANNEL, handle_principals_change)
+    return _principals.get(key)
+
+def cache_principal(key, user_id, attributes):
+    _principals.put(key, {'user_id': user_id, 'attributes': attributes})
+
+def evict_principals(user_id):
+    _principals.delete_if(lambda principal: principal['user_id'] == user_id)
+
+def invalidate_principals(user_id):
+    #? evicts the local principals right away and the other API instances' ones through the pubsub
+    log_msg("DEBUG", "[invalidate_principals] user_id = {}".format(user_id))
+    evict_principals(user_id)
+    broadcast(AUTH_CHANNEL, {'user_id': user_id})
+
+async def handle_principals_change(msg):
+    payload = decode_broadcast(msg)
+    if payload is None or is_empty_key(payload, 'user_id'):
+        return
+
+    evict_principals(payload['user_id'])
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from queue import Queue
+
+from adapters.AdapterConfig import get_adapter
+from utils.consumer import CONSUMER_SLEEP_TIME
+from utils.logger import log_msg
+
+_pubsub_adapter = get_adapter("pubsub")
+_listeners = {}
+_sender = None
+_queue = Queue()
+_lock = threading.Lock()
+
+def send_broadcasts():
+    while True:
+        channel, payload = _queue.get()
+        try:
+            #? no consumer group: every instance receives the message
+            _pubsub_adapter().publish(None, channel, payload)
+        except Exception as e:
+            log_msg("WARN", "[send_broadcasts] unable to publish: channel = {}, e.type = {}, e.msg = {}".format(channel, type(e), e))
+
+def broadcast(channel, payload):
+    #? published from a background thread so that the callers aren't slowed down by an unavailable broker
+    global _sender
+    with _lock:
+        if _sender is None:
+            _sender = threading.Thread(target = send_broadcasts, name = "broadcast-sender", daemon = True)
+            _sender.start()
+    _queue.put((channel, payload))
+
+def decode_broadcast(msg):
+    return _pubsub_adapter().decode(msg)
+
+def listen_broadcast(channel, handler):
+    delay = 1
+    while True:
+        started_at = time.monotonic()
+        try:
+            _pubsub_adapter().consume(None, channel, handler)
+        except SystemExit:
+            #? the nats clients exit once their subscription expires, the listener subscribes again
+            log_msg("DEBUG", "[listen_broadcast] consume loop ended: channel = {}".format(channel))
+        except Exception as e:
+            log_msg("ERROR", "[listen_broadcast] unexpected error: channel = {}, e.type = {}, e.msg = {}".format(channel, type(e), e))
+
+        #? backoff when the consume loop keeps returning right away (connection lost, log adapter)
+        delay = 1 if time.monotonic() - started_at > delay else min(delay * 2, CONSUMER_SLEEP_TIME)
+        time.sleep(delay)
+
+def start_broadcast_listener(channel, handler):
+    with _lock:
+        if channel not in _listeners or not _listeners[channel].is_alive():
+            _listeners[channel] = threading.Thread(target = listen_broadcast, args = (channel, handler), name = "{}-listener".format(channel), daemon = True)
+            _listeners[channel].start()
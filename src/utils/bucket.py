@@ -1,12 +1,18 @@
 import os
+import asyncio
+import certifi
 import importlib
+import threading
+import urllib3
 
 from minio import Minio
+from minio.error import S3Error
 from time import sleep
+from urllib3.util import Retry, Timeout
 
 from entities.Bucket import Bucket
 
-from utils.common import is_empty
+from utils.common import get_env_int, is_empty
 from utils.logger import log_msg
 from utils.observability.cid import get_current_cid
 from utils.provider import get_driver
@@ -73,16 +79,17 @@ invoice_bucket_name = os.getenv('BUCKET_NAME')
 attachment_bucket_url = os.getenv('ATTACHMENT_BUCKET_URL', invoice_bucket_url)
 attachment_bucket_name = os.getenv('ATTACHMENT_BUCKET_NAME', invoice_bucket_name)
 
-def upload_to_attachment_bucket(path_file, target_name):
-    return upload_bucket(path_file, target_name, attachment_bucket_url, attachment_bucket_name)
+BUCKET_POOL_SIZE = get_env_int('BUCKET_POOL_SIZE', 20)
+BUCKET_TIMEOUT = get_env_int('BUCKET_TIMEOUT', 300)
+BUCKET_PART_SIZE = get_env_int('BUCKET_PART_SIZE', 10 * 1024 * 1024)
+BUCKET_CHUNK_SIZE = get_env_int('BUCKET_CHUNK_SIZE', 64 * 1024)
 
-def download_from_attachment_bucket(path_file, target_name):
-    return download_from_bucket(path_file, target_name, attachment_bucket_url, attachment_bucket_name)
+#? one client per endpoint sharing the same connections pool, the buckets are only checked once
+_clients = {}
+_checked_buckets = set()
+_clients_lock = threading.Lock()
 
-def delete_from_attachment_bucket(path_file):
-    return delete_from_bucket(path_file, attachment_bucket_url, attachment_bucket_name)
-
-def upload_bucket(path_file, target_name, url, bucket_name):
+def get_bucket_settings_error(url, bucket_name):
     if any(is_empty(setting) for setting in [url, access_key, secret_key, bucket_name, bucket_region]):
         return {
             'status': 'ko',
@@ -91,18 +98,97 @@ def upload_bucket(path_file, target_name, url, bucket_name):
             'http_code': 405,
             'cid': get_current_cid()
         }
+    return None
+
+def get_minio_client(url):
+    with _clients_lock:
+        if url not in _clients:
+            http_client = urllib3.PoolManager(
+                timeout = Timeout(connect = BUCKET_TIMEOUT, read = BUCKET_TIMEOUT),
+                maxsize = BUCKET_POOL_SIZE,
+                cert_reqs = 'CERT_REQUIRED',
+                ca_certs = os.environ.get('SSL_CERT_FILE') or certifi.where(),
+                retries = Retry(total = 5, backoff_factor = 0.2, status_forcelist = [500, 502, 503, 504])
+            )
+            _clients[url] = Minio(url, region = bucket_region, access_key = access_key, secret_key = secret_key, http_client = http_client)
+        return _clients[url]
 
-    client = Minio(url, region = bucket_region, access_key = access_key, secret_key = secret_key)
+def ensure_bucket(url, bucket_name):
+    if (url, bucket_name) in _checked_buckets:
+        return
+
+    client = get_minio_client(url)
     found = client.bucket_exists(bucket_name)
-    log_msg("DEBUG", "[upload_bucket] found = {}".format(found))
+    log_msg("DEBUG", "[ensure_bucket] bucket_name = {}, found = {}".format(bucket_name, found))
+    if not found:
+        client.make_bucket(bucket_name)
+    _checked_buckets.add((url, bucket_name))
 
-    try:
-        if not found:
-            client.make_bucket(bucket_name)
+def buckets():
+    def check_attachment_bucket():
+        try:
+            ensure_bucket(attachment_bucket_url, attachment_bucket_name)
+        except Exception as e:
+            #? checked again with the first upload
+            log_msg("WARN", "[buckets][check_attachment_bucket] unexpected error: {}".format(e))
+
+    if get_bucket_settings_error(attachment_bucket_url, attachment_bucket_name) is None:
+        threading.Thread(target = check_attachment_bucket, name = "buckets", daemon = True).start()
+
+def get_object_name(storage_key):
+    #? the former attachments were stored with a local path as key but uploaded with its basename
+    return os.path.basename(storage_key)
+
+class AsyncStreamReader():
+    #? file-like adapter over an async iterator of chunks (i.e: the request body) for the blocking minio client
+    #? which must be used from a worker thread while the event loop is running
+    def __init__(self, chunks, loop):
+        self.chunks = chunks.__aiter__()
+        self.loop = loop
+        self.buffer = bytearray()
+        self.eof = False
+        self.size = 0
+
+    async def next_chunk(self):
+        try:
+            return await self.chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read(self, size = -1):
+        while not self.eof and (size < 0 or len(self.buffer) < size):
+            chunk = asyncio.run_coroutine_threadsafe(self.next_chunk(), self.loop).result()
+            if chunk is None:
+                self.eof = True
+            else:
+                self.buffer.extend(chunk)
+
+        size = len(self.buffer) if size < 0 else min(size, len(self.buffer))
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        self.size += len(data)
+        return data
 
-        client.fput_object(bucket_name, target_name, path_file)
+def put_to_attachment_bucket(data, target_name, content_type):
+    return put_to_bucket(data, target_name, content_type, attachment_bucket_url, attachment_bucket_name)
+
+def get_from_attachment_bucket(path_file, byte_range = None):
+    return get_from_bucket(get_object_name(path_file), byte_range, attachment_bucket_url, attachment_bucket_name)
+
+def delete_from_attachment_bucket(path_file):
+    return delete_from_bucket(get_object_name(path_file), attachment_bucket_url, attachment_bucket_name)
+
+def put_to_bucket(data, target_name, content_type, url, bucket_name):
+    #? unknown length: the data is read and sent by parts, so only one part is kept in memory
+    error = get_bucket_settings_error(url, bucket_name)
+    if error:
+        return error
+
+    try:
+        ensure_bucket(url, bucket_name)
+        get_minio_client(url).put_object(bucket_name, target_name, data, length = -1, part_size = BUCKET_PART_SIZE, num_parallel_uploads = 1, content_type = content_type or "application/octet-stream")
     except Exception as e:
-        log_msg("ERROR", "[upload_bucket] unexpected error when uploading path_file = {} into bucket_name = {} e.type = {}, e.msg = {}".format(path_file, bucket_name, type(e), e))
+        log_msg("ERROR", "[put_to_bucket] unexpected error when uploading target_name = {} into bucket_name = {} e.type = {}, e.msg = {}".format(target_name, bucket_name, type(e), e))
         return {
             'status': 'ko',
             'error': "bucket upload error",
@@ -115,52 +201,59 @@ def upload_bucket(path_file, target_name, url, bucket_name):
         'status': 'ok',
     }
 
-def download_from_bucket(path_file, target_name, url, bucket_name):
-    if any(is_empty(setting) for setting in [url, access_key, secret_key, bucket_name, bucket_region]):
-        return {
-            'status': 'ko',
-            'error': 'Bucket settings are not configured',
-            'i18n_code': 'bucket_settings_not_configured',
-            'http_code': 405,
-            'cid': get_current_cid()
-        }
+def get_from_bucket(path_file, byte_range, url, bucket_name):
+    #? the http range is forwarded as it is, the storage answers with the partial content and its content-range
+    error = get_bucket_settings_error(url, bucket_name)
+    if error:
+        return error
 
     try:
-        client = Minio(url, region = bucket_region, access_key = access_key, secret_key = secret_key)
-        client.fget_object(bucket_name, path_file, target_name)
+        response = get_minio_client(url).get_object(bucket_name, path_file, request_headers = {'Range': byte_range} if byte_range else None)
         return {
             'status': 'ok',
+            'response': response
         }
-    except Exception as e:
-        not_found_msg = "File not found: target_name = {}, path_file = {}".format(target_name, path_file)
-        log_msg("WARN", "[bucket][download_from_bucket] {}, e.type = {}, e.msg = {}".format(not_found_msg, type(e), e))
-
-        basename = os.path.basename(path_file)
-        if basename != path_file:
-           log_msg("INFO", "[bucket][download_from_bucket] switch file_path path_file = {} with basename = {}".format(path_file, basename))
-           return download_from_bucket(basename, target_name, url, bucket_name)
-
+    except S3Error as e:
+        log_msg("WARN", "[bucket][get_from_bucket] path_file = {}, e.code = {}, e.msg = {}".format(path_file, e.code, e))
+        if e.code == "InvalidRange":
+            return {
+                'status': 'ko',
+                'error': "Range not satisfiable",
+                'i18n_code': 'range_not_satisfiable',
+                'http_code': 416,
+                'cid': get_current_cid()
+            }
         return {
             'status': 'ko',
-            'error': not_found_msg,
+            'error': "File not found: path_file = {}".format(path_file),
             'i18n_code': 'file_not_found',
             'http_code': 404,
             'cid': get_current_cid()
         }
-
-def delete_from_bucket(path_file, url, bucket_name):
-    if any(is_empty(setting) for setting in [url, access_key, secret_key, bucket_name, bucket_region]):
+    except Exception as e:
+        log_msg("ERROR", "[bucket][get_from_bucket] unexpected error path_file = {}, e.type = {}, e.msg = {}".format(path_file, type(e), e))
         return {
             'status': 'ko',
-            'error': 'Bucket settings are not configured',
-            'i18n_code': 'bucket_settings_not_configured',
-            'http_code': 405,
+            'error': "bucket download error",
+            'i18n_code': 'bucket_download_error',
+            'http_code': 500,
             'cid': get_current_cid()
         }
 
+def stream_object(response, chunk_size = BUCKET_CHUNK_SIZE):
+    try:
+        yield from response.stream(chunk_size)
+    finally:
+        response.close()
+        response.release_conn()
+
+def delete_from_bucket(path_file, url, bucket_name):
+    error = get_bucket_settings_error(url, bucket_name)
+    if error:
+        return error
+
     try:
-        client = Minio(url, region = bucket_region, access_key = access_key, secret_key = secret_key)
-        client.remove_object(bucket_name, path_file)
+        get_minio_client(url).remove_object(bucket_name, path_file)
         return {
             'status': 'ok',
         }
@@ -1,6 +1,43 @@
+import os
+
+from utils.common import is_not_empty
+
+_trusted_proxies = [proxy.strip() for proxy in os.getenv('TRUSTED_PROXIES', '').split(",") if is_not_empty(proxy.strip())]
+
 def get_client_ips(request):
     return [
         request.client.host,
         request.headers.get("X-Forwarded-For", None), 
         request.headers.get("X-Real-IP", None)
     ]
+
+def get_client_ip(request):
+    #? the X-Real-IP is set by the reverse proxy, the first address of a X-Forwarded-For list is the client one
+    real_ip = request.headers.get("X-Real-IP", None)
+    if real_ip:
+        return real_ip.strip()
+
+    forwarded_for = request.headers.get("X-Forwarded-For", None)
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+
+    return request.client.host if request.client else None
+
+def get_trusted_client_ip(request):
+    #? the forwarding headers are set by the client itself unless the request comes from a trusted proxy
+    client_host = request.client.host if request.client else None
+    if client_host not in _trusted_proxies:
+        return client_host
+
+    real_ip = request.headers.get("X-Real-IP", None)
+    if real_ip:
+        return real_ip.strip()
+
+    #? the trusted proxies append the address they've received the request from: the last untrusted one is the client
+    forwarded_for = request.headers.get("X-Forwarded-For", None)
+    if forwarded_for:
+        for ip in reversed([ip.strip() for ip in forwarded_for.split(",")]):
+            if ip not in _trusted_proxies:
+                return ip
+
+    return client_host
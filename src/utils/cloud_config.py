@@ -0,0 +1,65 @@
+import os
+import threading
+import yaml
+
+from utils.logger import log_msg
+
+_config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
+_config = None
+_lock = threading.Lock()
+
+class CloudConfig():
+    def __init__(self, data, mtime):
+        self.data = data if isinstance(data, dict) else {}
+        self.mtime = mtime
+        self.providers = {}
+        self.regions = {}
+        self.zones = {}
+        self.dns_zones = {}
+
+        #? the first declaration wins like the former list filters
+        for provider in self.data.get('providers') or []:
+            self.providers.setdefault(provider['name'], provider)
+            for instance_config in provider.get('instance_configs') or []:
+                self.regions.setdefault((provider['name'], instance_config['region']), instance_config)
+                for zone in instance_config.get('zones') or []:
+                    self.zones.setdefault((provider['name'], instance_config['region'], str(zone['name'])), zone)
+
+        for dns_zone in self.data.get('dns_zones') or []:
+            self.dns_zones.setdefault(dns_zone['name'], dns_zone)
+
+    def get(self, key, default = None):
+        return self.data[key] if key in self.data else default
+
+    def get_provider(self, name):
+        return self.providers.get(name)
+
+    def get_region(self, provider, region):
+        return self.regions.get((provider, region))
+
+    def get_zone(self, provider, region, zone):
+        return self.zones.get((provider, region, str(zone)))
+
+    def get_dns_zone(self, name):
+        return self.dns_zones.get(name)
+
+def get_cloud_config():
+    #? parsed once and reloaded when the file changes, the returned config must be considered read-only
+    global _config
+    mtime = os.stat(_config_path).st_mtime_ns
+    config = _config
+    if config is not None and config.mtime == mtime:
+        return config
+
+    with _lock:
+        if _config is None or _config.mtime != mtime:
+            try:
+                with open(_config_path, "r") as stream:
+                    _config = CloudConfig(yaml.safe_load(stream), mtime)
+                log_msg("DEBUG", "[get_cloud_config] {} loaded with mtime = {}".format(_config_path, mtime))
+            except yaml.YAMLError as e:
+                if _config is None:
+                    raise
+                log_msg("ERROR", "[get_cloud_config] keeping the previous configuration, unable to reload {}: {}".format(_config_path, e))
+                _config.mtime = mtime
+        return _config
@@ -1,12 +1,23 @@
+import asyncio
 import shlex
 from subprocess import check_output, PIPE, CalledProcessError # nosec B404
 from utils.logger import log_msg
 
-def get_script_output(cmd):
+def get_script_output(cmd, env = None):
     log_msg("DEBUG", f"[get_script_output] cmd = {cmd}")
     try:
         cmd_args = shlex.split(cmd)
-        return check_output(cmd_args, stderr=PIPE, universal_newlines=True) # nosec B603
+        return check_output(cmd_args, stderr=PIPE, universal_newlines=True, env=env) # nosec B603
     except CalledProcessError as e:
         log_msg("ERROR", f"Command failed with error: {e.stderr}")
         return e.stderr
+
+async def aget_script_output(cmd):
+    log_msg("DEBUG", f"[aget_script_output] cmd = {cmd}")
+    cmd_args = shlex.split(cmd)
+    process = await asyncio.create_subprocess_exec(*cmd_args, stdout=PIPE, stderr=PIPE) # nosec B603
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        log_msg("ERROR", f"Command failed with error: {stderr.decode()}")
+        return stderr.decode()
+    return stdout.decode()
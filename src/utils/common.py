@@ -2,23 +2,13 @@ import os
 import re
 import base64
 
-from passlib.context import CryptContext
-
 AUTOESCAPE_EXTENSIONS = ['html', 'xml']
 
-pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
-
 _src_path = "/app/src"
 
 def get_src_path():
     return _src_path
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def generate_hash_password(password):
-    return pwd_context.hash(password)
-
 def is_boolean(var):
     if isinstance(var, bool):
         return True
@@ -1,10 +1,36 @@
 import os
 
-from utils.common import get_env_int
+from utils.common import get_env_bool, get_env_int
+from utils.http import HTTP_REQUEST_TIMEOUT
 
 CONSUMER_SLEEP_TIME = get_env_int('CONSUMER_SLEEP_TIME', 3600)
 CONSUMER_GROUP = os.getenv('CONSUMER_GROUP', 'faas')
 CONSUMER_CHANNEL = os.getenv('CONSUMER_CHANNEL', 'faas')
+CONSUMER_MAX_IN_FLIGHT = get_env_int('CONSUMER_MAX_IN_FLIGHT', 20)
+
+CONSUMER_POOL_ENABLED = get_env_bool('CONSUMER_POOL_ENABLED', False)
+CONSUMER_POOL_SIZE = get_env_int('CONSUMER_POOL_SIZE', 2)
+CONSUMER_POOL_MAX_RUNS = get_env_int('CONSUMER_POOL_MAX_RUNS', 100)
+CONSUMER_POOL_TIMEOUT = get_env_int('CONSUMER_POOL_TIMEOUT', HTTP_REQUEST_TIMEOUT)
+CONSUMER_GO_CACHE_SIZE = get_env_int('CONSUMER_GO_CACHE_SIZE', 100)
+CONSUMER_FUNCTIONS_CACHE_SIZE = get_env_int('CONSUMER_FUNCTIONS_CACHE_SIZE', 1000)
+CONSUMER_FUNCTIONS_CACHE_TTL = get_env_int('CONSUMER_FUNCTIONS_CACHE_TTL', 300)
+CONSUMER_RESULTS_BATCH_SIZE = get_env_int('CONSUMER_RESULTS_BATCH_SIZE', 50)
+CONSUMER_RESULTS_BATCH_WAIT_TIME = get_env_int('CONSUMER_RESULTS_BATCH_WAIT_TIME', 100)
+CONSUMER_BATCH_SIZE = get_env_int('CONSUMER_BATCH_SIZE', 10)
+CONSUMER_STREAM_MAXLEN = get_env_int('CONSUMER_STREAM_MAXLEN', 10000)
+CONSUMER_CLAIM_IDLE_TIME = get_env_int('CONSUMER_CLAIM_IDLE_TIME', 300000)
+CONSUMER_CLAIM_INTERVAL = get_env_int('CONSUMER_CLAIM_INTERVAL', 30)
 
 TRIGGERS_GROUP = os.getenv('TRIGGERS_GROUP', 'faastriggers')
 TRIGGERS_CHANNEL = os.getenv('TRIGGERS_CHANNEL', 'faastriggers')
+TRIGGERS_RESYNC_TIME = get_env_int('TRIGGERS_RESYNC_TIME', 3600)
+
+FUNCTIONS_CHANNEL = os.getenv('FUNCTIONS_CHANNEL', 'faasfunctions')
+
+INVOCATIONS_CHANNEL = os.getenv('INVOCATIONS_CHANNEL', 'faasinvocations')
+AUTH_CHANNEL = os.getenv('AUTH_CHANNEL', 'auth')
+STATISTICS_CHANNEL = os.getenv('STATISTICS_CHANNEL', 'statistics')
+
+PROVISIONING_GROUP = os.getenv('PROVISIONING_GROUP', 'provisioning')
+PROVISIONING_CHANNEL = os.getenv('PROVISIONING_CHANNEL', 'provisioning')
@@ -1,5 +1,3 @@
-import os
-import yaml
 
 import pulumi_ovh as ovh
 import pulumiverse_scaleway as scaleway
@@ -7,6 +5,7 @@ import pulumi_aws as aws
 import pulumi_azure_native as azure_native
 import pulumi_cloudflare as cloudflare
 
+from utils.cloud_config import get_cloud_config
 from utils.common import is_empty, is_not_empty, is_not_empty_key
 from utils.logger import log_msg
 
@@ -52,10 +51,7 @@ def register_aws_domain(record_name, environment, instance_ip, root_dns_zone):
     sub_domain = "{}.{}".format(record_name, environment)
     log_msg("INFO", "[register_domain][aws] register domain {}.{}".format(record_name, dns_zone))
 
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        hosted_zone_id = loaded_data['dns_hosted_zone_id']
+    hosted_zone_id = get_cloud_config().data['dns_hosted_zone_id']
 
     aws.route53.Record(resource_name = sub_domain,
         zone_id = hosted_zone_id,
@@ -79,40 +75,19 @@ def register_azure_domain(record_name, environment, instance_ip, root_dns_zone):
     zone_name=root_dns_zone)
 
 def get_dns_zone_driver(dns_zone):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    dns_zones = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        if 'dns_zones' in loaded_data.keys():
-            dns_zones = loaded_data['dns_zones']
-        else:
-            dns_zones = []
-
-    filtered_dns_zones = [zone for zone in dns_zones if zone['name'] == dns_zone]
-    if len(filtered_dns_zones) >0:
-        strategy = filtered_dns_zones[0]['driver'] if 'driver' in filtered_dns_zones[0] and is_not_empty(filtered_dns_zones[0]['driver']) else filtered_dns_zones[0]['strategy']
+    zone = get_cloud_config().get_dns_zone(dns_zone)
+    if zone is not None:
+        strategy = zone['driver'] if 'driver' in zone and is_not_empty(zone['driver']) else zone['strategy']
         return strategy.replace("Strategy", "Driver")
     return False
 
 def get_dns_zones():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        if 'dns_zones' in loaded_data.keys():
-            result = [dns_zone['name'] for dns_zone in loaded_data['dns_zones']]
-        else:
-            result = []
-    return result
+    return [dns_zone['name'] for dns_zone in get_cloud_config().get('dns_zones', [])]
 
 def get_zone_id(dns_zone):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        if 'dns_zones' in loaded_data.keys():
-            for z in loaded_data['dns_zones']:
-                if z['name'] == dns_zone and is_not_empty_key(z, 'zone_id'):
-                    return z['zone_id']
+    for z in get_cloud_config().get('dns_zones', []):
+        if z['name'] == dns_zone and is_not_empty_key(z, 'zone_id'):
+            return z['zone_id']
 
     return None
 
@@ -3,9 +3,13 @@ import json
 from sqlalchemy.engine.row import Row
 from sqlalchemy.ext.declarative import DeclarativeMeta
 
+from utils.serializer import get_serializer, is_mapped
+
 class AlchemyEncoder(json.JSONEncoder):
     def default(self, obj):
-        if isinstance(obj.__class__, DeclarativeMeta):
+        if is_mapped(obj):
+            return get_serializer(type(obj)).to_legacy_dict(obj)
+        elif isinstance(obj.__class__, DeclarativeMeta):
             fields = {}
             for field in [x for x in dir(obj) if not x.startswith('_') and x != 'metadata']:
                 if field == "query":
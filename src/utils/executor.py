@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.consumer import CONSUMER_MAX_IN_FLIGHT
+from utils.logger import log_msg
+
+_executor = None
+
+class ConsumerExecutor():
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self.async_slots = {}
+        self.loop = None
+        self.lock = threading.Lock()
+        self.tasks = set()
+
+    def get_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop.set_default_executor(ThreadPoolExecutor(max_workers = self.max_in_flight))
+                threading.Thread(target = self.loop.run_forever, name = "consumer-executor", daemon = True).start()
+        return self.loop
+
+    async def run(self, handler, msg, release):
+        try:
+            await handler(msg)
+        except Exception as e:
+            log_msg("ERROR", "[ConsumerExecutor][run] unexpected error: e.type = {}, e.msg = {}".format(type(e), e))
+        finally:
+            release()
+
+    def dispatch(self, handler, msg):
+        #? blocks the caller's reading loop while max_in_flight handlers are running (backpressure)
+        self.slots.acquire()
+        asyncio.run_coroutine_threadsafe(self.run(handler, msg, self.slots.release), self.get_loop())
+
+    async def adispatch(self, handler, msg):
+        loop = asyncio.get_running_loop()
+        if loop not in self.async_slots:
+            self.async_slots[loop] = asyncio.Semaphore(self.max_in_flight)
+
+        slots = self.async_slots[loop]
+        await slots.acquire()
+        task = loop.create_task(self.run(handler, msg, slots.release))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def wrap(self, handler):
+        async def callback(msg):
+            await self.adispatch(handler, msg)
+        return callback
+
+def get_consumer_executor():
+    global _executor
+    if _executor is None:
+        log_msg("DEBUG", "[get_consumer_executor] max_in_flight = {}".format(CONSUMER_MAX_IN_FLIGHT))
+        _executor = ConsumerExecutor(CONSUMER_MAX_IN_FLIGHT)
+    return _executor
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+from utils.broadcast import broadcast, decode_broadcast, start_broadcast_listener
+from utils.common import is_empty_key
+from utils.consumer import INVOCATIONS_CHANNEL
+
+_waiters = {}
+_lock = threading.Lock()
+
+class CompletionWaiter():
+    def __init__(self, invocation_id):
+        self.invocation_id = "{}".format(invocation_id)
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def notify(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+    async def wait(self, timeout):
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.event.clear()
+
+def register_completion_waiter(invocation_id):
+    waiter = CompletionWaiter(invocation_id)
+    with _lock:
+        _waiters.setdefault(waiter.invocation_id, []).append(waiter)
+    return waiter
+
+def unregister_completion_waiter(waiter):
+    with _lock:
+        waiters = _waiters.get(waiter.invocation_id, [])
+        if waiter in waiters:
+            waiters.remove(waiter)
+        if len(waiters) == 0:
+            _waiters.pop(waiter.invocation_id, None)
+
+def resolve_completion_waiters(invocation_id):
+    with _lock:
+        waiters = list(_waiters.get("{}".format(invocation_id), []))
+
+    for waiter in waiters:
+        waiter.notify()
+
+def notify_completion(invocation_id, state):
+    #? wakes up the local waiters right away and the other API instances' ones through the pubsub
+    resolve_completion_waiters(invocation_id)
+    broadcast(INVOCATIONS_CHANNEL, {'id': "{}".format(invocation_id), 'state': state})
+
+async def handle_completion(msg):
+    payload = decode_broadcast(msg)
+    if payload is None or is_empty_key(payload, 'id'):
+        return
+
+    resolve_completion_waiters(payload['id'])
+
+def start_completions_listener():
+    start_broadcast_listener(INVOCATIONS_CHANNEL, handle_completion)
@@ -35,6 +35,10 @@ def override_invoker_id(payload, old_data, current_user, db):
         'invoker_id': payload.invoker_id if is_true(current_user.is_admin) and is_not_empty(payload.invoker_id) else old_data.invoker_id
     }
 
+def get_email_invokers(payloads, db):
+    invoker_ids = {payload.invoker_id for payload in payloads if is_not_empty(payload.invoker_id)}
+    return User.getEmailsByIds(list(invoker_ids), db)
+
 def get_invoker_id(payload, current_user):
     if is_empty(current_user):
         return None
@@ -39,6 +39,10 @@ def get_owner_id(payload, current_user):
     return payload.owner_id if is_true(current_user.is_admin) and is_not_empty(payload.owner_id) else current_user.id
 
 
+def get_email_owners(payloads, db):
+    owner_ids = {payload.owner_id for payload in payloads if is_not_empty(payload.owner_id)}
+    return User.getEmailsByIds(list(owner_ids), db)
+
 def get_email_owner(payload, db):
     if is_empty(payload.owner_id):
         return None
@@ -3,7 +3,6 @@ import base64
 import secrets
 import gitlab
 import requests
-import yaml
 
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
@@ -12,6 +11,7 @@ from urllib.parse import urlparse
 
 from utils.api_url import is_url_not_responding
 from utils.bytes_generator import generate_random_bytes
+from utils.cloud_config import get_cloud_config
 from utils.common import exists_entry, get_env_int, is_disabled, is_empty, is_empty_key, is_not_empty, is_not_empty_key, is_response_ko, safe_compare_entry, safe_contain_entry, is_response_ok
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import log_msg
@@ -39,12 +39,10 @@ def is_public_instance(gitlab_url):
     return gitlab_url in get_public_instances()
 
 def get_public_instances():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
     result = ["https://gitlab.com"]
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        if is_not_empty(loaded_data) and 'gitlab_public_instances' in loaded_data and is_not_empty(loaded_data['gitlab_public_instances']):
-            result = loaded_data['gitlab_public_instances']
+    loaded_data = get_cloud_config().data
+    if is_not_empty(loaded_data) and 'gitlab_public_instances' in loaded_data and is_not_empty(loaded_data['gitlab_public_instances']):
+        result = loaded_data['gitlab_public_instances']
 
     log_msg("INFO", "[gitlab][get_public_instances] gitlab loaded public instances are : {}".format(result))
     return result
@@ -564,18 +562,21 @@ def push_file_to_repository(file_content, file_path, gitlab_connection: gitlab.G
                 }
             ],
         })
+
+def get_repository_paths(project, branch):
+    #? one listing of the whole tree instead of one files.get per file
+    try:
+        return {entry['path'] for entry in project.repository_tree(ref=branch, recursive=True, get_all=True) if entry.get('type') == 'blob'}
+    except gitlab.exceptions.GitlabGetError:
+        return set()
+
 def push_files_to_repository(files: list[dict], gitlab_connection: gitlab.Gitlab, git_repo_id: str, branch, commit_message):
     fetchedProject = gitlab_connection.projects.get(git_repo_id)
+    existing_paths = get_repository_paths(fetchedProject, branch)
     actions = []
     for file in files:
-        file_exists = True
-        try:
-            fetchedProject.files.get(file_path=file['path'][1:], ref=branch)
-        except gitlab.exceptions.GitlabGetError:
-            file_exists = False
-        
         action = {
-            "action": "update" if file_exists else "create",
+            "action": "update" if file['path'][1:] in existing_paths else "create",
             "file_path": file["path"],
             'content': file["content"],
         }
@@ -1,7 +1,4 @@
-import os
-import yaml
-
-from utils.logger import log_msg
+from utils.cloud_config import get_cloud_config
 
 def get_image_from_region_zone(images, region_zone):
     obj = None
@@ -18,13 +15,5 @@ def get_image_from_region_zone(images, region_zone):
 
 def get_os_image(region, zone):
     region_zone = "{}-{}".format(region, zone)
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    image = ""
-    with open(config_path, "r") as stream:
-        try:
-            loaded_images_data = yaml.safe_load(stream)
-            images = loaded_images_data['images']
-            image = get_image_from_region_zone(images, region_zone)
-        except yaml.YAMLError as exc:
-            log_msg("ERROR", "[get_os_image] Unexpected YAMLError, e = {}".format(exc))
-    return image
+    images = get_cloud_config().data['images']
+    return get_image_from_region_zone(images, region_zone)
@@ -10,11 +10,13 @@ from time import sleep
 from fastapi import BackgroundTasks
 
 from entities.Instance import Instance
+from entities.VmState import VmState
 
 from utils.api_url import get_api_url
 from utils.driver import sanitize_project_name
 from utils.exec import exec_cmd
 from utils.file import create_dir_if_not_exists, quiet_remove
+from utils.inventory import get_instance_vm
 from utils.gitlab import delete_runner, get_project_runners, inject_default_credentials_to_url, inject_git_credentials_to_url, GIT_USERNAME, GIT_EMAIL
 from utils.bytes_generator import generate_random_bytes
 from utils.dynamic_name import rehash_dynamic_name
@@ -70,17 +72,8 @@ def register_instance(hash, provider, region, zone, userid, instance_name, insta
     user.save(db)
     return new_instance
 
-def get_server_state(provider, server):
-    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
-    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
-    return ProviderDriver().get_server_state(server)
-
-def get_virtual_machine(provider, region, zone, instance_name):
-    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
-    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
-    return ProviderDriver().get_virtual_machine(region, zone, instance_name)
-
-def create_instance(provider, ami_image, instance_id, user_email, instance_name, hashed_instance_name, environment, instance_region, instance_zone, generate_dns, gitlab_project, user_project, instance_type, debug, centralized, root_dns_zone, args, db):
+def prepare_instance(provider, ami_image, instance_id, user_email, instance_name, hashed_instance_name, environment, instance_region, instance_zone, generate_dns, gitlab_project, user_project, instance_type, debug, centralized, root_dns_zone, args, db):
+    #? the passwords are pushed to the playbooks and mailed once: the provisioning retries only run provision_instance
     root_password = generate_random_bytes(20)
     access_password = generate_random_bytes(20)
     setup_ansible(user_email, gitlab_project, user_project, instance_name, hashed_instance_name, environment, centralized, root_password, access_password, generate_dns, root_dns_zone, args)
@@ -89,18 +82,17 @@ def create_instance(provider, ami_image, instance_id, user_email, instance_name,
         if is_false(debug):
             send_create_instance_email(user_email, gitlab_project['http_url_to_repo'], hashed_instance_name, environment, access_password, root_dns_zone)
     except Exception as exn:
-        log_msg("WARN", "[instance][create_instance] Gitlab user {} is already a member of this project due to a greater inherited membership., e = {}".format(user_email, exn))
+        log_msg("WARN", "[instance][prepare_instance] Gitlab user {} is already a member of this project due to a greater inherited membership., e = {}".format(user_email, exn))
 
+def provision_instance(provider, ami_image, instance_id, user_email, instance_name, hashed_instance_name, environment, instance_region, instance_zone, generate_dns, gitlab_project, user_project, instance_type, debug, centralized, root_dns_zone, args, db):
     ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
     ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
     cloud_init_script = ProviderDriver().cloud_init_script()
 
     config_cloud_init(instance_id, instance_name, user_project, gitlab_project['name'], gitlab_project['http_url_to_repo'], debug, centralized, provider)
-    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
-    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
-    log_msg("DEBUG", "[create_instance] creating instance hashed_instance_name = {}".format(hashed_instance_name))
+    log_msg("DEBUG", "[provision_instance] creating instance hashed_instance_name = {}".format(hashed_instance_name))
     result = ProviderDriver().create_instance(hashed_instance_name, environment, instance_region, instance_zone, instance_type, ami_image, generate_dns, root_dns_zone)
-    log_msg("DEBUG", "[create_instance] driver result = {}".format(result))
+    log_msg("DEBUG", "[provision_instance] driver result = {}".format(result))
     if "ip" in result:
         Instance.updateInstanceIp(instance_id, result['ip'], db)
     quiet_remove(os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', cloud_init_script)))
@@ -244,6 +236,8 @@ def update_instance_status(instance, server_id, action, db):
     nowDate = datetime.now()
     Instance.updateStatus(instance.id, switcher.get(action), db)
     Instance.updateModificationDate(instance.id, nowDate.isoformat(), db)
+    #? the indexed state is outdated by the action, the next read will get it from the provider
+    VmState.deleteStates(instance.provider, [rehash_dynamic_name(instance.name, instance.hash)], db)
 
 def generic_remove_instance(userInstance, db, bt: BackgroundTasks):
     if is_empty(userInstance):
@@ -259,13 +253,13 @@ def generic_remove_instance(userInstance, db, bt: BackgroundTasks):
     target_server_id = "none"
 
     try:
-        server = get_virtual_machine(userInstance.provider, userInstance.region, userInstance.zone, rehash_dynamic_name(userInstance.name, userInstance.hash))
+        server = get_instance_vm(userInstance, db)
     except Exception as e:
-        log_msg("WARN", "[remove_instance] unexpected error (get_virtual_machine) : {}".format(e))
+        log_msg("WARN", "[remove_instance] unexpected error (get_instance_vm) : {}".format(e))
 
     if is_not_empty(server):
         target_server_id = server['id']
-        server_state = get_server_state(userInstance.provider, server)
+        server_state = server['state']
         if not server_state in ['running', 'stopped']:
             return {
                 'status': 'ko',
@@ -0,0 +1,112 @@
+import importlib
+
+from datetime import datetime, timedelta
+
+from entities.Instance import Instance
+from entities.VmState import VmState
+from utils.common import get_env_int
+from utils.dynamic_name import rehash_dynamic_name
+from utils.logger import log_msg
+from utils.provider import get_driver
+
+INVENTORY_SYNC_INTERVAL = get_env_int('INVENTORY_SYNC_INTERVAL', 300)
+INVENTORY_MAX_AGE = get_env_int('INVENTORY_MAX_AGE', 600)
+
+def get_server_state(provider, server):
+    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
+    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
+    return ProviderDriver().get_server_state(server)
+
+def get_virtual_machine(provider, region, zone, instance_name):
+    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
+    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
+    return ProviderDriver().get_virtual_machine(region, zone, instance_name)
+
+def list_virtual_machines(provider, region, zones, instance_names):
+    ProviderDriverModule = importlib.import_module('drivers.{}'.format(get_driver(provider)))
+    ProviderDriver = getattr(ProviderDriverModule, get_driver(provider))
+    return ProviderDriver().list_virtual_machines(region, zones, instance_names)
+
+def get_vm_values(provider, zone, server):
+    #? the openstack servers expose a status instead of a state
+    raw_state = server['state'] if 'state' in server else server['status']
+    return (zone, "{}".format(server['id']), raw_state, get_server_state(provider, server))
+
+def get_vm_json(vm_state):
+    return {
+        'id': vm_state.server_id,
+        'state': vm_state.state,
+        'raw_state': vm_state.raw_state,
+        'synced_at': vm_state.synced_at.isoformat()
+    }
+
+#? the transitional states are outdated in a few seconds, they're always read from the provider
+_stable_states = ["running", "stopped", "deleted"]
+
+def is_fresh(vm_state, now):
+    return vm_state.state in _stable_states and vm_state.synced_at >= now - timedelta(seconds = INVENTORY_MAX_AGE)
+
+def get_instance_vm(instance, db, refresh = False):
+    #? reads the indexed state of the instance's vm and only asks the provider when it's missing,
+    #? outdated or when a refresh is forced: None means the provider doesn't know the vm
+    hashed_name = rehash_dynamic_name(instance.name, instance.hash)
+    now = datetime.now()
+    if not refresh:
+        vm_state = VmState.findState(instance.provider, hashed_name, db)
+        if vm_state is not None and is_fresh(vm_state, now):
+            return get_vm_json(vm_state)
+
+    server = get_virtual_machine(instance.provider, instance.region, instance.zone, hashed_name)
+    if not server:
+        VmState.deleteStates(instance.provider, [hashed_name], db)
+        return None
+
+    zone, server_id, raw_state, state = get_vm_values(instance.provider, instance.zone, server)
+    VmState.saveStates(instance.provider, instance.region, {hashed_name: (zone, server_id, raw_state, state)}, now, db)
+    return {
+        'id': server_id,
+        'state': state,
+        'raw_state': raw_state,
+        'synced_at': now.isoformat()
+    }
+
+def get_instances_vms(instances, db):
+    #? listings only read the index, in one query per provider
+    hashed_names = {}
+    for instance in instances:
+        hashed_names.setdefault(instance.provider, []).append(rehash_dynamic_name(instance.name, instance.hash))
+
+    vms = {}
+    for provider, names in hashed_names.items():
+        vms.update({(provider, vm_state.hashed_name): get_vm_json(vm_state) for vm_state in VmState.findStates(provider, names, db)})
+
+    return [vms.get((instance.provider, rehash_dynamic_name(instance.name, instance.hash))) for instance in instances]
+
+def sync_region_inventory(provider, region, locations, db):
+    names = {rehash_dynamic_name(location.name, location.hash): location.zone for location in locations}
+    zones = sorted({zone for zone in names.values() if zone is not None})
+    now = datetime.now()
+    servers = list_virtual_machines(provider, region, zones, list(names))
+    if servers is None:
+        #? no bulk listing for this provider, its vms stay read one by one
+        return 0
+
+    VmState.saveStates(provider, region, {name: get_vm_values(provider, names[name], server) for name, server in servers.items() if name in names}, now, db)
+    VmState.deleteStates(provider, [name for name in names if name not in servers], db)
+    return len(servers)
+
+def sync_inventory(db):
+    regions = {}
+    for location in Instance.getAllActiveInstancesLocations(db):
+        regions.setdefault((location.provider, location.region), []).append(location)
+
+    synced = 0
+    for (provider, region), locations in regions.items():
+        try:
+            synced += sync_region_inventory(provider, region, locations, db)
+        except Exception as e:
+            db.rollback()
+            log_msg("WARN", "[inventory][sync_inventory] unable to sync: provider = {}, region = {}, e.type = {}, e.msg = {}".format(provider, region, type(e), e))
+
+    log_msg("DEBUG", "[inventory][sync_inventory] {} vms synced in {} regions".format(synced, len(regions)))
+    return synced
@@ -1,7 +1,12 @@
 
+import json
+
 from entities.faas.Function import FunctionEntity
 from entities.faas.Trigger import TriggerEntity
-from utils.common import is_not_uuid
+from entities.iot.ObjectType import ObjectType
+from utils.common import get_env_int, is_empty_key, is_not_empty_key, is_not_uuid, is_true, is_uuid
+from utils.encoder import AlchemyEncoder
+from utils.lru_cache import TtlLruCache
 from fastapi import HTTPException
 
 def object_type_user_content_check(current_user, payload, db):
@@ -36,3 +41,76 @@ def object_type_admin_content_check(payload, db):
         if not existed_trigger:
             raise HTTPException(status_code=404, detail=f'Trigger with id {trigger.id} not found')
 
+
+_object_types_metadata = TtlLruCache(get_env_int('IOT_METADATA_CACHE_SIZE', 1000), get_env_int('IOT_METADATA_CACHE_TTL', 30))
+
+def check_decoding_function_args(function):
+    args = function['content']['args']
+    if not args:
+        return {'code': 404, 'message': "Decoding function 'data' argument not found", 'i18n_code': 'decoding_function_data_argument_not_found'}
+    if len(args) != 1:
+        return {'code': 404, 'message': 'Decoding function has more than one argument', 'i18n_code': 'decoding_function_has_more_than_one_argument'}
+    if args[0] != 'data':
+        return {'code': 404, 'message': "Decoding function key should be named 'data'", 'i18n_code': 'decoding_function_key_should_be_named_data'}
+    return None
+
+def load_object_type_metadata(object_type, functions, triggers):
+    content = object_type.content
+    metadata = {
+        'decoding_function': None,
+        'batch_decoding': is_true(content.get('batch_decoding')),
+        'triggers': [],
+        'error': None
+    }
+
+    if is_empty_key(content, 'decoding_function'):
+        metadata['error'] = {'code': 404, 'message': 'Decoding function not found', 'i18n_code': 'decoding_function_not_found'}
+        return metadata
+
+    function = functions.get(str(content['decoding_function']))
+    if not function:
+        metadata['error'] = {'code': 404, 'message': 'Decoding function not found', 'i18n_code': 'decoding_function_not_found'}
+        return metadata
+
+    metadata['decoding_function'] = str(function.id)
+    metadata['error'] = check_decoding_function_args(json.loads(json.dumps(function, cls = AlchemyEncoder)))
+    metadata['triggers'] = [json.loads(json.dumps(triggers[str(trigger_id)], cls = AlchemyEncoder)) for trigger_id in (content.get('triggers') or []) if str(trigger_id) in triggers]
+    return metadata
+
+def get_object_types_metadata(object_type_ids, db):
+    #? the object types, their decoding functions and triggers are loaded with one query per table for all the missing ones
+    result = {}
+    missing_ids = []
+    for object_type_id in {str(object_type_id) for object_type_id in object_type_ids}:
+        metadata = _object_types_metadata.get(object_type_id)
+        if metadata is None:
+            missing_ids.append(object_type_id)
+        else:
+            result[object_type_id] = metadata
+
+    if not missing_ids:
+        return result
+
+    object_types = ObjectType.findByIds(missing_ids, db)
+    function_ids = {str(o.content['decoding_function']) for o in object_types if is_not_empty_key(o.content, 'decoding_function') and is_uuid(o.content['decoding_function'])}
+    trigger_ids = {str(t) for o in object_types for t in (o.content.get('triggers') or []) if is_uuid(t)}
+    functions = {str(f.id): f for f in FunctionEntity.findByIds(list(function_ids), db)}
+    triggers = {str(t.id): t for t in TriggerEntity.findByIds(list(trigger_ids), db)}
+
+    for object_type in object_types:
+        metadata = load_object_type_metadata(object_type, functions, triggers)
+        _object_types_metadata.put(str(object_type.id), metadata)
+        result[str(object_type.id)] = metadata
+
+    return result
+
+def invalidate_object_type_metadata(object_type_id):
+    _object_types_metadata.delete(str(object_type_id))
+
+def invalidate_function_metadata(function_id):
+    #? the object types decoded by an updated or deleted function are loaded again
+    _object_types_metadata.delete_if(lambda metadata: metadata['decoding_function'] == str(function_id))
+
+def invalidate_triggers_metadata(trigger_ids):
+    trigger_ids = {str(trigger_id) for trigger_id in trigger_ids}
+    _object_types_metadata.delete_if(lambda metadata: any(str(trigger.get('id')) in trigger_ids for trigger in metadata['triggers']))
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from database.postgres_db import SessionLocal
+from entities.iot.Data import NumericData, NumericDataRollup
+from utils.common import get_env_int
+from utils.logger import log_msg
+
+IOT_MAX_POINTS = get_env_int('IOT_MAX_POINTS', 1000)
+IOT_PARTITIONS_AHEAD = get_env_int('IOT_PARTITIONS_AHEAD', 2)
+IOT_PARTITIONS_CHECK_TIME = get_env_int('IOT_PARTITIONS_CHECK_TIME', 86400)
+
+#? from the finest to the coarsest
+ROLLUP_RESOLUTIONS = {
+    'minute': timedelta(minutes = 1),
+    'hour': timedelta(hours = 1),
+    'day': timedelta(days = 1)
+}
+
+def get_bucket(ts, resolution):
+    if resolution == 'minute':
+        return ts.replace(second = 0, microsecond = 0)
+    if resolution == 'hour':
+        return ts.replace(minute = 0, second = 0, microsecond = 0)
+    return ts.replace(hour = 0, minute = 0, second = 0, microsecond = 0)
+
+def get_rollup_rows(numeric_rows):
+    #? the rows of a batch are aggregated first so each bucket is only upserted once
+    rollups = {}
+    for row in numeric_rows:
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket_key = (row['device_id'], row['key'], resolution, get_bucket(row['created_at'], resolution))
+            rollup = rollups.get(bucket_key)
+            if rollup is None:
+                device_id, key, resolution, bucket = bucket_key
+                rollups[bucket_key] = {'device_id': device_id, 'key': key, 'resolution': resolution, 'bucket': bucket, 'min_value': row['value'], 'max_value': row['value'], 'sum_value': row['value'], 'count': 1}
+            else:
+                rollup['min_value'] = min(rollup['min_value'], row['value'])
+                rollup['max_value'] = max(rollup['max_value'], row['value'])
+                rollup['sum_value'] += row['value']
+                rollup['count'] += 1
+    return list(rollups.values())
+
+def pick_resolution(device_id, key, start, end, max_points, db):
+    #? the finest rollup which fits in the points budget, the raw rows when the minute rollup says there are few enough of them
+    for resolution, step in ROLLUP_RESOLUTIONS.items():
+        if (end - start) / step <= max_points:
+            if resolution == 'minute' and NumericDataRollup.countPoints(device_id, key, resolution, get_bucket(start, resolution), end, db) <= max_points:
+                return 'raw'
+            return resolution
+    return 'day'
+
+def get_numeric_series(device_id, key, start, end, max_points, resolution, db):
+    resolution = resolution or pick_resolution(device_id, key, start, end, max_points, db)
+    if resolution == 'raw':
+        rows = NumericData.getSeries(device_id, key, start, end, max_points, db)
+        points = [{'ts': ts.isoformat(), 'min': value, 'max': value, 'avg': value, 'count': 1} for ts, value in rows]
+    else:
+        rows = NumericDataRollup.getSeries(device_id, key, resolution, get_bucket(start, resolution), end, max_points, db)
+        points = [{'ts': row.bucket.isoformat(), 'min': row.min_value, 'max': row.max_value, 'avg': row.sum_value / row.count, 'count': row.count} for row in rows]
+
+    return resolution, points
+
+def create_numeric_data_partitions(db):
+    if db.get_bind().dialect.name != 'postgresql':
+        return
+
+    db.execute(text("SELECT create_numeric_data_partitions(CURRENT_DATE, :months_ahead)"), {'months_ahead': IOT_PARTITIONS_AHEAD})
+    db.commit()
+
+def timeseries():
+    #? the monthly partitions of numeric_data are created ahead, the default partition only catches what's left
+    def create_partitions():
+        while True:
+            db = SessionLocal()
+            try:
+                create_numeric_data_partitions(db)
+            except Exception as e:
+                log_msg("WARN", "[timeseries][create_partitions] unexpected error: {}".format(e))
+            finally:
+                db.close()
+            time.sleep(IOT_PARTITIONS_CHECK_TIME)
+
+    threading.Thread(target = create_partitions, name = "timeseries", daemon = True).start()
+
+def to_local_time(ts):
+    #? the readings are stored with the naive local time of the api
+    return ts.astimezone().replace(tzinfo = None) if ts.tzinfo else ts
+
+def parse_range(start, end):
+    end = to_local_time(end) if end else datetime.now()
+    start = to_local_time(start) if start else end - timedelta(days = 1)
+    return start, end
@@ -0,0 +1,68 @@
+import os
+import fcntl
+import shutil
+import threading
+import time
+
+from git import Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+from utils.common import get_env_int
+from utils.logger import log_msg
+
+CHARTS_MIRROR_REFRESH_TIME = get_env_int("CHARTS_MIRROR_REFRESH_TIME", 60)
+
+def read_blob(blob):
+    return blob.data_stream.read().decode("utf-8")
+
+def walk_tree(tree):
+    #? same as os.walk on the git objects: the directory and its files, then the subdirectories
+    yield tree, tree.blobs
+    for subtree in tree.trees:
+        yield from walk_tree(subtree)
+
+class ChartsMirror():
+    #? bare clone of the charts repository shared by all the deployments and refreshed with an incremental fetch
+    #? the files are read from the git objects so there's no checkout at all
+    def __init__(self, git_url, path, branch = "main"):
+        self.git_url = git_url
+        self.path = path
+        self.branch = branch
+        self.lock = threading.Lock()
+        self.fetched_at = None
+
+    def clone(self):
+        tmp_path = "{}.tmp".format(self.path)
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+
+        Repo.clone_from(self.git_url, tmp_path, bare = True, branch = self.branch)
+        os.rename(tmp_path, self.path)
+        return Repo(self.path)
+
+    def open(self):
+        try:
+            return Repo(self.path), False
+        except (InvalidGitRepositoryError, NoSuchPathError):
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+            return self.clone(), True
+
+    def fetch(self, repo):
+        try:
+            repo.remotes.origin.fetch("+refs/heads/{0}:refs/heads/{0}".format(self.branch))
+        except GitCommandError as e:
+            #? the last fetched charts are still usable when the git server is unreachable
+            log_msg("WARN", "[ChartsMirror][fetch] error = {}".format(e))
+
+    def refresh(self):
+        #? the file lock serializes the workers of the other processes sharing the same path
+        with self.lock, open("{}.lock".format(self.path), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            repo, cloned = self.open()
+            now = time.monotonic()
+            if self.fetched_at is None or now - self.fetched_at >= CHARTS_MIRROR_REFRESH_TIME:
+                if not cloned:
+                    self.fetch(repo)
+                self.fetched_at = now
+            return repo.commit(self.branch)
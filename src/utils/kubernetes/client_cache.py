@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+
+from collections import OrderedDict
+from kubernetes import client, config, watch
+from kubernetes.client.rest import ApiException
+
+from utils.common import get_env_bool, get_env_int
+from utils.logger import log_msg
+from utils.yaml import read_uploaded_yaml_file
+
+K8S_CLIENT_CACHE_SIZE = max(get_env_int("K8S_CLIENT_CACHE_SIZE", 20), 1)
+K8S_INFORMER_ENABLED = get_env_bool("K8S_INFORMER_ENABLED", False)
+K8S_INFORMER_IDLE_TIME = get_env_int("K8S_INFORMER_IDLE_TIME", 900)
+K8S_INFORMER_SYNC_TIME = get_env_int("K8S_INFORMER_SYNC_TIME", 10)
+K8S_INFORMER_WATCH_TIMEOUT = get_env_int("K8S_INFORMER_WATCH_TIMEOUT", 300)
+K8S_INFORMER_RETRY_TIME = get_env_int("K8S_INFORMER_RETRY_TIME", 5)
+K8S_CLIENT_CLOSE_DELAY = get_env_int("K8S_CLIENT_CLOSE_DELAY", 300)
+
+_informer_resources = {
+    'pods': lambda api_client: client.CoreV1Api(api_client).list_pod_for_all_namespaces,
+    'nodes': lambda api_client: client.CoreV1Api(api_client).list_node,
+    'services': lambda api_client: client.CoreV1Api(api_client).list_service_for_all_namespaces,
+    'deployments': lambda api_client: client.AppsV1Api(api_client).list_deployment_for_all_namespaces
+}
+
+_clients = OrderedDict()
+_lock = threading.Lock()
+
+def get_content_hash(content):
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content or b"").hexdigest()
+
+def get_object_key(item):
+    return (item.metadata.namespace, item.metadata.name)
+
+class ResourceInformer():
+    #? list then watch one kind of resource to keep an in memory copy of it
+    #? the store is rebuilt from a new list when the watch can't be resumed (410 gone)
+    def __init__(self, name, list_fn):
+        self.name = name
+        self.list_fn = list_fn
+        self.store = {}
+        self.lock = threading.Lock()
+        self.synced = threading.Event()
+        self.stopped = threading.Event()
+        self.watcher = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target = self.run, name = "k8s-informer-{}".format(self.name), daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def items(self):
+        with self.lock:
+            return list(self.store.values())
+
+    def relist(self):
+        result = self.list_fn()
+        with self.lock:
+            self.store = {get_object_key(item): item for item in result.items}
+        self.synced.set()
+        return result.metadata.resource_version
+
+    def apply(self, event):
+        item = event['object']
+        if event['type'] not in ['ADDED', 'MODIFIED', 'DELETED'] or not hasattr(item, 'metadata'):
+            return
+
+        with self.lock:
+            if event['type'] == 'DELETED':
+                self.store.pop(get_object_key(item), None)
+            else:
+                self.store[get_object_key(item)] = item
+
+    def run(self):
+        resource_version = None
+        while not self.stopped.is_set():
+            try:
+                if resource_version is None:
+                    resource_version = self.relist()
+
+                self.watcher = watch.Watch()
+                for event in self.watcher.stream(self.list_fn, resource_version = resource_version, timeout_seconds = K8S_INFORMER_WATCH_TIMEOUT):
+                    self.apply(event)
+                    if self.stopped.is_set():
+                        break
+                resource_version = self.watcher.resource_version or resource_version
+            except ApiException as e:
+                if e.status != 410:
+                    log_msg("WARN", "[ResourceInformer][run] watch of {} failed: {}".format(self.name, e))
+                    self.stopped.wait(K8S_INFORMER_RETRY_TIME)
+                resource_version = None
+            except Exception as e:
+                log_msg("WARN", "[ResourceInformer][run] watch of {} failed: {}".format(self.name, e))
+                resource_version = None
+                self.stopped.wait(K8S_INFORMER_RETRY_TIME)
+
+class ClusterClient():
+    #? one api client per kubeconfig with its own configuration: the global one of the kubernetes module is never loaded
+    def __init__(self, kubeconfig_file_id, content):
+        self.kubeconfig_file_id = kubeconfig_file_id
+        self.hash = get_content_hash(content)
+        self.api_client = config.new_client_from_config_dict(read_uploaded_yaml_file(content))
+        self.informers = {}
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+
+    def core_v1(self):
+        return client.CoreV1Api(self.api_client)
+
+    def apps_v1(self):
+        return client.AppsV1Api(self.api_client)
+
+    def networking_v1(self):
+        return client.NetworkingV1Api(self.api_client)
+
+    def custom_objects(self):
+        return client.CustomObjectsApi(self.api_client)
+
+    def version(self):
+        return client.VersionApi(self.api_client)
+
+    def get_informer(self, resource):
+        with self.lock:
+            informer = self.informers.get(resource)
+            if informer is None:
+                informer = ResourceInformer(resource, _informer_resources[resource](self.api_client))
+                self.informers[resource] = informer
+                informer.start()
+        return informer
+
+    def list_objects(self, resource):
+        #? served from the informer store once it's synced, from a full list otherwise
+        self.last_access = time.monotonic()
+        if K8S_INFORMER_ENABLED:
+            informer = self.get_informer(resource)
+            if informer.synced.wait(K8S_INFORMER_SYNC_TIME):
+                return informer.items()
+        return _informer_resources[resource](self.api_client)().items
+
+    def stop_idle_informers(self, now):
+        if now - self.last_access >= K8S_INFORMER_IDLE_TIME:
+            self.close_informers()
+
+    def close_informers(self):
+        with self.lock:
+            informers = list(self.informers.values())
+            self.informers = {}
+        for informer in informers:
+            informer.stop()
+
+    def close(self):
+        #? the requests in flight may still hold the evicted client: its connections are only closed after a delay
+        self.close_informers()
+        closer = threading.Timer(K8S_CLIENT_CLOSE_DELAY, self.api_client.close)
+        closer.daemon = True
+        closer.start()
+
+def get_kubeconfig_client(kubeconfig_file):
+    #? the key is the kubeconfig id and the hash of its content so that a new upload gets a new client
+    key = kubeconfig_file.id
+    content_hash = get_content_hash(kubeconfig_file.content)
+    stale = []
+    with _lock:
+        cluster_client = _clients.get(key)
+        if cluster_client is not None and cluster_client.hash == content_hash:
+            _clients.move_to_end(key)
+        else:
+            if cluster_client is not None:
+                stale.append(_clients.pop(key))
+            cluster_client = ClusterClient(key, kubeconfig_file.content)
+            _clients[key] = cluster_client
+            while len(_clients) > K8S_CLIENT_CACHE_SIZE:
+                stale.append(_clients.popitem(last = False)[1])
+
+        now = time.monotonic()
+        for other in _clients.values():
+            if other is not cluster_client:
+                other.stop_idle_informers(now)
+
+    for other in stale:
+        other.close()
+    return cluster_client
+
+def evict_kubeconfig_client(kubeconfig_file_id):
+    with _lock:
+        cluster_client = _clients.pop(kubeconfig_file_id, None)
+
+    if cluster_client is not None:
+        cluster_client.close()
@@ -1,9 +1,7 @@
 import os
 import yaml
-import shutil
 import gitlab
 
-from git import Repo
 from pathlib import Path
 from typing import Optional
 from fastapi.responses import JSONResponse
@@ -12,12 +10,14 @@ from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from schemas.Kubernetes import ExternalChart
 
 from utils.gitlab import GIT_HELMCHARTS_REPO_URL, push_files_to_repository, GIT_DEFAULT_TOKEN, GIT_USERNAME
+from utils.kubernetes.charts_mirror import ChartsMirror, read_blob, walk_tree
 from utils.observability.cid import get_current_cid
 from utils.common import AUTOESCAPE_EXTENSIONS
 
 CHARTS_REPO_PATH = os.getenv('LOCAL_CLONE_CHARTS_PATH', '/cloned_charts')
 
 git_url = f'https://{GIT_USERNAME}:{GIT_DEFAULT_TOKEN}@{GIT_HELMCHARTS_REPO_URL.replace("https://", "")}'
+charts_mirror = ChartsMirror(git_url, f"{CHARTS_REPO_PATH}_mirror")
 
 def push_charts(
     project_id,
@@ -43,30 +43,10 @@ def push_charts(
     template = env.get_template("Chart.yaml.j2")
     doc_template = Template(readme)
     value_template = Template(values)
-    root_dir = f"{CHARTS_REPO_PATH}_{project_id}"
 
     try:
-        charts_files = []
         gitlab_connection = gitlab.Gitlab(url=gitlab_host, private_token=token)
-
-        path_tpl = "{}/{}"
-        root_dir = f"{CHARTS_REPO_PATH}_{project_id}"
-        charts_path = "{}/charts".format(root_dir)
-        clone_chart_repo(git_url, root_dir, charts_path, charts)
-
-        for root, dirs, files in os.walk(charts_path):
-            new_root = root.replace(root_dir, "")
-            if "external-chart.yaml" not in files:
-                for file in files:
-                    root.replace(root_dir, "")
-                    charts_files.append(
-                        {
-                            "path": path_tpl.format(new_root, file),
-                            "content": open(path_tpl.format(root, file), "r").read(),
-                        }
-                    )
-            else:
-                get_external_dependency_data(root, external_charts, charts)
+        charts_files = get_charts_files(charts_mirror.refresh(), charts, external_charts)
 
         charts_files.extend([
             {
@@ -99,7 +79,6 @@ def push_charts(
         push_files_to_repository(
             charts_files, gitlab_connection, project_id, "main", "Added Manifest"
         )
-        shutil.rmtree(root_dir)
     except Exception as e:
         return JSONResponse(
             content={
@@ -116,26 +95,29 @@ def push_charts(
 
 
 
-def get_external_dependency_data(root: str, external_charts: list[ExternalChart], charts: list[str]):
-    with open(f"{root}/external-chart.yaml", 'r') as yaml_file:
-        external_chart_file = yaml.safe_load(yaml_file)
-        new_chart = ExternalChart(
-            name=external_chart_file["name"],
-            version=external_chart_file["version"],
-            repository=external_chart_file["repository"]
-        )
-        external_charts.append(new_chart)
-        dependency = root.split("/")[-1]
-        if dependency in charts:
-            charts.remove(dependency)
-        
-def clone_chart_repo(git_url, root_dir, charts_path,charts):
-    if os.path.exists(root_dir):
-        shutil.rmtree(root_dir)
-        
-    Repo.clone_from(git_url, root_dir, branch='main')
-
-    path_tpl = "{}/{}"
-    for dir in os.listdir(charts_path):
-        if dir not in charts:
-            shutil.rmtree(path_tpl.format(charts_path, dir))
+def get_charts_files(commit, charts: list[str], external_charts: list[ExternalChart]):
+    charts_files = []
+    for chart_tree in [tree for tree in (commit.tree / "charts").trees if tree.name in charts]:
+        for tree, blobs in walk_tree(chart_tree):
+            external_chart = next((blob for blob in blobs if blob.name == "external-chart.yaml"), None)
+            if external_chart is None:
+                charts_files.extend([
+                    {
+                        "path": "/{}".format(blob.path),
+                        "content": read_blob(blob),
+                    } for blob in blobs
+                ])
+            else:
+                get_external_dependency_data(tree.name, read_blob(external_chart), external_charts, charts)
+    return charts_files
+
+def get_external_dependency_data(dependency: str, content: str, external_charts: list[ExternalChart], charts: list[str]):
+    external_chart_file = yaml.safe_load(content)
+    new_chart = ExternalChart(
+        name=external_chart_file["name"],
+        version=external_chart_file["version"],
+        repository=external_chart_file["repository"]
+    )
+    external_charts.append(new_chart)
+    if dependency in charts:
+        charts.remove(dependency)
@@ -20,3 +20,10 @@ def unmarshall_list_array(roles_str):
         return roles_str
 
     return re.split(r"\,|\;", roles_str) if is_not_empty(roles_str) else []
+
+def group_by_key(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(item[key], []).append(item)
+
+    return groups
@@ -1,12 +1,11 @@
 import os
-import requests
 import logging
 import json
 import sys
 
 from datetime import datetime
 
-from utils.http import HTTP_REQUEST_TIMEOUT
+from utils.notifier import Webhook, notify
 from utils.observability.cid import get_current_cid
 from utils.common import get_env_bool, get_env_int, is_disabled, is_enabled
 
@@ -33,33 +32,35 @@ if is_disabled(_username):
 if is_disabled(_username):
     _username = "logger"
 
-def slack_message(log_level, message, is_public):
-    token = _slack_token
-    if is_public and is_enabled(_slack_public_token):
-        if is_enabled(token):
-            slack_message(log_level, message, False)
-        token = _slack_public_token
-
-    if is_enabled(token):
-        data = { "attachments": [{ "color": get_color_level(log_level), "text": message, "title": log_level }], "username": _username, "channel": _slack_channel, "icon_emoji": _slack_emoji }
-        try:
-            requests.post(SLACK_WEBHOOK_TPL.format(token), json=data, timeout=HTTP_REQUEST_TIMEOUT)
-        except Exception as e:
-            logging.warning("[slack_message] unexpected exception: {}".format(e))
-
-def discord_message(log_level, message, is_public):
-    token = _discord_token
-    if is_public and is_enabled(_discord_public_token):
-        if is_enabled(token):
-            discord_message(log_level, message, False)
-        token = _discord_public_token
-
-    if is_enabled(token):
-        data = { "attachments": [{ "color": get_color_level(log_level), "text": message, "title": log_level }], "username": _username }
-        try:
-            requests.post(DISCORD_WEBHOOK_TPL.format(token), json=data, timeout=HTTP_REQUEST_TIMEOUT)
-        except Exception as e:
-            logging.warning("[discord_message] unexpected exception: {}".format(e))
+def get_attachments(messages):
+    return [{ "color": get_color_level(m['level']), "text": m['text'] if m['count'] == 1 else "{} (x{})".format(m['text'], m['count']), "title": m['level'] } for m in messages]
+
+def slack_payload(messages):
+    return { "attachments": get_attachments(messages), "username": _username, "channel": _slack_channel, "icon_emoji": _slack_emoji }
+
+def discord_payload(messages):
+    return { "attachments": get_attachments(messages), "username": _username }
+
+_webhooks = {
+    'slack': Webhook("slack", SLACK_WEBHOOK_TPL.format(_slack_token), slack_payload) if is_enabled(_slack_token) else None,
+    'slack_public': Webhook("slack_public", SLACK_WEBHOOK_TPL.format(_slack_public_token), slack_payload) if is_enabled(_slack_public_token) else None,
+    'discord': Webhook("discord", DISCORD_WEBHOOK_TPL.format(_discord_token), discord_payload) if is_enabled(_discord_token) else None,
+    'discord_public': Webhook("discord_public", DISCORD_WEBHOOK_TPL.format(_discord_public_token), discord_payload) if is_enabled(_discord_public_token) else None
+}
+
+def get_webhooks(provider, is_public):
+    webhooks = [_webhooks[provider]]
+    if is_public:
+        webhooks.append(_webhooks["{}_public".format(provider)])
+    return [webhook for webhook in webhooks if webhook is not None]
+
+def slack_message(log_level, message, is_public, key = None):
+    for webhook in get_webhooks('slack', is_public):
+        notify(webhook, (log_level, key or message), log_level, message)
+
+def discord_message(log_level, message, is_public, key = None):
+    for webhook in get_webhooks('discord', is_public):
+        notify(webhook, (log_level, key or message), log_level, message)
 
 def is_level_partof(level, levels):
     return any(log == "{}".format(level).lower() for log in levels)
@@ -135,5 +136,7 @@ def log_msg(log_level, message, is_public = False):
     formated_log = quiet_log_msg (log_level, message)
 
     if get_int_value_level(log_level) >= get_int_value_level(LOG_LEVEL) and is_notif_enabled():
-        slack_message(log_level, formated_log, is_public)
-        discord_message(log_level, formated_log, is_public)
+        #? the messages are coalesced on their content, the formatted log has the time and the cid
+        key = "{}".format(message)
+        slack_message(log_level, formated_log, is_public, key)
+        discord_message(log_level, formated_log, is_public, key)
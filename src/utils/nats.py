@@ -3,27 +3,55 @@ import base64
 import json
 import nats
 
-from utils.common import get_src_path, is_enabled
+from nats.js.errors import BadRequestError
+
+from utils.common import get_env_int, get_src_path, is_enabled
 from utils.file import quiet_remove
 from utils.logger import log_msg
 
 _nats_url = os.getenv("NATS_URL", "nats://changeit.com:4222")
 _creds_file = "{}/faas.creds".format(get_src_path())
 _creds_base64 = os.getenv("NATS_CREDS_BASE64")
+_creds_written = False
+_broadcast_stream_max_age = get_env_int("BROADCAST_STREAM_MAX_AGE", 600)
 
 def get_nats_url():
     log_msg("DEBUG", "[NatsUtils][get_nats_url] connecting nats_url = {}".format(_nats_url))
     return _nats_url
 
 def get_creds_file_if_exists():
+    global _creds_written
     if is_enabled(_creds_base64):
-        quiet_remove(_creds_file)
-        creds_content = base64.b64decode(_creds_base64).decode()
-        with open(_creds_file, "w") as creds_file:
-            creds_file.write(creds_content)
-            return _creds_file
+        #? the credentials don't change during the process' lifetime
+        if not _creds_written:
+            quiet_remove(_creds_file)
+            creds_content = base64.b64decode(_creds_base64).decode()
+            with open(_creds_file, "w") as creds_file:
+                creds_file.write(creds_content)
+            _creds_written = True
+        return _creds_file
     return None
 
+def get_stream_subjects(group, channel):
+    #? the fan-out channels (no group) have a stream bound to their own subject
+    return [channel if group is None else group]
+
+def get_stream_max_age(group):
+    #? the fan-out channels only carry notifications: they're not kept once outdated
+    return _broadcast_stream_max_age if group is None else None
+
+async def declare_stream(js, name, subjects, max_age = None):
+    config = {'name': name, 'subjects': subjects}
+    if max_age is None:
+        await js.add_stream(**config)
+        return
+
+    try:
+        await js.add_stream(**config, max_age = max_age)
+    except BadRequestError:
+        #? the streams declared before their retention was bounded are updated in place
+        await js.update_stream(**config, max_age = max_age)
+
 async def close_nats(nc):
     await nc.drain()
     await nc.close()
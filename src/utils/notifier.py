@@ -0,0 +1,162 @@
+import queue
+import atexit
+import logging
+import threading
+import time
+import requests
+
+from collections import OrderedDict
+from prometheus_client import Counter
+
+from utils.common import get_env_int
+
+NOTIF_QUEUE_SIZE = get_env_int('NOTIF_QUEUE_SIZE', 1000)
+NOTIF_BATCH_SIZE = max(get_env_int('NOTIF_BATCH_SIZE', 10), 1)
+NOTIF_BATCH_WINDOW = get_env_int('NOTIF_BATCH_WINDOW', 5)
+NOTIF_RATE_LIMIT = max(get_env_int('NOTIF_RATE_LIMIT', 30), 1)
+
+_notifications = Counter('log_notifications', 'Log notifications sent to the webhooks', ['webhook', 'status'])
+
+class Webhook():
+    def __init__(self, name, url, build_payload):
+        self.name = name
+        self.url = url
+        self.build_payload = build_payload
+        self.pending = OrderedDict()
+        self.first_pending_at = None
+        self.next_post_at = 0
+
+    def add(self, key, level, text, now):
+        #? the same message inside the window is only posted once with its number of occurrences
+        if key in self.pending:
+            self.pending[key]['count'] += 1
+            _notifications.labels(self.name, "coalesced").inc()
+            return True
+
+        if len(self.pending) >= NOTIF_QUEUE_SIZE:
+            return False
+
+        self.pending[key] = {'level': level, 'text': text, 'count': 1}
+        if self.first_pending_at is None:
+            self.first_pending_at = now
+        return True
+
+    def is_ready(self, now):
+        if len(self.pending) == 0 or now < self.next_post_at:
+            return False
+        return len(self.pending) >= NOTIF_BATCH_SIZE or now - self.first_pending_at >= NOTIF_BATCH_WINDOW
+
+    def pop_batch(self):
+        batch = []
+        while len(self.pending) > 0 and len(batch) < NOTIF_BATCH_SIZE:
+            batch.append(self.pending.popitem(last = False))
+        self.first_pending_at = None if len(self.pending) == 0 else self.first_pending_at
+        return batch
+
+    def restore_batch(self, batch, now):
+        for key, message in reversed(batch):
+            if key in self.pending:
+                message['count'] += self.pending.pop(key)['count']
+            self.pending[key] = message
+            self.pending.move_to_end(key, last = False)
+        self.first_pending_at = self.first_pending_at or now
+
+def get_retry_after(response, default):
+    try:
+        return float(response.headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        #? a Retry-After http date isn't worth parsing for a log notification
+        return default
+
+class WebhookNotifier():
+    #? the webhooks are posted by one background thread: the callers only put the messages in a bounded queue
+    def __init__(self, post = None):
+        self.queue = queue.Queue(maxsize = NOTIF_QUEUE_SIZE)
+        self.webhooks = {}
+        self.post = post or requests.Session().post
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target = self.run, name = "log-notifier", daemon = True)
+                self.thread.start()
+
+    def stop(self, timeout = 5):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def notify(self, webhook, key, level, text):
+        try:
+            self.queue.put_nowait((webhook, key, level, text))
+        except queue.Full:
+            _notifications.labels(webhook.name, "dropped").inc()
+            return
+
+        if self.thread is None:
+            self.start()
+
+    def drain(self, now, timeout = 0):
+        try:
+            item = self.queue.get(timeout = timeout) if timeout > 0 else self.queue.get_nowait()
+            while True:
+                webhook, key, level, text = item
+                self.webhooks[webhook.url] = webhook
+                if not webhook.add(key, level, text, now):
+                    _notifications.labels(webhook.name, "dropped").inc()
+                item = self.queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def flush(self, now, force = False):
+        for webhook in self.webhooks.values():
+            while (force and len(webhook.pending) > 0) or webhook.is_ready(now):
+                batch = webhook.pop_batch()
+                if not self.send(webhook, batch, now) and not force:
+                    webhook.restore_batch(batch, now)
+                    break
+
+    def send(self, webhook, batch, now):
+        webhook.next_post_at = now + 60 / NOTIF_RATE_LIMIT
+        try:
+            response = self.post(webhook.url, json = webhook.build_payload([message for _, message in batch]), timeout = NOTIF_BATCH_WINDOW)
+        except Exception as e:
+            logging.warning("[WebhookNotifier][send] unexpected exception: {}".format(e))
+            _notifications.labels(webhook.name, "failed").inc(len(batch))
+            return True
+
+        if response.status_code == 429:
+            #? the webhook rate limit wins over ours
+            webhook.next_post_at = now + get_retry_after(response, 60 / NOTIF_RATE_LIMIT)
+            _notifications.labels(webhook.name, "throttled").inc()
+            return False
+
+        if response.status_code >= 500:
+            #? the webhook is unavailable, the batch is posted again after the usual delay
+            _notifications.labels(webhook.name, "retried").inc()
+            return False
+
+        if response.status_code >= 300:
+            logging.warning("[WebhookNotifier][send] the webhook {} rejected the batch: status = {}".format(webhook.name, response.status_code))
+            _notifications.labels(webhook.name, "failed").inc(len(batch))
+            return True
+
+        _notifications.labels(webhook.name, "sent").inc(len(batch))
+        return True
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.drain(time.monotonic(), timeout = 1)
+            self.flush(time.monotonic())
+
+        self.drain(time.monotonic())
+        self.flush(time.monotonic(), force = True)
+
+_notifier = WebhookNotifier()
+atexit.register(_notifier.stop)
+
+def notify(webhook, key, level, text):
+    _notifier.notify(webhook, key, level, text)
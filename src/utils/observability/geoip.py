@@ -0,0 +1,98 @@
+import csv
+import mmap
+import bisect
+import ipaddress
+
+from array import array
+
+_geoip_fields = ["ip_start", "ip_end", "continent", "country", "stateprov", "city", "latitude", "longitude"]
+
+def to_ip_int(ip):
+    address = ipaddress.ip_address(ip.strip().strip('"'))
+    return address.version, int(address)
+
+class IpRangeIndex():
+    #? sorted intervals: the range of an ip is found with a binary search on the starts
+    def __init__(self, typecode = None):
+        self.starts = array(typecode) if typecode else []
+        self.ends = array(typecode) if typecode else []
+        self.offsets = array('Q')
+        self.is_sorted = True
+
+    def add(self, start, end, offset):
+        if len(self.starts) > 0 and start < self.starts[-1]:
+            self.is_sorted = False
+        self.starts.append(start)
+        self.ends.append(end)
+        self.offsets.append(offset)
+
+    def sort(self):
+        if self.is_sorted:
+            return
+
+        ranges = sorted(zip(self.starts, self.ends, self.offsets))
+        for i, (start, end, offset) in enumerate(ranges):
+            self.starts[i] = start
+            self.ends[i] = end
+            self.offsets[i] = offset
+        self.is_sorted = True
+
+    def find(self, value):
+        i = bisect.bisect_right(self.starts, value) - 1
+        if i >= 0 and value <= self.ends[i]:
+            return self.offsets[i]
+        return None
+
+    def size(self):
+        return len(self.starts)
+
+class GeoIpDatabase():
+    #? ip ranges in the csv layout of db-ip lite: ip_start,ip_end,continent,country,stateprov,city,latitude,longitude
+    #? only the bounds and the offsets of the lines are kept in memory, the records are read from the memory-mapped file
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        #? the ipv6 values don't fit in a 64 bits array
+        self.indexes = {4: IpRangeIndex('Q'), 6: IpRangeIndex()}
+        self.load()
+
+    def load(self):
+        offset = 0
+        size = len(self.mm)
+        while offset < size:
+            end = self.mm.find(b"\n", offset)
+            end = size if end == -1 else end
+            fields = self.mm[offset:end].split(b",", 2)
+            if len(fields) >= 2:
+                try:
+                    version, start = to_ip_int(fields[0].decode())
+                    _, last = to_ip_int(fields[1].decode())
+                    self.indexes[version].add(start, last, offset)
+                except ValueError:
+                    pass #? header or malformed line
+            offset = end + 1
+
+        for index in self.indexes.values():
+            index.sort()
+
+    def read_record(self, offset):
+        end = self.mm.find(b"\n", offset)
+        line = self.mm[offset:end if end != -1 else len(self.mm)].decode("utf-8", errors = "replace")
+        return dict(zip(_geoip_fields, next(csv.reader([line.strip()]))))
+
+    def lookup(self, ip):
+        try:
+            version, value = to_ip_int(ip)
+        except ValueError:
+            return None
+
+        offset = self.indexes[version].find(value)
+        return self.read_record(offset) if offset is not None else None
+
+    def size(self):
+        return sum(index.size() for index in self.indexes.values())
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
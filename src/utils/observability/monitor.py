@@ -1,17 +1,16 @@
 import os
 import re
 import asyncio
-import socket
+import heapq
+import random
 import threading
 import time
-import requests
+import zlib
+import httpx
 
 from datetime import datetime
-from time import sleep
 
-from requests.auth import HTTPBasicAuth
-
-from utils.common import del_key_if_exists, get_env_int, get_or_else, is_empty_key, is_not_empty, is_not_empty_key, is_true, sanitize_header_name
+from utils.common import del_key_if_exists, get_env_bool, get_env_int, get_or_else, is_empty_key, is_not_empty, is_not_empty_key, is_true, sanitize_header_name
 from utils.faas.iot import send_payload_in_realtime
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import LOG_LEVEL, get_int_value_level, log_msg
@@ -23,6 +22,15 @@ from utils.env_vars import APP_ENV, APP_VERSION, DOMAIN
 
 MONITOR_SRC = os.getenv("MONITOR_SRC", "cwcloud-api")
 MONITOR_WAIT_TIME = get_env_int("MONITOR_WAIT_TIME", 300)
+MONITOR_CONCURRENCY = get_env_int("MONITOR_CONCURRENCY", 100)
+MONITOR_JITTER_PERCENT = get_env_int("MONITOR_JITTER_PERCENT", 10)
+MONITOR_REFRESH_TIME = get_env_int("MONITOR_REFRESH_TIME", 60)
+MONITOR_FLUSH_SIZE = get_env_int("MONITOR_FLUSH_SIZE", 500)
+MONITOR_FLUSH_TIME = get_env_int("MONITOR_FLUSH_TIME", 5)
+MONITOR_ELECTION_TIME = get_env_int("MONITOR_ELECTION_TIME", 30)
+MONITOR_LEADER_ELECTION = get_env_bool("MONITOR_LEADER_ELECTION", True)
+MONITOR_SHARD_COUNT = max(get_env_int("MONITOR_SHARD_COUNT", 1), 1)
+MONITOR_SHARD_INDEX = get_env_int("MONITOR_SHARD_INDEX", 0)
 _supported_monitor_types = ["http", "tcp"]
 
 def check_status_code_pattern(actual_code, pattern):
@@ -45,7 +53,7 @@ def get_level_monitor(monitor):
 
     return level
 
-def process_callbacks(monitor, payload):
+async def process_callbacks(monitor, payload, client):
     if is_empty_key(monitor, 'callbacks'):
         return
 
@@ -66,13 +74,14 @@ def process_callbacks(monitor, payload):
                 })
 
                 try:
-                    requests.post(callback["endpoint"], json=payload, headers=callback_headers, timeout=HTTP_REQUEST_TIMEOUT)
+                    await client.post(callback["endpoint"], json=payload, headers=callback_headers, timeout=HTTP_REQUEST_TIMEOUT)
                     log_msg("DEBUG", f"[monitor][process_callbacks] monitor result sent to: {callback['endpoint']}")
                 except Exception as e:
                     log_msg("ERROR", f"Failed to send HTTP callback: e.type = {type(e)}, e.msg = {str(e)}")
             elif callback["type"] in ["websocket", "mqtt"]:
                 try:
-                    asyncio.run(async_send_payload_in_realtime(callback, payload))
+                    #? the mqtt client is blocking
+                    await asyncio.to_thread(asyncio.run, async_send_payload_in_realtime(callback, payload))
                 except Exception as e:
                     log_msg("ERROR", f"Failed to send {callback['type']} callback: e.type = {type(e)}, e.msg = {str(e)}")
     except Exception as e:
@@ -101,7 +110,7 @@ def init_vars_monitor(monitor):
 
     return vdate, labels, pmonitor, level, timeout
 
-def check_tcp_monitor(monitor, gauges):
+async def check_tcp_monitor(monitor, gauges):
     vdate, labels, pmonitor, level, timeout = init_vars_monitor(monitor)
     callback_payload = {}
     duration = 0
@@ -125,23 +134,24 @@ def check_tcp_monitor(monitor, gauges):
     start_time = time.time()
 
     try:
-        with socket.create_connection((host, port), timeout=timeout):
-            duration = time.time() - start_time
-            callback_payload = {
-                "status": "ok",
-                "type": "monitor",
-                "time": vdate.isoformat(),
-                "duration": duration,
-                "message": "Monitor is healthy",
-                "monitor": pmonitor
-            }
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        duration = time.time() - start_time
+        writer.close()
+        callback_payload = {
+            "status": "ok",
+            "type": "monitor",
+            "time": vdate.isoformat(),
+            "duration": duration,
+            "message": "Monitor is healthy",
+            "monitor": pmonitor
+        }
 
-            log_msg(level, callback_payload)
-            set_gauge(gauges['result'], 1, {**labels, 'kind': 'result', 'user': monitor['user_id']})
-            set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
-            return duration, callback_payload
-            
-    except (socket.timeout, ConnectionRefusedError, socket.error) as e:
+        log_msg(level, callback_payload)
+        set_gauge(gauges['result'], 1, {**labels, 'kind': 'result', 'user': monitor['user_id']})
+        set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
+        return duration, callback_payload
+
+    except (asyncio.TimeoutError, OSError) as e:
         duration = time.time() - start_time
         callback_payload = {
             "status": "ko",
@@ -156,7 +166,7 @@ def check_tcp_monitor(monitor, gauges):
         set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
         return duration, callback_payload
 
-def check_http_monitor(monitor, gauges):
+async def check_http_monitor(monitor, gauges, clients):
     vdate, labels, pmonitor, level, timeout = init_vars_monitor(monitor)
     callback_payload = {}
     method = get_or_else(monitor, 'method', 'GET')
@@ -168,7 +178,7 @@ def check_http_monitor(monitor, gauges):
     check_tls = is_true(get_or_else(monitor, 'check_tls', True))
 
     if is_not_empty_key(monitor, 'username') and is_not_empty_key(monitor, 'password'): 
-        auth = HTTPBasicAuth(monitor['username'], monitor['password'])
+        auth = (monitor['username'], monitor['password'])
 
     if is_not_empty_key(monitor, 'headers'):
         for header in monitor['headers']:
@@ -176,14 +186,12 @@ def check_http_monitor(monitor, gauges):
                 headers[sanitize_header_name(header['name'])] = header['value']
 
     try:
+        client = clients['default'] if check_tls else clients['insecure']
         if method == "GET":
-            response = requests.get(monitor['url'], auth=auth, headers=headers, timeout=timeout, verify=check_tls)
-            duration = response.elapsed.total_seconds() * 1000
-        elif method == "POST":
-            response = requests.post(monitor['url'], auth=auth, headers=headers, data=monitor.get('body'), timeout=timeout, verify=check_tls)
+            response = await client.get(monitor['url'], auth=auth, headers=headers, timeout=timeout)
             duration = response.elapsed.total_seconds() * 1000
-        elif method == "PUT":
-            response = requests.put(monitor['url'], auth=auth, headers=headers, data=monitor.get('body'), timeout=timeout, verify=check_tls)
+        elif method in ["POST", "PUT"]:
+            response = await client.request(method, monitor['url'], auth=auth, headers=headers, content=monitor.get('body'), timeout=timeout)
             duration = response.elapsed.total_seconds() * 1000
         else:
             callback_payload = {
@@ -263,7 +271,7 @@ def check_http_monitor(monitor, gauges):
         log_msg("ERROR", callback_payload)
         return 0, callback_payload
 
-def check_monitor(monitor, gauges):
+async def check_monitor(monitor, gauges, clients):
     callback_payload = {}
     vdate, labels, pmonitor, _, _ = init_vars_monitor(monitor)
     response_time = 0
@@ -295,91 +303,206 @@ def check_monitor(monitor, gauges):
         return response_time, callback_payload
     
     if monitor['type'] == 'http':
-        response_time, callback_payload = check_http_monitor(monitor, gauges)
+        response_time, callback_payload = await check_http_monitor(monitor, gauges, clients)
     elif monitor['type'] == 'tcp':
-        response_time, callback_payload = check_tcp_monitor(monitor, gauges)
+        response_time, callback_payload = await check_tcp_monitor(monitor, gauges)
 
     return response_time, callback_payload
 
 gauges = {}
+_monitor_labels = ['name', 'family', 'kind', 'env', 'source', 'url', 'version', 'user']
 
-def check_monitors():
-    try:
-        from database.postgres_db import SessionLocal
-        from entities.Monitor import Monitor
-
-        db = SessionLocal()
-        loaded_data = Monitor.getAllMonitors(db)
-        labels = ['name', 'family', 'kind', 'env', 'source', 'url', 'version', 'user']
-
-        for monitor in loaded_data:
-            if monitor.name not in gauges:
-                gauges[monitor.name] = {
-                    'result': create_gauge(f"monitor_{monitor.name}_result", f"monitor {monitor.name} result", labels),
-                    'duration': create_gauge(f"monitor_{monitor.name}_duration", f"monitor {monitor.name} duration", labels)
-                }
+def get_monitor_gauges(name):
+    if name not in gauges:
+        gauges[name] = {
+            'result': create_gauge(f"monitor_{name}_result", f"monitor {name} result", _monitor_labels),
+            'duration': create_gauge(f"monitor_{name}_duration", f"monitor {name} duration", _monitor_labels)
+        }
 
-            monitor_dict = {
-                "name": monitor.name,
-                "family": monitor.family,
-                "type": monitor.type,
-                "url": monitor.url,
-                "method": monitor.method,
-                "timeout": monitor.timeout,
-                "expected_http_code": monitor.expected_http_code,
-                "body": monitor.body,
-                "expected_contain": monitor.expected_contain,
-                "username": monitor.username,
-                "password": monitor.password,
-                "user_id": monitor.user_id,
-                "callbacks": monitor.callbacks if monitor.callbacks else [],
-                "check_tls": monitor.check_tls,
-                "level": monitor.level,
-                "headers": [{"name": h["name"], "value": h["value"]} for h in monitor.headers] if monitor.headers else [],
-            }
+    return gauges[name]
+
+def is_in_shard(monitor_id):
+    return zlib.crc32(str(monitor_id).encode()) % MONITOR_SHARD_COUNT == MONITOR_SHARD_INDEX
+
+def get_monitor_interval(monitor):
+    return monitor.interval if is_not_empty(monitor.interval) and monitor.interval > 0 else MONITOR_WAIT_TIME
+
+def get_monitor_jitter(interval):
+    jitter = interval * MONITOR_JITTER_PERCENT / 100
+    return random.uniform(-jitter, jitter)
+
+def to_monitor_dict(monitor):
+    return {
+        "name": monitor.name,
+        "family": monitor.family,
+        "type": monitor.type,
+        "url": monitor.url,
+        "method": monitor.method,
+        "timeout": monitor.timeout,
+        "expected_http_code": monitor.expected_http_code,
+        "body": monitor.body,
+        "expected_contain": monitor.expected_contain,
+        "username": monitor.username,
+        "password": monitor.password,
+        "user_id": monitor.user_id,
+        "callbacks": monitor.callbacks if monitor.callbacks else [],
+        "check_tls": monitor.check_tls,
+        "level": monitor.level,
+        "headers": [{"name": h["name"], "value": h["value"]} for h in monitor.headers] if monitor.headers else [],
+    }
 
-            try:
-                response_time, callback_payload = check_monitor(monitor_dict, gauges[monitor.name])
-                Monitor.updateMonitorStatus(monitor.id, 'success' if is_true(callback_payload['status']) else 'failure', f"{response_time} ms", db)
-                process_callbacks(monitor_dict, callback_payload)
-            except Exception as me:
-                log_msg("ERROR", f"Error processing monitor {monitor.name}: e.type = {type(me)}, e.msg = {str(me)}")
+def load_monitors():
+    from database.postgres_db import SessionLocal
+    from entities.Monitor import Monitor
 
-    except Exception as e:
-        details = {
-            "type": type(e).__name__,
-            "file": __file__,
-            "lno": e.__traceback__.tb_lineno,
-        }
+    db = SessionLocal()
+    try:
+        return [{
+            'id': monitor.id,
+            'interval': get_monitor_interval(monitor),
+            'monitor': to_monitor_dict(monitor)
+        } for monitor in Monitor.getAllMonitors(db) if is_in_shard(monitor.id)]
+    finally:
+        db.close()
 
-        log_msg("ERROR", {
-            "status": "ko",
-            "i18n_code": "monitor_check_failed",
-            "type": "monitor",
-            "time": datetime.now().isoformat(),
-            "message": f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}",
-            "details": details,
-        })
+def save_monitors_status(statuses):
+    from database.postgres_db import SessionLocal
+    from entities.Monitor import Monitor
+
+    db = SessionLocal()
+    try:
+        Monitor.updateMonitorsStatus(statuses, db)
     finally:
-        if "db" in locals():
-            db.close()
+        db.close()
+
+class MonitorEngine():
+    def __init__(self):
+        self.monitors = {}
+        self.next_runs = {}
+        self.schedule = []
+        self.running = {}
+        self.statuses = {}
+        self.semaphore = asyncio.Semaphore(MONITOR_CONCURRENCY)
+        self.clients = {}
+
+    def refresh(self, monitors):
+        #? new monitors are spread over their first interval so that they don't all start at once
+        now = time.monotonic()
+        ids = set()
+        for entry in monitors:
+            ids.add(entry['id'])
+            self.monitors[entry['id']] = entry
+            if entry['id'] not in self.next_runs:
+                self.plan(entry['id'], now + random.uniform(0, entry['interval']))
+
+        for monitor_id in list(self.monitors.keys()):
+            if monitor_id not in ids:
+                del self.monitors[monitor_id]
+                del self.next_runs[monitor_id]
+
+    def plan(self, monitor_id, next_run):
+        self.next_runs[monitor_id] = next_run
+        heapq.heappush(self.schedule, (next_run, str(monitor_id), monitor_id))
+
+    def pop_due_monitors(self, now):
+        due = []
+        while self.schedule and self.schedule[0][0] <= now:
+            next_run, _, monitor_id = heapq.heappop(self.schedule)
+            if self.next_runs.get(monitor_id) != next_run:
+                continue
 
-def monitors():
-    def loop_monitors():
-        while True:
-            try:
-                with get_otel_tracer().start_as_current_span(span_format("monitors", Method.ASYNCWORKER)):
-                    check_monitors()
-            except Exception as e:
-                log_msg("ERROR", f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}")
-            finally:
-                sleep(MONITOR_WAIT_TIME)
+            #? a monitor late by more than its interval is planned from now rather than caught up
+            entry = self.monitors[monitor_id]
+            base = next_run if now - next_run < entry['interval'] else now
+            self.plan(monitor_id, max(base + entry['interval'] + get_monitor_jitter(entry['interval']), now + 1))
+            if monitor_id in self.running:
+                log_msg("DEBUG", "[monitor][pop_due_monitors] previous check still running: name = {}".format(entry['monitor']['name']))
+                continue
+
+            due.append(entry)
+        return due
+
+    async def check(self, entry):
+        monitor = entry['monitor']
+        try:
+            async with self.semaphore:
+                response_time, callback_payload = await check_monitor(monitor, get_monitor_gauges(monitor['name']), self.clients)
+                self.statuses[entry['id']] = {
+                    'id': entry['id'],
+                    'status': 'success' if is_true(callback_payload['status']) else 'failure',
+                    'response_time': f"{response_time} ms"
+                }
+                await process_callbacks(monitor, callback_payload, self.clients['default'])
+        except Exception as me:
+            log_msg("ERROR", f"Error processing monitor {monitor['name']}: e.type = {type(me)}, e.msg = {str(me)}")
+        finally:
+            self.running.pop(entry['id'], None)
+
+    async def flush(self):
+        if not self.statuses:
+            return
+
+        statuses = list(self.statuses.values())
+        self.statuses = {}
+        try:
+            await asyncio.to_thread(save_monitors_status, statuses)
+        except Exception as e:
+            log_msg("ERROR", f"Error saving monitors status: count = {len(statuses)}, e.type = {type(e)}, e.msg = {str(e)}")
+
+    async def run(self, lock = None):
+        limits = httpx.Limits(max_connections = MONITOR_CONCURRENCY)
+        self.clients = {
+            'default': httpx.AsyncClient(limits = limits, follow_redirects = True),
+            'insecure': httpx.AsyncClient(limits = limits, follow_redirects = True, verify = False)
+        }
+        refreshed_at = flushed_at = 0
+        try:
+            while True:
+                now = time.monotonic()
+                if now - refreshed_at >= MONITOR_REFRESH_TIME:
+                    if lock is not None and not await asyncio.to_thread(lock.is_held):
+                        return
+
+                    with get_otel_tracer().start_as_current_span(span_format("monitors", Method.ASYNCWORKER)):
+                        self.refresh(await asyncio.to_thread(load_monitors))
+                    refreshed_at = now
+
+                for entry in self.pop_due_monitors(now):
+                    self.running[entry['id']] = asyncio.create_task(self.check(entry))
+
+                if len(self.statuses) >= MONITOR_FLUSH_SIZE or now - flushed_at >= MONITOR_FLUSH_TIME:
+                    await self.flush()
+                    flushed_at = now
+
+                await asyncio.sleep(1)
+        finally:
+            for task in list(self.running.values()):
+                task.cancel()
+            await self.flush()
+            for client in self.clients.values():
+                await client.aclose()
+
+async def run_monitors():
+    #? with the leader election, a single worker among all the api instances checks the monitors of its shard
+    lock = None
+    if MONITOR_LEADER_ELECTION:
+        from database.advisory_lock import AdvisoryLock
+        lock = AdvisoryLock("monitors-{}".format(MONITOR_SHARD_INDEX))
+
+    while True:
+        try:
+            if lock is None or await asyncio.to_thread(lock.try_acquire):
+                await MonitorEngine().run(lock)
+        except Exception as e:
+            log_msg("ERROR", f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}")
+            if lock is not None:
+                await asyncio.to_thread(lock.release)
+        finally:
+            await asyncio.sleep(MONITOR_ELECTION_TIME)
 
+def monitors():
     def start_monitors():
-        sleep(MONITOR_WAIT_TIME)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(loop_monitors())
+        asyncio.run(run_monitors())
 
-    async_thread = threading.Thread(target=start_monitors, daemon=True)
+    async_thread = threading.Thread(target=start_monitors, name="monitors", daemon=True)
     async_thread.start()
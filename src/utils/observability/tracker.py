@@ -1,31 +1,131 @@
 import os
 import re
-import requests
+import asyncio
+import threading
+import httpx
 
 from user_agents import parse
 from PIL import Image
 
-from utils.common import get_env_int, is_empty, is_empty_key, is_response_ok
+from utils.common import get_env_bool, get_env_int, is_empty, is_empty_key, is_not_empty, is_response_ok
 from utils.logger import log_msg
+from utils.lru_cache import TtlLruCache
+from utils.observability.geoip import GeoIpDatabase
 
 TRACKER_IMAGE_PATH = os.getenv('TRACKER_IMAGE_PATH', "tracker_image.png")
 TRACKER_LOCATION_TIMEOUT = get_env_int('TRACKER_LOCATION_TIMEOUT', 60)
+TRACKER_GEOIP_DB_PATH = os.getenv('TRACKER_GEOIP_DB_PATH')
+TRACKER_REMOTE_LOOKUP = get_env_bool('TRACKER_REMOTE_LOOKUP', True)
+TRACKER_REMOTE_CONCURRENCY = get_env_int('TRACKER_REMOTE_CONCURRENCY', 10)
+TRACKER_CACHE_TTL = get_env_int('TRACKER_CACHE_TTL', 86400)
+TRACKER_ERROR_CACHE_TTL = get_env_int('TRACKER_ERROR_CACHE_TTL', 60)
 DEFAULT_VALUE = "unknown"
 
+_ua_cache = TtlLruCache(get_env_int('TRACKER_UA_CACHE_SIZE', 10000), TRACKER_CACHE_TTL)
+_ip_cache = TtlLruCache(get_env_int('TRACKER_IP_CACHE_SIZE', 100000), TRACKER_CACHE_TTL)
+_geoip_db = None
+_tracker_img = None
+_remote_client = None
+_remote_semaphore = None
+
 def init_tracker_img():
     if not os.path.exists(TRACKER_IMAGE_PATH):
         img = Image.new('RGBA', (1, 1), (255, 255, 255, 0))
         img.save(TRACKER_IMAGE_PATH)
 
+def get_tracker_img():
+    #? the pixel is read once instead of checking the filesystem for every hit
+    global _tracker_img
+    if _tracker_img is None:
+        init_tracker_img()
+        with open(TRACKER_IMAGE_PATH, "rb") as img:
+            _tracker_img = img.read()
+    return _tracker_img
+
+def load_geoip_db(path = TRACKER_GEOIP_DB_PATH):
+    global _geoip_db
+    if is_empty(path):
+        return
+
+    try:
+        _geoip_db = GeoIpDatabase(path)
+        _ip_cache.clear()
+        log_msg("INFO", "[load_geoip_db] {} ip ranges loaded from {}".format(_geoip_db.size(), path))
+    except Exception as e:
+        log_msg("ERROR", "[load_geoip_db] unexpected error: path = {}, e.type = {}, e.msg = {}".format(path, type(e), e))
+
+def tracker():
+    get_tracker_img()
+    threading.Thread(target = load_geoip_db, name = "tracker-geoip", daemon = True).start()
+
+def get_local_infos_from_ip(ip: str):
+    infos = _ip_cache.get(ip)
+    if infos is not None or _geoip_db is None:
+        return infos
+
+    record = _geoip_db.lookup(ip)
+    if record is None:
+        return None
+
+    infos = {
+        "status": "ok",
+        "source": "local",
+        "city": record.get("city") or DEFAULT_VALUE,
+        "region": record.get("stateprov") or DEFAULT_VALUE,
+        "country": record.get("country") or DEFAULT_VALUE,
+        "country_iso": record.get("country") or DEFAULT_VALUE,
+        "continent": record.get("continent") or DEFAULT_VALUE,
+        "loc": "{},{}".format(record["latitude"], record["longitude"]) if is_not_empty(record.get("latitude")) and is_not_empty(record.get("longitude")) else DEFAULT_VALUE,
+        "ip": ip
+    }
+    _ip_cache.put(ip, infos)
+    return infos
+
+def get_remote_client():
+    global _remote_client, _remote_semaphore
+    if _remote_client is None:
+        _remote_client = httpx.AsyncClient(timeout = TRACKER_LOCATION_TIMEOUT)
+        _remote_semaphore = asyncio.Semaphore(TRACKER_REMOTE_CONCURRENCY)
+    return _remote_client
+
+async def get_infos_from_ip(ip: str):
+    #? local database and cache first, the remote apis are only a fallback
+    infos = get_local_infos_from_ip(ip)
+    if infos is not None:
+        return infos
+
+    if not TRACKER_REMOTE_LOOKUP:
+        return {
+            "status": "ko",
+            "ip": ip,
+            "reason": "not found"
+        }
+
+    client = get_remote_client()
+    async with _remote_semaphore:
+        infos = await get_remote_infos_from_ip(ip, client)
+
+    _ip_cache.put(ip, infos, None if infos.get("status") == "ok" else TRACKER_ERROR_CACHE_TTL)
+    return infos
+
 def override_if_is_empty(payload, pkey, data, dkey = None):
     if is_empty(dkey):
         dkey = pkey
 
     return data.get(dkey, DEFAULT_VALUE) if is_empty_key(payload, pkey) or payload[pkey] == DEFAULT_VALUE else payload[pkey]
 
-def get_infos_from_ip(ip: str):
+async def get_remote_infos_from_ip(ip: str, client: httpx.AsyncClient):
+    ipapi, ipinfo = await asyncio.gather(
+        client.get(f"https://ipapi.co/{ip}/json"),
+        client.get(f"https://ipinfo.io/{ip}/json"),
+        return_exceptions = True
+    )
+
     try:
-        response = requests.get(f"https://ipapi.co/{ip}/json", timeout=TRACKER_LOCATION_TIMEOUT)
+        if isinstance(ipapi, Exception):
+            raise ipapi
+
+        response = ipapi
         status_code = response.status_code
         if is_response_ok(status_code):
             data = response.json()
@@ -52,7 +152,7 @@ def get_infos_from_ip(ip: str):
                 data = response.json()
                 reason = data.get("reason", DEFAULT_VALUE)
             except Exception as pe:
-                log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, pe.type = {}, pe.msg = {}".format(ip, type(pe), pe))
+                log_msg("WARN", "[get_remote_infos_from_ip] unexpected error with ipapi.co: ip = {}, pe.type = {}, pe.msg = {}".format(ip, type(pe), pe))
                 reason = str(pe)
 
             payload = {
@@ -62,16 +162,19 @@ def get_infos_from_ip(ip: str):
                 "reason": reason
             }
     except Exception as e:
-        log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+        log_msg("WARN", "[get_remote_infos_from_ip] unexpected error with ipapi.co: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
         payload = {
             "status": "ko",
             "ip": ip,
             "reason": str(e)
         }
 
-    response = requests.get(f"https://ipinfo.io/{ip}/json", timeout=TRACKER_LOCATION_TIMEOUT)
-    status_code = response.status_code
     try:
+        if isinstance(ipinfo, Exception):
+            raise ipinfo
+
+        response = ipinfo
+        status_code = response.status_code
         if is_response_ok(status_code):
             data = response.json()
             payload['status'] = "ok"
@@ -87,11 +190,23 @@ def get_infos_from_ip(ip: str):
             payload['timezone'] = override_if_is_empty(payload, 'timezone', data)
             payload['ip'] = override_if_is_empty(payload, 'ip', data)
     except Exception as e:
-        log_msg("WARN", "[get_infos_from_ip] unexpected error with ipinfo.io: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+        log_msg("WARN", "[get_remote_infos_from_ip] unexpected error with ipinfo.io: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
 
     return payload
 
 def parse_user_agent(user_agent):
+    if is_empty(user_agent):
+        return compute_user_agent(user_agent)
+
+    parsed_ua = _ua_cache.get(user_agent)
+    if parsed_ua is None:
+        parsed_ua = compute_user_agent(user_agent)
+        _ua_cache.put(user_agent, parsed_ua)
+
+    #? the details are copied so that the callers can't alter the cached value
+    return {**parsed_ua, 'details': dict(parsed_ua['details'])}
+
+def compute_user_agent(user_agent):
     if is_empty(user_agent):
         return {
             "device": DEFAULT_VALUE,
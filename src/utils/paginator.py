@@ -1,6 +1,18 @@
+import base64
+import json
+
+from sqlalchemy import literal, tuple_
+
+from utils.common import is_empty, is_true
+
+_json_scalar_types = (str, int, float, bool, type(None))
+
 def get_paginated_list(data, url, page, no_per_page):
-    count = len(data)
+    start = (page-1) * no_per_page
+    return get_paginated_page(data[start: page * no_per_page], len(data), url, page, no_per_page)
 
+def get_paginated_page(data, count, url, page, no_per_page):
+    #? the data is the already extracted page so that the whole table doesn't have to be loaded
     obj = {}
     obj['page'] = page
     obj['no_per_page'] = no_per_page
@@ -23,6 +35,76 @@ def get_paginated_list(data, url, page, no_per_page):
     else:
         obj['next'] = url + '?page=%d&no_per_page=%d' % (page + 1, no_per_page)
 
-    # extract result according to bounds
-    obj['data'] = data[start: limit]
+    obj['data'] = data
     return obj
+
+def encode_cursor(values, direction):
+    payload = json.dumps({'k': values, 'd': direction}, separators = (',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, size):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode((cursor + '=' * (-len(cursor) % 4)).encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor: {}".format(e))
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('k'), list) or len(payload['k']) != size or payload.get('d') not in ['next', 'prev']:
+        raise ValueError("Invalid cursor: {}".format(cursor))
+
+    return payload['k'], payload['d']
+
+def get_cursor_key(row, columns):
+    values = [getattr(row, column.key) for column in columns]
+    return [value if isinstance(value, _json_scalar_types) else "{}".format(value) for value in values]
+
+def paginate(query, columns, limit, cursor = None, offset = 0):
+    #? keyset pagination in descending order on the columns, the last one must be unique (tie-breaker)
+    #? the cursor gives a constant time access to any page whereas the offset is kept for the former clients
+    direction = 'next'
+    if is_empty(cursor):
+        query = query.order_by(*[column.desc() for column in columns]).offset(offset)
+    else:
+        values, direction = decode_cursor(cursor, len(columns))
+        keys = tuple_(*columns)
+        #? the values are bound with the columns types (i.e: the uuid are converted by the guid type)
+        values = [literal(value, column.type) for column, value in zip(columns, values)]
+        if direction == 'next':
+            query = query.filter(keys < tuple_(*values)).order_by(*[column.desc() for column in columns])
+        else:
+            query = query.filter(keys > tuple_(*values)).order_by(*[column.asc() for column in columns])
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == 'prev':
+        rows.reverse()
+
+    has_next = has_more if direction == 'next' else True
+    has_previous = (not is_empty(cursor) or offset > 0) if direction == 'next' else has_more
+    return {
+        'results': rows,
+        'next_cursor': encode_cursor(get_cursor_key(rows[-1], columns), 'next') if has_next and rows else None,
+        'previous_cursor': encode_cursor(get_cursor_key(rows[0], columns), 'prev') if has_previous and rows else None
+    }
+
+def get_page_cursors(page, query, total = False):
+    cursors = {
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor']
+    }
+
+    if is_true(total):
+        cursors['total'] = estimate_count(query)
+
+    return cursors
+
+def estimate_count(query):
+    #? the planner estimate on postgres so that the total stays cheap on the big tables, the exact count elsewhere
+    query = query.order_by(None)
+    connection = query.session.connection()
+    if connection.dialect.name != 'postgresql':
+        return query.count()
+
+    compiled = query.statement.compile(dialect = connection.dialect)
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) {}".format(compiled), compiled.params).scalar()
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import threading
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+from utils.common import get_env_int
+from utils.logger import log_msg
+
+PASSWORD_HASH_WORKERS = get_env_int('PASSWORD_HASH_WORKERS', 2)
+PASSWORD_HASH_QUEUE_SIZE = get_env_int('PASSWORD_HASH_QUEUE_SIZE', 32)
+PASSWORD_HASH_MAX_PER_SOURCE = get_env_int('PASSWORD_HASH_MAX_PER_SOURCE', 2)
+
+#? the hashes below BCRYPT_ROUNDS are upgraded on the next successful login
+BCRYPT_ROUNDS = get_env_int('BCRYPT_ROUNDS', 12)
+pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto", bcrypt__default_rounds = BCRYPT_ROUNDS, bcrypt__min_rounds = BCRYPT_ROUNDS)
+
+#? bcrypt burns the cpu under the gil, so the hashes are computed in dedicated processes
+#? and the requests of the same worker keep being served in the meantime
+_executor = None
+_executor_lock = threading.Lock()
+
+def compute_hash(password):
+    return pwd_context.hash(password)
+
+def compute_verify_and_update(plain_password, hashed_password):
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except (UnknownHashError, ValueError, TypeError):
+        return False, None
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None and PASSWORD_HASH_WORKERS > 0:
+            #? spawn rather than fork: the api process already runs threads
+            _executor = ProcessPoolExecutor(max_workers = PASSWORD_HASH_WORKERS, mp_context = multiprocessing.get_context("spawn"))
+        return _executor
+
+def reset_executor(executor):
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+def run_hashing(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+
+    try:
+        return executor.submit(fn, *args).result()
+    except BrokenProcessPool as e:
+        log_msg("WARN", "[password][run_hashing] the hashing pool is broken, it will be recreated: {}".format(e))
+        reset_executor(executor)
+        return fn(*args)
+
+class HashingAdmission():
+    #? bounds the pending hashes overall and per source (ip, email) so a burst
+    #? from a few clients can't fill the pool for everybody else
+    def __init__(self, max_pending, max_per_source):
+        self.max_pending = max_pending
+        self.max_per_source = max_per_source
+        self.pending = 0
+        self.pending_by_source = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, sources):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                return False
+
+            if any(self.pending_by_source.get(source, 0) >= self.max_per_source for source in sources):
+                return False
+
+            self.pending += 1
+            for source in sources:
+                self.pending_by_source[source] = self.pending_by_source.get(source, 0) + 1
+            return True
+
+    def release(self, sources):
+        with self.lock:
+            self.pending -= 1
+            for source in sources:
+                count = self.pending_by_source.get(source, 0) - 1
+                if count > 0:
+                    self.pending_by_source[source] = count
+                else:
+                    self.pending_by_source.pop(source, None)
+
+_admission = HashingAdmission(PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_MAX_PER_SOURCE)
+
+def hash_password(password):
+    return run_hashing(compute_hash, password)
+
+def verify_password(plain_password, hashed_password):
+    verified, _ = run_hashing(compute_verify_and_update, plain_password, hashed_password)
+    return verified
+
+async def run_hashing_async(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        return await asyncio.to_thread(fn, *args)
+
+    try:
+        return await asyncio.wrap_future(executor.submit(fn, *args))
+    except BrokenProcessPool as e:
+        log_msg("WARN", "[password][run_hashing_async] the hashing pool is broken, it will be recreated: {}".format(e))
+        reset_executor(executor)
+        return await asyncio.to_thread(fn, *args)
+
+async def verify_login_password(plain_password, hashed_password, sources):
+    #? new_hash is set when the stored hash has to be upgraded to the current cost factor
+    sources = [source for source in sources if source]
+    if not _admission.acquire(sources):
+        return {
+            'status': 'ko',
+            'http_code': 429,
+            'error': 'Too many authentication attempts, try again later',
+            'i18n_code': 'auth_too_many_attempts'
+        }
+
+    try:
+        verified, new_hash = await run_hashing_async(compute_verify_and_update, plain_password, hashed_password)
+    finally:
+        _admission.release(sources)
+
+    return {
+        'status': 'ok',
+        'verified': verified,
+        'new_hash': new_hash
+    }
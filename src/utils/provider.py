@@ -1,38 +1,35 @@
 import os
-import yaml
 
 from urllib.error import HTTPError
 
+from utils.cloud_config import get_cloud_config
 from utils.common import is_empty
 from utils.logger import log_msg
 
 def exist_provider(providerName):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-        providers = [p for p in result if p['name'] == providerName]
-    return len(providers)>0
+    return get_cloud_config().get_provider(providerName) is not None
 
 def get_providers():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-    return result
+    return get_cloud_config().data['providers']
 
 def get_provider_infos(provider, key):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-        provider = [p for p in result if p['name'] == provider]
-        if not len(provider)>0:
-            raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
-    return provider[0][key]
+    provider_config = get_cloud_config().get_provider(provider)
+    if provider_config is None:
+        raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
+    return provider_config[key]
+
+def get_zone_config(provider, region, zone):
+    get_provider_infos(provider, 'instance_configs')
+    config = get_cloud_config()
+    if config.get_region(provider, region) is None:
+        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
+    zone_config = config.get_zone(provider, region, zone)
+    if zone_config is None:
+        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
+    return zone_config
+
+def is_available_instance_type(instance):
+    return 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])
 
 def get_driver(provider):
     driver = get_provider_infos(provider, 'driver')
@@ -58,8 +55,7 @@ def get_provider_available_instances(provider):
         zones = instance_config['zones']
         available_zones = []
         for zone in zones:
-            instances_types = get_provider_available_instances_by_region_zone(provider, region, zone['name'])
-            if len(instances_types)>0:
+            if any(is_available_instance_type(instance) for instance in zone['instance_types']):
                 available_zones.append(zone['name'])
         if len(available_zones)>0:
             region_instances.append({"region": region, "zones": available_zones})
@@ -67,38 +63,17 @@ def get_provider_available_instances(provider):
     return region_instances
 
 def get_provider_available_instances_config_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: instance, filtered_instances))
+    zone_config = get_zone_config(provider, region, zone)
+    return [instance for instance in zone_config['instance_types'] if is_available_instance_type(instance)]
 
 def get_provider_available_instances_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: instance['type'], filtered_instances))
+    zone_config = get_zone_config(provider, region, zone)
+    return [instance['type'] for instance in zone_config['instance_types'] if is_available_instance_type(instance)]
 
 def get_specific_config(provider, key, region, zone):
-    config = None
-    provider_instances_config = get_provider_infos(provider, 'instance_configs')
-    for instance_config in provider_instances_config:
-        if instance_config['region'] == region:
-            for z in instance_config['zones']:
-                if z['name'] == zone:
-                    config = z[key] if key in z else None
-                    break
+    get_provider_infos(provider, 'instance_configs')
+    zone_config = get_cloud_config().get_zone(provider, region, zone)
+    config = zone_config[key] if zone_config is not None and key in zone_config else None
 
     log_msg("INFO", "[provider][get_specific_config] provider = {}, key = {}, region = {}, zone = {} = > config = {}".format(provider, key, region, zone, config))
     return config
@@ -111,8 +86,7 @@ def get_provider_instances_pricing(provider):
         zones = instance_config['zones']
         available_zones = []
         for zone in zones:
-            instances_types = get_provider_available_instances_by_region_zone(provider, region, zone['name'])
-            if len(instances_types)>0:
+            if any(is_available_instance_type(instance) for instance in zone['instance_types']):
                 available_zones.append({'name':zone['name'], 'instances':zone['instance_types']})
         if len(available_zones)>0:
             region_instances.append({"region": region, "zones": available_zones})
@@ -120,36 +94,19 @@ def get_provider_instances_pricing(provider):
     return region_instances
 
 def get_provider_instances_pricing_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: {
+    zone_config = get_zone_config(provider, region, zone)
+    return [{
         "name": instance['type'],
         "price": os.getenv(instance['price_variable'])
-    }, filtered_instances))
+    } for instance in zone_config['instance_types'] if is_available_instance_type(instance)]
 
 def extract_provider_name(driver):
     return driver.replace("Driver", "").lower()
 
 def get_provider_dns_zones(provider):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        dns_zones = loaded_data['dns_zones']
-        result = [dns_zone['name'] for dns_zone in dns_zones if extract_provider_name(dns_zone['driver']) == provider]
-    return result
+    dns_zones = get_cloud_config().data['dns_zones']
+    return [dns_zone['name'] for dns_zone in dns_zones if extract_provider_name(dns_zone['driver']) == provider]
 
 def get_dns_providers():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        dns_zones = loaded_data['dns_zones']
-        result = list(set([extract_provider_name(dns_zone['driver']) for dns_zone in dns_zones]))
-    return result
+    dns_zones = get_cloud_config().data['dns_zones']
+    return list(set([extract_provider_name(dns_zone['driver']) for dns_zone in dns_zones]))
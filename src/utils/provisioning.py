@@ -0,0 +1,43 @@
+from adapters.AdapterConfig import get_adapter
+from entities.ProvisioningJob import ProvisioningJob
+from utils.common import get_env_int
+from utils.consumer import PROVISIONING_CHANNEL, PROVISIONING_GROUP
+from utils.logger import log_msg
+
+PROVISIONING_MAX_ATTEMPTS = get_env_int('PROVISIONING_MAX_ATTEMPTS', 3)
+PROVISIONING_RETRY_DELAY = get_env_int('PROVISIONING_RETRY_DELAY', 60)
+PROVISIONING_PROVIDER_CONCURRENCY = get_env_int('PROVISIONING_PROVIDER_CONCURRENCY', 2)
+PROVISIONING_POLL_INTERVAL = get_env_int('PROVISIONING_POLL_INTERVAL', 30)
+PROVISIONING_JOB_TIMEOUT = get_env_int('PROVISIONING_JOB_TIMEOUT', 600)
+PROVISIONING_HEARTBEAT_INTERVAL = get_env_int('PROVISIONING_HEARTBEAT_INTERVAL', 60)
+
+_pubsub_adapter = get_adapter("pubsub")
+
+def enqueue_provisioning_job(kind, provider, resource_id, user_id, args, db):
+    #? the stacks are run by the provisioner workers: the api only persists the job and notifies them
+    job = ProvisioningJob(kind = kind, provider = provider, resource_id = resource_id, user_id = user_id, args = args)
+    job.save(db)
+    try:
+        _pubsub_adapter().publish(PROVISIONING_GROUP, PROVISIONING_CHANNEL, {'job_id': "{}".format(job.id), 'provider': provider})
+    except Exception as e:
+        #? the job stays pending in the database, the workers will pick it up when polling
+        log_msg("WARN", "[enqueue_provisioning_job] unable to notify the workers: job_id = {}, e.type = {}, e.msg = {}".format(job.id, type(e), e))
+    return job
+
+def get_retry_delay(attempts):
+    return PROVISIONING_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+def get_job_json(job):
+    return {
+        'id': "{}".format(job.id),
+        'kind': job.kind,
+        'provider': job.provider,
+        'resource_id': job.resource_id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'max_attempts': PROVISIONING_MAX_ATTEMPTS,
+        'error': job.error,
+        'next_attempt_at': job.next_attempt_at.isoformat() if job.status == "pending" else None,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat()
+    }
@@ -0,0 +1,97 @@
+import copy
+import json
+import orjson
+import threading
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.engine.row import Row
+
+_json_scalar_types = (str, int, float, bool, type(None))
+_json_container_types = (list, dict)
+_serializers = {}
+_lock = threading.Lock()
+
+class ModelSerializer():
+    #? the columns and relationships of the mapped class are resolved once instead of walking dir() for every row
+    def __init__(self, model):
+        #? the backrefs are only added to the mappers once they're configured
+        configure_mappers()
+        mapper = inspect(model)
+        self.model = model
+        self.columns = [attr.key for attr in mapper.column_attrs]
+        self.relationships = {rel.key: rel.uselist for rel in mapper.relationships}
+        self.mapped = set(mapper.attrs.keys())
+        self.attributes = [key for key in dir(model) if is_public_attribute(key) and key not in self.mapped and not callable(getattr(model, key))]
+
+    def to_dict(self, obj, fields = None, relationships = None):
+        data = {}
+        for key in self.columns if fields is None else fields:
+            value = getattr(obj, key)
+            if isinstance(value, _json_scalar_types):
+                data[key] = value
+            elif isinstance(value, _json_container_types):
+                #? jsonb values, copied so that the callers can't alter the entity through the result
+                data[key] = copy.deepcopy(value)
+
+        #? the relationships are opt-in: they would lazy load one query per row otherwise
+        for key, nested in (relationships or {}).items():
+            if key not in self.relationships:
+                raise AttributeError("{} has no relationship {}".format(self.model.__name__, key))
+
+            nested = nested if isinstance(nested, dict) else {'fields': nested}
+            data[key] = serialize(getattr(obj, key), nested.get('fields'), nested.get('relationships'))
+        return data
+
+    def to_legacy_dict(self, obj):
+        #? same output as the former dir() walk: sorted keys, the relationships only appear when they're empty
+        #? and the other public attributes are kept when they're serializable
+        data = self.to_dict(obj)
+        for key in self.relationships:
+            value = getattr(obj, key)
+            if value is None or (isinstance(value, list) and len(value) == 0):
+                data[key] = None if value is None else []
+
+        for key in self.attributes + [key for key in obj.__dict__ if is_public_attribute(key) and key not in self.mapped]:
+            value = getattr(obj, key)
+            if is_serializable(value):
+                data[key] = value
+        return dict(sorted(data.items()))
+
+def is_public_attribute(key):
+    return not key.startswith('_') and key not in ['metadata', 'query', 'registry']
+
+def is_serializable(value):
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+def get_serializer(model):
+    serializer = _serializers.get(model)
+    if serializer is None:
+        with _lock:
+            serializer = _serializers.setdefault(model, ModelSerializer(model))
+    return serializer
+
+def is_mapped(obj):
+    return hasattr(type(obj), '__mapper__')
+
+def serialize(obj, fields = None, relationships = None):
+    if isinstance(obj, (list, tuple)):
+        return [serialize(item, fields, relationships) for item in obj]
+    elif isinstance(obj, Row):
+        return dict(obj._mapping)
+    elif is_mapped(obj):
+        return get_serializer(type(obj)).to_dict(obj, fields, relationships)
+    return obj
+
+def dumps(data):
+    #? the non string keys are converted like json.dumps does
+    return orjson.dumps(data, option = orjson.OPT_NON_STR_KEYS)
+
+class SerializedResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
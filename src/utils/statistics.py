@@ -0,0 +1,51 @@
+from sqlalchemy import func, literal, select, union_all
+
+from utils.broadcast import broadcast, decode_broadcast, start_broadcast_listener
+from utils.common import get_env_int, is_empty_key
+from utils.consumer import STATISTICS_CHANNEL
+from utils.logger import log_msg
+from utils.lru_cache import TtlLruCache
+
+_statistics = TtlLruCache(get_env_int('STATISTICS_CACHE_SIZE', 10000), get_env_int('STATISTICS_CACHE_TTL', 300))
+
+def count_user_cloud_resources(user_id, db):
+    from entities.Instance import Instance
+    from entities.Project import Project
+    from entities.Bucket import Bucket
+    from entities.Registry import Registry
+
+    #? the four counts come back from a single round trip
+    query = union_all(
+        select(literal("projects").label("kind"), func.count()).select_from(Project).where(Project.userid == user_id),
+        select(literal("instances").label("kind"), func.count()).select_from(Instance).where(Instance.user_id == user_id, Instance.status != "deleted"),
+        select(literal("buckets").label("kind"), func.count()).select_from(Bucket).where(Bucket.user_id == user_id, Bucket.status != "deleted"),
+        select(literal("registries").label("kind"), func.count()).select_from(Registry).where(Registry.user_id == user_id, Registry.status != "deleted")
+    )
+    counts = {"projects": 0, "instances": 0, "buckets": 0, "registries": 0}
+    counts.update({kind: count for kind, count in db.execute(query)})
+    return counts
+
+def get_user_cloud_counts(user_id, db):
+    start_broadcast_listener(STATISTICS_CHANNEL, handle_statistics_change)
+    counts = _statistics.get(user_id)
+    if counts is None:
+        counts = count_user_cloud_resources(user_id, db)
+        _statistics.put(user_id, counts)
+    return counts
+
+def invalidate_user_statistics(*user_ids):
+    #? evicts the local counters right away and the other API instances' ones through the pubsub
+    for user_id in user_ids:
+        if user_id is None:
+            continue
+
+        log_msg("DEBUG", "[invalidate_user_statistics] user_id = {}".format(user_id))
+        _statistics.delete(user_id)
+        broadcast(STATISTICS_CHANNEL, {'user_id': user_id})
+
+async def handle_statistics_change(msg):
+    payload = decode_broadcast(msg)
+    if payload is None or is_empty_key(payload, 'user_id'):
+        return
+
+    _statistics.delete(payload['user_id'])